@@ -0,0 +1,308 @@
+#!/usr/bin/env python3
+# -*- coding:utf-8 -*-
+# =========================================================================== #
+# Project  : Drug Approval Analytics                                          #
+# Version  : 0.1.0                                                            #
+# File     : \src\domain\features\build_features.py                           #
+# Language : Python 3.9.5                                                     #
+# --------------------------------------------------------------------------  #
+# Author   : John James                                                       #
+# Company  : nov8.ai                                                          #
+# Email    : john.james@nov8.ai                                               #
+# URL      : https://github.com/john-james-sf/drug-approval-analytics         #
+# --------------------------------------------------------------------------  #
+# Created  : Sunday, October 18th 2026, 9:12:40 am                            #
+# Modified : Sunday, October 18th 2026, 9:12:40 am                            #
+# Modifier : John James (john.james@nov8.ai)                                  #
+# --------------------------------------------------------------------------- #
+# License  : BSD 3-clause "New" or "Revised" License                          #
+# Copyright: (c) 2021 nov8.ai                                                 #
+# =========================================================================== #
+"""Feature engine: declarative column transforms compiled into a lazy DAG.
+
+Each FeatureTransform declares the columns it consumes and the columns it
+produces. Base columns come from FeatureSources, i.e. tables keyed by
+nct_id that are loaded and joined at most once per build. When features
+are requested, the engine walks the DAG back from the requested columns,
+loads only the sources and executes only the transforms on that path, and
+shares intermediate columns between every feature that depends on them.
+
+"""
+from dataclasses import dataclass, field
+from datetime import datetime
+import logging
+from typing import Callable, Union
+
+import numpy as np
+import pandas as pd
+
+from ...utils.logger import exception_handler
+# --------------------------------------------------------------------------- #
+logger = logging.getLogger(__name__)
+
+
+# --------------------------------------------------------------------------- #
+#                           FEATURE SOURCE                                    #
+# --------------------------------------------------------------------------- #
+@dataclass
+class FeatureSource:
+    """A table of base columns keyed by study.
+
+    Arguments:
+        name (str): Name of the source, e.g. the AACT table name.
+        columns (list): Columns the source can provide.
+        loader (Callable): Called with the list of columns required and
+            returns a DataFrame containing the key and those columns.
+        key (str): The column identifying the study. Defaults to 'nct_id'
+    """
+    name: str
+    columns: list
+    loader: Callable
+    key: str = field(default='nct_id')
+
+
+# --------------------------------------------------------------------------- #
+#                          FEATURE TRANSFORM                                  #
+# --------------------------------------------------------------------------- #
+@dataclass
+class FeatureTransform:
+    """Declares a vectorized transform of input columns to output columns.
+
+    The function receives one pandas Series per input, in the order given,
+    and returns a Series or ndarray for a single output, or a tuple,
+    list or DataFrame with one element per output.
+
+    Arguments:
+        name (str): Name of the transform.
+        inputs (list): Names of the input columns.
+        outputs (list): Names of the output columns.
+        func (Callable): The vectorized transform function.
+        type (str): The type of transform. Defaults to 'derived'
+        description (str): Description of the transform.
+        feature_id (str): Id of the feature in the metabase feature
+            table. Only transforms with a feature_id are recorded in the
+            featuretransform table.
+    """
+    name: str
+    inputs: list
+    outputs: list
+    func: Callable
+    type: str = field(default='derived')
+    description: str = field(default=None)
+    feature_id: str = field(default=None)
+
+
+# --------------------------------------------------------------------------- #
+#                            FEATURE PLAN                                     #
+# --------------------------------------------------------------------------- #
+@dataclass
+class FeaturePlan:
+    """The sources and transforms, in execution order, for a feature set."""
+    features: list
+    sources: dict = field(default_factory=dict)
+    transforms: list = field(default_factory=list)
+
+
+# --------------------------------------------------------------------------- #
+#                           FEATURE ENGINE                                    #
+# --------------------------------------------------------------------------- #
+class FeatureEngine:
+    """Compiles and executes feature transforms lazily.
+
+    Arguments:
+        key (str): The column identifying the study. Defaults to 'nct_id'
+        dao (PGDao): Optional data access object used to record executed
+            transforms in the featuretransform table.
+        schema (str): Schema of the featuretransform table.
+            Defaults to 'metabase'
+        user (str): Recorded as created_by and updated_by.
+    """
+
+    def __init__(self, key: str = 'nct_id', dao=None,
+                 schema: str = 'metabase', user: str = 'rx2m') -> None:
+        self._key = key
+        self._dao = dao
+        self._schema = schema
+        self._user = user
+        self._sources = {}
+        self._transforms = {}
+        self._producers = {}
+        self._frame = None
+
+    def add_source(self, source: FeatureSource) -> None:
+        """Registers a source of base columns."""
+        if source.name in self._sources:
+            raise ValueError(
+                "Source {} is already registered.".format(source.name))
+        for column in source.columns:
+            self._register_producer(column, source)
+        self._sources[source.name] = source
+
+    def add_transform(self, transform: FeatureTransform) -> None:
+        """Registers a transform producing one or more columns."""
+        if transform.name in self._transforms:
+            raise ValueError(
+                "Transform {} is already registered.".format(transform.name))
+        for column in transform.outputs:
+            self._register_producer(column, transform)
+        self._transforms[transform.name] = transform
+
+    def _register_producer(self, column: str,
+                           producer: Union[FeatureSource, FeatureTransform])\
+            -> None:
+        if column in self._producers:
+            raise ValueError("Column {} is already produced by {}.".format(
+                column, self._producers[column].name))
+        self._producers[column] = producer
+
+    def compile(self, features: list) -> FeaturePlan:
+        """Returns the plan for the requested features.
+
+        The plan contains, for each source on the path to the requested
+        features, the columns to load and the transforms in dependency
+        order. Columns already computed by a previous build are not
+        planned again.
+
+        Arguments:
+            features (list): Names of the requested feature columns.
+
+        Raises:
+            KeyError if a column has no producer.
+            ValueError if the transforms contain a cycle.
+        """
+        plan = FeaturePlan(features=list(features))
+        visiting = set()
+        visited = set()
+
+        def visit(column):
+            if column in visited or column == self._key or \
+                    self._is_cached(column):
+                return
+            if column in visiting:
+                raise ValueError(
+                    "Cycle detected in feature transforms at column {}."
+                    .format(column))
+            if column not in self._producers:
+                raise KeyError("No source or transform produces column {}."
+                               .format(column))
+
+            producer = self._producers[column]
+            if isinstance(producer, FeatureSource):
+                plan.sources.setdefault(producer.name, []).append(column)
+                visited.add(column)
+                return
+
+            visiting.add(column)
+            for input_column in producer.inputs:
+                visit(input_column)
+            visiting.discard(column)
+
+            # A transform with several outputs is scheduled once.
+            visited.update(producer.outputs)
+            if producer not in plan.transforms:
+                plan.transforms.append(producer)
+
+        for feature in features:
+            visit(feature)
+        return plan
+
+    def _is_cached(self, column: str) -> bool:
+        return self._frame is not None and column in self._frame.columns
+
+    @exception_handler()
+    def build(self, features: list, index: list = None) -> pd.DataFrame:
+        """Computes the requested features.
+
+        Arguments:
+            features (list): Names of the requested feature columns.
+            index (list): Optional study ids to which the result is
+                restricted. Defaults to the ids returned by the sources.
+
+        Returns:
+            DataFrame indexed by the key containing the requested features.
+        """
+        plan = self.compile(features)
+
+        for name, columns in plan.sources.items():
+            self._join_source(self._sources[name], columns)
+
+        for transform in plan.transforms:
+            self._execute(transform)
+
+        frame = self._frame[plan.features]
+        if index is not None:
+            frame = frame.reindex(index)
+        return frame
+
+    def _join_source(self, source: FeatureSource, columns: list) -> None:
+        data = source.loader(columns)
+        data = data.set_index(source.key)[columns]
+        data.index.name = self._key
+        if self._frame is None:
+            self._frame = data
+        else:
+            self._frame = self._frame.join(data, how='outer')
+        logger.debug("Joined %d columns from source %s.",
+                     len(columns), source.name)
+
+    def _execute(self, transform: FeatureTransform) -> None:
+        executed = datetime.now()
+        args = [self._frame.index.to_series() if column == self._key
+                else self._frame[column] for column in transform.inputs]
+        result = transform.func(*args)
+
+        if isinstance(result, pd.DataFrame):
+            outputs = [result[column] for column in result.columns]
+        elif isinstance(result, (tuple, list)):
+            outputs = list(result)
+        else:
+            outputs = [result]
+
+        if len(outputs) != len(transform.outputs):
+            raise ValueError(
+                "Transform {} returned {} columns, {} declared.".format(
+                    transform.name, len(outputs), len(transform.outputs)))
+
+        columns = {}
+        for name, values in zip(transform.outputs, outputs):
+            if isinstance(values, pd.Series):
+                values = values.to_numpy()
+            columns[name] = np.asarray(values)
+        self._frame = self._frame.assign(**columns)
+
+        logger.debug("Executed transform %s.", transform.name)
+        self._record(transform, executed)
+
+    def _record(self, transform: FeatureTransform,
+                executed: datetime) -> None:
+        """Records the transform in the featuretransform table.
+
+        Inputs and outputs are recorded as column positions in the
+        feature frame.
+        """
+        if self._dao is None or transform.feature_id is None:
+            return
+
+        now = datetime.now()
+        columns = ['name', 'type', 'description', 'transformer', 'inputs',
+                   'outputs', 'executed', 'feature_id', 'created', 'updated',
+                   'updated_by', 'created_by']
+        values = [transform.name, transform.type,
+                  transform.description or transform.name,
+                  getattr(transform.func, '__name__', 'transform')[:32],
+                  [self._frame.columns.get_loc(c) for c in transform.inputs
+                   if c != self._key],
+                  [self._frame.columns.get_loc(c) for c in transform.outputs],
+                  executed, transform.feature_id, now, now,
+                  self._user, self._user]
+        self._dao.create(name='featuretransform', columns=columns,
+                         values=values, schema=self._schema)
+
+    def clear(self) -> None:
+        """Discards all computed columns."""
+        self._frame = None
+
+    @property
+    def columns(self) -> list:
+        """Returns the names of all columns that can be produced."""
+        return list(self._producers.keys())
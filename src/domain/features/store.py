@@ -0,0 +1,376 @@
+#!/usr/bin/env python3
+# -*- coding:utf-8 -*-
+# =========================================================================== #
+# Project  : Drug Approval Analytics                                          #
+# Version  : 0.1.0                                                            #
+# File     : \src\domain\features\store.py                                    #
+# Language : Python 3.9.5                                                     #
+# --------------------------------------------------------------------------  #
+# Author   : John James                                                       #
+# Company  : nov8.ai                                                          #
+# Email    : john.james@nov8.ai                                               #
+# URL      : https://github.com/john-james-sf/drug-approval-analytics         #
+# --------------------------------------------------------------------------  #
+# Created  : Sunday, October 18th 2026, 11:05:12 am                           #
+# Modified : Sunday, October 18th 2026, 11:05:12 am                           #
+# Modifier : John James (john.james@nov8.ai)                                  #
+# --------------------------------------------------------------------------- #
+# License  : BSD 3-clause "New" or "Revised" License                          #
+# Copyright: (c) 2021 nov8.ai                                                 #
+# =========================================================================== #
+"""Local feature store with point-in-time snapshots.
+
+Feature groups are stored as Parquet files partitioned by group and
+snapshot date:
+
+    {root}/group={group}/snapshot={YYYY-MM-DD}/features.parquet
+
+Each snapshot is registered in metabase.dataset and each new feature
+column in metabase.feature. Files are sorted by nct_id and recently used
+snapshots are held in memory, so repeated lookups by nct_id and as-of
+date are answered without touching the raw AACT tables or the disk.
+
+"""
+from collections import OrderedDict
+from datetime import date, datetime
+import logging
+import os
+import threading
+from typing import Union
+
+import numpy as np
+import pandas as pd
+
+from ...utils.logger import exception_handler
+# --------------------------------------------------------------------------- #
+logger = logging.getLogger(__name__)
+
+# Widths of the name and type columns of metabase.dataset and feature.
+_NAME_WIDTH = 24
+_TYPE_WIDTH = 12
+
+
+# --------------------------------------------------------------------------- #
+#                             FEATURE STORE                                   #
+# --------------------------------------------------------------------------- #
+class FeatureStore:
+    """Stores feature groups as dated, columnar snapshots.
+
+    Arguments:
+        root (str): Root directory of the store. Defaults to 'data/features'
+        key (str): The study identifier. Defaults to 'nct_id'
+        dao (PGDao): Optional data access object used to register
+            snapshots and features in the metabase.
+        schema (str): Schema of the metabase tables.
+            Defaults to 'metabase'
+        user (str): Recorded as created_by and updated_by.
+        max_cached (int): Number of snapshots held in memory.
+            Defaults to 8
+    """
+
+    filename = 'features.parquet'
+
+    def __init__(self, root: str = 'data/features', key: str = 'nct_id',
+                 dao=None, schema: str = 'metabase', user: str = 'rx2m',
+                 max_cached: int = 8) -> None:
+        self._root = root
+        self._key = key
+        self._dao = dao
+        self._schema = schema
+        self._user = user
+        self._max_cached = max_cached
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+
+    # ----------------------------------------------------------------------- #
+    #                                PATHS                                    #
+    # ----------------------------------------------------------------------- #
+    def _group_dir(self, group: str) -> str:
+        return os.path.join(self._root, "group={}".format(group))
+
+    def _snapshot_path(self, group: str, snapshot: date) -> str:
+        return os.path.join(self._group_dir(group),
+                            "snapshot={}".format(snapshot.isoformat()),
+                            FeatureStore.filename)
+
+    def groups(self) -> list:
+        """Returns the names of the feature groups in the store."""
+        if not os.path.exists(self._root):
+            return []
+        return sorted(entry.split('=', 1)[1]
+                      for entry in os.listdir(self._root)
+                      if entry.startswith('group='))
+
+    def snapshots(self, group: str) -> list:
+        """Returns the snapshot dates of a feature group in ascending order."""
+        directory = self._group_dir(group)
+        if not os.path.exists(directory):
+            return []
+        return sorted(date.fromisoformat(entry.split('=', 1)[1])
+                      for entry in os.listdir(directory)
+                      if entry.startswith('snapshot='))
+
+    def _as_of(self, group: str, as_of: Union[date, datetime] = None) -> date:
+        snapshots = self.snapshots(group)
+        if isinstance(as_of, datetime):
+            as_of = as_of.date()
+        if as_of is not None:
+            snapshots = [s for s in snapshots if s <= as_of]
+        if not snapshots:
+            raise LookupError("No snapshot of feature group {} as of {}."
+                              .format(group, as_of))
+        return snapshots[-1]
+
+    # ----------------------------------------------------------------------- #
+    #                                WRITE                                    #
+    # ----------------------------------------------------------------------- #
+    @exception_handler()
+    def write(self, group: str, df: pd.DataFrame, snapshot: date = None,
+              description: str = None) -> str:
+        """Writes a snapshot of a feature group.
+
+        Arguments:
+            group (str): Name of the feature group.
+            df (pd.DataFrame): Features with one row per study. The key
+                may be a column or the index.
+            snapshot (date): The date as of which the features are valid.
+                Defaults to today.
+            description (str): Description of the snapshot.
+
+        Returns:
+            filepath (str): The location of the snapshot.
+        """
+        snapshot = snapshot or date.today()
+        if df.index.name == self._key:
+            df = df.reset_index()
+        if self._key not in df.columns:
+            raise ValueError("Features must contain the key {}."
+                             .format(self._key))
+
+        self._validate(group, df)
+
+        df = df.sort_values(self._key).reset_index(drop=True)
+        filepath = self._snapshot_path(group, snapshot)
+        os.makedirs(os.path.dirname(filepath), exist_ok=True)
+
+        # Write then rename so readers never see a partial snapshot.
+        tmppath = filepath + '.tmp'
+        try:
+            df.to_parquet(tmppath, index=False)
+        except Exception:
+            if os.path.exists(tmppath):
+                os.remove(tmppath)
+            raise
+        os.replace(tmppath, filepath)
+
+        with self._lock:
+            self._cache.pop((group, snapshot), None)
+
+        logger.info("Wrote %d rows of feature group %s as of %s to %s.",
+                    len(df), group, snapshot, filepath)
+        self._register(group, snapshot, filepath, df, description)
+        return filepath
+
+    def _validate(self, group: str, df: pd.DataFrame) -> None:
+        """Checks names against the metabase column widths before writing.
+
+        The snapshot is registered after the file is written, so a name
+        the metabase would reject must be caught first.
+        """
+        if self._dao is None:
+            return
+        # The group is the dataset name and the type of each feature.
+        if len(group) > _TYPE_WIDTH:
+            raise ValueError("Feature group name {} exceeds {} characters."
+                             .format(group, _TYPE_WIDTH))
+        for column in df.columns:
+            if len(str(column)) > _NAME_WIDTH:
+                raise ValueError("Feature name {} exceeds {} characters."
+                                 .format(column, _NAME_WIDTH))
+
+    def _register(self, group: str, snapshot: date, filepath: str,
+                  df: pd.DataFrame, description: str) -> None:
+        """Registers the snapshot and any new features in the metabase.
+
+        Rewriting a snapshot updates its dataset row rather than adding
+        another one for the same uri.
+        """
+        if self._dao is None:
+            return
+
+        now = datetime.now()
+        version = len(self.snapshots(group))
+        description = description or "{} features as of {}".format(
+            group, snapshot)
+        dataset = self._dao.read(name='dataset', columns=['id'],
+                                 filter_key='uri', filter_value=filepath,
+                                 schema=self._schema, cache=False)
+        if len(dataset) == 0:
+            self._dao.create(
+                name='dataset',
+                columns=['name', 'type', 'version', 'description', 'uri',
+                         'created', 'created_by'],
+                values=[group, 'features', version, description, filepath,
+                        now, self._user],
+                schema=self._schema)
+        else:
+            for column, value in (('version', version),
+                                  ('description', description),
+                                  ('updated', now),
+                                  ('updated_by', self._user)):
+                self._dao.update(name='dataset', column=column, value=value,
+                                 filter_key='uri', filter_value=filepath,
+                                 schema=self._schema)
+
+        registered = self._dao.read(name='feature', columns=['name'],
+                                    schema=self._schema)
+        registered = set(registered['name'])
+        for column in df.columns:
+            if column == self._key or column in registered:
+                continue
+            self._dao.create(
+                name='feature',
+                columns=['name', 'type', 'description', 'required',
+                         'datatype', 'created', 'domain', 'updated',
+                         'updated_by', 'created_by'],
+                values=[column, group, None, False, str(df[column].dtype),
+                        now, [], now, self._user, self._user],
+                schema=self._schema)
+
+    # ----------------------------------------------------------------------- #
+    #                                 READ                                    #
+    # ----------------------------------------------------------------------- #
+    def _load(self, group: str, snapshot: date) -> pd.DataFrame:
+        """Returns a snapshot indexed by key, from memory when possible."""
+        with self._lock:
+            if (group, snapshot) in self._cache:
+                self._cache.move_to_end((group, snapshot))
+                return self._cache[(group, snapshot)]
+
+        df = pd.read_parquet(self._snapshot_path(group, snapshot))
+        df = df.set_index(self._key)
+
+        with self._lock:
+            self._cache[(group, snapshot)] = df
+            while len(self._cache) > self._max_cached:
+                self._cache.popitem(last=False)
+        return df
+
+    @exception_handler()
+    def read(self, group: str, features: list = None, nct_ids: list = None,
+             as_of: Union[date, datetime] = None) -> pd.DataFrame:
+        """Reads features from the latest snapshot on or before as_of.
+
+        Arguments:
+            group (str): Name of the feature group.
+            features (list): Feature columns to return. Optional.
+                Defaults to all features.
+            nct_ids (list): Studies to return. Optional. Defaults to all.
+            as_of (date): Point in time of the lookup. Optional.
+                Defaults to the latest snapshot.
+
+        Returns:
+            DataFrame indexed by key, a copy independent of the snapshot
+            held in memory.
+        """
+        df = self._load(group, self._as_of(group, as_of))
+        if features is None and nct_ids is None:
+            return df.copy()
+        if features is not None:
+            df = df[features]
+        if nct_ids is not None:
+            df = df.reindex(nct_ids)
+        return df
+
+    def iter_batches(self, group: str, features: list = None,
+                     as_of: Union[date, datetime] = None,
+                     batch_size: int = 50000):
+        """Yields a snapshot lazily in DataFrames of batch_size rows.
+
+        Only the requested columns are read and at most one batch is held
+        in memory at a time.
+        """
+        import pyarrow.parquet as pq
+
+        snapshot = self._as_of(group, as_of)
+        columns = None if features is None else [self._key] + list(features)
+        parquet = pq.ParquetFile(self._snapshot_path(group, snapshot))
+        for batch in parquet.iter_batches(batch_size=batch_size,
+                                          columns=columns):
+            yield batch.to_pandas().set_index(self._key)
+
+    def lookup(self, group: str, nct_id: str,
+               as_of: Union[date, datetime] = None) -> pd.Series:
+        """Returns the features of a single study."""
+        return self._load(group, self._as_of(group, as_of)).loc[nct_id]\
+            .copy()
+
+    @exception_handler()
+    def point_in_time(self, group: str, events: pd.DataFrame,
+                      features: list = None,
+                      as_of: str = 'as_of') -> pd.DataFrame:
+        """Joins each event to the features valid at its own as-of date.
+
+        Arguments:
+            group (str): Name of the feature group.
+            events (pd.DataFrame): Rows with the key and an as-of date,
+                e.g. labelled training examples.
+            features (list): Feature columns to return. Optional.
+            as_of (str): The column of events containing the as-of date.
+
+        Returns:
+            events with the features of the latest snapshot on or before
+            each event's as-of date. Events predating every snapshot get
+            missing values.
+        """
+        snapshots = self.snapshots(group)
+        dates = pd.to_datetime(events[as_of]).dt.normalize()\
+            .astype('datetime64[ns]')
+        frames = []
+        for snapshot in snapshots:
+            if not (dates >= pd.Timestamp(snapshot)).any():
+                continue
+            df = self._load(group, snapshot)
+            if features is not None:
+                df = df[features]
+            df = df.reset_index()
+            df['_snapshot'] = np.datetime64(snapshot, 'ns')
+            frames.append(df)
+
+        # With no snapshot on or before any event, the features are
+        # still returned, all missing, as they would be for any single
+        # event predating the first snapshot.
+        if not frames:
+            result = events.copy()
+            if features is None and snapshots:
+                features = list(self._load(group, snapshots[0]).columns)
+            for column in features or []:
+                result[column] = np.nan
+            return result
+
+        # Events are matched on a private row number, leaving their own
+        # index, named or not, untouched. The key may be the index.
+        left = events.reset_index(drop=True)
+        from_index = self._key not in left.columns and \
+            self._key in events.index.names
+        if from_index:
+            left[self._key] = events.index.get_level_values(self._key)
+        left['_as_of'] = dates.to_numpy()
+        left['_row'] = np.arange(len(left))
+
+        right = pd.concat(frames, ignore_index=True)
+        result = pd.merge_asof(left.sort_values('_as_of'),
+                               right.sort_values('_snapshot'),
+                               left_on='_as_of', right_on='_snapshot',
+                               by=self._key, direction='backward')
+        result = result.sort_values('_row')
+        result.index = events.index
+        private = ['_as_of', '_snapshot', '_row']
+        if from_index:
+            private.append(self._key)
+        return result.drop(columns=private)
+
+    def clear_cache(self) -> None:
+        """Releases all snapshots held in memory."""
+        with self._lock:
+            self._cache.clear()
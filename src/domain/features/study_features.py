@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+# -*- coding:utf-8 -*-
+# =========================================================================== #
+# Project  : Drug Approval Analytics                                          #
+# Version  : 0.1.0                                                            #
+# File     : \src\domain\features\study_features.py                           #
+# Language : Python 3.9.5                                                     #
+# --------------------------------------------------------------------------  #
+# Author   : John James                                                       #
+# Company  : nov8.ai                                                          #
+# Email    : john.james@nov8.ai                                               #
+# URL      : https://github.com/john-james-sf/drug-approval-analytics         #
+# --------------------------------------------------------------------------  #
+# Created  : Sunday, October 18th 2026, 10:26:51 am                           #
+# Modified : Sunday, October 18th 2026, 10:26:51 am                           #
+# Modifier : John James (john.james@nov8.ai)                                  #
+# --------------------------------------------------------------------------- #
+# License  : BSD 3-clause "New" or "Revised" License                          #
+# Copyright: (c) 2021 nov8.ai                                                 #
+# =========================================================================== #
+"""Study-level feature table built with SQL push-down aggregation.
+
+Per-table aggregates over the one-to-many AACT tables (conditions,
+interventions, sponsors, facilities, design_groups, outcomes, ...) are
+compiled into GROUP BY nct_id subqueries and joined to the studies table
+inside Postgres. Only the resulting one-row-per-study table crosses the
+wire, and it can be streamed straight into a columnar file.
+
+"""
+import logging
+import uuid
+
+import pandas as pd
+
+from ...infrastructure.data.sequel import Aggregate, FeatureSequel
+from ...infrastructure.data.database import Database
+from ...infrastructure.data.connect import Connection
+from ...utils.logger import exception_handler
+from .build_features import FeatureSource
+# --------------------------------------------------------------------------- #
+logger = logging.getLogger(__name__)
+
+
+# --------------------------------------------------------------------------- #
+#                        STUDY FEATURE BUILDER                                #
+# --------------------------------------------------------------------------- #
+class StudyFeatureBuilder:
+    """Builds a wide, one-row-per-study feature table in the database.
+
+    Arguments:
+        connection (Connection): Connection to the AACT database.
+        schema (str): Schema containing the AACT tables. Defaults to 'ctgov'
+        base_table (str): Table with one row per study.
+            Defaults to 'studies'
+        key (str): The study identifier. Defaults to 'nct_id'
+    """
+
+    def __init__(self, connection: Connection, schema: str = 'ctgov',
+                 base_table: str = 'studies', key: str = 'nct_id') -> None:
+        self._connection = connection
+        self._schema = schema
+        self._base_table = base_table
+        self._key = key
+        self._aggregates = {}
+        self._sequel = FeatureSequel()
+        self._database = Database()
+
+    def add(self, aggregate: Aggregate) -> None:
+        """Adds an aggregate to the feature table."""
+        if aggregate.name in self._aggregates:
+            raise ValueError("Aggregate {} already exists.".format(
+                aggregate.name))
+        self._aggregates[aggregate.name] = aggregate
+
+    def _select(self, features: list = None) -> list:
+        if features is None:
+            return list(self._aggregates.values())
+        return [self._aggregates[name] for name in features]
+
+    @exception_handler()
+    def build(self, features: list = None) -> pd.DataFrame:
+        """Returns the feature table as a DataFrame.
+
+        Arguments:
+            features (list): Names of aggregates to compute. Optional.
+                Defaults to all aggregates.
+        """
+        sequel = self._sequel.study_features(
+            self._select(features), schema=self._schema,
+            base_table=self._base_table, key=self._key)
+        response = self._database.execute(sequel, self._connection)
+        colnames = [element[0] for element in response.description]
+        return pd.DataFrame(data=response.fetchall, columns=colnames)
+
+    @exception_handler()
+    def export(self, filepath: str, features: list = None,
+               batch_size: int = 50000) -> int:
+        """Streams the feature table to a Parquet file.
+
+        Rows are fetched from a server side cursor in batches and appended
+        to the file as row groups, so the full table is never held in
+        memory.
+
+        Arguments:
+            filepath (str): Path to the Parquet file.
+            features (list): Names of aggregates to compute. Optional.
+                Defaults to all aggregates.
+            batch_size (int): Rows fetched per round trip.
+
+        Returns:
+            rowcount (int): The number of rows exported.
+        """
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        sequel = self._sequel.study_features(
+            self._select(features), schema=self._schema,
+            base_table=self._base_table, key=self._key)
+
+        cursor = self._connection.cursor(
+            name="study_features_{}".format(uuid.uuid4().hex),
+            withhold=True)
+        cursor.itersize = batch_size
+        cursor.execute(sequel.cmd, sequel.params)
+
+        writer = None
+        rowcount = 0
+        try:
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                if writer is None:
+                    colnames = [element[0] for element in cursor.description]
+                df = pd.DataFrame(data=rows, columns=colnames)
+                table = pa.Table.from_pandas(df, preserve_index=False)
+                if writer is None:
+                    writer = pq.ParquetWriter(filepath, table.schema)
+                writer.write_table(table.cast(writer.schema))
+                rowcount += len(rows)
+        finally:
+            cursor.close()
+            if writer is not None:
+                writer.close()
+
+        logger.info("Exported %d study feature rows to %s.",
+                    rowcount, filepath)
+        return rowcount
+
+    def as_source(self, name: str = 'study_aggregates') -> FeatureSource:
+        """Exposes the aggregates as a source for the FeatureEngine.
+
+        Only the aggregates the engine requests are pushed down.
+        """
+        return FeatureSource(name=name, columns=list(self._aggregates.keys()),
+                             loader=self.build, key=self._key)
+
+    @property
+    def aggregates(self) -> list:
+        return list(self._aggregates.values())
@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+# -*- coding:utf-8 -*-
+# =========================================================================== #
+# Project  : Drug Approval Analytics                                          #
+# Version  : 0.1.0                                                            #
+# File     : \src\domain\models\predict_model.py                              #
+# Language : Python 3.9.5                                                     #
+# --------------------------------------------------------------------------  #
+# Author   : John James                                                       #
+# Company  : nov8.ai                                                          #
+# Email    : john.james@nov8.ai                                               #
+# URL      : https://github.com/john-james-sf/drug-approval-analytics         #
+# --------------------------------------------------------------------------  #
+# Created  : Sunday, October 18th 2026, 1:37:22 pm                            #
+# Modified : Sunday, October 18th 2026, 1:37:22 pm                            #
+# Modifier : John James (john.james@nov8.ai)                                  #
+# --------------------------------------------------------------------------- #
+# License  : BSD 3-clause "New" or "Revised" License                          #
+# Copyright: (c) 2021 nov8.ai                                                 #
+# =========================================================================== #
+"""Batch and single-study prediction.
+
+Trained models are unpickled once per process and held in a module level
+cache. Batch scoring consumes an iterator of feature DataFrames, e.g.
+FeatureStore.iter_batches, scores each batch with one vectorized call and
+appends the predictions to a Parquet file, which is registered in the
+metabase prediction table.
+
+"""
+from datetime import datetime
+import logging
+import os
+import pickle
+import threading
+from typing import Iterable, Union
+
+import numpy as np
+import pandas as pd
+
+from ...utils.logger import exception_handler
+# --------------------------------------------------------------------------- #
+logger = logging.getLogger(__name__)
+
+# Models loaded by this process, keyed by uri.
+_models = {}
+_lock = threading.Lock()
+
+
+def load_model(uri: str, reload: bool = False):
+    """Returns the model saved at uri, loading it at most once per process.
+
+    Arguments:
+        uri (str): Path to the pickled model.
+        reload (bool): Discard the cached model and load it again.
+    """
+    with _lock:
+        if reload or uri not in _models:
+            with open(uri, 'rb') as f:
+                _models[uri] = pickle.load(f)
+            logger.info("Loaded model from %s.", uri)
+        return _models[uri]
+
+
+def clear_models() -> None:
+    """Releases all cached models."""
+    with _lock:
+        _models.clear()
+
+
+# --------------------------------------------------------------------------- #
+#                               PREDICTOR                                     #
+# --------------------------------------------------------------------------- #
+class Predictor:
+    """Scores studies with a trained model.
+
+    Arguments:
+        model_uri (str): Path to the pickled model.
+        features (list): Feature columns, in the order the model was
+            trained on.
+        key (str): The study identifier. Defaults to 'nct_id'
+        training_event_id (str): Id of the training event that produced
+            the model. Required to register predictions.
+        dao (PGDao): Optional data access object used to register
+            predictions in the metabase.
+        schema (str): Schema of the metabase tables.
+            Defaults to 'metabase'
+        user (str): Recorded as created_by and updated_by.
+    """
+
+    def __init__(self, model_uri: str, features: list, key: str = 'nct_id',
+                 training_event_id: str = None, dao=None,
+                 schema: str = 'metabase', user: str = 'rx2m') -> None:
+        self._model_uri = model_uri
+        self._features = list(features)
+        self._key = key
+        self._training_event_id = training_event_id
+        self._dao = dao
+        self._schema = schema
+        self._user = user
+        self._model = load_model(model_uri)
+        self._proba = hasattr(self._model, 'predict_proba')
+
+    def _predict(self, X: np.ndarray) -> np.ndarray:
+        if self._proba:
+            return self._model.predict_proba(X)[:, -1]
+        return self._model.predict(X)
+
+    def predict_one(self, features: Union[dict, pd.Series]) -> float:
+        """Scores a single study.
+
+        Arguments:
+            features (dict): Feature values keyed by feature name.
+        """
+        X = np.array([[features[name] for name in self._features]],
+                     dtype=float)
+        return float(self._predict(X)[0])
+
+    def predict_batch(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Scores a DataFrame of studies indexed by key.
+
+        Returns:
+            DataFrame with the key and prediction columns.
+        """
+        if self._key in df.columns:
+            df = df.set_index(self._key)
+        X = df[self._features].to_numpy(dtype=float)
+        return pd.DataFrame({self._key: df.index.to_numpy(),
+                             'prediction': self._predict(X)})
+
+    @exception_handler()
+    def score(self, batches: Iterable[pd.DataFrame], filepath: str,
+              name: str = 'prediction',
+              description: str = None) -> int:
+        """Scores batches of studies and writes predictions to Parquet.
+
+        Arguments:
+            batches (Iterable[pd.DataFrame]): Feature batches indexed by
+                key, e.g. FeatureStore.iter_batches(...).
+            filepath (str): Path to the Parquet file of predictions.
+            name (str): Name under which predictions are registered.
+            description (str): Description of the predictions.
+
+        Returns:
+            rowcount (int): The number of studies scored.
+        """
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        os.makedirs(os.path.dirname(filepath) or '.', exist_ok=True)
+        tmppath = filepath + '.tmp'
+        writer = None
+        rowcount = 0
+        try:
+            for batch in batches:
+                predictions = self.predict_batch(batch)
+                predictions['scored'] = datetime.now()
+                table = pa.Table.from_pandas(predictions,
+                                             preserve_index=False)
+                if writer is None:
+                    writer = pq.ParquetWriter(tmppath, table.schema)
+                writer.write_table(table.cast(writer.schema))
+                rowcount += len(predictions)
+        except Exception:
+            # Leave no partial file behind for the next run to trip on.
+            if writer is not None:
+                writer.close()
+            if os.path.exists(tmppath):
+                os.remove(tmppath)
+            raise
+        if writer is not None:
+            writer.close()
+
+        if writer is None:
+            logger.warning("No studies to score.")
+            return 0
+
+        os.replace(tmppath, filepath)
+        logger.info("Scored %d studies with %s to %s.", rowcount,
+                    self._model_uri, filepath)
+        self._register(name, filepath, description)
+        return rowcount
+
+    def _register(self, name: str, filepath: str, description: str) -> None:
+        if self._dao is None or self._training_event_id is None:
+            return
+        now = datetime.now()
+        self._dao.create(
+            name='prediction',
+            columns=['name', 'type', 'description', 'training_event_id',
+                     'uri', 'created', 'updated', 'updated_by', 'created_by'],
+            values=[name[:24], 'batch',
+                    description or "Predictions of {}".format(
+                        os.path.basename(self._model_uri)),
+                    self._training_event_id, filepath, now, now,
+                    self._user, self._user],
+            schema=self._schema)
+
+    @property
+    def model(self):
+        return self._model
@@ -0,0 +1,325 @@
+#!/usr/bin/env python3
+# -*- coding:utf-8 -*-
+# =========================================================================== #
+# Project  : Drug Approval Analytics                                          #
+# Version  : 0.1.0                                                            #
+# File     : \src\domain\models\train_model.py                                #
+# Language : Python 3.9.5                                                     #
+# --------------------------------------------------------------------------  #
+# Author   : John James                                                       #
+# Company  : nov8.ai                                                          #
+# Email    : john.james@nov8.ai                                               #
+# URL      : https://github.com/john-james-sf/drug-approval-analytics         #
+# --------------------------------------------------------------------------  #
+# Created  : Sunday, October 18th 2026, 12:14:08 pm                           #
+# Modified : Sunday, October 18th 2026, 12:14:08 pm                           #
+# Modifier : John James (john.james@nov8.ai)                                  #
+# --------------------------------------------------------------------------- #
+# License  : BSD 3-clause "New" or "Revised" License                          #
+# Copyright: (c) 2021 nov8.ai                                                 #
+# =========================================================================== #
+"""Parallel model selection with tracking in the metabase.
+
+Every (model, hyperparameters, fold) combination is an independent task run
+in a process pool. The feature matrix, target and fold assignments are
+written once to .npy files and memory-mapped by each worker, so tasks carry
+only the estimator class, its parameters and a fold number. Results are
+recorded in the model, parameter, score and trainingevent tables with one
+bulk insert per table.
+
+"""
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime
+import itertools
+import logging
+import math
+import numbers
+import os
+import pickle
+import shutil
+import tempfile
+import time
+import uuid
+
+import numpy as np
+import pandas as pd
+
+from ...utils.logger import exception_handler
+# --------------------------------------------------------------------------- #
+logger = logging.getLogger(__name__)
+
+# Arrays memory-mapped by the current worker process, keyed by path.
+_mapped = {}
+
+
+def _load(path: str) -> np.ndarray:
+    if path not in _mapped:
+        _mapped[path] = np.load(path, mmap_mode='r')
+    return _mapped[path]
+
+
+def _fit_fold(estimator, params: dict, fold: int, paths: dict,
+              scoring: str) -> tuple:
+    """Fits and scores one fold. Runs in a worker process."""
+    from sklearn.base import clone
+    from sklearn.metrics import get_scorer
+
+    X = _load(paths['X'])
+    y = _load(paths['y'])
+    folds = _load(paths['folds'])
+    test = folds == fold
+
+    model = clone(estimator).set_params(**params)
+    started = time.perf_counter()
+    model.fit(X[~test], y[~test])
+    fit_time = time.perf_counter() - started
+    score = get_scorer(scoring)(model, X[test], y[test])
+    return score, fit_time
+
+
+# --------------------------------------------------------------------------- #
+#                              MODEL SPEC                                     #
+# --------------------------------------------------------------------------- #
+@dataclass
+class ModelSpec:
+    """A model and the grid of hyperparameters to evaluate.
+
+    Arguments:
+        name (str): Name of the model.
+        estimator (object): An unfitted scikit-learn compatible estimator.
+        param_grid (dict): Parameter names mapped to lists of values.
+        description (str): Description of the model.
+        framework (str): Defaults to 'sklearn'
+        type (str): Defaults to 'classifier'
+    """
+    name: str
+    estimator: object
+    param_grid: dict = field(default_factory=dict)
+    description: str = field(default=None)
+    framework: str = field(default='sklearn')
+    type: str = field(default='classifier')
+
+    def candidates(self) -> list:
+        """Returns the list of parameter combinations in the grid."""
+        keys = sorted(self.param_grid.keys())
+        return [dict(zip(keys, values)) for values in
+                itertools.product(*[self.param_grid[k] for k in keys])]
+
+    @property
+    def algorithm(self) -> str:
+        return self.estimator.__class__.__name__
+
+
+# --------------------------------------------------------------------------- #
+#                            TRAINING RUNNER                                  #
+# --------------------------------------------------------------------------- #
+class TrainingRunner:
+    """Evaluates a grid of models and hyperparameters in parallel.
+
+    Arguments:
+        specs (list): List of ModelSpec objects.
+        cv (int): Number of cross-validation folds. Defaults to 5
+        scoring (str): scikit-learn scorer name. Defaults to 'roc_auc'
+        n_jobs (int): Number of worker processes. Defaults to the
+            number of CPUs.
+        stratify (bool): Whether folds preserve class proportions.
+            Defaults to True
+        random_state (int): Seed for the fold assignment.
+        model_dir (str): Directory in which the selected model is saved.
+            Defaults to 'models'
+        dao (PGDao): Optional data access object used to record runs.
+        schema (str): Schema of the metabase tables.
+            Defaults to 'metabase'
+        user (str): Recorded as created_by and updated_by.
+    """
+
+    def __init__(self, specs: list, cv: int = 5, scoring: str = 'roc_auc',
+                 n_jobs: int = None, stratify: bool = True,
+                 random_state: int = None, model_dir: str = 'models',
+                 dao=None, schema: str = 'metabase',
+                 user: str = 'rx2m') -> None:
+        self._specs = specs
+        self._cv = cv
+        self._scoring = scoring
+        self._n_jobs = n_jobs or os.cpu_count()
+        self._stratify = stratify
+        self._random_state = random_state
+        self._model_dir = model_dir
+        self._dao = dao
+        self._schema = schema
+        self._user = user
+        self._results = None
+        self._best = None
+        self._best_model = None
+        self._model_uri = None
+
+    def _folds(self, X: np.ndarray, y: np.ndarray) -> np.ndarray:
+        """Returns the fold number of each row."""
+        from sklearn.model_selection import KFold, StratifiedKFold
+
+        splitter = StratifiedKFold if self._stratify else KFold
+        splitter = splitter(n_splits=self._cv, shuffle=True,
+                            random_state=self._random_state)
+        folds = np.empty(len(y), dtype=np.int16)
+        for fold, (_, test) in enumerate(splitter.split(X, y)):
+            folds[test] = fold
+        return folds
+
+    @exception_handler()
+    def fit(self, X, y, dataset_id: str = None) -> pd.DataFrame:
+        """Runs model selection and refits the best candidate.
+
+        Arguments:
+            X (array-like): Feature matrix.
+            y (array-like): Target.
+            dataset_id (str): Id of the input dataset in the metabase.
+                Required to record training events.
+
+        Returns:
+            DataFrame with one row per candidate containing the mean and
+            standard deviation of the cross-validated score.
+        """
+        X = np.ascontiguousarray(np.asarray(X))
+        y = np.asarray(y)
+
+        tasks = [(spec, params) for spec in self._specs
+                 for params in spec.candidates()]
+
+        workdir = tempfile.mkdtemp(prefix='training_')
+        try:
+            paths = {name: os.path.join(workdir, name + '.npy')
+                     for name in ('X', 'y', 'folds')}
+            np.save(paths['X'], X)
+            np.save(paths['y'], y)
+            np.save(paths['folds'], self._folds(X, y))
+
+            started = datetime.now()
+            with ProcessPoolExecutor(max_workers=self._n_jobs) as executor:
+                futures = [[executor.submit(_fit_fold, spec.estimator, params,
+                                            fold, paths, self._scoring)
+                            for fold in range(self._cv)]
+                           for spec, params in tasks]
+                scores = [[future.result() for future in candidate]
+                          for candidate in futures]
+            ended = datetime.now()
+        finally:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+        rows = []
+        for (spec, params), candidate in zip(tasks, scores):
+            values = [score for score, _ in candidate]
+            rows.append({'model': spec.name, 'params': params,
+                         'mean_score': float(np.mean(values)),
+                         'std_score': float(np.std(values)),
+                         'fit_time': float(np.sum([t for _, t in candidate])),
+                         'spec': spec})
+        self._results = pd.DataFrame(rows)
+
+        best = self._results['mean_score'].idxmax()
+        self._best = self._results.loc[best]
+        logger.info("Selected %s with %s: %s = %.4f over %d candidates.",
+                    self._best['model'], self._best['params'],
+                    self._scoring, self._best['mean_score'], len(rows))
+
+        self._refit(X, y)
+        if self._dao is not None and dataset_id is not None:
+            self._record(dataset_id, started, ended)
+
+        return self._results.drop(columns=['spec'])
+
+    def _refit(self, X: np.ndarray, y: np.ndarray) -> None:
+        """Fits the selected candidate on all data and saves it."""
+        from sklearn.base import clone
+
+        spec = self._best['spec']
+        model = clone(spec.estimator).set_params(**self._best['params'])
+        model.fit(X, y)
+        self._best_model = model
+
+        os.makedirs(self._model_dir, exist_ok=True)
+        self._model_uri = os.path.join(
+            self._model_dir, "{}_{}.pkl".format(
+                spec.name, datetime.now().strftime("%Y%m%d%H%M%S")))
+        with open(self._model_uri, 'wb') as f:
+            pickle.dump(model, f)
+        logger.info("Saved selected model to %s.", self._model_uri)
+
+    def _record(self, dataset_id: str, started: datetime,
+                ended: datetime) -> None:
+        """Records models, parameters, scores and training events."""
+        now = datetime.now()
+        audit = [now, now, self._user, self._user]
+
+        model_ids = {}
+        models = []
+        for spec in self._specs:
+            model_ids[spec.name] = str(uuid.uuid4())
+            models.append([model_ids[spec.name], spec.name[:24],
+                           spec.description or spec.name, spec.algorithm,
+                           spec.framework, spec.type] + audit)
+
+        parameters = []
+        scores = []
+        events = []
+        for _, result in self._results.iterrows():
+            spec = result['spec']
+            parameter_ids = []
+            for name, value in result['params'].items():
+                parameter_ids.append(str(uuid.uuid4()))
+                numeric = isinstance(value, numbers.Real)
+                parameters.append([
+                    parameter_ids[-1], name[:24],
+                    float(value) if numeric else math.nan,
+                    type(value).__name__[:12],
+                    "{} = {!r}".format(name, value)[:256]] + audit)
+
+            score_ids = []
+            for name, value in (('mean', result['mean_score']),
+                                ('std', result['std_score'])):
+                score_ids.append(str(uuid.uuid4()))
+                scores.append([score_ids[-1], name, value, 'cv',
+                               self._scoring[:24],
+                               "{}-fold {} {}".format(
+                                   self._cv, name, self._scoring)] + audit)
+
+            events.append([spec.name[:24], 'gridsearch',
+                           "{} {}".format(spec.name, result['params'])[:256],
+                           model_ids[spec.name], dataset_id, parameter_ids,
+                           score_ids, [], started, ended] + audit)
+
+        columns = ['created', 'updated', 'updated_by', 'created_by']
+        self._dao.create_many(
+            name='model', columns=['id', 'name', 'description', 'algorithm',
+                                   'framework', 'type'] + columns,
+            values=models, schema=self._schema)
+        self._dao.create_many(
+            name='parameter', columns=['id', 'name', 'value', 'type',
+                                       'description'] + columns,
+            values=parameters, schema=self._schema)
+        self._dao.create_many(
+            name='score', columns=['id', 'name', 'value', 'type', 'metric',
+                                   'description'] + columns,
+            values=scores, schema=self._schema)
+        self._dao.create_many(
+            name='trainingevent',
+            columns=['name', 'type', 'description', 'model_id',
+                     'input_dataset_id', 'parameter_ids', 'score_ids',
+                     'feature_transform_ids', 'started', 'ended'] + columns,
+            values=events, schema=self._schema)
+
+    @property
+    def results(self) -> pd.DataFrame:
+        return self._results.drop(columns=['spec'])
+
+    @property
+    def best_params(self) -> dict:
+        return self._best['params']
+
+    @property
+    def best_model(self):
+        return self._best_model
+
+    @property
+    def model_uri(self) -> str:
+        return self._model_uri
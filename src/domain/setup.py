@@ -55,7 +55,7 @@ class PlatformBuilder:
                 self._dba.create(name)
         else:
             self._dba.create(name)
-        logger.info("Database {} created.".format(name))
+        logger.info("Database %s created.", name)
 
     def build_user(self, credentials) -> None:
         """Builds the database user with createdb privileges."""
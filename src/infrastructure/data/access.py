@@ -19,18 +19,28 @@
 # Copyright: (c) 2021 nov8.ai                                                 #
 # =========================================================================== #
 """Database context class."""
+from __future__ import annotations
 from abc import ABC, abstractmethod
+from dataclasses import asdict, dataclass, replace
+import io
+import json
 import logging
+import tempfile
 from typing import Union
 import uuid
 
-import pandas as pd
-
-from .sequel import Sequel, AccessSequel
+from . import columnar
+from .dtypes import ColumnStats, compact_dtypes, compact as compact_frame
+from .sequel import Sequel, AccessSequel, TableSequel
+from .database import Database
 from src.infrastructure.data.config import DBCredentials
 from ...utils.logger import exception_handler
+from ...utils.lazy import lazy_import
+from ...utils import metrics
 # --------------------------------------------------------------------------- #
 logger = logging.getLogger(__name__)
+pd = lazy_import('pandas')
+extensions = lazy_import('psycopg2.extensions')
 
 
 # --------------------------------------------------------------------------- #
@@ -42,7 +52,7 @@ class Access(ABC):
 
     def __init__(self, connection, end=0) -> None:
         self._connection = connection
-        self._command = Command()
+        self._command = Database()
 
         self._end = end
 
@@ -82,16 +92,91 @@ class Access(ABC):
         pass
 
 
+# --------------------------------------------------------------------------- #
+_COPY_ESCAPES = str.maketrans({'\\': '\\\\', '\t': '\\t', '\n': '\\n',
+                               '\r': '\\r'})
+
+
+def copy_text(value) -> str:
+    """Formats a value as a field of COPY text format."""
+    if value is None:
+        return '\\N'
+    if isinstance(value, dict):
+        value = json.dumps(value)
+    elif isinstance(value, (list, tuple)):
+        value = '{' + ','.join(
+            'NULL' if v is None else
+            '"' + str(v).replace('\\', '\\\\').replace('"', '\\"') + '"'
+            for v in value) + '}'
+    return str(value).translate(_COPY_ESCAPES)
+
+
+# --------------------------------------------------------------------------- #
+#                          KEYSET PAGINATION                                  #
+# --------------------------------------------------------------------------- #
+def _json_value(value):
+    """JSON encodes key values that json does not handle natively."""
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    return str(value)
+
+
+@dataclass
+class KeysetCursor:
+    """Position of a keyset paginated scan.
+
+    Holds no connection or server state: after is the key of the last row
+    read, so a cursor can be serialized with to_json and resumed by any
+    worker with PGDao.read_page. Key values round trip through JSON as
+    strings where JSON has no type for them, e.g. dates, which Postgres
+    casts back to the key column's type.
+
+    Arguments:
+        name (str): Table to scan.
+        key (list): Columns of a unique key, in scan order.
+        schema (str): Schema of the table. Default 'public'.
+        columns (list): Columns to return. Default all. Key columns are
+            always returned.
+        filters (list): Conditions as for PGDao.read.
+        limit (int): Rows per page. Default 1000.
+        after (list): Key of the last row read. None before the first page.
+        done (bool): True once a page shorter than limit was read.
+    """
+    name: str
+    key: list
+    schema: str = 'public'
+    columns: list = None
+    filters: list = None
+    limit: int = 1000
+    after: list = None
+    done: bool = False
+
+    def to_json(self) -> str:
+        return json.dumps(asdict(self), default=_json_value)
+
+    @classmethod
+    def from_json(cls, text: str) -> KeysetCursor:
+        fields = json.loads(text)
+        if isinstance(fields.get('filters'), list):
+            fields['filters'] = [tuple(f) for f in fields['filters']]
+        return cls(**fields)
+
+
 # --------------------------------------------------------------------------- #
 class PGDao(Access):
     """Postgres data access object."""
 
-    def __init__(self, connection, name=None) -> None:
+    def __init__(self, connection, name=None, cache=None) -> None:
         """Postgres Database Context Object (PGDao)
 
         Arguments:
             connection (psycopg2.connection): The Postgres database connection.
             name (str): A name of a table to which access is required.
+            cache (ResultCache): Optional cache of read results. Writes
+                through this object drop the entries of the table written
+                when they execute and, outside autocommit, again when
+                end_transaction() is called, as Context does after a
+                commit or rollback.
 
         Dependencies:
             AccessSequel (Sequel): Serves parameterized SQL statements
@@ -99,6 +184,8 @@ class PGDao(Access):
         """
         super(PGDao, self).__init__(connection)
         self._name = name
+        self._cache = cache
+        self._written = set()
         self._sequel = AccessSequel()
         self._response = None
         self._response_description = None
@@ -125,6 +212,7 @@ class PGDao(Access):
             raise StopIteration
 
     @exception_handler()
+    @metrics.timed(metrics.dao_seconds, 'create')
     def create(self, name: str, columns: list,
                values: list, schema: str = 'public') -> None:
         """Adds a row to the designated table.
@@ -148,13 +236,162 @@ class PGDao(Access):
         sequel = self._sequel.create(name=name, schema=schema,
                                      columns=columns, values=values)
         response = self._command.execute(sequel, self._connection)
+        self._invalidate(schema, name)
+        return response
+
+    @exception_handler()
+    @metrics.timed(metrics.dao_seconds, 'create_many')
+    def create_many(self, name: str, columns: list,
+                    values: list, schema: str = 'public',
+                    page_size: int = 1000) -> None:
+        """Adds many rows to the designated table in batches.
+
+        Arguments
+
+            name (str): Name of table
+            columns (list): List of columns to insert.
+            values (list): List of rows, each a list of values
+                corresponding with the columns.
+            schema (str): The schema to which the table belongs.
+                Optional. Default='public'
+            page_size (int): Rows per INSERT statement. Default=1000
+
+        Returns:
+            rowcount (int): The number of rows inserted. Ids are generated
+            unless 'id' is one of the columns.
+        """
+        columns, rows = self._with_ids(columns, values)
+
+        sequel = self._sequel.create_many(name=name, schema=schema,
+                                          columns=columns, values=rows)
+        response = self._command.execute_values(sequel, self._connection,
+                                                page_size=page_size)
+        self._invalidate(schema, name)
+        return response
+
+    @exception_handler()
+    @metrics.timed(metrics.dao_seconds, 'upsert')
+    def upsert(self, name: str, columns: list, values: list,
+               key: Union[str, list], schema: str = 'public',
+               update: list = None) -> None:
+        """Inserts a row, or updates the row having the same key.
+
+        Compiles to INSERT ... ON CONFLICT (key) DO UPDATE, one statement
+        in place of a read followed by create or update.
+
+        Arguments
+
+            name (str): Name of table
+            columns (list): List of columns to insert.
+            values (list): List of values corresponding with the columns.
+            key (Union[str, list]): Column or columns of a unique index.
+            schema (str): The schema to which the table belongs.
+                Optional. Default='public'
+            update (list): Columns updated when the key exists. Default
+                all columns but the key and id.
+
+        Returns:
+            rowcount (int): The number of rows inserted or updated.
+        """
+        columns, rows = self._with_ids(columns, [values])
+        key = [key] if isinstance(key, str) else list(key)
+        sequel = self._sequel.upsert(name=name, schema=schema,
+                                     columns=columns, values=rows[0],
+                                     key=key, update=update)
+        response = self._command.execute(sequel, self._connection)
+        self._invalidate(schema, name)
         return response
 
     @exception_handler()
+    @metrics.timed(metrics.dao_seconds, 'upsert_many')
+    def upsert_many(self, name: str, columns: list, values: list,
+                    key: Union[str, list], schema: str = 'public',
+                    update: list = None) -> int:
+        """Upserts many rows through a staging table.
+
+        The rows are copied with COPY into a temporary table shaped like
+        the target, then merged with one INSERT ... SELECT ... ON CONFLICT
+        statement. Where rows repeat a key, the last one wins.
+
+        Arguments
+
+            name (str): Name of table
+            columns (list): List of columns to insert.
+            values (list): List of rows, each a list of values
+                corresponding with the columns.
+            key (Union[str, list]): Column or columns of a unique index.
+            schema (str): The schema to which the table belongs.
+                Optional. Default='public'
+            update (list): As for upsert.
+
+        Returns:
+            rowcount (int): The number of rows inserted or updated.
+        """
+        columns, rows = self._with_ids(columns, values)
+        key = [key] if isinstance(key, str) else list(key)
+        staging = "{}_{}".format(name, uuid.uuid4().hex[:8])
+        stream = io.StringIO()
+        for row in rows:
+            stream.write('\t'.join(map(copy_text, row)) + '\n')
+        stream.seek(0)
+
+        table_sequel = TableSequel()
+        drop = self._sequel.drop_staging(staging)
+        try:
+            self._command.execute(
+                self._sequel.stage(name, schema, staging), self._connection)
+            self._command.copy_from(
+                table_sequel.copy_from(staging, 'pg_temp', columns), stream,
+                self._connection)
+            response = self._command.execute(
+                self._sequel.merge(name, schema, staging, columns, key,
+                                   update), self._connection)
+        except Exception:
+            # In an aborted transaction the DROP would fail and hide the
+            # error; the rollback discards the temporary table anyway.
+            if not self._aborted():
+                self._command.execute(drop, self._connection)
+            raise
+        self._command.execute(drop, self._connection)
+        self._invalidate(schema, name)
+        return response.rowcount
+
+    def _invalidate(self, schema: str, name: str) -> None:
+        if self._cache is None:
+            return
+        self._cache.invalidate(schema, name)
+        raw = getattr(self._connection, '_connection', self._connection)
+        if not getattr(raw, 'autocommit', True):
+            # Until the write is committed other connections may still
+            # read, and cache, the old rows; they are dropped again when
+            # the transaction ends.
+            self._written.add((schema, name))
+
+    def end_transaction(self) -> None:
+        """Drops the cached results of the tables written in the
+        transaction just committed or rolled back."""
+        written, self._written = self._written, set()
+        for schema, name in written:
+            self._cache.invalidate(schema, name)
+
+    @staticmethod
+    def _with_ids(columns: list, values: list) -> tuple:
+        """Adds generated ids to rows unless 'id' is one of the columns."""
+        columns = list(columns)
+        rows = [list(row) for row in values]
+        if 'id' not in columns:
+            columns.append('id')
+            for row in rows:
+                row.append(str(uuid.uuid4()))
+        return columns, rows
+
+    @exception_handler()
+    @metrics.timed(metrics.dao_seconds, 'read')
     def read(self, name: str, columns: list = None,
              filter_key: str = None,
-             filter_value: Union[str, int, float] = None,
-             schema: str = 'public')\
+             filter_value: Union[str, int, float, list] = None,
+             schema: str = 'public', compact: bool = False,
+             dtypes: dict = None, filters=None, cache: bool = True)\
             -> pd.DataFrame:
         """Reads data from a table
 
@@ -165,22 +402,190 @@ class PGDao(Access):
             filter_key (str): Column containing value for subset
                 Optional. If no value is provided, all rows
                 are returned.
-            filter_value (Union[str, int, float]) The value to match.
-                Optional. If no value is provided, all rows
+            filter_value (Union[str, int, float, list]) The value to
+                match, or a list of values any of which may match, fetched
+                in one query. Optional. If no value is provided, all rows
                 are returned.
+            compact (bool): Convert columns to compact dtypes chosen from
+                the catalog statistics of the table. See dtypes.
+            dtypes (dict): {column: dtype} applied after, and taking
+                precedence over, the compact choices. None keeps a
+                column as read.
+            filters (Union[dict, list]): Further conditions, all of which
+                must hold: a dict of {column: value} or a list of
+                (column, value) and (column, operator, value) filters, e.g.
+                [('nct_id', ids), ('start_date', '>=', date)]. Operators
+                are =, <>, <, <=, >, >=, in, not in, between, like, ilike,
+                is null and is not null.
+            cache (bool): Use the result cache, if this object has one.
+                Default True. A table written in the open transaction is
+                never cached, since its uncommitted rows are visible only
+                to this connection.
 
         """
         sequel = self._sequel.read(name=name, schema=schema,
                                    columns=columns, filter_key=filter_key,
-                                   filter_value=filter_value)
-        response = self._command.execute(sequel, self._connection)
+                                   filter_value=filter_value,
+                                   filters=filters)
+        if (schema, name) in self._written:
+            cache = False
+        cache = self._cache if cache else None
+        df = None
+        if cache is not None:
+            df = cache.get(self._connection, schema, name, sequel)
+        if df is None:
+            response = self._command.execute(sequel, self._connection)
+
+            colnames = [element[0] for element in response.description]
+            df = pd.DataFrame(data=response.fetchall, columns=colnames)
+            if cache is not None:
+                cache.put(self._connection, schema, name, sequel, df)
+
+        return self._compact(df, name, schema, compact, dtypes)
+
+    def _compact(self, df: pd.DataFrame, name: str, schema: str,
+                 compact: bool, overrides: dict) -> pd.DataFrame:
+        if not compact and not overrides:
+            return df
+        chosen = {}
+        if compact:
+            rows = self._command.column_stats(name, schema, self._connection)
+            chosen = compact_dtypes(ColumnStats.from_rows(rows))
+        return compact_frame(df, chosen, overrides)
+
+    @exception_handler()
+    @metrics.timed(metrics.dao_seconds, 'read_page')
+    def read_page(self, cursor: KeysetCursor) -> tuple:
+        """Reads the page of rows following a keyset cursor.
+
+        Each page is one short query, WHERE key > last key ORDER BY key
+        LIMIT n. No transaction is left open between pages: if the page
+        opened one on a connection outside autocommit, it is ended.
+
+        Arguments
+            cursor (KeysetCursor): Position to read from.
+
+        Returns:
+            (DataFrame, KeysetCursor) the page and the cursor following it.
+        """
+        if cursor.done:
+            return pd.DataFrame(columns=cursor.columns or []), cursor
+        sequel = self._sequel.page(name=cursor.name, schema=cursor.schema,
+                                   key=cursor.key, after=cursor.after,
+                                   limit=cursor.limit,
+                                   columns=cursor.columns,
+                                   filters=cursor.filters)
+        idle = self._idle()
+        try:
+            response = self._command.execute(sequel, self._connection)
+        finally:
+            if idle:
+                self._connection.rollback()
 
         colnames = [element[0] for element in response.description]
         df = pd.DataFrame(data=response.fetchall, columns=colnames)
+        after = cursor.after
+        if response.fetchall:
+            last = response.fetchall[-1]
+            after = [last[colnames.index(k)] for k in cursor.key]
+        return df, replace(cursor, after=after,
+                           done=len(df) < cursor.limit)
+
+    def paginate(self, name: str, key: Union[str, list], limit: int = 1000,
+                 columns: list = None, filters=None,
+                 schema: str = 'public', cursor: KeysetCursor = None):
+        """Scans a table page by page in key order.
 
-        return df
+        Arguments
+            name (str): Table to scan.
+            key (Union[str, list]): Column or columns of a unique key.
+            limit (int): Rows per page.
+            columns (list): Columns to return. Default all.
+            filters (Union[dict, list]): Conditions as for read.
+            schema (str): Schema of the table. Default 'public'.
+            cursor (KeysetCursor): Resume from this cursor instead.
+
+        Yields:
+            (DataFrame, KeysetCursor) each non-empty page and the cursor
+            that resumes the scan after it.
+        """
+        if cursor is None:
+            key = [key] if isinstance(key, str) else list(key)
+            if isinstance(filters, dict):
+                filters = list(filters.items())
+            cursor = KeysetCursor(name=name, key=key, schema=schema,
+                                  columns=columns, filters=filters,
+                                  limit=limit)
+        while not cursor.done:
+            df, cursor = self.read_page(cursor)
+            if len(df):
+                yield df, cursor
+
+    def _idle(self) -> bool:
+        """True if the raw connection is outside autocommit and has no
+        transaction in progress."""
+        raw = getattr(self._connection, '_connection', self._connection)
+        try:
+            return not raw.autocommit and raw.info.transaction_status == \
+                extensions.TRANSACTION_STATUS_IDLE
+        except AttributeError:
+            return False
+
+    def _aborted(self) -> bool:
+        """True if the raw connection's transaction has failed and awaits
+        a rollback."""
+        raw = getattr(self._connection, '_connection', self._connection)
+        try:
+            return raw.info.transaction_status == \
+                extensions.TRANSACTION_STATUS_INERROR
+        except AttributeError:
+            return False
 
     @exception_handler()
+    @metrics.timed(metrics.dao_seconds, 'export')
+    def export(self, name: str, columns: list = None,
+               filter_key: str = None,
+               filter_value: Union[str, int, float, list] = None,
+               schema: str = 'public', arrow: bool = False,
+               spool: int = 256 * 2**20, compact: bool = False,
+               dtypes: dict = None, filters=None):
+        """Reads a table through COPY ... TO STDOUT into typed columns.
+
+        Takes the same arguments as read and returns the same frame, but
+        the rows are decoded in bulk from COPY output rather than built
+        from per-row tuples, which is several times faster and lighter on
+        memory for full scans of wide tables. See columnar.
+
+        Arguments
+            name (str): Table from which to read
+            columns (list): List of columns to return. Optional
+            filter_key (str): Column containing value for subset. Optional
+            filter_value (Union[str, int, float]) The value to match.
+            schema (str): The schema to which the table belongs.
+            arrow (bool): Return a pyarrow Table instead of a DataFrame.
+            spool (int): Bytes of COPY output buffered in memory before
+                spilling to a temporary file. Default 256MB.
+            compact (bool): As for read. Ignored when arrow is True.
+            dtypes (dict): As for read. Ignored when arrow is True.
+            filters (Union[dict, list]): As for read.
+
+        """
+        query = self._sequel.read(name=name, schema=schema,
+                                  columns=columns, filter_key=filter_key,
+                                  filter_value=filter_value, filters=filters)
+        response = self._command.execute(self._sequel.describe(query),
+                                          self._connection)
+        with tempfile.SpooledTemporaryFile(max_size=spool) as stream:
+            self._command.execute_copy(self._sequel.copy_to(query),
+                                       self._connection, stream)
+            stream.seek(0)
+            result = columnar.decode(stream, response.description, arrow)
+        if arrow:
+            return result
+        return self._compact(result, name, schema, compact, dtypes)
+
+    @exception_handler()
+    @metrics.timed(metrics.dao_seconds, 'update')
     def update(self, name: str, column: str,
                value: Union[str, float, int], filter_key: str,
                filter_value: Union[str, float, int],
@@ -206,12 +611,43 @@ class PGDao(Access):
                                      filter_value=filter_value)
 
         response = self._command.execute(sequel, self._connection)
+        self._invalidate(schema, name)
 
         return response
 
     @exception_handler()
+    @metrics.timed(metrics.dao_seconds, 'update_many')
+    def update_many(self, name: str, column: str, values: list,
+                    filter_key: str, schema: str = 'public',
+                    page_size: int = 100) -> None:
+        """Updates one column of many rows in batches.
+
+        Arguments
+            name (str): Name of table
+            column (str): The column to update
+            values (list): (value, filter_value) pairs: the value to assign
+                to column in the rows where filter_key is filter_value.
+            filter_key (str): Column upon which the condition applies.
+            schema (str): The schema to which the table belongs.
+                Optional. Default='public'
+            page_size (int): Statements per round trip. Default=100
+
+        Returns:
+            rowcount (int): The number of statements executed.
+        """
+        sequel = self._sequel.update_many(name=name, schema=schema,
+                                          column=column,
+                                          filter_key=filter_key,
+                                          values=values)
+        response = self._command.execute_batch(sequel, self._connection,
+                                               page_size=page_size)
+        self._invalidate(schema, name)
+        return response
+
+    @exception_handler()
+    @metrics.timed(metrics.dao_seconds, 'delete')
     def delete(self, name: str, filter_key: str,
-               filter_value: Union[str, float, int],
+               filter_value: Union[str, float, int, list],
                schema: str = 'public') \
             -> None:
         """Deletes data from the designated table.
@@ -219,8 +655,9 @@ class PGDao(Access):
         Arguments
             name (str): Name of table
             filter_key (str): Column upon which the condition applies.
-            filter_value (Union[str, int, float]): Value to which
-                filter_key must match.
+            filter_value (Union[str, int, float, list]): Value to which
+                filter_key must match, or a list of values any of which
+                may match.
             schema (str): The schema to which the table belongs.
                 Optional. Default='public'
 
@@ -232,5 +669,6 @@ class PGDao(Access):
                                      filter_key=filter_key,
                                      filter_value=filter_value)
         response = self._command.execute(sequel, self._connection)
+        self._invalidate(schema, name)
 
         return response
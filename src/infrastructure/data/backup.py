@@ -0,0 +1,291 @@
+#!/usr/bin/env python3
+# -*- coding:utf-8 -*-
+# =========================================================================== #
+# Project  : Drug Approval Analytics                                          #
+# Version  : 0.1.0                                                            #
+# File     : \src\infrastructure\data\backup.py                               #
+# Language : Python 3.9.5                                                     #
+# --------------------------------------------------------------------------  #
+# Author   : John James                                                       #
+# Company  : nov8.ai                                                          #
+# Email    : john.james@nov8.ai                                               #
+# URL      : https://github.com/john-james-sf/drug-approval-analytics         #
+# --------------------------------------------------------------------------  #
+# Created  : Monday, October 19th 2026, 5:44:31 am                            #
+# Modified : Monday, October 19th 2026, 5:44:31 am                            #
+# Modifier : John James (john.james@nov8.ai)                                  #
+# --------------------------------------------------------------------------- #
+# License  : BSD 3-clause "New" or "Revised" License                          #
+# Copyright: (c) 2021 nov8.ai                                                 #
+# =========================================================================== #
+"""Parallel backup and restore with pg_dump and pg_restore.
+
+Backups use the directory format, which is the format pg_dump can write
+with several jobs at once, one per table, and which pg_restore can load
+with several jobs. Connection parameters are passed as separate options
+and the password through PGPASSWORD in the child environment, so it never
+appears in the command line. Commands run without a shell; their verbose
+stderr is streamed line by line to the log, or to a progress callback, as
+it is produced.
+
+    backup = PGBackup(credentials, jobs=8)
+    backup.dump('aact', 'data/backup/aact')
+    backup.restore('aact', 'data/backup/aact', tables=['ctgov.studies'])
+
+pg_restore can also render an archive of any format as a SQL script
+without connecting; contents and script expose the table of contents and
+that script, a section or selected entries at a time, for callers that
+rewrite it on the way into the database.
+
+"""
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import dataclass
+import logging
+import os
+import re
+import subprocess
+import tempfile
+import time
+
+from .config import DBCredentials
+# --------------------------------------------------------------------------- #
+logger = logging.getLogger(__name__)
+# --------------------------------------------------------------------------- #
+_TABLE_LINE = re.compile(
+    r'(dumping contents of table|processing data for table)\s+"?([^"\s]+)"?',
+    re.I)
+# --------------------------------------------------------------------------- #
+
+
+class BackupError(Exception):
+    """Raised when pg_dump or pg_restore exits with an error."""
+
+
+@dataclass
+class BackupResult:
+    """Outcome of a dump or restore."""
+    operation: str
+    dbname: str
+    path: str
+    seconds: float
+    bytes: int
+    tables: int
+
+    @property
+    def throughput(self) -> float:
+        """Megabytes of archive written or read per second."""
+        return self.bytes / 1e6 / self.seconds if self.seconds else 0.0
+
+
+def directory_size(path: str) -> int:
+    """Total bytes of the files under path."""
+    total = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            total += os.path.getsize(os.path.join(root, name))
+    return total
+
+
+class PGBackup:
+    """Runs pg_dump and pg_restore in directory format with parallel jobs.
+
+    Arguments:
+        credentials (DBCredentials): User, password, host and port.
+        jobs (int): Parallel jobs for pg_dump and pg_restore. Defaults to 4.
+        bindir (str): Directory holding the client binaries. Defaults to
+            those on the PATH.
+        progress (callable): Called with each stderr line. Defaults to
+            logging the line at DEBUG.
+    """
+
+    def __init__(self, credentials: DBCredentials, jobs: int = 4,
+                 bindir: str = None, progress=None) -> None:
+        self._credentials = credentials
+        self._jobs = max(1, int(jobs))
+        self._bindir = bindir
+        self._progress = progress or (lambda line: logger.debug(line))
+
+    def _binary(self, name: str) -> str:
+        return os.path.join(self._bindir, name) if self._bindir else name
+
+    def _connection_options(self, dbname: str) -> list:
+        return ['--host', str(self._credentials['host']),
+                '--port', str(self._credentials['port']),
+                '--username', str(self._credentials['user']),
+                '--dbname', dbname,
+                '--no-password']
+
+    def environment(self) -> dict:
+        """Child process environment carrying the password."""
+        env = dict(os.environ)
+        env['PGPASSWORD'] = str(self._credentials['password'])
+        return env
+
+    def dump_command(self, dbname: str, directory: str, tables: list = None,
+                     schemas: list = None, compress: int = None) -> list:
+        """Builds the pg_dump argument list.
+
+        Arguments:
+            dbname (str): Database to dump.
+            directory (str): Output directory. It must not exist.
+            tables (list): Optional table patterns, e.g. 'ctgov.studies'.
+            schemas (list): Optional schema patterns.
+            compress (int): Optional compression level 0-9.
+        """
+        command = [self._binary('pg_dump'), '--format=directory',
+                   '--jobs={}'.format(self._jobs), '--verbose',
+                   '--file', directory]
+        if compress is not None:
+            command.append('--compress={}'.format(compress))
+        for schema in schemas or []:
+            command.extend(['--schema', schema])
+        for table in tables or []:
+            command.extend(['--table', table])
+        return command + self._connection_options(dbname)
+
+    def restore_command(self, dbname: str, directory: str,
+                        tables: list = None, clean: bool = False,
+                        data_only: bool = False) -> list:
+        """Builds the pg_restore argument list.
+
+        Arguments:
+            dbname (str): Database to restore into.
+            directory (str): A directory format archive.
+            tables (list): Optional tables to restore, optionally schema
+                qualified. pg_restore matches table names only, so the
+                schemas given are applied to all of the tables.
+            clean (bool): Drop objects before recreating them.
+            data_only (bool): Restore data into existing tables only.
+        """
+        command = [self._binary('pg_restore'), '--format=directory',
+                   '--jobs={}'.format(self._jobs), '--verbose', '--no-owner',
+                   '--exit-on-error']
+        if clean:
+            command.extend(['--clean', '--if-exists'])
+        if data_only:
+            command.append('--data-only')
+        schemas = []
+        for table in tables or []:
+            schema, _, name = table.rpartition('.')
+            if schema and schema not in schemas:
+                schemas.append(schema)
+            command.extend(['--table', name])
+        for schema in schemas:
+            command.extend(['--schema', schema])
+        return command + self._connection_options(dbname) + [directory]
+
+    def dump(self, dbname: str, directory: str, tables: list = None,
+             schemas: list = None, compress: int = None) -> BackupResult:
+        """Dumps dbname to a directory format archive. See dump_command."""
+        command = self.dump_command(dbname, directory, tables, schemas,
+                                    compress)
+        start = time.perf_counter()
+        count = self._run(command)
+        result = BackupResult(operation='dump', dbname=dbname,
+                              path=directory,
+                              seconds=time.perf_counter() - start,
+                              bytes=directory_size(directory), tables=count)
+        logger.info("Dumped %s to %s: %d tables, %.1f MB in %.1fs "
+                    "(%.1f MB/s).", dbname, directory, count,
+                    result.bytes / 1e6, result.seconds, result.throughput)
+        return result
+
+    def restore(self, dbname: str, directory: str, tables: list = None,
+                clean: bool = False, data_only: bool = False) \
+            -> BackupResult:
+        """Restores an archive into dbname. See restore_command."""
+        command = self.restore_command(dbname, directory, tables, clean,
+                                       data_only)
+        start = time.perf_counter()
+        count = self._run(command)
+        result = BackupResult(operation='restore', dbname=dbname,
+                              path=directory,
+                              seconds=time.perf_counter() - start,
+                              bytes=directory_size(directory), tables=count)
+        logger.info("Restored %s from %s: %d tables, %.1f MB in %.1fs "
+                    "(%.1f MB/s).", dbname, directory, count,
+                    result.bytes / 1e6, result.seconds, result.throughput)
+        return result
+
+    def contents(self, archive: str) -> list:
+        """Returns the table of contents entries of an archive, one line
+        per entry as printed by pg_restore --list."""
+        command = [self._binary('pg_restore'), '--list', archive]
+        completed = subprocess.run(command, stdin=subprocess.DEVNULL,
+                                   capture_output=True, text=True)
+        if completed.returncode != 0:
+            raise BackupError("{} exited with {}:\n{}".format(
+                os.path.basename(command[0]), completed.returncode,
+                completed.stderr.strip()))
+        return [line for line in completed.stdout.splitlines()
+                if line.strip() and not line.startswith(';')]
+
+    @contextmanager
+    def script(self, archive: str, section: str = None,
+               entries: list = None):
+        """Streams an archive as a SQL script without ownership or
+        privilege statements.
+
+        Yields the binary stdout of pg_restore. The process is waited for
+        on leaving the block and a nonzero exit raises BackupError.
+
+        Arguments:
+            archive (str): Archive file or directory.
+            section (str): Optional 'pre-data', 'data' or 'post-data'.
+            entries (list): Optional table of contents lines, as returned
+                by contents, to render instead of the whole archive.
+        """
+        command = [self._binary('pg_restore'), '--no-owner',
+                   '--no-privileges', '--file', '-']
+        if section:
+            command.append('--section={}'.format(section))
+        listfile = None
+        if entries is not None:
+            with tempfile.NamedTemporaryFile('w', suffix='.list',
+                                             delete=False) as f:
+                f.write('\n'.join(entries) + '\n')
+                listfile = f.name
+            command.extend(['--use-list', listfile])
+        command.append(archive)
+        try:
+            # stderr goes to a file: a full stderr pipe would block
+            # pg_restore while the caller is still reading stdout.
+            with tempfile.TemporaryFile() as errors, \
+                    subprocess.Popen(command, stdin=subprocess.DEVNULL,
+                                     stdout=subprocess.PIPE,
+                                     stderr=errors) as process:
+                yield process.stdout
+                # Drain what the caller did not read so pg_restore exits.
+                for _ in process.stdout:
+                    pass
+                returncode = process.wait()
+                errors.seek(0)
+                stderr = errors.read().decode(errors='replace')
+        finally:
+            if listfile:
+                os.remove(listfile)
+        if returncode != 0:
+            raise BackupError("{} exited with {}:\n{}".format(
+                os.path.basename(command[0]), returncode, stderr.strip()))
+
+    def _run(self, command: list) -> int:
+        """Runs command, streaming stderr. Returns the table data count."""
+        tail = deque(maxlen=20)
+        count = 0
+        with subprocess.Popen(command, env=self.environment(),
+                              stdin=subprocess.DEVNULL,
+                              stdout=subprocess.DEVNULL,
+                              stderr=subprocess.PIPE, text=True,
+                              bufsize=1) as process:
+            for line in process.stderr:
+                line = line.rstrip()
+                tail.append(line)
+                if _TABLE_LINE.search(line):
+                    count += 1
+                self._progress(line)
+            returncode = process.wait()
+        if returncode != 0:
+            raise BackupError("{} exited with {}:\n{}".format(
+                os.path.basename(command[0]), returncode, "\n".join(tail)))
+        return count
@@ -0,0 +1,330 @@
+#!/usr/bin/env python3
+# -*- coding:utf-8 -*-
+# =========================================================================== #
+# Project  : Drug Approval Analytics                                          #
+# Version  : 0.1.0                                                            #
+# File     : \src\infrastructure\data\cache.py                                #
+# Language : Python 3.9.5                                                     #
+# --------------------------------------------------------------------------  #
+# Author   : John James                                                       #
+# Company  : nov8.ai                                                          #
+# Email    : john.james@nov8.ai                                               #
+# URL      : https://github.com/john-james-sf/drug-approval-analytics         #
+# --------------------------------------------------------------------------  #
+# Created  : Monday, October 19th 2026, 10:48:22 am                           #
+# Modified : Monday, October 19th 2026, 10:48:22 am                           #
+# Modifier : John James (john.james@nov8.ai)                                  #
+# --------------------------------------------------------------------------- #
+# License  : BSD 3-clause "New" or "Revised" License                          #
+# Copyright: (c) 2021 nov8.ai                                                 #
+# =========================================================================== #
+"""Result cache for PGDao.read.
+
+Reads of the largely static AACT snapshots are repeated across analyses
+and notebook runs. A ResultCache given to PGDao serves a repeated read
+from memory, or from disk, instead of querying again. Entries are keyed
+by database, the rendered Sequel and its parameters, so any change to the
+columns or filters of a read is a different entry.
+
+Two tiers are kept:
+
+    memory  an LRU of DataFrames bounded by their deep memory usage.
+    disk    one Parquet file per entry under a directory dedicated to the
+            cache, shared by the processes using it. Requires pyarrow;
+            without it only the memory tier is used.
+
+Entries of a table are dropped when a write through a PGDao holding the
+cache changes the table: once when the write executes and, outside
+autocommit, again when the transaction ends, which Context reports to its
+PGDao. Entries are also tied to the snapshot of their schema: given a
+token function, the cache asks for the schema's current token at most
+once per check interval and entries read under another token are not
+served. Entries of schemas without a token expire after ttl seconds, so a
+row cached by another reader before a commit the cache was not told of
+is not served indefinitely. schema_token reads the token SchemaRefresh leaves
+on the live schema; metabase_token reads the schema_swap events it
+records in the metabase.
+
+    cache = ResultCache(max_bytes=512e6, directory='data/cache',
+                        token=schema_token)
+    dao = PGDao(connection, cache=cache)
+    studies = dao.read('studies', schema='ctgov')
+
+Writes made by other processes to tables outside refreshed schemas are
+not seen; call invalidate() after them.
+
+"""
+from __future__ import annotations
+from collections import OrderedDict
+from dataclasses import dataclass
+import glob
+import hashlib
+import logging
+import os
+import shutil
+import threading
+import time
+
+from . import columnar
+from .access import PGDao
+from .catalog import database_key
+from .database import Database
+from .refresh import EVENT, PREFIX
+from .sequel import Sequel, SchemaSequel
+from ...utils import metrics
+from ...utils.lazy import lazy_import
+# --------------------------------------------------------------------------- #
+logger = logging.getLogger(__name__)
+pd = lazy_import('pandas')
+# --------------------------------------------------------------------------- #
+
+
+def hashable(value):
+    """Converts lists, sets and dicts in query parameters, recursively,
+    into tuples so that the parameters can be part of a key."""
+    if isinstance(value, (list, tuple)):
+        return tuple(hashable(v) for v in value)
+    if isinstance(value, (set, frozenset)):
+        return tuple(sorted(hashable(v) for v in value))
+    if isinstance(value, dict):
+        return tuple(sorted((k, hashable(v)) for k, v in value.items()))
+    return value
+
+
+def sequel_key(connection, sequel: Sequel) -> tuple:
+    """Key of a read: the database, the composed statement and its
+    parameters."""
+    return (database_key(connection), repr(sequel.cmd),
+            hashable(sequel.params))
+
+
+def schema_token(connection, schema: str) -> str:
+    """The refresh token commented on schema, or None."""
+    response = Database().execute(SchemaSequel().get_comment(schema),
+                                  connection)
+    comment = response.fetchall[0][0] if response.fetchall else None
+    if comment and comment.startswith(PREFIX):
+        return comment[len(PREFIX):]
+    return None
+
+
+def metabase_token(metabase, datasources: dict):
+    """Returns a token function reading schema swaps from the metabase.
+
+    Arguments:
+        metabase (Connection): Connection to the metabase database.
+        datasources (dict): {schema: datasource name}, e.g.
+            {'ctgov': 'aact'}. Other schemas have no token.
+    """
+    dao = PGDao(metabase)
+
+    def token(connection, schema: str) -> str:
+        if schema not in datasources:
+            return None
+        found = dao.read('datasource', columns=['id'], filter_key='name',
+                         filter_value=datasources[schema],
+                         schema='metabase')
+        if found.empty:
+            return None
+        events = dao.read('datasourceevent',
+                          columns=['return_value', 'ended'],
+                          filters={'name': EVENT,
+                                   'datasource_id': found['id'].iloc[0]},
+                          schema='metabase')
+        if events.empty:
+            return None
+        value = events.sort_values('ended')['return_value'].iloc[-1]
+        return value[len(PREFIX):] if value.startswith(PREFIX) else None
+    return token
+
+
+@dataclass
+class Entry:
+    """A cached read."""
+    frame: object
+    nbytes: int
+    table: tuple
+    token: str
+    created: float
+
+
+class ResultCache:
+    """Two tier cache of read results.
+
+    Arguments:
+        max_bytes (int): Memory tier budget. Least recently used entries
+            are evicted beyond it. Default 256 MB.
+        directory (str): Directory of the disk tier, holding one
+            subdirectory per table. Default None, memory only.
+        token (callable): token(connection, schema) returning the current
+            snapshot token of a schema, e.g. schema_token. Default None,
+            entries are only invalidated by writes.
+        check_interval (float): Seconds a schema's token is trusted
+            before it is read again. Default 30.
+        ttl (float): Seconds an entry without a snapshot token is served.
+            None keeps it until invalidated. Default 300.
+    """
+
+    def __init__(self, max_bytes: int = 256e6, directory: str = None,
+                 token=None, check_interval: float = 30.0,
+                 ttl: float = 300.0) -> None:
+        self.max_bytes = int(max_bytes)
+        self._directory = directory
+        if directory and not columnar.has_arrow():
+            logger.warning("pyarrow is not installed; the result cache "
+                           "disk tier is disabled.")
+            self._directory = None
+        self._token = token
+        self._check_interval = check_interval
+        self.ttl = ttl
+        self._lock = threading.RLock()
+        self._entries = OrderedDict()
+        self._tokens = {}
+        self.nbytes = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    # ----------------------------------------------------------------------- #
+    def token(self, connection, schema: str) -> str:
+        """The snapshot token of schema, read at most once per check
+        interval."""
+        if self._token is None:
+            return None
+        key = (database_key(connection), schema)
+        now = time.monotonic()
+        with self._lock:
+            checked = self._tokens.get(key)
+        if checked is not None and now - checked[0] < self._check_interval:
+            return checked[1]
+        token = self._token(connection, schema)
+        with self._lock:
+            if checked is not None and checked[1] != token:
+                logger.info("Schema %s changed from snapshot %s to %s.",
+                            schema, checked[1], token)
+                self._drop(lambda entry: entry.table[0] == schema)
+                self._remove_files(glob.escape(schema))
+            self._tokens[key] = (now, token)
+        return token
+
+    def _fresh(self, token: str, created: float) -> bool:
+        return token is not None or self.ttl is None or \
+            time.time() - created < self.ttl
+
+    def _path(self, key: tuple, table: tuple, token: str) -> str:
+        digest = hashlib.sha256(repr((key, token)).encode()).hexdigest()
+        return os.path.join(self._directory, "{}.{}".format(*table),
+                            digest + '.parquet')
+
+    # ----------------------------------------------------------------------- #
+    def get(self, connection, schema: str, name: str, sequel: Sequel):
+        """Returns a copy of the cached result of sequel, or None."""
+        key = sequel_key(connection, sequel)
+        token = self.token(connection, schema)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.token == token:
+                if self._fresh(token, entry.created):
+                    self._entries.move_to_end(key)
+                    metrics.cache_lookups.inc('memory')
+                    return entry.frame.copy()
+                self._discard(key)
+        if self._directory:
+            path = self._path(key, (schema, name), token)
+            try:
+                created = os.path.getmtime(path)
+            except OSError:
+                created = None
+            if created is not None and not self._fresh(token, created):
+                self._remove(path)
+            elif created is not None:
+                try:
+                    frame = pd.read_parquet(path)
+                except Exception as e:
+                    logger.warning("Unreadable cache file %s: %s", path, e)
+                else:
+                    self._remember(key, frame, (schema, name), token,
+                                   created)
+                    metrics.cache_lookups.inc('disk')
+                    return frame.copy()
+        metrics.cache_lookups.inc('miss')
+        return None
+
+    def put(self, connection, schema: str, name: str, sequel: Sequel,
+            frame) -> None:
+        """Caches a copy of frame as the result of sequel."""
+        key = sequel_key(connection, sequel)
+        token = self.token(connection, schema)
+        frame = frame.copy()
+        self._remember(key, frame, (schema, name), token, time.time())
+        if self._directory:
+            self._write(self._path(key, (schema, name), token), frame)
+
+    def _remember(self, key: tuple, frame, table: tuple, token: str,
+                  created: float) -> None:
+        nbytes = int(frame.memory_usage(index=True, deep=True).sum())
+        with self._lock:
+            self._discard(key)
+            if nbytes > self.max_bytes:
+                return
+            self._entries[key] = Entry(frame, nbytes, table, token, created)
+            self.nbytes += nbytes
+            while self.nbytes > self.max_bytes:
+                self._discard(next(iter(self._entries)))
+
+    @staticmethod
+    def _write(path: str, frame) -> None:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        partial = "{}.{}.partial".format(path, os.getpid())
+        try:
+            frame.to_parquet(partial, index=False)
+            os.replace(partial, path)
+        except Exception as e:
+            logger.debug("Result not written to disk cache: %s", e)
+            ResultCache._remove(partial)
+
+    @staticmethod
+    def _remove(path: str) -> None:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+    # ----------------------------------------------------------------------- #
+    def _discard(self, key: tuple) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self.nbytes -= entry.nbytes
+
+    def _drop(self, predicate) -> None:
+        with self._lock:
+            for key in [k for k, entry in self._entries.items()
+                        if predicate(entry)]:
+                self._discard(key)
+
+    def _remove_files(self, schema: str, name: str = '*') -> None:
+        if not self._directory:
+            return
+        pattern = os.path.join(glob.escape(self._directory),
+                               "{}.{}".format(schema, name))
+        for path in glob.glob(pattern):
+            shutil.rmtree(path, ignore_errors=True)
+
+    def invalidate(self, schema: str = None, name: str = None) -> None:
+        """Drops the entries of a table, of a schema when no name is given,
+        or all entries, from both tiers."""
+        if schema is None:
+            self.clear()
+            return
+        self._drop(lambda entry: entry.table[0] == schema and
+                   name in (None, entry.table[1]))
+        self._remove_files(glob.escape(schema),
+                           glob.escape(name) if name else '*')
+
+    def clear(self) -> None:
+        """Drops every entry from both tiers."""
+        with self._lock:
+            self._entries.clear()
+            self._tokens.clear()
+            self.nbytes = 0
+        self._remove_files('*')
@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+# -*- coding:utf-8 -*-
+# =========================================================================== #
+# Project  : Drug Approval Analytics                                          #
+# Version  : 0.1.0                                                            #
+# File     : \src\infrastructure\data\catalog.py                              #
+# Language : Python 3.9.5                                                     #
+# --------------------------------------------------------------------------  #
+# Author   : John James                                                       #
+# Company  : nov8.ai                                                          #
+# Email    : john.james@nov8.ai                                               #
+# URL      : https://github.com/john-james-sf/drug-approval-analytics         #
+# --------------------------------------------------------------------------  #
+# Created  : Monday, October 19th 2026, 8:17:33 am                            #
+# Modified : Monday, October 19th 2026, 8:17:33 am                            #
+# Modifier : John James (john.james@nov8.ai)                                  #
+# --------------------------------------------------------------------------- #
+# License  : BSD 3-clause "New" or "Revised" License                          #
+# Copyright: (c) 2021 nov8.ai                                                 #
+# =========================================================================== #
+"""In-memory cache of schema, table, column and role names.
+
+Database's existence and column lookups are answered from here. The first
+lookup in a schema loads all of its tables, views and columns with one
+catalog query; schema and role names are each loaded with one query and
+kept until invalidated. Entries are kept per database, keyed by host, port
+and database name.
+
+Database offers every executed Sequel to observe(), which drops the
+cached database on DDL, and everything on database or role DDL. DDL run
+inside a transaction is only final once it commits or rolls back, so the
+names it changed are not cached until then and are dropped again by
+end_transaction(), which Connection and DirectConnection call on commit
+and rollback. DDL run by other processes is not seen; call invalidate()
+or refresh() before a lookup that must reflect it.
+
+"""
+import logging
+import threading
+
+from .sequel import SchemaSequel, TableSequel, UserSequel
+from .sequel import (
+    CREATE_SCHEMA, DROP_SCHEMA, RENAME_SCHEMA, CREATE_TABLE,
+    BATCH_CREATE_TABLES, DELETE_TABLE, DELETE_TABLES, CREATE_COLUMN,
+    CREATE_DATABASE, DROP_DATABASE, CLONE_DATABASE, CREATE_USER, DROP_USER)
+# --------------------------------------------------------------------------- #
+logger = logging.getLogger(__name__)
+# --------------------------------------------------------------------------- #
+# Sequels that change the schemas, tables or columns of a database.
+DDL = {CREATE_SCHEMA, DROP_SCHEMA, RENAME_SCHEMA, CREATE_TABLE,
+       BATCH_CREATE_TABLES, DELETE_TABLE, DELETE_TABLES, CREATE_COLUMN}
+# Sequels that change databases or roles of the cluster.
+CLUSTER_DDL = {CREATE_DATABASE, DROP_DATABASE, CLONE_DATABASE, CREATE_USER,
+               DROP_USER}
+# --------------------------------------------------------------------------- #
+
+
+def _raw(connection):
+    return getattr(connection, '_connection', connection)
+
+
+def database_key(connection) -> tuple:
+    """(host, port, dbname) of a Connection or psycopg2 connection."""
+    raw = _raw(connection)
+    try:
+        info = raw.info
+        return (info.host, info.port, info.dbname)
+    except AttributeError:
+        return (None, None, getattr(connection, 'dbname', None))
+
+
+class Catalog:
+    """Cache of catalog names for Database lookups.
+
+    Arguments:
+        enabled (bool): When False every lookup queries the catalog.
+            Defaults to True.
+    """
+
+    def __init__(self, enabled: bool = True) -> None:
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._schema_sequel = SchemaSequel()
+        self._table_sequel = TableSequel()
+        self._user_sequel = UserSequel()
+        self._schemas = {}
+        self._tables = {}
+        self._users = None
+        # {id(raw connection): database keys, None for every database and
+        # the roles, changed by DDL in its open transaction}
+        self._pending = {}
+        self.hits = 0
+        self.misses = 0
+
+    def schemas(self, connection, database) -> set:
+        """Lower case schema names of the connected database."""
+        key = database_key(connection)
+        with self._lock:
+            names = self._schemas.get(key) if self.enabled else None
+            if names is not None:
+                self.hits += 1
+                return names
+        response = database.execute(self._schema_sequel.names(), connection)
+        names = {row[0].lower() for row in response.fetchall or []}
+        self._store(self._schemas, key, names)
+        return names
+
+    def tables(self, schema: str, connection, database) -> dict:
+        """{table: (columns)} for a schema of the connected database."""
+        key = database_key(connection) + (schema,)
+        with self._lock:
+            tables = self._tables.get(key) if self.enabled else None
+            if tables is not None:
+                self.hits += 1
+                return tables
+        response = database.execute(self._table_sequel.catalog(schema),
+                                    connection)
+        tables = {}
+        for table, column in response.fetchall or []:
+            columns = tables.setdefault(table, [])
+            if column is not None:
+                columns.append(column)
+        tables = {table: tuple(columns) for table, columns in tables.items()}
+        self._store(self._tables, key, tables)
+        return tables
+
+    def users(self, connection, database) -> set:
+        """Role names of the cluster."""
+        with self._lock:
+            users = self._users if self.enabled else None
+            if users is not None:
+                self.hits += 1
+                return users
+        response = database.execute(self._user_sequel.names(), connection)
+        users = {row[0] for row in response.fetchall or []}
+        if self.enabled:
+            with self._lock:
+                self.misses += 1
+                if not self._deferred(None):
+                    self._users = users
+        return users
+
+    def _store(self, cache: dict, key: tuple, value) -> None:
+        if self.enabled:
+            with self._lock:
+                self.misses += 1
+                if not self._deferred(key[:3]):
+                    cache[key] = value
+
+    def _deferred(self, key: tuple) -> bool:
+        """True while uncommitted DDL may change the names of the database
+        key, or of the roles when key is None. Called under the lock."""
+        return any(None in keys or key in keys
+                   for keys in self._pending.values())
+
+    def invalidate(self, connection=None) -> None:
+        """Drops the cached names of the connected database, or of every
+        database and the roles when no connection is given."""
+        key = None if connection is None else database_key(connection)
+        with self._lock:
+            self._drop(key)
+
+    def _drop(self, key: tuple) -> None:
+        if key is None:
+            self._schemas.clear()
+            self._tables.clear()
+            self._users = None
+            return
+        self._schemas.pop(key, None)
+        for cached in [k for k in self._tables if k[:3] == key]:
+            del self._tables[cached]
+
+    def end_transaction(self, connection) -> None:
+        """Drops again the names changed by DDL in the transaction of
+        connection just committed or rolled back, in case another
+        connection cached them before it ended."""
+        with self._lock:
+            for key in self._pending.pop(id(_raw(connection)), ()):
+                self._drop(key)
+
+    def refresh(self, connection, database, schemas: list = None) -> None:
+        """Reloads the schema names and the given schemas' tables of the
+        connected database."""
+        self.invalidate(connection)
+        self.schemas(connection, database)
+        for schema in schemas or []:
+            self.tables(schema, connection, database)
+
+    def observe(self, sequel, connection) -> None:
+        """Invalidates cached names that an executed sequel may change."""
+        if sequel.name in CLUSTER_DDL:
+            logger.debug("Catalog invalidated by %s.", sequel.name)
+            key = None
+        elif sequel.name in DDL or sequel.name.startswith('ddl_'):
+            key = database_key(connection)
+            logger.debug("Catalog of %s invalidated by %s.", key[2],
+                         sequel.name)
+        else:
+            return
+        raw = _raw(connection)
+        with self._lock:
+            self._drop(key)
+            if not getattr(raw, 'autocommit', True):
+                self._pending.setdefault(id(raw), set()).add(key)
+
+
+catalog = Catalog()
@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+# -*- coding:utf-8 -*-
+# =========================================================================== #
+# Project  : Drug Approval Analytics                                          #
+# Version  : 0.1.0                                                            #
+# File     : \src\infrastructure\data\columnar.py                             #
+# Language : Python 3.9.5                                                     #
+# --------------------------------------------------------------------------  #
+# Author   : John James                                                       #
+# Company  : nov8.ai                                                          #
+# Email    : john.james@nov8.ai                                               #
+# URL      : https://github.com/john-james-sf/drug-approval-analytics         #
+# --------------------------------------------------------------------------  #
+# Created  : Monday, October 19th 2026, 7:03:26 am                            #
+# Modified : Monday, October 19th 2026, 7:03:26 am                            #
+# Modifier : John James (john.james@nov8.ai)                                  #
+# --------------------------------------------------------------------------- #
+# License  : BSD 3-clause "New" or "Revised" License                          #
+# Copyright: (c) 2021 nov8.ai                                                 #
+# =========================================================================== #
+"""Decodes COPY ... TO STDOUT CSV output into typed columns.
+
+Rows fetched through a cursor arrive as tuples of Python objects, one per
+cell, which pandas then rebuilds into columns. COPY output is instead
+parsed in bulk by pyarrow's CSV reader straight into Arrow arrays, or by
+the pandas C parser when pyarrow is not installed, so no per-cell Python
+objects are created for numeric, boolean and temporal columns.
+
+Column types come from the Postgres type oids of the query's cursor
+description rather than from inference, so that text such as zip codes
+stays text. In Postgres CSV an unquoted empty field is NULL and a quoted
+one the empty string; the Arrow reader keeps that distinction.
+
+"""
+from __future__ import annotations
+import logging
+
+from ...utils.lazy import lazy_import
+# --------------------------------------------------------------------------- #
+logger = logging.getLogger(__name__)
+pa = lazy_import('pyarrow')
+pd = lazy_import('pandas')
+# --------------------------------------------------------------------------- #
+# Postgres type oid: (Arrow type name, pandas dtype)
+TYPES = {
+    16: ('bool_', 'boolean'),
+    20: ('int64', 'Int64'),
+    21: ('int16', 'Int16'),
+    23: ('int32', 'Int32'),
+    26: ('int64', 'Int64'),
+    700: ('float32', 'float32'),
+    701: ('float64', 'float64'),
+    1700: ('float64', 'float64'),
+    1082: ('date32', 'date'),
+    1114: ('timestamp', 'datetime'),
+    1184: ('timestamptz', 'datetime'),
+}
+STRING = ('string', 'object')
+# --------------------------------------------------------------------------- #
+
+
+def has_arrow() -> bool:
+    """True if pyarrow can be imported."""
+    try:
+        pa.__version__
+    except ImportError:
+        return False
+    return True
+
+
+def column_types(description) -> dict:
+    """Maps each column of a cursor description to its (Arrow, pandas)
+    type names. Types without a mapping are read as text."""
+    return {column[0]: TYPES.get(column[1], STRING)
+            for column in description}
+
+
+def _arrow_type(name: str):
+    if name == 'timestamp':
+        return pa.timestamp('us')
+    if name == 'timestamptz':
+        return pa.timestamp('us', tz='UTC')
+    return getattr(pa, name)()
+
+
+def read_arrow(stream, types: dict):
+    """Reads headerless Postgres CSV from stream into a pyarrow Table.
+
+    Arguments:
+        stream: Binary file-like object positioned at the first row.
+        types (dict): {column: (Arrow type, pandas dtype)} in column order.
+    """
+    from pyarrow import csv
+    names = list(types)
+    return csv.read_csv(
+        stream,
+        read_options=csv.ReadOptions(column_names=names),
+        convert_options=csv.ConvertOptions(
+            column_types={c: _arrow_type(t[0]) for c, t in types.items()},
+            null_values=[''], true_values=['t'], false_values=['f'],
+            strings_can_be_null=True, quoted_strings_can_be_null=False))
+
+
+def read_pandas(stream, types: dict) -> pd.DataFrame:
+    """Reads headerless Postgres CSV from stream into a DataFrame with the
+    pandas C parser. Quoted empty strings are read as missing."""
+    names = list(types)
+    dtypes, dates = {}, []
+    for column, (_, dtype) in types.items():
+        if dtype in ('date', 'datetime'):
+            dates.append(column)
+        else:
+            dtypes[column] = dtype
+    df = pd.read_csv(stream, names=names, header=None, dtype=dtypes,
+                     keep_default_na=False, na_values=[''],
+                     true_values=['t'], false_values=['f'])
+    for column in dates:
+        utc = types[column][0] == 'timestamptz'
+        df[column] = pd.to_datetime(df[column], utc=utc, format='ISO8601')
+        if types[column][0] == 'date32':
+            df[column] = df[column].dt.date
+    return df
+
+
+def empty(types: dict, arrow: bool = False):
+    """An empty DataFrame, or pyarrow Table, with the given columns."""
+    if has_arrow():
+        table = pa.schema([(c, _arrow_type(t[0]))
+                           for c, t in types.items()]).empty_table()
+        return table if arrow else table.to_pandas()
+    if arrow:
+        raise ImportError("pyarrow is required to return an Arrow table.")
+    return pd.DataFrame(columns=list(types))
+
+
+def decode(stream, description, arrow: bool = False):
+    """Decodes COPY CSV output typed by a cursor description.
+
+    Arguments:
+        stream: Seekable binary file-like object positioned at the first
+            row.
+        description: Cursor description of the copied query.
+        arrow (bool): Return a pyarrow Table rather than a DataFrame.
+
+    Returns:
+        A DataFrame, or a pyarrow Table if arrow is True.
+    """
+    types = column_types(description)
+    start = stream.tell()
+    if not stream.read(1):
+        return empty(types, arrow)
+    stream.seek(start)
+    if has_arrow():
+        table = read_arrow(stream, types)
+        return table if arrow else table.to_pandas()
+    if arrow:
+        raise ImportError("pyarrow is required to return an Arrow table.")
+    logger.debug("pyarrow not installed; decoding COPY with pandas.")
+    return read_pandas(stream, types)
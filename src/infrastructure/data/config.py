@@ -23,11 +23,62 @@ import os
 from copy import copy, deepcopy
 import logging
 from configparser import ConfigParser
+import threading
 # --------------------------------------------------------------------------- #
 logger = logging.getLogger(__name__)
 # --------------------------------------------------------------------------- #
 
 
+# --------------------------------------------------------------------------- #
+#                             PARSER CACHE                                    #
+# --------------------------------------------------------------------------- #
+class ParserCache:
+    """Parses each configuration file once and keeps the parser in memory.
+
+    A cached parser is reused until the modification time or size of its
+    file changes. Parsers returned are shared and must not be modified.
+    """
+
+    def __init__(self) -> None:
+        self._parsers = {}
+        self._lock = threading.Lock()
+
+    def _stamp(self, filepath: str) -> tuple:
+        try:
+            stat = os.stat(filepath)
+        except FileNotFoundError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size)
+
+    def get(self, filepath: str) -> ConfigParser:
+        """Returns the parser for filepath, parsing it only if changed."""
+        key = os.path.abspath(filepath)
+        stamp = self._stamp(key)
+        with self._lock:
+            cached = self._parsers.get(key)
+            if cached is not None and cached[0] == stamp:
+                return cached[1]
+
+        parser = ConfigParser()
+        if stamp is not None:
+            parser.read(key)
+
+        with self._lock:
+            self._parsers[key] = (stamp, parser)
+        return parser
+
+    def invalidate(self, filepath: str = None) -> None:
+        """Discards the parser for filepath, or all parsers."""
+        with self._lock:
+            if filepath is None:
+                self._parsers.clear()
+            else:
+                self._parsers.pop(os.path.abspath(filepath), None)
+
+
+parsers = ParserCache()
+
+
 class Config:
     """Access object to the configuration file."""
 
@@ -36,25 +87,28 @@ class Config:
 
     def _check_file(self, filepath):
         if not os.path.exists(filepath):
-            logger.error("Configuration file {} not found.".format(filepath))
-            raise FileNotFoundError
+            logger.error("Configuration file %s not found.", filepath)
+            raise FileNotFoundError(filepath)
+
+    def _parser(self) -> ConfigParser:
+        return parsers.get(self._filepath)
+
+    def _write(self, parser: ConfigParser) -> None:
+        with open(self._filepath, 'w+') as configfile:
+            parser.write(configfile)
+        parsers.invalidate(self._filepath)
 
     def has_section(self, section):
-        parser = ConfigParser()
-        parser.read(self._filepath)
-        return parser.has_section(str(section))
+        return self._parser().has_section(str(section))
 
     def has_option(self, section, option):
-        parser = ConfigParser()
-        parser.read(self._filepath)
-        return parser.has_option(str(section), str(option))
+        return self._parser().has_option(str(section), str(option))
 
     def get_section(self, section: str) -> dict:
         """Returns section key-value pairs."""
 
-        parser = ConfigParser()
         self._check_file(self._filepath)
-        parser.read(self._filepath)
+        parser = self._parser()
 
         config = {}
         try:
@@ -80,15 +134,13 @@ class Config:
         for option, value in params.items():
             parser[str(section)][str(option)] = str(value)
 
-        with open(self._filepath, 'w+') as configfile:
-            parser.write(configfile)
+        self._write(parser)
 
     def get_config(self, section, option):
         """Returns a configuration value given a section and option."""
 
-        parser = ConfigParser()
         self._check_file(self._filepath)
-        parser.read(self._filepath)
+        parser = self._parser()
 
         try:
             config = parser.get(section, option)
@@ -109,8 +161,7 @@ class Config:
             parser[str(section)] = {}
 
         parser[section][option] = value
-        with open(self._filepath, 'w+') as configfile:
-            parser.write(configfile)
+        self._write(parser)
 
     def delete_section(self, section: str):
         """Removes a section from the config file."""
@@ -118,15 +169,12 @@ class Config:
         parser = ConfigParser()
         parser.read(self._filepath)
         parser.remove_section(section)
-        with open(self._filepath, 'w+') as configfile:
-            parser.write(configfile)
+        self._write(parser)
 
     @property
     def sections(self):
         """Returns a list of all sections in the configuration file."""
-        parser = ConfigParser()
-        parser.read(self._filepath)
-        return parser.sections()
+        return self._parser().sections()
 
 # --------------------------------------------------------------------------- #
 #                     DATABASE CREDENTIALS READER                             #
@@ -140,7 +188,8 @@ class DBCredentials:
     are exposed for credentials dictionary and for each variable
     independently.  The dictionary property is provided for
     database connection applications that accept credentials in
-    a dictionary format.
+    a dictionary format. Credentials are read from the configuration file
+    on first use, not when they are requested with get.
 
     Arguments:
         filepath str: The path to the credentials configuration file.
@@ -151,12 +200,22 @@ class DBCredentials:
     def __init__(self, filepath: str = None) -> None:
         self._filepath = filepath if filepath is not None else \
             DBCredentials.filepath
+        self._section = None
+        self._credentials = None
+
+    def _get_credentials(self) -> dict:
+        if self._credentials is None:
+            if self._section is None:
+                raise ValueError("No credentials have been requested.")
+            self._credentials = Config(self._filepath).get_section(
+                self._section)
+        return self._credentials
 
     def keys(self):
-        return list(self._credentials.keys())
+        return list(self._get_credentials().keys())
 
     def __getitem__(self, key):
-        return self._credentials[key]
+        return self._get_credentials()[key]
 
     def create(self, user: str, password: str,
                host: str = 'localhost', dbname: str = 'rx2m',
@@ -170,8 +229,15 @@ class DBCredentials:
         params['dbname'] = dbname
         params['port'] = port
         config.set_section(section=section, params=params)
+        self._section = section
         self._credentials = config.get_section(section=section)
 
+    def load(self, section: str) -> None:
+        """Reads the credentials in the named section immediately."""
+        self._section = section
+        self._credentials = None
+        self._get_credentials()
+
     def read(self, user: str, dbname: str) -> dict:
         section = self._format_section_name(user, dbname)
         self.load(section)
@@ -182,29 +248,29 @@ class DBCredentials:
         Config(self._filepath).delete_section(section)
 
     def get(self, user: str, dbname: str):
-        section = self._format_section_name(user, dbname)
-        self._credentials = Config(self._filepath).get_section(section)
+        self._section = self._format_section_name(user, dbname)
+        self._credentials = None
         return self
 
     @property
     def dbname(self):
-        return self._credentials['dbname']
+        return self._get_credentials()['dbname']
 
     @property
     def host(self):
-        return self._credentials['host']
+        return self._get_credentials()['host']
 
     @property
     def user(self):
-        return self._credentials['user']
+        return self._get_credentials()['user']
 
     @property
     def password(self):
-        return self._credentials['password']
+        return self._get_credentials()['password']
 
     @property
     def port(self):
-        return self._credentials['port']
+        return self._get_credentials()['port']
 
     def _format_section_name(self, user: str, dbname: str):
         return user + "_" + dbname
@@ -231,7 +297,7 @@ class DataSourceConfig:
 
     @property
     def datasources(self) -> list:
-        sources = Config().get_config('data', 'sources')
+        sources = Config(self._filepath).get_config('data', 'sources')
         sources = sources.split(',')
         return sources
 
@@ -239,7 +305,8 @@ class DataSourceConfig:
 # ----------------------------------------------------------------------------#
 #                           CONFIGURATIONS                                    #
 # ----------------------------------------------------------------------------#
-# Database credentials
+# Database credentials. These are resolved from the configuration file on
+# first use.
 pg_pg_login = DBCredentials().get('postgres', 'postgres')
 pg_rx2m_login = DBCredentials().get('postgres', 'rx2m')
 j2_pg_login = DBCredentials().get('j2', 'postgres')
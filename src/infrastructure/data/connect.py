@@ -41,16 +41,18 @@
 """Core internal Base, Connection, and ConnectionPool classes."""
 from abc import ABC, abstractmethod
 import logging
+import time
 
-import psycopg2
-from psycopg2 import pool
-from sqlalchemy import create_engine
-
+from ...utils.lazy import lazy_import
 from ...utils.logger import exception_handler
+from ...utils import metrics
+from .catalog import catalog
 from .sequel import Sequel
 from src.infrastructure.data.config import DBCredentials
 # --------------------------------------------------------------------------- #
 logger = logging.getLogger(__name__)
+psycopg2 = lazy_import('psycopg2')
+pool = lazy_import('psycopg2.pool')
 # --------------------------------------------------------------------------- #
 
 
@@ -115,24 +117,24 @@ class PGConnectionPool(AbstractConnectionPool):
         PGConnectionPool.__connection_pool = pool.SimpleConnectionPool(
             mincon, maxcon, **credentials)
 
-        logger.info("Initialized connection pool for {} database.".format(
-            credentials['dbname']))
+        logger.info("Initialized connection pool for %s database.",
+                    credentials['dbname'])
 
     @staticmethod
     @exception_handler()
     def get_connection():
+        start = time.perf_counter()
         con = PGConnectionPool.__connection_pool.getconn()
+        metrics.pool_wait_seconds.observe(time.perf_counter() - start, 'pg')
         name = con.info.dsn_parameters['dbname']
-        logger.info(
-            "Getting connection from {} connection pool.".format(name))
+        logger.debug("Getting connection from %s connection pool.", name)
         return con
 
     @staticmethod
     @exception_handler()
     def close(connection) -> None:
         name = connection.info.dsn_parameters['dbname']
-        logger.info(
-            "Returning connection to {} connection pool.".format(name))
+        logger.debug("Returning connection to %s connection pool.", name)
         PGConnectionPool.__connection_pool.putconn(connection)
 
     @staticmethod
@@ -163,6 +165,8 @@ class SAConnectionPool(AbstractConnectionPool):
             max_overflow (int, optional): Max number of pools above
                 pool size. Defaults to 10.
         """
+        from sqlalchemy import create_engine
+
         SAConnectionPool.initialized = False
         USER = credentials['user']
         PWD = credentials['password']
@@ -176,34 +180,29 @@ class SAConnectionPool(AbstractConnectionPool):
             create_engine(f'{DATABASE_URI}{DBNAME}',
                           pool_size=pool_size, max_overflow=max_overflow)
 
-        logger.info("Initialized {} connection pool for {} database.".format(
-            SAConnectionPool.__class__.__name__,
-            credentials['dbname']))
+        logger.info("Initialized %s connection pool for %s database.",
+                    SAConnectionPool.__name__, credentials['dbname'])
 
     @staticmethod
     @exception_handler()
     def get_connection():
         """Returns a connection engine object."""
         connection = SAConnectionPool.__connection_pool
-        logger.info(
-            "Obtained SQLAlchemy connection from connection pool.")
+        logger.debug("Obtained SQLAlchemy connection from connection pool.")
         return connection
 
     @staticmethod
     @exception_handler()
     def close(connection) -> None:
         connection.close()
-        logger.info(
-            "Returned connection to {} connection pool.".format(
-                SAConnectionPool.__class__.__name__,))
+        logger.debug("Returned connection to %s connection pool.",
+                    SAConnectionPool.__name__)
 
     @staticmethod
     @exception_handler()
     def close_all_connections() -> None:
         SAConnectionPool.__connection_pool.dispose()
-        logger.info(
-            "Closed all {} connections.".format(
-                SAConnectionPool.__class__.__name__,))
+        logger.info("Closed all %s connections.", SAConnectionPool.__name__)
 
 
 # --------------------------------------------------------------------------- #
@@ -261,6 +260,7 @@ class Connection:
 
     def commit(self):
         self._connection.commit()
+        catalog.end_transaction(self)
 
     def close(self):
         if self._connection is not None:
@@ -271,6 +271,7 @@ class Connection:
 
     def rollback(self):
         self._connection.rollback()
+        catalog.end_transaction(self)
 
     @property
     def dbname(self):
@@ -286,3 +287,62 @@ class Connection:
             return self._connection.cursor
         else:
             return self._connection.connect()
+
+
+# --------------------------------------------------------------------------- #
+#                         DIRECT CONNECTION CLASS                             #
+# --------------------------------------------------------------------------- #
+class DirectConnection:
+    """Dedicated psycopg2 connection that bypasses the connection pools.
+
+    For statements that cannot run inside a transaction block, such as
+    CREATE INDEX CONCURRENTLY, and for work spread over several sessions at
+    once. Exposes the same cursor, commit, rollback and close interface as
+    Connection, and is closed on leaving a with block.
+
+    Arguments:
+        credentials (DBCredentials): Credentials including the database name.
+        autocommit (bool): Session autocommit mode. Defaults to True.
+    """
+
+    def __init__(self, credentials: DBCredentials,
+                 autocommit: bool = True) -> None:
+        self._credentials = credentials
+        self._connection = psycopg2.connect(
+            **{k: credentials[k] for k in credentials.keys()})
+        self._connection.set_session(autocommit=autocommit)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, type, value, traceback):
+        if not self._connection.autocommit:
+            if type is None:
+                self.commit()
+            else:
+                self.rollback()
+        self.close()
+
+    def commit(self):
+        self._connection.commit()
+        catalog.end_transaction(self)
+
+    def rollback(self):
+        self._connection.rollback()
+        catalog.end_transaction(self)
+
+    def close(self):
+        if self._connection is not None and not self._connection.closed:
+            self._connection.close()
+
+    @property
+    def dbname(self):
+        return self._credentials.dbname
+
+    @property
+    def user(self):
+        return self._credentials.user
+
+    @property
+    def cursor(self):
+        return self._connection.cursor
@@ -18,12 +18,177 @@
 # License  : BSD 3-clause "New" or "Revised" License                          #
 # Copyright: (c) 2021 nov8.ai                                                 #
 # =========================================================================== #
+"""Database context: a connection, its data access object and a unit of
+work.
+
+In unit of work mode the creates, updates, deletes and upserts issued
+through Context.dao are queued in memory instead of executed. save()
+flushes them in one transaction and commits. Consecutive operations of
+the same kind, on the same table and with the same statement shape, are
+coalesced into one batched statement:
+
+    create, create_many   one multi-row INSERT (create_many)
+    update                one batch of UPDATEs per page (update_many)
+    delete                one DELETE ... WHERE key = ANY(%s)
+    upsert, upsert_many   one staged merge (upsert_many)
+
+Only consecutive operations are coalesced, so statements run in the order
+they were issued. Reads through Context.dao flush the queue first so that
+they see the queued writes. Every flush runs inside the context's
+transaction, begun by the first flush if none is open, so nothing flushed
+is committed before save() and rollback() undoes it all.
+
+    context = Context(connection, PGDao, unit_of_work=True)
+    for event in events:
+        context.dao.create('datasourceevent', columns, event)
+    context.save()
+
+"""
+from dataclasses import dataclass, field
+import logging
 
-from .connect import PGConnectionPool
-from src.infrastructure.data.config import DBCredentials
 from src.infrastructure.data.connect import Connection
 from .access import PGDao
 # --------------------------------------------------------------------------- #
+logger = logging.getLogger(__name__)
+# --------------------------------------------------------------------------- #
+#                             UNIT OF WORK                                    #
+# --------------------------------------------------------------------------- #
+
+
+@dataclass
+class Operation:
+    """A queued write. Operations with equal shapes can be coalesced."""
+    kind: str
+    name: str
+    schema: str
+    shape: tuple
+    rows: list = field(default_factory=list)
+
+
+class UnitOfWork:
+    """Queues the writes of a PGDao and flushes them in batches.
+
+    Attributes other than the write methods are delegated to the dao,
+    flushing the queue first.
+
+    Arguments:
+        dao (PGDao): The data access object writes are flushed through.
+        begin (callable): Called before queued writes are executed, to
+            open a transaction if none is. Optional.
+    """
+
+    def __init__(self, dao: PGDao, begin=None) -> None:
+        self._dao = dao
+        self._begin = begin
+        self._pending = []
+
+    def __getattr__(self, attr: str):
+        self.flush()
+        return getattr(self._dao, attr)
+
+    @property
+    def pending(self) -> int:
+        """The number of rows queued."""
+        return sum(len(op.rows) for op in self._pending)
+
+    def _queue(self, kind: str, name: str, schema: str, shape: tuple,
+               rows: list) -> None:
+        last = self._pending[-1] if self._pending else None
+        if last is not None and (last.kind, last.name, last.schema,
+                                 last.shape) == (kind, name, schema, shape):
+            last.rows.extend(rows)
+        else:
+            self._pending.append(Operation(kind, name, schema, shape,
+                                           list(rows)))
+
+    def create(self, name: str, columns: list, values: list,
+               schema: str = 'public') -> None:
+        self._queue('create', name, schema, tuple(columns), [list(values)])
+
+    def create_many(self, name: str, columns: list, values: list,
+                    schema: str = 'public', page_size: int = 1000) -> None:
+        self._queue('create', name, schema, tuple(columns),
+                    [list(row) for row in values])
+
+    def update(self, name: str, column: str, value, filter_key: str,
+               filter_value, schema: str = 'public') -> None:
+        self._queue('update', name, schema, (column, filter_key),
+                    [(value, filter_value)])
+
+    def update_many(self, name: str, column: str, values: list,
+                    filter_key: str, schema: str = 'public',
+                    page_size: int = 100) -> None:
+        self._queue('update', name, schema, (column, filter_key),
+                    [tuple(pair) for pair in values])
+
+    def delete(self, name: str, filter_key: str, filter_value,
+               schema: str = 'public') -> None:
+        values = filter_value if isinstance(filter_value, list) \
+            else [filter_value]
+        self._queue('delete', name, schema, (filter_key,), values)
+
+    def upsert(self, name: str, columns: list, values: list, key,
+               schema: str = 'public', update: list = None) -> None:
+        self._queue('upsert', name, schema, self._upsert_shape(
+            columns, key, update), [list(values)])
+
+    def upsert_many(self, name: str, columns: list, values: list, key,
+                    schema: str = 'public', update: list = None) -> None:
+        self._queue('upsert', name, schema, self._upsert_shape(
+            columns, key, update), [list(row) for row in values])
+
+    @staticmethod
+    def _upsert_shape(columns: list, key, update: list) -> tuple:
+        key = (key,) if isinstance(key, str) else tuple(key)
+        return (tuple(columns), key,
+                None if update is None else tuple(update))
+
+    def flush(self) -> int:
+        """Executes the queued operations in order, one batched statement
+        per run of coalesced operations. The queue is cleared once all
+        have been executed. Returns the number of statements executed."""
+        if not self._pending:
+            return 0
+        if self._begin is not None:
+            self._begin()
+        dao = self._dao
+        for op in self._pending:
+            if op.kind == 'create':
+                dao.create_many(op.name, list(op.shape), op.rows,
+                                schema=op.schema)
+            elif op.kind == 'update':
+                column, filter_key = op.shape
+                if len(op.rows) == 1:
+                    value, filter_value = op.rows[0]
+                    dao.update(op.name, column, value, filter_key,
+                               filter_value, schema=op.schema)
+                else:
+                    dao.update_many(op.name, column, op.rows, filter_key,
+                                    schema=op.schema)
+            elif op.kind == 'delete':
+                dao.delete(op.name, op.shape[0], list(op.rows),
+                           schema=op.schema)
+            elif op.kind == 'upsert':
+                columns, key, update = op.shape
+                update = None if update is None else list(update)
+                if len(op.rows) == 1:
+                    dao.upsert(op.name, list(columns), op.rows[0],
+                               list(key), schema=op.schema, update=update)
+                else:
+                    dao.upsert_many(op.name, list(columns), op.rows,
+                                    list(key), schema=op.schema,
+                                    update=update)
+        statements = len(self._pending)
+        logger.debug("Flushed %d rows in %d statements.", self.pending,
+                     statements)
+        self._pending = []
+        return statements
+
+    def clear(self) -> None:
+        """Discards the queued operations."""
+        self._pending = []
+
 
 # --------------------------------------------------------------------------- #
 #                             CONTEXT                                         #
@@ -31,26 +196,73 @@ from .access import PGDao
 
 
 class Context:
-    """Database context class encapsulating database connection, and access."""
+    """Database context class encapsulating database connection, and access.
+
+    Arguments:
+        connection (Connection): The database connection.
+        dao (type): Data access object class, instantiated on the
+            connection. Defaults to PGDao.
+        unit_of_work (bool): Queue writes until save(). Default False.
+    """
 
     def __init__(self, connection: Connection,
-                 dao: PGDao) -> None:
+                 dao: type = PGDao, unit_of_work: bool = False) -> None:
 
         self._connection = connection
-        self._dao = dao
+        self._dao_class = dao
+        self._dao = None
+        self._unit_of_work = unit_of_work
+        self._in_transaction = False
+        self._callbacks = []
 
     def begin_transaction(self):
         self._connection.begin_transaction()
+        self._in_transaction = True
+
+    def _ensure_transaction(self):
+        if not self._in_transaction:
+            self.begin_transaction()
+
+    def after_transaction(self, callback) -> None:
+        """Registers callback to be called once, after the next save() or
+        rollback(), e.g. to drop cache entries the transaction changed.
+        Outside a transaction the writes are already final, so callback
+        is called at once."""
+        if not self._in_transaction:
+            callback()
+            return
+        self._callbacks.append(callback)
+
+    def _end_transaction(self):
+        self._in_transaction = False
+        access = self._dao._dao if isinstance(self._dao, UnitOfWork) \
+            else self._dao
+        if isinstance(access, PGDao):
+            access.end_transaction()
+        callbacks, self._callbacks = self._callbacks, []
+        for callback in callbacks:
+            callback()
 
     def save(self):
+        """Flushes queued writes, if any, and commits."""
+        if self._unit_of_work:
+            self.dao.flush()
         self._connection.commit()
+        self._end_transaction()
 
     def rollback(self):
+        """Discards queued writes and rolls back."""
+        if self._unit_of_work and self._dao is not None:
+            self._dao.clear()
         self._connection.rollback()
+        self._end_transaction()
 
     @property
     def dao(self):
-        self._dao(connection=self._connection)
+        if self._dao is None:
+            dao = self._dao_class(connection=self._connection)
+            self._dao = UnitOfWork(dao, begin=self._ensure_transaction) \
+                if self._unit_of_work else dao
         return self._dao
 
     @property
@@ -20,20 +20,27 @@
 # =========================================================================== #
 """Core internal Base, Connection, and ConnectionPool classes."""
 from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
 import logging
-
-import psycopg2
-from psycopg2 import pool
-
+import time
 
 from .sequel import DatabaseSequel, TableSequel, UserSequel, SchemaSequel
 from .sequel import Sequel
 from .connect import PGConnectionPool, SAConnectionPool, Connection
+from .connect import DirectConnection
+from .backup import PGBackup, BackupResult
+from .catalog import catalog
+from .ddl.parser import DDLGraph
+from .querylog import querylog
+from .explain import explainer
 from .config import DBCredentials
 from ...utils.logger import exception_handler
-from ...utils.files import string_replace
+from ...utils import metrics
+from ...utils.lazy import lazy_import
 # --------------------------------------------------------------------------- #
 logger = logging.getLogger(__name__)
+psycopg2 = lazy_import('psycopg2')
+extras = lazy_import('psycopg2.extras')
 
 
 # --------------------------------------------------------------------------- #
@@ -55,6 +62,8 @@ class DatabaseConfiguration:
         replace_if_exists (bool): If true, delete database if it exists.
             If False and any of the database entities exist, an
             exception will be raised.
+        workers (int): Connections used to create tables concurrently.
+            Defaults to 4.
 
         Raises:
             [Entity] already exists: If replace_if_exists is False and
@@ -71,7 +80,8 @@ class DatabaseConfiguration:
                  create_table_ddl_filepath: str,
                  drop_table_ddl_filepath: str,
                  table_data: dict,
-                 replace_if_exists: bool = True) -> None:
+                 replace_if_exists: bool = True,
+                 workers: int = 4) -> None:
 
         self._name = name
         self._schema = schema
@@ -82,6 +92,7 @@ class DatabaseConfiguration:
         self._drop_table_ddl_filepath = drop_table_ddl_filepath
         self._table_data = table_data
         self._replace_if_exists = replace_if_exists
+        self._workers = workers
         self._validate()
 
     def _validate(self):
@@ -133,6 +144,10 @@ class DatabaseConfiguration:
     def replace_if_exists(self) -> str:
         return self._replace_if_exists
 
+    @property
+    def workers(self) -> int:
+        return self._workers
+
 # --------------------------------------------------------------------------- #
 #                          DATABASE BUILDER                                   #
 # --------------------------------------------------------------------------- #
@@ -212,69 +227,43 @@ class MetaDatabaseBuilder(DatabaseBuilder):
     def _rollback_user(self, user: str, dbname: str, connection: Connection) -> None:
         # Confirm user exists
         if not self._database.user_exists(user, connection):
-            msg = "\n\nRollback Warning: User {} does not exist. No action taken".format(
-                user)
-            logger.warn(msg)
+            logger.warning("Rollback Warning: User %s does not exist. "
+                           "No action taken", user)
             return
 
         # Remove user. This revokes privileges on the database and any dependent
         # databases, then deletes the user.
         self._database.remove_user(user, dbname, connection)
-        msg = "\n\nRollback: User {} removed from {}".format(
-            user, connection.dbname)
-        logger.info(msg)
+        logger.info("Rollback: User %s removed from %s", user,
+                    connection.dbname)
 
     @exception_handler()
     def _rollback_tables(self, connection: Connection) -> None:
-        self._database.delete_tables(
-            self._builder_config.drop_table_ddl_filepath, connection)
-        msg = "\n\nRollback: Tables removed from {}".format(
-            connection.dbname)
-        logger.info(msg)
+        graph = DDLGraph.from_file(
+            self._builder_config.drop_table_ddl_filepath,
+            schema=self._builder_config.schema, if_exists=True)
+        self._database.execute_statements(graph.statements, connection)
+        logger.info("Rollback: Tables removed from %s", connection.dbname)
 
     @exception_handler()
     def _rollback_database(self, connection: Connection) -> None:
         # Confirm the database to delete isn't the current database.
         if self._builder_config.name == connection.dbname:
-            msg = "\n\nRollback Warning: Active database {} cannot be dropped. No action taken.".format(
-                connection.dbname)
-            logger.warn(msg)
+            logger.warning("Rollback Warning: Active database %s cannot be "
+                           "dropped. No action taken.", connection.dbname)
             return
 
         self._database.delete(self._builder_config.name, connection)
-        msg = "\n\nRollback: Database {} dropped.".format(
-            self._builder_config.name)
-        logger.info(msg)
-
-    @exception_handler()
-    def _update_ddl(self) -> None:
-
-        if not self._builder_config.replace_if_exists:
-            # If not replacing, create tables only if they don't already exist
-            string_replace(self._builder_config.create_table_ddl_filepath,
-                           'CREATE TABLE public', 'CREATE TABLE IF NOT EXISTS public')
-
-        # Add IF EXISTS option to DROP TABLE
-        string_replace(self._builder_config.drop_table_ddl_filepath,
-                       'DROP TABLE public', "DROP TABLE IF EXISTS public")
-
-        # Update CREATE table DDL with requested schema.
-        string_replace(self._builder_config.create_table_ddl_filepath,
-                       'public', self._builder_config.schema)
-
-        # Update DROP table DDL with requested schema.
-        string_replace(self._builder_config.drop_table_ddl_filepath,
-                       'public', self._builder_config.schema)
+        logger.info("Rollback: Database %s dropped.",
+                    self._builder_config.name)
 
     # --------------------------------------------------------------------------- #
     @exception_handler()
     def reset(self) -> None:
-        # Instantiate a database object
+        # Instantiate a database object. Schema and IF EXISTS type options
+        # are applied to the DDL in memory when it is parsed.
         self._database = Database()
 
-        # Add schema and IF EXISTS type options to DDL
-        self._update_ddl()
-
         # Grab a connection in autocommit mode. Database changes can't be made
         # in transaction mode.
         connection = Connection(self._builder_config.dba_db_credentials,
@@ -324,12 +313,13 @@ class MetaDatabaseBuilder(DatabaseBuilder):
 
     @exception_handler()
     def build_tables(self) -> None:
-        connection = Connection(self._builder_config.dba_db_credentials,
-                                autocommit=True, postgres=True)
-
-        with connection:
-            self._database.create_tables(
-                self._builder_config.create_table_ddl_filepath, connection)
+        graph = DDLGraph.from_file(
+            self._builder_config.create_table_ddl_filepath,
+            schema=self._builder_config.schema,
+            if_not_exists=not self._builder_config.replace_if_exists)
+        self._database.execute_graph(graph,
+                                     self._builder_config.dba_db_credentials,
+                                     workers=self._builder_config.workers)
 
     @exception_handler()
     def initialize(self) -> None:
@@ -453,6 +443,45 @@ class Database(ABC):
         response = self.execute(sequel, connection)
         return response
 
+    @exception_handler()
+    def clone(self, name: str, template: str,
+              connection: Connection) -> Response:
+        """Creates a database as a file level copy of a template database.
+
+        Arguments:
+            name (str): The name of the database to create.
+            template (str): The database to copy. It must have no other
+                sessions connected.
+            connection (Connection): Connection to postgres database
+        """
+        sequel = self._database_sequel.clone(name, template)
+        response = self.execute(sequel, connection)
+        return response
+
+    @exception_handler()
+    def set_template(self, name: str, is_template: bool,
+                     connection: Connection) -> Response:
+        """Marks a database as a template, or clears the mark so that it can
+        be dropped."""
+        sequel = self._database_sequel.set_template(name, is_template)
+        response = self.execute(sequel, connection)
+        return response
+
+    @exception_handler()
+    def set_comment(self, name: str, text: str,
+                    connection: Connection) -> Response:
+        """Sets the comment on a database."""
+        sequel = self._database_sequel.comment(name, text)
+        response = self.execute(sequel, connection)
+        return response
+
+    @exception_handler()
+    def get_comment(self, name: str, connection: Connection) -> str:
+        """Returns the comment on a database, or None."""
+        sequel = self._database_sequel.get_comment(name)
+        response = self.execute(sequel, connection)
+        return response.fetchall[0][0] if response.fetchall else None
+
     @exception_handler()
     def terminate_database_processes(self, name: str,
                                      connection: Connection) -> None:
@@ -482,78 +511,55 @@ class Database(ABC):
         return response.fetchall
 
     @exception_handler()
-    def backup(self, dbname: str, filepath: str) -> None:
-        """Backs up database to the designated filepath
+    def backup(self, credentials: DBCredentials, dbname: str,
+               filepath: str, jobs: int = 4, tables: list = None) \
+            -> BackupResult:
+        """Backs up database to the designated directory
 
         Arguments
-            dba_pg_credentials (dict): Credentials for the database
-            filepath(str): Location of the backup file.
+            credentials (DBCredentials): Credentials of a user able to
+                read the database.
+            dbname (str): The database to back up.
+            filepath (str): Directory to write the backup to. It must not
+                exist.
+            jobs (int): Tables dumped in parallel. Defaults to 4.
+            tables (list): Optional subset of tables to back up.
 
         """
-        USER = self._dba_pg_credentials['user']
-        HOST = self._dba_pg_credentials['host']
-        PORT = self._dba_pg_credentials['port']
-        PASSWORD = self._dba_pg_credentials['password']
-        DBNAME = dbname
-
-        command = ['pg_dump',
-                   '--dbname=Psycopg2ql://{}:{}@{}:{}/{}'.format(USER,
-                                                                 PASSWORD,
-                                                                 HOST,
-                                                                 PORT,
-                                                                 dbname),
-                   '-Fc',
-                   '-f', filepath,
-                   '-v']
-
-        self._run_process(command)
-
-        logger.info("Backed up database {} to {}".format(
-            DBNAME, filepath))
+        return PGBackup(credentials, jobs=jobs).dump(dbname, filepath,
+                                                     tables=tables)
 
     @exception_handler()
-    def restore(self, dbname: str, filepath: str) -> None:
+    def restore(self, credentials: DBCredentials, dbname: str,
+                filepath: str, jobs: int = 4, tables: list = None,
+                clean: bool = False) -> BackupResult:
+        """Restores a backup directory into an existing database.
 
-        USER = self._dba_pg_credentials['user']
-        HOST = self._dba_pg_credentials['host']
-        PASSWORD = self._dba_pg_credentials['password']
-        PORT = self._dba_pg_credentials['port']
-        DBNAME = dbname
-
-        command = ['pg_restore',
-                   '--no-owner',
-                   '--dbname=Psycopg2ql://{}:{}@{}:{}/{}'.format(USER,
-                                                                 PASSWORD,
-                                                                 HOST,
-                                                                 PORT,
-                                                                 dbname),
-                   '-v',
-                   filepath]
-        self._run_process(command)
+        Arguments
+            credentials (DBCredentials): Credentials of the restoring user.
+            dbname (str): The database to restore into.
+            filepath (str): Directory written by backup.
+            jobs (int): Tables restored in parallel. Defaults to 4.
+            tables (list): Optional subset of tables to restore.
+            clean (bool): Drop objects before recreating them.
 
-        logger.info("Restored database {} from {}".format(
-            DBNAME, filepath))
+        """
+        return PGBackup(credentials, jobs=jobs).restore(
+            dbname, filepath, tables=tables, clean=clean)
 
     @exception_handler()
-    def _run_process(self, command):
-        """Wrapper for Python subprocess commands."""
-
-        if isinstance(command, str):
-            command = shlex.split(command)
-
-        proc = Popen(command,  shell=True, stdin=PIPE,
-                     stdout=PIPE, stderr=PIPE, encoding='utf8')
-
-        out, err = proc.communicate()
+    def refresh_catalog(self, connection: Connection,
+                        schemas: list = None) -> None:
+        """Reloads the cached catalog names of the connected database, for
+        changes made outside this process.
 
-        if int(proc.returncode) != 0:
-            if err.strip() == "":
-                err = out
-            mesg = "Error [%d]: %s" % (proc.returncode, command)
-            mesg += "\nDetail: %s" % err
-            raise Exception(mesg)
+        Arguments
+            connection (Connection): Connection to the database
+            schemas (list): Schemas whose tables and columns are reloaded
+                now rather than on their next lookup.
 
-        return proc.returncode, out, err
+        """
+        catalog.refresh(connection, self, schemas)
 
     # ----------------------------------------------------------------------- #
     #                               SCHEMA                                    #
@@ -582,25 +588,36 @@ class Database(ABC):
 
         """
 
-        sequel = self._schema_sequel.exists(name)
-        response = self.execute(sequel, connection)
-
-        if response.fetchall:
-            return response.fetchall[0][0]
-        else:
-            return False
+        return name.lower() in catalog.schemas(connection, self)
 
     @exception_handler()
     def delete_schema(self, name: str,
-                      connection: Connection) -> None:
+                      connection: Connection, cascade: bool = False) -> None:
         """Drops a schema
 
         Arguments:
             name(str): Name of the schema to drop
             connection (Connection)
+            cascade (bool): Drop the schema, if it exists, with everything
+                in it.
 
         """
-        sequel = self._schema_sequel.delete(name)
+        sequel = self._schema_sequel.delete(name, cascade)
+        self.execute(sequel, connection)
+
+    @exception_handler()
+    def rename_schema(self, name: str, new_name: str,
+                      connection: Connection) -> None:
+        """Renames a schema. Only the catalog entry changes, so the rename
+        is instant once its lock is granted.
+
+        Arguments:
+            name(str): Name of the schema to rename
+            new_name(str): Its new name
+            connection (Connection)
+
+        """
+        sequel = self._schema_sequel.rename(name, new_name)
         self.execute(sequel, connection)
 
     # ----------------------------------------------------------------------- #
@@ -646,13 +663,7 @@ class Database(ABC):
 
         """
 
-        sequel = self._table_sequel.exists(name, schema)
-        response = self.execute(sequel, connection)
-
-        if response.fetchall:
-            return response.fetchall[0][0]
-        else:
-            return False
+        return name in catalog.tables(schema, connection, self)
 
     @exception_handler()
     def delete_table(self, name: str,
@@ -682,6 +693,22 @@ class Database(ABC):
         sequel = self._table_sequel.batch_delete(filepath)
         self.execute_ddl(sequel, connection)
 
+    @exception_handler()
+    def analyze_table(self, name: str, schema: str,
+                      connection: Connection) -> None:
+        """Refreshes planner statistics for a table."""
+        sequel = self._table_sequel.analyze(name, schema)
+        self.execute(sequel, connection)
+
+    @exception_handler()
+    def column_stats(self, name: str, schema: str,
+                     connection: Connection) -> list:
+        """Returns (column, data type, n_distinct, null_frac, reltuples)
+        rows for a table, with None where it has not been analyzed."""
+        sequel = self._table_sequel.column_stats(name, schema)
+        response = self.execute(sequel, connection)
+        return response.fetchall
+
     @exception_handler()
     def column_exists(self, name: str, column: str,
                       connection: PGConnectionPool,
@@ -696,12 +723,8 @@ class Database(ABC):
 
         """
 
-        sequel = self._table_sequel.column_exists(name, schema, column)
-        response = self.execute(sequel, connection)
-        if response.fetchall:
-            return response.fetchall[0][0]
-        else:
-            return False
+        return column in catalog.tables(schema, connection, self).get(
+            name, ())
 
     @exception_handler()
     @property
@@ -736,10 +759,8 @@ class Database(ABC):
 
         """
 
-        sequel = self._table_sequel.get_columns(name, schema)
-        response = self.execute(sequel, connection)
-
-        return response.fetchall
+        columns = catalog.tables(schema, connection, self).get(name, ())
+        return [(column,) for column in columns]
 
     # ----------------------------------------------------------------------- #
     #                                USER                                     #
@@ -768,12 +789,7 @@ class Database(ABC):
             name (str): The username
 
         """
-        sequel = self._user_sequel.exists(name)
-        response = self.execute(sequel, connection)
-        if response.fetchall:
-            return response.fetchall[0][0]
-        else:
-            return False
+        return name in catalog.users(connection, self)
 
     @exception_handler()
     def delete_user(self, name: str,
@@ -846,6 +862,7 @@ class Database(ABC):
 
     @exception_handler()
     def execute_one(self, sequel: Sequel, connection: Connection) -> Response:
+        start = time.perf_counter()
         cursor = connection.cursor()
         response_execute = cursor.execute(sequel.cmd, sequel.params)
         response_description = cursor.description
@@ -858,11 +875,12 @@ class Database(ABC):
                             description=response_description,
                             rowcount=response_rowcount)
 
-        logger.info(sequel.description)
+        self._observe(sequel, start, connection, response_rowcount)
         return response
 
     @exception_handler()
     def execute(self, sequel: Sequel, connection: Connection) -> Response:
+        start = time.perf_counter()
         cursor = connection.cursor()
         response_execute = cursor.execute(sequel.cmd, sequel.params)
         response_description = cursor.description
@@ -879,14 +897,129 @@ class Database(ABC):
                             description=response_description,
                             rowcount=response_rowcount)
         cursor.close()
-        logger.info(sequel.description)
+        self._observe(sequel, start, connection, response_rowcount,
+                      response_fetchall)
+        return response
+
+    @exception_handler()
+    def execute_values(self, sequel: Sequel, connection: Connection,
+                       page_size: int = 1000) -> Response:
+        """Executes a multi-row statement over a list of parameter tuples.
+
+        Rows are sent page_size at a time in multi-row VALUES statements,
+        i.e. one round trip per page rather than per row.
+        """
+        start = time.perf_counter()
+        cursor = connection.cursor()
+        extras.execute_values(cursor, sequel.cmd, sequel.params,
+                              page_size=page_size)
+        response = Response(cursor=cursor, rowcount=len(sequel.params))
+        cursor.close()
+        self._observe(sequel, start, connection, len(sequel.params))
+        return response
+
+    @exception_handler()
+    def execute_batch(self, sequel: Sequel, connection: Connection,
+                      page_size: int = 100) -> Response:
+        """Executes one statement over a list of parameter tuples, sending
+        page_size statements per round trip."""
+        start = time.perf_counter()
+        cursor = connection.cursor()
+        extras.execute_batch(cursor, sequel.cmd, sequel.params,
+                             page_size=page_size)
+        response = Response(cursor=cursor, rowcount=len(sequel.params))
+        cursor.close()
+        self._observe(sequel, start, connection, len(sequel.params))
         return response
 
     @exception_handler()
     def execute_ddl(self, sequel: Sequel, connection: Connection) -> None:
         """Processes SQL DDL commands from file."""
-
+        start = time.perf_counter()
         with connection.cursor() as cursor:
             cursor.execute(open(sequel.params, "r").read())
         cursor.close()
-        logger.info(sequel.description)
+        self._observe(sequel, start, connection)
+
+    @exception_handler()
+    def execute_statements(self, statements: list,
+                           connection: Connection) -> None:
+        """Executes parsed DDL statements in order on one connection."""
+        for statement in statements:
+            sequel = self._table_sequel.statement(
+                statement.kind, statement.name or statement.table,
+                statement.sql)
+            self.execute(sequel, connection)
+
+    @exception_handler()
+    def execute_graph(self, graph: DDLGraph, credentials: DBCredentials,
+                      workers: int = 4) -> None:
+        """Executes a DDL statement graph.
+
+        Statements not tied to a created table run first. Each wave of
+        tables is then built concurrently, one table with the statements
+        that follow it on that table per DirectConnection. Foreign key constraints are added
+        last, in one transaction, once every table exists.
+
+        Arguments:
+            graph (DDLGraph): The parsed DDL.
+            credentials (DBCredentials): Credentials for the database.
+            workers (int): Max concurrent connections. Defaults to 4.
+        """
+        units = graph.units()
+
+        def build(table):
+            with DirectConnection(credentials) as connection:
+                self.execute_statements(units[table], connection)
+
+        prologue = graph.prologue()
+        if prologue:
+            with DirectConnection(credentials) as connection:
+                self.execute_statements(prologue, connection)
+
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+            for wave in graph.waves():
+                # list() re-raises the first failure before the next wave.
+                list(executor.map(build, wave))
+
+        constraints = graph.constraints
+        if constraints:
+            with DirectConnection(credentials, autocommit=False) as \
+                    connection:
+                self.execute_statements(constraints, connection)
+
+    def copy_from(self, sequel: Sequel, stream,
+                  connection: Connection) -> int:
+        """Runs a COPY ... FROM STDIN sequel reading rows from stream, a
+        file-like object. Returns the number of rows copied."""
+        start = time.perf_counter()
+        cursor = connection.cursor()
+        cursor.copy_expert(sequel.cmd, stream)
+        rowcount = cursor.rowcount
+        cursor.close()
+        self._observe(sequel, start, connection, rowcount)
+        return rowcount
+
+    def execute_copy(self, sequel: Sequel, connection: Connection,
+                     stream) -> int:
+        """Runs a COPY ... TO STDOUT sequel, writing its output to stream, a
+        writable file-like object. Returns the number of rows copied."""
+        start = time.perf_counter()
+        cursor = connection.cursor()
+        cmd = sequel.cmd
+        if sequel.params:
+            cmd = cursor.mogrify(cmd, sequel.params).decode()
+        cursor.copy_expert(cmd, stream)
+        rowcount = cursor.rowcount
+        cursor.close()
+        self._observe(sequel, start, connection, rowcount)
+        return rowcount
+
+    def _observe(self, sequel: Sequel, start: float, connection: Connection,
+                 rowcount: int = None, rows: list = None) -> None:
+        """Feeds an executed statement to the query log and metrics."""
+        elapsed = time.perf_counter() - start
+        metrics.observe_query(sequel.name, elapsed, rowcount, rows)
+        catalog.observe(sequel, connection)
+        querylog.record(sequel, elapsed, rowcount, connection)
+        explainer.observe(sequel, elapsed, connection)
@@ -60,6 +60,9 @@ PRIMARY KEY (id)
 COMMENT ON COLUMN metabase.datasource.next_extract
 IS 'Next extract = DATE(today) + lifecycle computed by the extractor ONLY.';
 
+CREATE UNIQUE INDEX ON metabase.datasource
+(name);
+
 CREATE TABLE metabase.dataset (
 id char(36) NOT NULL,
 name varchar(24) NOT NULL,
@@ -120,9 +123,9 @@ type varchar(12) NOT NULL,
 description varchar(256) NOT NULL,
 model_id char(36) NOT NULL,
 input_dataset_id char(36) NOT NULL,
-parameter_ids CHAR[] NOT NULL,
-score_ids CHAR[] NOT NULL,
-predictions_dataset_id char(36) NOT NULL,
+parameter_ids char(36)[] NOT NULL,
+score_ids char(36)[] NOT NULL,
+predictions_dataset_id char(36),
 feature_transform_ids TEXT[] NOT NULL,
 started timestamp with time zone NOT NULL,
 ended timestamp with time zone NOT NULL,
@@ -189,6 +192,8 @@ PRIMARY KEY (id)
 
 CREATE INDEX ON metabase.datasourceevent
 (datasource_id);
+CREATE INDEX ON metabase.datasourceevent
+(name);
 
 
 CREATE TABLE metabase.countstats (
@@ -0,0 +1,312 @@
+#!/usr/bin/env python3
+# -*- coding:utf-8 -*-
+# =========================================================================== #
+# Project  : Drug Approval Analytics                                          #
+# Version  : 0.1.0                                                            #
+# File     : \src\infrastructure\data\ddl\parser.py                           #
+# Language : Python 3.9.5                                                     #
+# --------------------------------------------------------------------------  #
+# Author   : John James                                                       #
+# Company  : nov8.ai                                                          #
+# Email    : john.james@nov8.ai                                               #
+# URL      : https://github.com/john-james-sf/drug-approval-analytics         #
+# --------------------------------------------------------------------------  #
+# Created  : Monday, October 19th 2026, 4:05:55 am                            #
+# Modified : Monday, October 19th 2026, 4:05:55 am                            #
+# Modifier : John James (john.james@nov8.ai)                                  #
+# --------------------------------------------------------------------------- #
+# License  : BSD 3-clause "New" or "Revised" License                          #
+# Copyright: (c) 2021 nov8.ai                                                 #
+# =========================================================================== #
+"""Parses DDL scripts into a graph of table, index and constraint statements.
+
+A script is split into statements, each classified as a table, index,
+comment, foreign key constraint, drop or other statement, and tied to the
+table it acts on. Statements on one table form a unit: the CREATE TABLE
+followed by its indexes and comments. Units are ordered in waves so that a
+table declaring an inline REFERENCES comes after the table it references;
+units within a wave are independent and can run concurrently. Foreign key
+constraints added with ALTER TABLE are held back to run after all units.
+
+Schema substitution is done in memory: qualified names in the script's own
+schema, taken from its first table statement, are rewritten to the target
+schema, leaving the script on disk untouched.
+
+"""
+from dataclasses import dataclass, field
+import re
+# --------------------------------------------------------------------------- #
+TABLE = 'table'
+INDEX = 'index'
+COMMENT = 'comment'
+CONSTRAINT = 'constraint'
+DROP = 'drop'
+OTHER = 'other'
+
+_NAME = r'"?(\w+)"?\s*\.\s*"?(\w+)"?'
+_CREATE_TABLE = re.compile(
+    r'^CREATE\s+(?:UNLOGGED\s+)?TABLE\s+(IF\s+NOT\s+EXISTS\s+)?' + _NAME,
+    re.I)
+_CREATE_INDEX = re.compile(
+    r'^CREATE\s+(UNIQUE\s+)?INDEX\s+(CONCURRENTLY\s+)?'
+    r'(IF\s+NOT\s+EXISTS\s+)?(?:"?(\w+)"?\s+)?ON\s+(?:ONLY\s+)?' + _NAME +
+    r'\s*(?:USING\s+\w+\s*)?\(([^)]*)\)', re.I | re.S)
+_COMMENT = re.compile(r'^COMMENT\s+ON\s+(?:TABLE|COLUMN)\s+' + _NAME, re.I)
+_ALTER = re.compile(r'^ALTER\s+TABLE\s+(?:ONLY\s+)?(?:IF\s+EXISTS\s+)?' +
+                    _NAME, re.I)
+_DROP_TABLE = re.compile(r'^DROP\s+TABLE\s+(IF\s+EXISTS\s+)?' + _NAME,
+                         re.I)
+_REFERENCES = re.compile(r'\bREFERENCES\s+' + _NAME, re.I)
+_STRING = r"'(?:[^']|'')*'"
+# --------------------------------------------------------------------------- #
+
+
+def index_name(table: str, columns: tuple) -> str:
+    """Postgres style name, truncated to the 63 byte identifier limit."""
+    name = "{}_{}_idx".format(table, "_".join(columns))
+    return name if len(name) <= 63 else name[:59] + "_idx"
+
+
+def split_statements(text: str) -> list:
+    """Splits a script on semicolons outside strings, identifiers,
+    parentheses and comments, dropping comments and empty statements."""
+    statements, current = [], []
+    depth, i, n = 0, 0, len(text)
+    while i < n:
+        char = text[i]
+        if char == '-' and text.startswith('--', i):
+            end = text.find('\n', i)
+            i = n if end == -1 else end
+            continue
+        if char == '/' and text.startswith('/*', i):
+            end = text.find('*/', i + 2)
+            i = n if end == -1 else end + 2
+            continue
+        if char in ("'", '"'):
+            end = i + 1
+            while end < n:
+                if text[end] == char:
+                    if end + 1 < n and text[end + 1] == char:
+                        end += 2
+                        continue
+                    break
+                end += 1
+            current.append(text[i:end + 1])
+            i = end + 1
+            continue
+        if char == '(':
+            depth += 1
+        elif char == ')':
+            depth -= 1
+        elif char == ';' and depth == 0:
+            statement = ''.join(current).strip()
+            if statement:
+                statements.append(statement)
+            current = []
+            i += 1
+            continue
+        current.append(char)
+        i += 1
+    statement = ''.join(current).strip()
+    if statement:
+        statements.append(statement)
+    return statements
+
+
+def requalify(text: str, source: str, schema: str) -> str:
+    """Rewrites names qualified with the source schema to the target schema,
+    leaving string literals untouched."""
+    pattern = re.compile(r'({})|(?<![\w.])("?){}\2\s*\.'.format(
+        _STRING, re.escape(source)))
+
+    def replace(match):
+        if match.group(1):
+            return match.group(1)
+        return '{0}{1}{0}.'.format(match.group(2), schema)
+    return pattern.sub(replace, text)
+
+
+@dataclass
+class DDLStatement:
+    """One statement of a DDL script."""
+    kind: str
+    sql: str
+    table: str = field(default=None)
+    name: str = field(default=None)
+    references: tuple = field(default=())
+
+
+class DDLGraph:
+    """Statement graph of a DDL script.
+
+    Arguments:
+        statements (list): DDLStatements in script order.
+    """
+
+    def __init__(self, statements: list) -> None:
+        self._statements = statements
+
+    @classmethod
+    def parse(cls, text: str, schema: str = None,
+              if_not_exists: bool = False, if_exists: bool = False):
+        """Parses a DDL script.
+
+        Arguments:
+            text (str): The script.
+            schema (str): Target schema replacing the script's own schema.
+            if_not_exists (bool): Make CREATE TABLE and CREATE INDEX
+                idempotent. Unnamed indexes are given Postgres style names.
+            if_exists (bool): Add IF EXISTS to DROP TABLE.
+        """
+        raw = split_statements(text)
+        source = cls._source_schema(raw)
+        statements = []
+        for statement in raw:
+            if schema and source and schema != source:
+                statement = cls._substitute(statement, source, schema)
+            statements.append(cls._classify(statement, if_not_exists,
+                                            if_exists))
+        return cls(statements)
+
+    @classmethod
+    def from_file(cls, filepath: str, schema: str = None,
+                  if_not_exists: bool = False, if_exists: bool = False):
+        """Parses the DDL script in filepath. See parse."""
+        with open(filepath, 'r') as f:
+            return cls.parse(f.read(), schema, if_not_exists, if_exists)
+
+    @staticmethod
+    def _source_schema(statements: list) -> str:
+        for statement in statements:
+            for pattern in (_CREATE_TABLE, _DROP_TABLE):
+                match = pattern.match(statement)
+                if match:
+                    return match.group(2)
+        return None
+
+    @staticmethod
+    def _substitute(statement: str, source: str, schema: str) -> str:
+        return requalify(statement, source, schema)
+
+    @staticmethod
+    def _classify(statement: str, if_not_exists: bool,
+                  if_exists: bool) -> DDLStatement:
+        match = _CREATE_TABLE.match(statement)
+        if match:
+            if if_not_exists and not match.group(1):
+                statement = re.sub(r'^(CREATE\s+(?:UNLOGGED\s+)?TABLE)\s+',
+                                   r'\1 IF NOT EXISTS ', statement,
+                                   count=1, flags=re.I)
+            table = "{}.{}".format(match.group(2), match.group(3))
+            references = tuple(sorted(
+                {"{}.{}".format(s, t)
+                 for s, t in _REFERENCES.findall(statement)} - {table}))
+            return DDLStatement(TABLE, statement, table, table, references)
+
+        match = _CREATE_INDEX.match(statement)
+        if match:
+            table = "{}.{}".format(match.group(5), match.group(6))
+            name = match.group(4)
+            if if_not_exists and not match.group(3):
+                if name is None:
+                    columns = tuple(re.sub(r'\W+', '_', c.strip()).strip('_')
+                                    for c in match.group(7).split(','))
+                    name = index_name(match.group(6), columns)
+                    statement = re.sub(
+                        r'\s+ON\s+', ' IF NOT EXISTS "{}" ON '.format(name),
+                        statement, count=1, flags=re.I)
+                else:
+                    statement = re.sub(
+                        r'INDEX\s+(CONCURRENTLY\s+)?',
+                        lambda m: 'INDEX ' + (m.group(1) or '') +
+                        'IF NOT EXISTS ', statement, count=1, flags=re.I)
+            return DDLStatement(INDEX, statement, table, name)
+
+        match = _COMMENT.match(statement)
+        if match:
+            table = "{}.{}".format(match.group(1), match.group(2))
+            return DDLStatement(COMMENT, statement, table)
+
+        match = _ALTER.match(statement)
+        if match:
+            table = "{}.{}".format(match.group(1), match.group(2))
+            references = tuple(sorted(
+                {"{}.{}".format(s, t)
+                 for s, t in _REFERENCES.findall(statement)}))
+            name = re.search(r'\bCONSTRAINT\s+"?(\w+)"?', statement, re.I)
+            kind = CONSTRAINT if re.search(r'\bFOREIGN\s+KEY\b', statement,
+                                           re.I) else OTHER
+            return DDLStatement(kind, statement, table,
+                                name.group(1) if name else None, references)
+
+        match = _DROP_TABLE.match(statement)
+        if match:
+            if if_exists and not match.group(1):
+                statement = re.sub(r'^(DROP\s+TABLE)\s+', r'\1 IF EXISTS ',
+                                   statement, count=1, flags=re.I)
+            table = "{}.{}".format(match.group(2), match.group(3))
+            return DDLStatement(DROP, statement, table, table)
+
+        return DDLStatement(OTHER, statement)
+
+    @property
+    def statements(self) -> list:
+        return list(self._statements)
+
+    @property
+    def tables(self) -> list:
+        return [s.table for s in self._statements if s.kind == TABLE]
+
+    @property
+    def constraints(self) -> list:
+        """Foreign key constraints, to be applied after all units."""
+        return [s for s in self._statements if s.kind == CONSTRAINT]
+
+    def units(self) -> dict:
+        """Returns {table: [statements]} for each created table.
+
+        A unit is the CREATE TABLE followed, in script order, by every
+        later statement on that table other than a foreign key.
+        """
+        units = {}
+        for statement in self._statements:
+            if statement.kind == TABLE:
+                units[statement.table] = [statement]
+            elif statement.kind != CONSTRAINT and statement.table in units:
+                units[statement.table].append(statement)
+        return units
+
+    def prologue(self) -> list:
+        """Statements not tied to a created table, run before the units.
+
+        These include statements on a created table that precede its
+        CREATE TABLE, such as DROP TABLE.
+        """
+        units = self.units()
+        attached = {id(s) for unit in units.values() for s in unit}
+        return [s for s in self._statements
+                if s.kind != CONSTRAINT and id(s) not in attached]
+
+    def waves(self) -> list:
+        """Groups units into lists of tables that can be built together.
+
+        Raises:
+            ValueError if inline REFERENCES form a cycle.
+        """
+        units = self.units()
+        pending = {table: {reference for statement in units[table]
+                           for reference in statement.references}
+                   & (set(units) - {table})
+                   for table in units}
+        waves = []
+        while pending:
+            ready = sorted(t for t, deps in pending.items() if not deps)
+            if not ready:
+                raise ValueError("Cyclic table references among {}."
+                                 .format(sorted(pending)))
+            waves.append(ready)
+            for table in ready:
+                del pending[table]
+            for deps in pending.values():
+                deps.difference_update(ready)
+        return waves
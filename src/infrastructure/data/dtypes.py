@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+# -*- coding:utf-8 -*-
+# =========================================================================== #
+# Project  : Drug Approval Analytics                                          #
+# Version  : 0.1.0                                                            #
+# File     : \src\infrastructure\data\dtypes.py                               #
+# Language : Python 3.9.5                                                     #
+# --------------------------------------------------------------------------  #
+# Author   : John James                                                       #
+# Company  : nov8.ai                                                          #
+# Email    : john.james@nov8.ai                                               #
+# URL      : https://github.com/john-james-sf/drug-approval-analytics         #
+# --------------------------------------------------------------------------  #
+# Created  : Monday, October 19th 2026, 7:38:15 am                            #
+# Modified : Monday, October 19th 2026, 7:38:15 am                            #
+# Modifier : John James (john.james@nov8.ai)                                  #
+# --------------------------------------------------------------------------- #
+# License  : BSD 3-clause "New" or "Revised" License                          #
+# Copyright: (c) 2021 nov8.ai                                                 #
+# =========================================================================== #
+"""Compact DataFrame dtypes chosen from catalog statistics.
+
+Frames built from cursor rows hold text as object columns and numbers as
+int64 or float64. compact_dtypes picks smaller dtypes for a table from
+each column's declared type and the planner's pg_stats estimates:
+
+    text          category when it has few distinct values, else object
+    smallint..    the narrowest signed integer holding the values, or the
+                  matching nullable integer when the column has nulls
+    real          float32
+    date, time-   datetime64, in UTC for timestamp with time zone
+    stamp
+    boolean       bool, or nullable boolean when the column has nulls
+
+Columns without statistics, before the table is first analyzed, fall back
+to the frame's own distinct and null counts. compact applies the choices,
+with caller overrides taking precedence.
+
+    stats = ColumnStats.from_rows(response.fetchall)
+    df = compact(df, compact_dtypes(stats), overrides={'phase': 'object'})
+
+"""
+from __future__ import annotations
+from dataclasses import dataclass
+import logging
+
+from ...utils.lazy import lazy_import
+# --------------------------------------------------------------------------- #
+logger = logging.getLogger(__name__)
+pd = lazy_import('pandas')
+# --------------------------------------------------------------------------- #
+# Text columns become categorical when the number of distinct values is at
+# most MAX_CATEGORIES and at most MAX_RATIO of the rows.
+MAX_CATEGORIES = 10000
+MAX_RATIO = 0.5
+
+TEXT = ('text', 'character varying', 'character', 'name')
+INTEGERS = {'smallint': 'Int16', 'integer': 'Int32', 'bigint': 'Int64'}
+DATETIMES = {'date': 'datetime64[ns]',
+             'timestamp without time zone': 'datetime64[ns]',
+             'timestamp with time zone': 'datetime64[ns, UTC]'}
+# Mark columns whose dtype is settled once the values are known.
+AUTO_CATEGORY = 'category:auto'
+AUTO_INTEGER = 'integer:auto'
+# --------------------------------------------------------------------------- #
+
+
+@dataclass
+class ColumnStats:
+    """Declared type and planner statistics of one column."""
+    name: str
+    data_type: str
+    n_distinct: float = None
+    null_frac: float = None
+    rows: float = None
+
+    @classmethod
+    def from_rows(cls, rows: list) -> dict:
+        """{column: ColumnStats} from TableSequel.column_stats rows."""
+        return {row[0]: cls(*row) for row in rows or []}
+
+    @property
+    def distinct(self) -> float:
+        """Estimated distinct values, or None without statistics.
+
+        pg_stats reports n_distinct as a count when positive and as minus
+        the fraction of rows when negative.
+        """
+        if self.n_distinct is None:
+            return None
+        if self.n_distinct >= 0:
+            return self.n_distinct
+        if not self.rows or self.rows < 0:
+            return None
+        return -self.n_distinct * self.rows
+
+
+def compact_dtypes(stats: dict, max_categories: int = MAX_CATEGORIES,
+                   max_ratio: float = MAX_RATIO) -> dict:
+    """Chooses a dtype for each column from its ColumnStats.
+
+    Integer columns without nulls map to AUTO_INTEGER, to be downcast to
+    the narrowest width holding their values. Text columns without
+    statistics map to AUTO_CATEGORY, to be decided from the values.
+    Columns kept as read are left out.
+    """
+    dtypes = {}
+    for column, stat in stats.items():
+        nullable = stat.null_frac is None or stat.null_frac > 0
+        if stat.data_type in TEXT:
+            distinct = stat.distinct
+            if distinct is None:
+                dtypes[column] = AUTO_CATEGORY
+            elif distinct <= max_categories and \
+                    (not stat.rows or stat.rows <= 0 or
+                     distinct <= max_ratio * stat.rows):
+                dtypes[column] = 'category'
+        elif stat.data_type in INTEGERS:
+            dtypes[column] = INTEGERS[stat.data_type] if nullable \
+                else AUTO_INTEGER
+        elif stat.data_type == 'real':
+            dtypes[column] = 'float32'
+        elif stat.data_type in DATETIMES:
+            dtypes[column] = DATETIMES[stat.data_type]
+        elif stat.data_type == 'boolean':
+            dtypes[column] = 'boolean' if nullable else 'bool'
+    return dtypes
+
+
+def _categorical(series: pd.Series, max_categories: int,
+                 max_ratio: float) -> bool:
+    distinct = series.nunique(dropna=True)
+    return distinct <= max_categories and distinct <= max_ratio * len(series)
+
+
+def compact(df: pd.DataFrame, dtypes: dict = None, overrides: dict = None,
+            max_categories: int = MAX_CATEGORIES,
+            max_ratio: float = MAX_RATIO) -> pd.DataFrame:
+    """Converts the columns of df to the chosen dtypes in place.
+
+    Arguments:
+        df (pd.DataFrame): Frame read from the table.
+        dtypes (dict): {column: dtype} from compact_dtypes.
+        overrides (dict): {column: dtype} taking precedence over dtypes. A
+            dtype of None keeps the column as read.
+        max_categories (int): Limit for text columns decided from values.
+        max_ratio (float): Limit for text columns decided from values.
+
+    Returns:
+        df, for chaining.
+    """
+    chosen = dict(dtypes or {})
+    chosen.update(overrides or {})
+    for column, dtype in chosen.items():
+        if dtype is None or column not in df.columns:
+            continue
+        series = df[column]
+        try:
+            if dtype == AUTO_CATEGORY:
+                if _categorical(series, max_categories, max_ratio):
+                    df[column] = series.astype('category')
+            elif dtype == AUTO_INTEGER:
+                if series.isna().any():
+                    df[column] = series.astype('Int64')
+                else:
+                    df[column] = pd.to_numeric(series, downcast='integer')
+            elif str(dtype).startswith('datetime64'):
+                df[column] = pd.to_datetime(series, utc='UTC' in str(dtype))
+            else:
+                df[column] = series.astype(dtype)
+        except (TypeError, ValueError) as error:
+            logger.warning("Kept %s as %s; conversion to %s failed: %s",
+                           column, series.dtype, dtype, error)
+    return df
+
+
+def memory(df: pd.DataFrame) -> int:
+    """Bytes held by df, including the contents of object columns."""
+    return int(df.memory_usage(index=True, deep=True).sum())
@@ -0,0 +1,273 @@
+#!/usr/bin/env python3
+# -*- coding:utf-8 -*-
+# =========================================================================== #
+# Project  : Drug Approval Analytics                                          #
+# Version  : 0.1.0                                                            #
+# File     : \src\infrastructure\data\explain.py                              #
+# Language : Python 3.9.5                                                     #
+# --------------------------------------------------------------------------  #
+# Author   : John James                                                       #
+# Company  : nov8.ai                                                          #
+# Email    : john.james@nov8.ai                                               #
+# URL      : https://github.com/john-james-sf/drug-approval-analytics         #
+# --------------------------------------------------------------------------  #
+# Created  : Monday, October 19th 2026, 2:20:44 am                            #
+# Modified : Monday, October 19th 2026, 2:20:44 am                            #
+# Modifier : John James (john.james@nov8.ai)                                  #
+# --------------------------------------------------------------------------- #
+# License  : BSD 3-clause "New" or "Revised" License                          #
+# Copyright: (c) 2021 nov8.ai                                                 #
+# =========================================================================== #
+"""Opt-in EXPLAIN capture for slow statements and a sequential scan report.
+
+When enabled, each SELECT whose latency exceeds threshold_ms is run once
+more under EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) and the plan is kept,
+keyed by the statement's shape: its rendered SQL with parameters and
+literals normalized away. Only the first slow execution of a shape is
+explained; later ones only bump its count.
+
+ANALYZE executes the statement again, so only reads are explained:
+statements with data modifying CTEs, row locks, SELECT INTO or functions
+with side effects such as nextval are skipped. Outside autocommit the
+plan is captured inside a savepoint that is always rolled back, so a
+failed EXPLAIN leaves the caller's transaction as it was.
+
+    explainer.enable(threshold_ms=200)
+    ...
+    print(explainer.render())
+
+"""
+from dataclasses import dataclass, field, asdict
+from datetime import datetime
+import hashlib
+import json
+import logging
+import re
+import threading
+
+from .sequel import Sequel
+from ...utils.lazy import lazy_import
+# --------------------------------------------------------------------------- #
+logger = logging.getLogger(__name__)
+sql = lazy_import('psycopg2.sql')
+# --------------------------------------------------------------------------- #
+EXPLAIN = "EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) "
+_LITERALS = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b|%s|%\(\w+\)s")
+_WHITESPACE = re.compile(r"\s+")
+_PREDICATE = re.compile(
+    r"\(?\b([a-z_][a-z0-9_]*)\)?(?:::[a-z ]+?)?\s+"
+    r"(=|<>|<=|>=|<|>|~~\*?|!~~\*?)\s", re.I)
+_RANGE_OPERATORS = ('<', '>', '<=', '>=')
+_QUOTED = re.compile(r"'(?:[^']|'')*'|\"(?:[^\"]|\"\")*\"")
+_WRITES = re.compile(
+    r"\b(INSERT|UPDATE|DELETE|MERGE|TRUNCATE|INTO|COPY|CALL)\b|"
+    r"\bFOR\s+(NO\s+KEY\s+UPDATE|KEY\s+SHARE|UPDATE|SHARE)\b", re.I)
+# Functions that change state when a SELECT calling them runs again.
+_SIDE_EFFECTS = re.compile(
+    r"\b(nextval|setval|pg_terminate_backend|pg_cancel_backend|"
+    r"pg_advisory_\w*|pg_try_advisory_\w*|pg_notify|set_config|dblink\w*|"
+    r"lo_\w+|pg_reload_conf|pg_rotate_logfile|pg_switch_wal|"
+    r"pg_create_\w+|pg_drop_\w+|pg_stat_reset\w*|pg_sleep\w*)\s*\(",
+    re.I)
+SAVEPOINT = "explain_capture"
+# --------------------------------------------------------------------------- #
+
+
+def normalize(statement: str) -> str:
+    """Replaces literals and placeholders with ? and collapses whitespace."""
+    text = _LITERALS.sub('?', statement)
+    return _WHITESPACE.sub(' ', text).strip().rstrip(';').strip()
+
+
+def explainable(statement: str) -> bool:
+    """True for a plain SELECT, or a WITH query of SELECTs, that neither
+    writes, locks rows nor calls a function with side effects."""
+    text = _QUOTED.sub("''", statement or '').strip()
+    head = text.split(None, 1)[0].upper() if text else ''
+    if head not in ('SELECT', 'WITH'):
+        return False
+    return not (_WRITES.search(text) or _SIDE_EFFECTS.search(text))
+
+
+def predicate_columns(condition: str) -> list:
+    """Columns compared in a plan Filter, equality comparisons first."""
+    equality, ranges = [], []
+    for column, operator in _PREDICATE.findall(condition or ''):
+        target = ranges if operator in _RANGE_OPERATORS else equality
+        if column not in equality and column not in ranges:
+            target.append(column)
+    return equality + ranges
+
+
+@dataclass
+class PlanRecord:
+    """A captured plan for one statement shape."""
+    shape: str
+    name: str
+    statement: str
+    duration_ms: float
+    plan: list
+    captured: str
+    occurrences: int = field(default=1)
+
+
+class Explainer:
+    """Captures plans for slow SELECT statements keyed by shape.
+
+    Arguments:
+        threshold_ms (float): Statements at least this slow are explained.
+            Defaults to 500.
+    """
+
+    def __init__(self, threshold_ms: float = 500.0) -> None:
+        self.enabled = False
+        self.threshold_ms = threshold_ms
+        self._plans = {}
+        self._lock = threading.Lock()
+
+    def enable(self, threshold_ms: float = None) -> None:
+        if threshold_ms is not None:
+            self.threshold_ms = threshold_ms
+        self.enabled = True
+
+    def disable(self) -> None:
+        self.enabled = False
+
+    def clear(self) -> None:
+        with self._lock:
+            self._plans.clear()
+
+    @property
+    def plans(self) -> dict:
+        """Captured PlanRecords keyed by shape hash."""
+        return dict(self._plans)
+
+    def observe(self, sequel: Sequel, seconds: float, connection) -> None:
+        """Explains sequel if capture is enabled and it ran slowly."""
+        if not self.enabled or seconds * 1000 < self.threshold_ms:
+            return
+        try:
+            self._capture(sequel, seconds, connection)
+        except Exception as error:
+            logger.warning("Could not explain %s: %s", sequel.name, error)
+
+    def _capture(self, sequel: Sequel, seconds: float, connection) -> None:
+        if sequel.cmd is None:
+            return
+        cursor = connection.cursor()
+        try:
+            if isinstance(sequel.cmd, str):
+                statement, command = sequel.cmd, EXPLAIN + sequel.cmd
+            else:
+                statement = sequel.cmd.as_string(cursor)
+                command = sql.SQL(EXPLAIN) + sequel.cmd
+            if not explainable(statement):
+                return
+            text = normalize(statement)
+            shape = hashlib.sha1(text.encode('utf-8')).hexdigest()[:16]
+            with self._lock:
+                record = self._plans.get(shape)
+                if record is not None:
+                    record.occurrences += 1
+                    return
+            plan = self._explain(cursor, command, sequel.params, connection)
+        finally:
+            cursor.close()
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        with self._lock:
+            self._plans.setdefault(shape, PlanRecord(
+                shape=shape, name=sequel.name, statement=text,
+                duration_ms=round(seconds * 1000, 3), plan=plan,
+                captured=datetime.now().isoformat()))
+        logger.info("Captured plan for %s (%.1fms).", sequel.name,
+                    seconds * 1000)
+
+    @staticmethod
+    def _explain(cursor, command, params, connection):
+        """Runs the EXPLAIN, inside a savepoint when in a transaction."""
+        raw = getattr(connection, '_connection', connection)
+        if getattr(raw, 'autocommit', True):
+            cursor.execute(command, params)
+            return cursor.fetchone()[0]
+        cursor.execute("SAVEPOINT " + SAVEPOINT)
+        try:
+            cursor.execute(command, params)
+            return cursor.fetchone()[0]
+        finally:
+            cursor.execute("ROLLBACK TO SAVEPOINT " + SAVEPOINT)
+            cursor.execute("RELEASE SAVEPOINT " + SAVEPOINT)
+
+    def report(self, min_rows: int = 10000) -> list:
+        """Flags sequential scans reading at least min_rows rows.
+
+        Returns:
+            A list of dicts with shape, statement, relation, rows scanned,
+            filter and a suggested CREATE INDEX, largest scans first.
+        """
+        findings = []
+        for record in self.plans.values():
+            for node in _nodes(record.plan):
+                if node.get('Node Type') != 'Seq Scan':
+                    continue
+                loops = node.get('Actual Loops', 1) or 1
+                scanned = (node.get('Actual Rows', 0) +
+                           node.get('Rows Removed by Filter', 0)) * loops
+                if scanned < min_rows:
+                    continue
+                relation = node.get('Relation Name')
+                schema = node.get('Schema')
+                qualified = "{}.{}".format(schema, relation) if schema \
+                    else relation
+                columns = predicate_columns(node.get('Filter'))
+                suggestion = "CREATE INDEX ON {} ({});".format(
+                    qualified, ", ".join(columns)) if columns else None
+                findings.append({'shape': record.shape,
+                                 'name': record.name,
+                                 'statement': record.statement,
+                                 'relation': qualified,
+                                 'rows_scanned': scanned,
+                                 'filter': node.get('Filter'),
+                                 'duration_ms': record.duration_ms,
+                                 'occurrences': record.occurrences,
+                                 'suggestion': suggestion})
+        return sorted(findings, key=lambda f: f['rows_scanned'],
+                      reverse=True)
+
+    def render(self, min_rows: int = 10000) -> str:
+        """Formats report() as text."""
+        lines = []
+        for finding in self.report(min_rows):
+            lines.append("Seq Scan on {relation}: {rows_scanned} rows, "
+                         "{duration_ms}ms x{occurrences} [{name}]"
+                         .format(**finding))
+            lines.append("  {}".format(finding['statement']))
+            if finding['suggestion']:
+                lines.append("  suggest: {}".format(finding['suggestion']))
+        return "\n".join(lines)
+
+    def save(self, filepath: str) -> None:
+        """Writes the captured plans to a JSON file."""
+        with open(filepath, 'w') as f:
+            json.dump([asdict(r) for r in self.plans.values()], f, indent=2)
+
+    def load(self, filepath: str) -> None:
+        """Adds plans from a JSON file written by save."""
+        with open(filepath) as f:
+            records = [PlanRecord(**r) for r in json.load(f)]
+        with self._lock:
+            for record in records:
+                self._plans.setdefault(record.shape, record)
+
+
+def _nodes(plan):
+    """Yields every node of an EXPLAIN FORMAT JSON plan."""
+    stack = [entry['Plan'] for entry in plan if 'Plan' in entry] \
+        if isinstance(plan, list) else [plan.get('Plan', plan)]
+    while stack:
+        node = stack.pop()
+        yield node
+        stack.extend(node.get('Plans', []))
+
+
+explainer = Explainer()
@@ -0,0 +1,343 @@
+#!/usr/bin/env python3
+# -*- coding:utf-8 -*-
+# =========================================================================== #
+# Project  : Drug Approval Analytics                                          #
+# Version  : 0.1.0                                                            #
+# File     : \src\infrastructure\data\indexing.py                             #
+# Language : Python 3.9.5                                                     #
+# --------------------------------------------------------------------------  #
+# Author   : John James                                                       #
+# Company  : nov8.ai                                                          #
+# Email    : john.james@nov8.ai                                               #
+# URL      : https://github.com/john-james-sf/drug-approval-analytics         #
+# --------------------------------------------------------------------------  #
+# Created  : Monday, October 19th 2026, 3:14:02 am                            #
+# Modified : Monday, October 19th 2026, 3:14:02 am                            #
+# Modifier : John James (john.james@nov8.ai)                                  #
+# --------------------------------------------------------------------------- #
+# License  : BSD 3-clause "New" or "Revised" License                          #
+# Copyright: (c) 2021 nov8.ai                                                 #
+# =========================================================================== #
+"""Index advisor and concurrent index builder.
+
+IndexAdvisor proposes indexes from three sources: WHERE predicates of the
+statements retained by the query log, sequential scans flagged by the
+EXPLAIN report, and join keys (nct_id by default) on tables that are read
+mostly by sequential scan according to pg_stat_user_tables. Proposals
+already covered by the leading columns of a valid index are dropped.
+
+IndexBuilder creates the proposed indexes with CREATE INDEX CONCURRENTLY,
+several at a time on dedicated connections, and times representative
+lookups before and after.
+
+    advisor = IndexAdvisor(connection)
+    proposals = advisor.propose()
+    results = IndexBuilder(credentials).build(proposals)
+
+"""
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+import logging
+import re
+import statistics
+import time
+
+from .config import DBCredentials
+from .connect import Connection, DirectConnection
+from .database import Database
+from .ddl.parser import index_name
+from .explain import explainer as default_explainer
+from .querylog import querylog as default_querylog
+from .sequel import IndexSequel, Sequel
+# --------------------------------------------------------------------------- #
+logger = logging.getLogger(__name__)
+# --------------------------------------------------------------------------- #
+_FROM = re.compile(r'\bFROM\s+"?(\w+)"?\s*\.\s*"?(\w+)"?', re.I)
+_WHERE = re.compile(r'\bWHERE\b(.*?)(?:\bGROUP\s+BY\b|\bORDER\s+BY\b|'
+                    r'\bLIMIT\b|\bOFFSET\b|;|$)', re.I | re.S)
+_PREDICATE = re.compile(
+    r'"?(\w+)"?\s*(=\s*ANY\b|=|<>|<=|>=|<|>|\bIN\b|\bLIKE\b|\bBETWEEN\b)',
+    re.I)
+_RANGE = ('<', '>', '<=', '>=', 'BETWEEN')
+_MAX_SAMPLES = 3
+# --------------------------------------------------------------------------- #
+
+
+def statement_predicates(statement: str) -> tuple:
+    """Parses (schema, table, columns) from a rendered single-table SELECT.
+
+    Columns compared for equality come before range comparisons; columns
+    compared only with <> or LIKE are ignored. Returns None when the
+    statement has no schema qualified FROM or no WHERE clause.
+    """
+    source = _FROM.search(statement)
+    where = _WHERE.search(statement)
+    if not source or not where:
+        return None
+    equality, ranges = [], []
+    for column, operator in _PREDICATE.findall(where.group(1)):
+        operator = ' '.join(operator.upper().split())
+        if operator in ('<>', 'LIKE') or column.upper() in ('AND', 'OR'):
+            continue
+        target = ranges if operator in _RANGE else equality
+        if column not in equality and column not in ranges:
+            target.append(column)
+    columns = equality + ranges
+    if not columns:
+        return None
+    return source.group(1), source.group(2), tuple(columns)
+
+
+@dataclass
+class IndexProposal:
+    """A proposed index and the evidence for it."""
+    schema: str
+    table: str
+    columns: tuple
+    reason: str
+    seq_scan: int = field(default=0)
+    seq_tup_read: int = field(default=0)
+    n_live_tup: int = field(default=0)
+    samples: list = field(default_factory=list)
+
+    @property
+    def name(self) -> str:
+        return index_name(self.table, self.columns)
+
+
+class IndexAdvisor:
+    """Proposes indexes for the given schemas.
+
+    Arguments:
+        connection (Connection): Connection to the database.
+        schemas (tuple): Schemas to consider.
+        join_keys (tuple): Columns joined on across tables, indexed on
+            every table containing them that is mostly sequentially scanned.
+        min_rows (int): Tables with fewer live rows are not indexed.
+    """
+
+    def __init__(self, connection: Connection,
+                 schemas: tuple = ('metabase', 'ctgov'),
+                 join_keys: tuple = ('nct_id',), min_rows: int = 1000,
+                 querylog=default_querylog,
+                 explainer=default_explainer) -> None:
+        self._connection = connection
+        self._schemas = list(schemas)
+        self._join_keys = join_keys
+        self._min_rows = min_rows
+        self._querylog = querylog
+        self._explainer = explainer
+        self._database = Database()
+        self._sequel = IndexSequel()
+
+    def table_stats(self) -> dict:
+        """Returns {(schema, table): (seq_scan, seq_tup_read, idx_scan,
+        n_live_tup)} from pg_stat_user_tables."""
+        sequel = self._sequel.table_stats(self._schemas)
+        rows = self._database.execute(sequel, self._connection).fetchall
+        return {(r[0], r[1]): tuple(r[2:]) for r in rows or []}
+
+    def indexes(self) -> dict:
+        """Returns {(schema, table): [column tuples of valid indexes]}."""
+        sequel = self._sequel.indexes(self._schemas)
+        rows = self._database.execute(sequel, self._connection).fetchall
+        indexes = {}
+        for schema, table, _, columns in rows or []:
+            indexes.setdefault((schema, table), []).append(tuple(columns))
+        return indexes
+
+    def propose(self) -> list:
+        """Returns IndexProposals ordered by rows read sequentially."""
+        stats = self.table_stats()
+        indexes = self.indexes()
+        candidates = {}
+
+        def add(schema, table, columns, reason, sample=None):
+            if schema not in self._schemas:
+                return
+            key = (schema, table, tuple(columns))
+            proposal = candidates.get(key)
+            if proposal is None:
+                proposal = candidates[key] = IndexProposal(
+                    schema=schema, table=table, columns=tuple(columns),
+                    reason=reason)
+            elif reason not in proposal.reason:
+                proposal.reason += ", " + reason
+            if sample is not None and len(proposal.samples) < _MAX_SAMPLES:
+                proposal.samples.append(sample)
+
+        for sample, statement in self._logged_statements():
+            parsed = statement_predicates(statement)
+            if parsed:
+                add(*parsed, reason='query log', sample=sample)
+
+        for finding in self._explainer.report(min_rows=self._min_rows):
+            suggestion = finding['suggestion']
+            if suggestion and '.' in finding['relation']:
+                schema, table = finding['relation'].split('.', 1)
+                columns = suggestion[suggestion.index('(') + 1:
+                                     suggestion.rindex(')')].split(', ')
+                add(schema, table, columns, reason='seq scan plan')
+
+        for key in self._join_keys:
+            sequel = self._sequel.tables_with_column(self._schemas, key)
+            rows = self._database.execute(sequel, self._connection).fetchall
+            for schema, table in rows or []:
+                seq_scan, _, idx_scan, _ = stats.get((schema, table),
+                                                     (0, 0, 0, 0))
+                if seq_scan > idx_scan:
+                    add(schema, table, (key,), reason='join key')
+
+        proposals = []
+        for (schema, table, columns), proposal in candidates.items():
+            existing = indexes.get((schema, table), [])
+            if any(index[:len(columns)] == columns for index in existing):
+                continue
+            seq_scan, seq_tup_read, _, n_live_tup = stats.get(
+                (schema, table), (0, 0, 0, 0))
+            if n_live_tup < self._min_rows:
+                continue
+            proposal.seq_scan = seq_scan
+            proposal.seq_tup_read = seq_tup_read
+            proposal.n_live_tup = n_live_tup
+            proposals.append(proposal)
+        return sorted(proposals, key=lambda p: p.seq_tup_read, reverse=True)
+
+    def _logged_statements(self):
+        """Yields (sample, rendered SELECT) for query log entries. The
+        sample is a Sequel that can be timed, for statements logged
+        without parameters, otherwise None."""
+        seen = set()
+        for fields in self._querylog.recent:
+            statement = fields.get('sql')
+            if not statement or statement in seen:
+                continue
+            seen.add(statement)
+            if statement[:6].upper() != 'SELECT':
+                continue
+            sample = None
+            if not fields.get('parameterized'):
+                sample = Sequel(name=fields['statement'],
+                                description="Logged sample of {}".format(
+                                    fields['statement']),
+                                query_context='access', object_type='table',
+                                object_name=fields['object'],
+                                cmd=statement, params=None)
+            yield sample, statement
+
+
+class IndexBuilder:
+    """Creates proposed indexes concurrently and measures their effect.
+
+    Arguments:
+        credentials (DBCredentials): Credentials for the target database.
+            Each worker opens its own DirectConnection.
+        workers (int): Indexes built at once. Defaults to 4.
+        repeats (int): Timed runs per representative query. Defaults to 3.
+    """
+
+    def __init__(self, credentials: DBCredentials, workers: int = 4,
+                 repeats: int = 3) -> None:
+        self._credentials = credentials
+        self._workers = workers
+        self._repeats = repeats
+        self._database = Database()
+        self._sequel = IndexSequel()
+
+    def build(self, proposals: list, timings: bool = True) -> list:
+        """Builds the proposals and returns one result dict per index."""
+        if not proposals:
+            return []
+        probes = {}
+        before = {}
+        if timings:
+            with DirectConnection(self._credentials) as connection:
+                for proposal in proposals:
+                    probes[proposal.name] = self._probes(proposal,
+                                                         connection)
+                    before[proposal.name] = self._time(
+                        probes[proposal.name], connection)
+
+        with ThreadPoolExecutor(max_workers=self._workers) as executor:
+            results = list(executor.map(self._create, proposals))
+
+        if timings:
+            with DirectConnection(self._credentials) as connection:
+                for result in results:
+                    name = result['index']
+                    result['before_ms'] = before.get(name)
+                    result['after_ms'] = self._time(probes.get(name, []),
+                                                    connection) \
+                        if result['created'] else None
+        for result in results:
+            logger.info("Index %s on %s.%s: created=%s in %.1fs, "
+                        "query %s ms -> %s ms", result['index'],
+                        result['schema'], result['table'], result['created'],
+                        result['seconds'], result.get('before_ms'),
+                        result.get('after_ms'))
+        return results
+
+    def _create(self, proposal: IndexProposal) -> dict:
+        result = {'index': proposal.name, 'schema': proposal.schema,
+                  'table': proposal.table, 'columns': proposal.columns,
+                  'reason': proposal.reason, 'created': False,
+                  'seconds': 0.0, 'error': None}
+        start = time.perf_counter()
+        with DirectConnection(self._credentials) as connection:
+            try:
+                # IF NOT EXISTS would keep an INVALID index left by an
+                # earlier failed build, so it is dropped and rebuilt.
+                sequel = self._sequel.validity(proposal.name,
+                                               proposal.schema)
+                rows = self._database.execute(sequel, connection).fetchall
+                if rows and rows[0][0]:
+                    result['seconds'] = time.perf_counter() - start
+                    return result
+                if rows:
+                    logger.info("Rebuilding invalid index %s.",
+                                proposal.name)
+                    self._database.execute(
+                        self._sequel.delete(proposal.name, proposal.schema),
+                        connection)
+                sequel = self._sequel.create(proposal.name, proposal.schema,
+                                             proposal.table,
+                                             list(proposal.columns))
+                self._database.execute(sequel, connection)
+                result['created'] = True
+            except Exception as error:
+                # A failed concurrent build leaves an INVALID index behind.
+                result['error'] = str(error)
+                sequel = self._sequel.delete(proposal.name, proposal.schema)
+                try:
+                    self._database.execute(sequel, connection)
+                except Exception:
+                    logger.warning("Could not drop invalid index %s.",
+                                   proposal.name)
+        result['seconds'] = time.perf_counter() - start
+        return result
+
+    def _probes(self, proposal: IndexProposal, connection) -> list:
+        """Logged sample statements, or an equality lookup on a sample."""
+        if proposal.samples:
+            return list(proposal.samples)
+        sequel = self._sequel.probe(proposal.schema, proposal.table,
+                                    list(proposal.columns))
+        rows = self._database.execute(sequel, connection).fetchall
+        if not rows:
+            return []
+        return [self._sequel.probe(proposal.schema, proposal.table,
+                                   list(proposal.columns), rows[0])]
+
+    def _time(self, probes: list, connection) -> float:
+        """Median milliseconds over repeats of each probe, summed."""
+        if not probes:
+            return None
+        total = 0.0
+        for sequel in probes:
+            runs = []
+            for _ in range(self._repeats):
+                start = time.perf_counter()
+                self._database.execute(sequel, connection)
+                runs.append((time.perf_counter() - start) * 1000)
+            total += statistics.median(runs)
+        return round(total, 3)
@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+# -*- coding:utf-8 -*-
+# =========================================================================== #
+# Project  : Drug Approval Analytics                                          #
+# Version  : 0.1.0                                                            #
+# File     : \src\infrastructure\data\querylog.py                             #
+# Language : Python 3.9.5                                                     #
+# --------------------------------------------------------------------------  #
+# Author   : John James                                                       #
+# Company  : nov8.ai                                                          #
+# Email    : john.james@nov8.ai                                               #
+# URL      : https://github.com/john-james-sf/drug-approval-analytics         #
+# --------------------------------------------------------------------------  #
+# Created  : Monday, October 19th 2026, 12:48:13 am                           #
+# Modified : Monday, October 19th 2026, 12:48:13 am                           #
+# Modifier : John James (john.james@nov8.ai)                                  #
+# --------------------------------------------------------------------------- #
+# License  : BSD 3-clause "New" or "Revised" License                          #
+# Copyright: (c) 2021 nov8.ai                                                 #
+# =========================================================================== #
+"""Sampled, rate limited, structured log of executed statements.
+
+Each executed Sequel is offered to the query log with its duration,
+rowcount and connection. Statements slower than slow_ms are always emitted
+at INFO. Others are emitted at DEBUG for a random sample_rate fraction,
+subject to a token bucket of rate_limit records per second. Nothing is
+formatted unless a record is emitted; the structured fields are attached
+to the record as record.query for handlers and formatters to consume.
+
+Selected statements, slow or sampled, are also retained in a bounded
+history, recent, which the index advisor reads, whether or not a record is
+emitted. Only the fields and the statement's shape, its SQL with
+placeholders in place of parameters, are kept; never the parameters. With
+history=0 ordinary statements are only sampled while DEBUG is enabled.
+
+"""
+from collections import deque
+import logging
+import random
+import re
+import threading
+import time
+# --------------------------------------------------------------------------- #
+logger = logging.getLogger(__name__)
+# --------------------------------------------------------------------------- #
+_WHITESPACE = re.compile(r"\s+")
+# --------------------------------------------------------------------------- #
+
+
+def connection_id(connection) -> int:
+    """Returns the backend pid of a Connection or psycopg2 connection."""
+    raw = getattr(connection, '_connection', connection)
+    try:
+        return raw.info.backend_pid
+    except AttributeError:
+        return id(raw)
+
+
+def shape(sequel, connection=None) -> str:
+    """The SQL of sequel with placeholders unfilled and whitespace
+    collapsed, or None if it cannot be rendered."""
+    cmd = sequel.cmd
+    if cmd is None:
+        return None
+    if not isinstance(cmd, str):
+        try:
+            cmd = cmd.as_string(getattr(connection, '_connection',
+                                        connection))
+        except Exception:
+            return None
+    return _WHITESPACE.sub(' ', cmd).strip()
+
+
+class QueryLog:
+    """Structured statement log with sampling and rate limiting.
+
+    Arguments:
+        sample_rate (float): Fraction of ordinary statements emitted.
+            Defaults to 0.01.
+        rate_limit (float): Max ordinary records emitted per second.
+            Defaults to 50.
+        slow_ms (float): Statements at least this slow are always emitted
+            at INFO. Defaults to 1000.
+        history (int): Number of selected statements retained in recent,
+            emitted or not. Defaults to 1000.
+    """
+
+    def __init__(self, sample_rate: float = 0.01, rate_limit: float = 50,
+                 slow_ms: float = 1000.0, history: int = 1000) -> None:
+        self.configure(sample_rate, rate_limit, slow_ms)
+        self._lock = threading.Lock()
+        self._suppressed = 0
+        self._recent = deque(maxlen=history)
+
+    def configure(self, sample_rate: float = None, rate_limit: float = None,
+                  slow_ms: float = None) -> None:
+        """Updates the sampling parameters in place."""
+        if sample_rate is not None:
+            self.sample_rate = sample_rate
+        if rate_limit is not None:
+            self.rate_limit = rate_limit
+            self._tokens = rate_limit
+            self._stamp = time.monotonic()
+        if slow_ms is not None:
+            self.slow_ms = slow_ms
+
+    @property
+    def recent(self) -> list:
+        """Fields of the most recently selected statements, oldest first,
+        each with 'sql', the statement's shape, and 'parameterized'."""
+        return list(self._recent)
+
+    @property
+    def suppressed(self) -> int:
+        """Count of sampled records dropped by the rate limiter."""
+        return self._suppressed
+
+    def record(self, sequel, duration: float, rowcount: int = None,
+               connection=None) -> None:
+        """Offers an executed statement to the log.
+
+        Arguments:
+            sequel (Sequel): The executed statement.
+            duration (float): Elapsed seconds.
+            rowcount (int): Rows returned or affected, if known.
+            connection (Connection): The connection it ran on.
+        """
+        # Select first: the shape and description are only rendered for
+        # statements that are kept or emitted.
+        ms = duration * 1000
+        if ms >= self.slow_ms:
+            level = logging.INFO
+        elif (self._recent.maxlen or logger.isEnabledFor(logging.DEBUG)) \
+                and random.random() < self.sample_rate and self._acquire():
+            level = logging.DEBUG
+        else:
+            return
+
+        fields = {'statement': sequel.name,
+                  'object': sequel.object_name,
+                  'duration_ms': round(ms, 3),
+                  'rowcount': rowcount,
+                  'connection_id': connection_id(connection)
+                  if connection is not None else None}
+        if self._recent.maxlen:
+            self._recent.append(dict(
+                fields, sql=shape(sequel, connection),
+                parameterized=bool(sequel.params)))
+        if not logger.isEnabledFor(level):
+            return
+        logger.log(level, "%s %s %.1fms rows=%s conn=%s: %s",
+                   fields['statement'], fields['object'], ms, rowcount,
+                   fields['connection_id'], sequel.description,
+                   extra={'query': fields})
+
+    def _acquire(self) -> bool:
+        """Takes a token from the bucket, refilled at rate_limit per sec."""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.rate_limit, self._tokens +
+                               (now - self._stamp) * self.rate_limit)
+            self._stamp = now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return True
+            self._suppressed += 1
+            return False
+
+
+querylog = QueryLog()
@@ -0,0 +1,411 @@
+#!/usr/bin/env python3
+# -*- coding:utf-8 -*-
+# =========================================================================== #
+# Project  : Drug Approval Analytics                                          #
+# Version  : 0.1.0                                                            #
+# File     : \src\infrastructure\data\refresh.py                              #
+# Language : Python 3.9.5                                                     #
+# --------------------------------------------------------------------------  #
+# Author   : John James                                                       #
+# Company  : nov8.ai                                                          #
+# Email    : john.james@nov8.ai                                               #
+# URL      : https://github.com/john-james-sf/drug-approval-analytics         #
+# --------------------------------------------------------------------------  #
+# Created  : Monday, October 19th 2026, 6:12:07 am                            #
+# Modified : Monday, October 19th 2026, 6:12:07 am                            #
+# Modifier : John James (john.james@nov8.ai)                                  #
+# --------------------------------------------------------------------------- #
+# License  : BSD 3-clause "New" or "Revised" License                          #
+# Copyright: (c) 2021 nov8.ai                                                 #
+# =========================================================================== #
+"""Blue/green refresh of a schema from a pg_dump archive.
+
+A new AACT snapshot is loaded into a staging schema next to the live one,
+so readers keep querying the live schema, untouched and unlocked, for the
+whole load. pg_restore renders the archive as SQL without connecting and
+the script is requalified to the staging schema in memory:
+
+    1. pre-data: tables, sequences, functions and types, in one script.
+    2. data: one COPY stream per table, spread over parallel connections.
+    3. post-data: each table's primary key and indexes, then ANALYZE, in
+       parallel; triggers and foreign keys last.
+
+The swap renames the live schema aside and the staging schema into its
+place inside one transaction. Renames only touch the catalog, so readers
+see either the old tables or the new ones, never a half loaded table. A
+lock timeout keeps the swap from queueing behind long running queries and
+blocking everyone behind it; the swap is retried instead. The previous
+schema is then dropped, or kept for revert().
+
+    refresh = SchemaRefresh(credentials, schema='ctgov', workers=8)
+    result = refresh.refresh('data/external/aact/postgres_data.dmp')
+    refresh.record(connection, 'aact', result)
+
+"""
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+import io
+import logging
+import re
+import time
+import uuid
+
+from .access import PGDao
+from .backup import PGBackup
+from .catalog import catalog
+from .config import DBCredentials
+from .connect import Connection, DirectConnection
+from .database import Database
+from .ddl.parser import DDLGraph, requalify, CONSTRAINT, OTHER
+from .sequel import SchemaSequel, TableSequel
+from ...utils.logger import exception_handler
+from ...utils.lazy import lazy_import
+# --------------------------------------------------------------------------- #
+logger = logging.getLogger(__name__)
+pd = lazy_import('pandas')
+# --------------------------------------------------------------------------- #
+PREFIX = 'refresh:'
+EVENT = 'schema_swap'
+LOCK_NOT_AVAILABLE = '55P03'
+# Table of contents line: id; tableoid oid description schema name owner
+_ENTRY = re.compile(
+    r'^\d+;\s+\d+\s+\d+\s+(TABLE DATA|SEQUENCE SET|SEQUENCE OWNED BY|'
+    r'FK CONSTRAINT|DEFAULT ACL|MATERIALIZED VIEW DATA|MATERIALIZED VIEW|'
+    r'INDEX ATTACH|[A-Z]+)\s+(\S+)\s+(.*?)\s+(\S+)$')
+_COPY = re.compile(r'^COPY\s+"?(\w+)"?\s*\.\s*"?(\w+)"?\s*\((.*)\)\s+'
+                   r'FROM\s+stdin;', re.I)
+_SESSION = re.compile(r'^(SET\s|SELECT\s+pg_catalog\.set_config)', re.I)
+# --------------------------------------------------------------------------- #
+
+
+def requalify_script(text: str, source: str, schema: str) -> str:
+    """Requalifies a pg_restore script from source to schema, including the
+    quoted names in nextval('schema.seq'::regclass) and setval calls."""
+    text = requalify(text, source, schema)
+    return re.sub(r"'(\"?){}\1\.".format(re.escape(source)),
+                  lambda m: "'{0}{1}{0}.".format(m.group(1), schema), text)
+
+
+class CopyStream(io.RawIOBase):
+    """File-like view of one COPY block of a pg_restore script.
+
+    Reads the lines following a COPY header up to the end of data marker,
+    so that the rest of the script is never sent to the server.
+
+    Arguments:
+        lines (iterator): Binary script lines after the COPY header.
+    """
+
+    def __init__(self, lines) -> None:
+        self._lines = lines
+        self._buffer = bytearray()
+        self._done = False
+        self.rows = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def read(self, size: int = -1) -> bytes:
+        while not self._done and (size < 0 or len(self._buffer) < size):
+            line = next(self._lines, None)
+            if line is None or line.rstrip(b'\r\n') == b'\\.':
+                self._done = True
+                break
+            self._buffer += line
+            self.rows += 1
+        if size < 0 or size >= len(self._buffer):
+            data, self._buffer = bytes(self._buffer), bytearray()
+        else:
+            data = bytes(self._buffer[:size])
+            del self._buffer[:size]
+        return data
+
+    def readline(self, size: int = -1) -> bytes:
+        if not self._buffer and not self._done:
+            self.read(1)
+        end = self._buffer.find(b'\n')
+        end = len(self._buffer) if end == -1 else end + 1
+        return self.read(end if size < 0 else min(size, end))
+
+
+@dataclass
+class RefreshResult:
+    """Outcome of a refresh."""
+    schema: str
+    archive: str
+    tables: int
+    rows: int
+    seconds: float
+    token: str
+
+
+class SchemaRefresh:
+    """Loads pg_dump archives into a staging schema and swaps it live.
+
+    Arguments:
+        credentials (DBCredentials): Credentials for the target database,
+            of a user able to create and rename schemas.
+        schema (str): The live schema, which must also be the schema of the
+            archive. Defaults to 'ctgov'.
+        workers (int): Concurrent connections for loading and indexing.
+            Defaults to 4.
+        lock_timeout (int): Milliseconds the swap waits for readers to
+            release the live schema before retrying. Defaults to 5000.
+        attempts (int): Swap attempts. Defaults to 5.
+        keep_previous (bool): Keep the replaced schema for revert().
+        bindir (str): Directory holding pg_restore. Defaults to the PATH.
+    """
+
+    def __init__(self, credentials: DBCredentials, schema: str = 'ctgov',
+                 workers: int = 4, lock_timeout: int = 5000,
+                 attempts: int = 5, keep_previous: bool = False,
+                 bindir: str = None) -> None:
+        self._credentials = credentials
+        self._schema = schema
+        self._staging = schema + '_staging'
+        self._previous = schema + '_previous'
+        self._workers = max(1, int(workers))
+        self._lock_timeout = lock_timeout
+        self._attempts = max(1, int(attempts))
+        self._keep_previous = keep_previous
+        self._backup = PGBackup(credentials, bindir=bindir)
+        self._database = Database()
+        self._schema_sequel = SchemaSequel()
+        self._table_sequel = TableSequel()
+
+    @property
+    def staging(self) -> str:
+        return self._staging
+
+    @property
+    def previous(self) -> str:
+        return self._previous
+
+    @exception_handler()
+    def refresh(self, archive: str) -> RefreshResult:
+        """Loads archive into the staging schema and swaps it live."""
+        start = time.perf_counter()
+        entries = self.entries(archive)
+        self.prepare()
+        self.load_schema(archive, entries)
+        rows = self.load_data(archive, entries)
+        tables = self.build_indexes(archive, entries)
+        token = self.swap()
+        result = RefreshResult(schema=self._schema, archive=archive,
+                               tables=tables, rows=rows,
+                               seconds=time.perf_counter() - start,
+                               token=token)
+        logger.info("Refreshed %s from %s: %d tables, %d rows in %.1fs.",
+                    self._schema, archive, tables, rows, result.seconds)
+        return result
+
+    def entries(self, archive: str) -> list:
+        """Table of contents entries of archive in the live schema."""
+        entries = []
+        for line in self._backup.contents(archive):
+            match = _ENTRY.match(line)
+            if match and match.group(2) == self._schema:
+                entries.append(line)
+        if not entries:
+            raise ValueError("{} has no objects in schema {}.".format(
+                archive, self._schema))
+        return entries
+
+    def prepare(self) -> None:
+        """Creates an empty staging schema, dropping leftovers of an
+        earlier failed refresh."""
+        with DirectConnection(self._credentials) as connection:
+            self._database.delete_schema(self._staging, connection,
+                                         cascade=True)
+            self._database.create_schema(self._staging, connection)
+
+    def load_schema(self, archive: str, entries: list) -> None:
+        """Creates the archive's tables, sequences, functions and types in
+        the staging schema."""
+        with self._backup.script(archive, 'pre-data', entries) as stream:
+            text = stream.read().decode()
+        text = requalify_script(text, self._schema, self._staging)
+        sequel = self._table_sequel.statement('pre-data', self._staging,
+                                              text)
+        with DirectConnection(self._credentials) as connection:
+            self._database.execute(sequel, connection)
+
+    def load_data(self, archive: str, entries: list) -> int:
+        """Copies each table's rows into the staging schema over parallel
+        connections, then sets the sequences. Returns rows copied."""
+        data = [e for e in entries if _ENTRY.match(e).group(1) ==
+                'TABLE DATA']
+        sequences = [e for e in entries if _ENTRY.match(e).group(1) ==
+                     'SEQUENCE SET']
+
+        def copy(entry):
+            return self._copy(archive, entry)
+
+        with ThreadPoolExecutor(max_workers=self._workers) as executor:
+            rows = sum(executor.map(copy, data))
+
+        if sequences:
+            with self._backup.script(archive, entries=sequences) as stream:
+                text = stream.read().decode()
+            text = requalify_script(text, self._schema, self._staging)
+            sequel = self._table_sequel.statement('sequence', self._staging,
+                                                  text)
+            with DirectConnection(self._credentials) as connection:
+                self._database.execute(sequel, connection)
+        return rows
+
+    def _copy(self, archive: str, entry: str) -> int:
+        with self._backup.script(archive, entries=[entry]) as stream:
+            lines = iter(stream)
+            for line in lines:
+                match = _COPY.match(line.decode())
+                if match:
+                    break
+            else:
+                return 0
+            columns = [c.strip().strip('"')
+                       for c in match.group(3).split(',')]
+            sequel = self._table_sequel.copy_from(match.group(2),
+                                                  self._staging, columns)
+            with DirectConnection(self._credentials) as connection:
+                rows = self._database.copy_from(sequel, CopyStream(lines),
+                                                connection)
+        logger.debug("Copied %d rows into %s.%s.", rows, self._staging,
+                     match.group(2))
+        return rows
+
+    def build_indexes(self, archive: str, entries: list) -> int:
+        """Adds primary keys and indexes, then ANALYZE, table by table over
+        parallel connections; then triggers and foreign keys. Returns the
+        number of tables analyzed."""
+        with self._backup.script(archive, 'post-data', entries) as stream:
+            text = stream.read().decode()
+        graph = DDLGraph.parse(requalify_script(text, self._schema,
+                                                self._staging))
+        session, units, rest = [], {}, []
+        for statement in graph.statements:
+            if statement.kind == OTHER and statement.table is None and \
+                    _SESSION.match(statement.sql):
+                session.append(statement)
+            elif statement.kind != CONSTRAINT and statement.table:
+                units.setdefault(statement.table, []).append(statement)
+            elif statement.kind != CONSTRAINT:
+                rest.append(statement)
+        for entry in entries:
+            match = _ENTRY.match(entry)
+            if match.group(1) == 'TABLE DATA':
+                units.setdefault("{}.{}".format(self._staging,
+                                                match.group(3)), [])
+
+        def build(table):
+            with DirectConnection(self._credentials) as connection:
+                self._database.execute_statements(session + units[table],
+                                                  connection)
+                self._database.analyze_table(table.split('.', 1)[1],
+                                             self._staging, connection)
+
+        with ThreadPoolExecutor(max_workers=self._workers) as executor:
+            list(executor.map(build, sorted(units)))
+
+        if rest or graph.constraints:
+            with DirectConnection(self._credentials, autocommit=False) as \
+                    connection:
+                self._database.execute_statements(
+                    session + rest + graph.constraints, connection)
+        return len(units)
+
+    @exception_handler()
+    def swap(self) -> str:
+        """Renames the live schema aside and the staging schema into its
+        place in one transaction, retrying while readers hold locks.
+
+        Returns:
+            The refresh token stored in the live schema's comment.
+        """
+        token = uuid.uuid4().hex
+        for attempt in range(1, self._attempts + 1):
+            try:
+                with DirectConnection(self._credentials,
+                                      autocommit=False) as connection:
+                    self._swap(connection, token)
+                break
+            except Exception as error:
+                if getattr(error, 'pgcode', None) != LOCK_NOT_AVAILABLE or \
+                        attempt == self._attempts:
+                    raise
+                logger.warning("Swap of %s waited over %dms for locks; "
+                               "retrying (%d/%d).", self._schema,
+                               self._lock_timeout, attempt, self._attempts)
+                time.sleep(min(2 ** attempt, 30))
+        logger.info("Swapped %s into %s.", self._staging, self._schema)
+        if not self._keep_previous:
+            with DirectConnection(self._credentials) as connection:
+                self._database.delete_schema(self._previous, connection,
+                                             cascade=True)
+        return token
+
+    def _swap(self, connection: Connection, token: str) -> None:
+        database = self._database
+        database.execute(self._schema_sequel.lock_timeout(
+            self._lock_timeout), connection)
+        database.execute(self._schema_sequel.comment(
+            self._staging, PREFIX + token), connection)
+        database.delete_schema(self._previous, connection, cascade=True)
+        if database.schema_exists(self._schema, connection):
+            database.rename_schema(self._schema, self._previous, connection)
+        database.rename_schema(self._staging, self._schema, connection)
+
+    @exception_handler()
+    def revert(self) -> None:
+        """Swaps the previous schema, kept with keep_previous, back live."""
+        with DirectConnection(self._credentials, autocommit=False) as \
+                connection:
+            catalog.invalidate(connection)
+            if not self._database.schema_exists(self._previous, connection):
+                raise ValueError("No previous schema {} to revert to."
+                                 .format(self._previous))
+            self._database.execute(self._schema_sequel.lock_timeout(
+                self._lock_timeout), connection)
+            self._database.rename_schema(self._schema, self._staging,
+                                         connection)
+            self._database.rename_schema(self._previous, self._schema,
+                                         connection)
+            self._database.delete_schema(self._staging, connection,
+                                         cascade=True)
+
+    def token(self) -> str:
+        """The token of the refresh that produced the live schema, or None
+        if it was not loaded by a refresh."""
+        with DirectConnection(self._credentials) as connection:
+            response = self._database.execute(
+                self._schema_sequel.get_comment(self._schema), connection)
+        comment = response.fetchall[0][0] if response.fetchall else None
+        if comment and comment.startswith(PREFIX):
+            return comment[len(PREFIX):]
+        return None
+
+    @exception_handler()
+    def record(self, connection: Connection, datasource: str,
+               result: RefreshResult, user: str = 'refresh') -> None:
+        """Records a completed refresh as a datasourceevent in the metabase.
+
+        Arguments:
+            connection (Connection): Connection to the metabase database.
+            datasource (str): Name of the refreshed datasource, e.g. 'aact'.
+            result (RefreshResult): The refresh to record.
+            user (str): Recorded as created_by.
+        """
+        dao = PGDao(connection)
+        found = dao.read('datasource', columns=['id'], filter_key='name',
+                         filter_value=datasource, schema='metabase')
+        if found.empty:
+            raise ValueError("Unknown datasource {}.".format(datasource))
+        now = pd.Timestamp.now(tz='UTC').to_pydatetime()
+        started = now - pd.Timedelta(seconds=result.seconds)
+        dao.create('datasourceevent',
+                   columns=['name', 'datasource_id', 'started', 'ended',
+                            'return_code', 'return_value', 'created',
+                            'created_by'],
+                   values=[EVENT, found['id'].iloc[0], started, now, 0,
+                           PREFIX + result.token, now, user],
+                   schema='metabase')
@@ -19,61 +19,179 @@
 # Copyright: (c) 2021 nov8.ai                                                 #
 # =========================================================================== #
 # %%
-"""Repository of Metadata."""
+"""Repository of Metadata.
+
+Repositories read and write metabase entities through a Context. Reads are
+cached in an identity map, one per entity type, schema and database, and
+shared by the repositories of that type: a repeated read of the same name
+returns the same DataFrame without a query until its time to live expires.
+The repository's own create, update and delete drop the entries they
+change when the write is issued, when it executes and again when the
+context's transaction ends, so that a read made meanwhile, by this or
+another context, cannot keep a row the transaction replaced. Frames
+returned are shared with the map and must not be modified.
+
+Writes made by other processes are not seen before the entries expire;
+call invalidate() to drop them sooner.
+
+    context = Context(connection, PGDao, unit_of_work=True)
+    datasources = DataSource(context, ttl=60)
+    aact = datasources.read('aact')
+    datasources.update('aact', ...)
+    context.save()
+
+"""
+from __future__ import annotations
 from abc import ABC, abstractmethod
 from datetime import datetime
 import logging
-from types import Union
-import pandas as pd
+import math
+import threading
+import time
 
-from ..platform.database.connect import PGConnectionPool
-from ..platform.database.context import PGDao
-from ..platform.database.connect import ConnectionFactory
-from ..platformsrc.infrastructure.data.config import rx2m_login, DBCredentials
+from src.utils.lazy import lazy_import
+from .context import Context
 # --------------------------------------------------------------------------- #
 logger = logging.getLogger(__name__)
+pd = lazy_import('pandas')
+# --------------------------------------------------------------------------- #
+# Time to live of identity map entries in seconds.
+DEFAULT_TTL = 300.0
+# Key of the entry holding all rows of a table.
+ALL = None
+_MISSING = object()
+# --------------------------------------------------------------------------- #
+#                              IDENTITY MAP                                   #
+# --------------------------------------------------------------------------- #
+
+
+class IdentityMap:
+    """Thread safe map of keys to entities with the time each was loaded.
+
+    Arguments:
+        clock (callable): Returns the current time in seconds. Defaults to
+            time.monotonic.
+    """
+
+    def __init__(self, clock=time.monotonic) -> None:
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._entries = {}
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key, ttl: float = DEFAULT_TTL):
+        """Returns the entity loaded under key within the last ttl seconds,
+        or _MISSING."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and self._clock() - entry[0] < ttl:
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+            return _MISSING
+
+    def put(self, key, entity) -> None:
+        with self._lock:
+            self._entries[key] = (self._clock(), entity)
+
+    def discard(self, *keys) -> None:
+        """Drops the entries of keys, if any."""
+        with self._lock:
+            for key in keys:
+                self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
 
 
 # --------------------------------------------------------------------------- #
 #                              REPOSITORY                                     #
 # --------------------------------------------------------------------------- #
 class Repository(ABC):
-
-    def __init__(self, context: Context) -> None:
+    """Base class of metabase repositories.
+
+    Arguments:
+        context (Context): Context providing the data access object.
+            Changes are committed by context.save().
+        schema (str): Schema of the table. Defaults to 'metabase'.
+        ttl (float): Seconds a read is served from the identity map.
+            0 disables caching, math.inf keeps entries until invalidated.
+            Defaults to DEFAULT_TTL.
+    """
+
+    table = None
+    _maps = {}
+    _maps_lock = threading.Lock()
+
+    def __init__(self, context: Context, schema: str = 'metabase',
+                 ttl: float = DEFAULT_TTL) -> None:
         self._context = context
-        self._data = None
-        self._index = 0
-
-    @abstractmethod
-    def __next__(self):
-
-    @abstractmethod
-    def get(self, name: str, *args, **kwargs) -> pd.DataFrame:
-        pass
+        self._schema = schema
+        self._ttl = math.inf if ttl is None else ttl
+        key = (type(self).__name__, context.dbname, schema)
+        with Repository._maps_lock:
+            self._map = Repository._maps.setdefault(key, IdentityMap())
+
+    @property
+    def _dao(self):
+        return self._context.dao
+
+    @property
+    def identity_map(self) -> IdentityMap:
+        return self._map
+
+    def _read_through(self, key, load) -> pd.DataFrame:
+        """Returns the entity cached under key, loading it on a miss."""
+        if self._ttl <= 0:
+            return load()
+        entity = self._map.get(key, self._ttl)
+        if entity is _MISSING:
+            entity = load()
+            self._map.put(key, entity)
+        return entity
+
+    def _write(self, key, write) -> None:
+        """Calls write, dropping the entry of key, or every entry when
+        key is _MISSING, before, after and once the transaction ends."""
+        self.invalidate(key)
+        try:
+            write()
+        finally:
+            self.invalidate(key)
+            self._context.after_transaction(lambda: self.invalidate(key))
+
+    def invalidate(self, key=_MISSING) -> None:
+        """Drops the entry of key and of all rows, or every entry when no
+        key is given."""
+        if key is _MISSING:
+            self._map.clear()
+        else:
+            self._map.discard(key, ALL)
 
     @abstractmethod
-    def add(self, entity: Entity) -> None:
+    def create(self, *args, **kwargs) -> None:
         pass
 
     @abstractmethod
-    def update(self, entity: Entity) -> None:
+    def read(self, name: str = None, *args, **kwargs) -> pd.DataFrame:
         pass
 
     @abstractmethod
-    def remove(self, name: str, *args, **kwargs) -> None:
+    def delete(self, *args, **kwargs) -> None:
         pass
 
 
 # --------------------------------------------------------------------------- #
+#                              DATASOURCE                                     #
+# --------------------------------------------------------------------------- #
+class DataSource(Repository):
 
-
-class DataSource(Artifact):
-
-    def __init__(self, credentials: DBCredentials,
-                 autocommit: bool = False) -> None:
-        super(DataSource, self).__init__(credentials=credentials,
-                                         autocommit=autocommit)
-        self._table = 'datasource'
+    table = 'datasource'
 
     def create(self,
                name: str,
@@ -108,99 +226,62 @@ class DataSource(Artifact):
         for k, v in kwargs.items():
             columns.append(k)
             values.append(v)
-        self._dao.create(table=self._table, columns=columns, values=values,
-                         schema=self._schema)
+        self._write(name, lambda: self._dao.create(
+            self.table, columns=columns, values=values, schema=self._schema))
 
     def read(self, name: str = None) -> pd.DataFrame:
         if name is not None:
-            result = self._dao.read(table=self._table,
-                                    filter_key='name',
-                                    filter_value=name,
-                                    schema=self._schema)
-        else:
-            result = self._dao.read(table=self._table,
-                                    schema=self._schema)
-        return result
+            return self._read_through(name, lambda: self._dao.read(
+                self.table, filter_key='name', filter_value=name,
+                schema=self._schema))
+        return self._read_through(ALL, lambda: self._dao.read(
+            self.table, schema=self._schema))
 
     def update(self, name: str, version: int, uris: list,
                has_changed: bool, source_updated: datetime,
                updated: datetime, updated_by: str) -> None:
 
-        self._dao.connect()
-        self._dao.begin()
-        self._dao.update(table=self._table, column='uris', value=uris,
-                         filter_key='name', filter_value=name,
-                         schema=self._schema)
-        self._dao.update(table=self._table, column='has_changed',
-                         value=has_changed,
-                         filter_key='name', filter_value=name,
-                         schema=self._schema)
-        self._dao.update(table=self._table, column='source_updated',
-                         value=source_updated,
-                         filter_key='name', filter_value=name,
-                         schema=self._schema)
-        self._dao.update(table=self._table, column='updated',
-                         value=updated,
-                         filter_key='name', filter_value=name,
-                         schema=self._schema)
-        self._dao.update(table=self._table, column='updated_by',
-                         value=updated_by,
-                         filter_key='name', filter_value=name,
-                         schema=self._schema)
-        self._dao.commit()
-        self._dao.close()
+        def write():
+            for column, value in (('uris', uris),
+                                  ('has_changed', has_changed),
+                                  ('source_updated', source_updated),
+                                  ('updated', updated),
+                                  ('updated_by', updated_by)):
+                self._dao.update(self.table, column=column, value=value,
+                                 filter_key='name', filter_value=name,
+                                 schema=self._schema)
+        self._write(name, write)
 
     def delete(self, name) -> None:
-        self._dao.delete(table=self._table, filter_key='name', filter_value=name,
-                         schema=self._schema)
+        self._write(name, lambda: self._dao.delete(
+            self.table, filter_key='name', filter_value=name,
+            schema=self._schema))
 
 
 # --------------------------------------------------------------------------- #
 #                              EVENTS                                         #
 # --------------------------------------------------------------------------- #
-class Event(ABC):
-
-    def __init__(self, credentials: DBCredentials, autocommit=True,
-                 *args, **kwargs) -> None:
-        self._credentials = credentials
-        self._dao = PGDao(credentials=credentials, autocommit=autocommit)
-        self._schema = 'public'
+class DataSourceEvent(Repository):
 
-    @abstractmethod
-    def add(self, name: str, *args, **kwargs) -> None:
-        pass
-
-    @abstractmethod
-    def read(self, name: str = None, *args, **kwargs) -> \
-            pd.DataFrame:
-        pass
-
-    @abstractmethod
-    def delete(self, id: int, *args, **kwargs) -> None:
-        pass
-
-
-# --------------------------------------------------------------------------- #
-class DataSourceEvent(Event):
-
-    def __init__(self, credentials: DBCredentials) -> None:
-        super(DataSourceEvent, self).__init__(credentials=credentials)
-        self._table = 'datasourceevent'
+    table = 'datasourceevent'
 
     def create(self, **kwargs) -> None:
         columns = [k for k in kwargs.keys()]
         values = [v for v in kwargs.values()]
 
-        self._dao.create(table=self._table, columns=columns, values=values,
-                         schema=self._schema)
+        self._write(kwargs.get('name'), lambda: self._dao.create(
+            self.table, columns=columns, values=values, schema=self._schema))
 
     def read(self, name: str = None) -> pd.DataFrame:
         if name is None:
-            df = self._dao.read(table=self._table)
-        else:
-            df = self._dao.read(table=self._table,
-                                filter_key="name", filter_value=name)
-        return df
-
-    def delete(self, id: int = None) -> pd.DataFrame:
-        self._dao.delete(table=self._table, filter_key="id", filter_value=id)
+            return self._read_through(ALL, lambda: self._dao.read(
+                self.table, schema=self._schema))
+        return self._read_through(name, lambda: self._dao.read(
+            self.table, filter_key="name", filter_value=name,
+            schema=self._schema))
+
+    def delete(self, id: str) -> None:
+        # The name of the deleted event is not known here.
+        self._write(_MISSING, lambda: self._dao.delete(
+            self.table, filter_key="id", filter_value=id,
+            schema=self._schema))
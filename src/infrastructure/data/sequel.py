@@ -21,11 +21,30 @@
 """SQL Generator: Generates SQL strings compatible with psycopg2.
 
 """
+from __future__ import annotations
 from abc import ABC, abstractmethod
 from dataclasses import dataclass, field
 from typing import Union
 
-from psycopg2 import sql
+from ...utils.lazy import lazy_import
+sql = lazy_import('psycopg2.sql')
+# --------------------------------------------------------------------------- #
+# Names of the sequels changing the schemas, tables or columns of a
+# database, and of those changing the databases or roles of the cluster.
+# The catalog cache is invalidated when one is executed.
+CREATE_SCHEMA = 'create_schema'
+DROP_SCHEMA = 'drop_schema'
+RENAME_SCHEMA = 'rename_schema'
+CREATE_TABLE = 'create_table'
+BATCH_CREATE_TABLES = 'batch_create_tables'
+DELETE_TABLE = 'delete_table'
+DELETE_TABLES = 'delete_tables'
+CREATE_COLUMN = 'create_column'
+CREATE_DATABASE = 'create_database'
+DROP_DATABASE = 'drop_database'
+CLONE_DATABASE = 'clone_database'
+CREATE_USER = 'create_user'
+DROP_USER = 'drop_user'
 
 
 # --------------------------------------------------------------------------- #
@@ -33,16 +52,68 @@ from psycopg2 import sql
 # --------------------------------------------------------------------------- #
 
 
+class Description:
+    """A str.format template whose arguments are rendered on first use.
+
+    Descriptions are built for every statement but only read when a log
+    record is actually emitted, so the formatting over column lists and
+    values is deferred until str() is called.
+    """
+
+    __slots__ = ('_template', '_args', '_text')
+
+    def __init__(self, template: str, *args) -> None:
+        self._template = template
+        self._args = args
+        self._text = None
+
+    def __str__(self) -> str:
+        if self._text is None:
+            self._text = self._template.format(*self._args)
+        return self._text
+
+    def __repr__(self) -> str:
+        return "Description({!r})".format(str(self))
+
+    def __eq__(self, other) -> bool:
+        return str(self) == str(other)
+
+    def __hash__(self) -> int:
+        return hash(str(self))
+
+
 @dataclass
 class Sequel:
     """Class that encapsulates a sql sequel, its name and parameters."""
     name: str
     cmd: sql.SQL
-    description: str = field(default=None)
+    description: Union[str, Description] = field(default=None)
     query_context: str = field(default=None)
     object_type: str = field(default=None)
     object_name: str = field(default=None)
     params: tuple = field(default=())
+
+
+@dataclass
+class Aggregate:
+    """Declares a per-study aggregate over a one-to-many child table.
+
+    Arguments:
+        name (str): Name of the resulting feature column.
+        table (str): The child table, e.g. 'facilities'.
+        function (str): One of 'count', 'count_distinct', 'flag', 'first',
+            'last', 'min', 'max', 'sum' or 'avg'.
+        column (str): The aggregated column. Not required for 'count'.
+        filter_key (str): Optional column restricting the rows aggregated.
+        filter_value (Union[str, int, float]): The value filter_key must
+            match.
+    """
+    name: str
+    table: str
+    function: str
+    column: str = field(default=None)
+    filter_key: str = field(default=None)
+    filter_value: Union[str, int, float] = field(default=None)
 # --------------------------------------------------------------------------- #
 #                            ADMIN SEQUEL BASE                                #
 # --------------------------------------------------------------------------- #
@@ -101,8 +172,8 @@ class DatabaseSequel(AdminSequelBase):
 
     def create(self, name: str) -> Sequel:
         sequel = Sequel(
-            name="create_database",
-            description="Created {} database".format(name),
+            name=CREATE_DATABASE,
+            description=Description("Created {} database", name),
             query_context='admin',
             object_type='database',
             object_name=name,
@@ -115,7 +186,7 @@ class DatabaseSequel(AdminSequelBase):
     def exists(self, name: str) -> Sequel:
         sequel = Sequel(
             name="database exists",
-            description="Checked existence of {} database.".format(name),
+            description=Description("Checked existence of {} database.", name),
             query_context='admin',
             object_type='database',
             object_name=name,
@@ -129,8 +200,8 @@ class DatabaseSequel(AdminSequelBase):
 
     def delete(self, name: str) -> Sequel:
         sequel = Sequel(
-            name="drop database",
-            description="Dropped {} database if it exists.".format(name),
+            name=DROP_DATABASE,
+            description=Description("Dropped {} database if it exists.", name),
             query_context='admin',
             object_type='database',
             object_name=name,
@@ -140,11 +211,70 @@ class DatabaseSequel(AdminSequelBase):
 
         return sequel
 
+    def clone(self, name: str, template: str) -> Sequel:
+        sequel = Sequel(
+            name=CLONE_DATABASE,
+            description=Description("Created {} database from template {}",
+                                    name, template),
+            query_context='admin',
+            object_type='database',
+            object_name=name,
+            cmd=sql.SQL("CREATE DATABASE {} WITH TEMPLATE {};").format(
+                sql.Identifier(name),
+                sql.Identifier(template))
+        )
+
+        return sequel
+
+    def set_template(self, name: str, is_template: bool = True) -> Sequel:
+        sequel = Sequel(
+            name="set_template",
+            description=Description("Set {} database IS_TEMPLATE {}", name,
+                                    is_template),
+            query_context='admin',
+            object_type='database',
+            object_name=name,
+            cmd=sql.SQL("ALTER DATABASE {} WITH IS_TEMPLATE {};").format(
+                sql.Identifier(name),
+                sql.SQL("true" if is_template else "false"))
+        )
+
+        return sequel
+
+    def comment(self, name: str, text: str) -> Sequel:
+        sequel = Sequel(
+            name="comment_database",
+            description=Description("Commented {} database", name),
+            query_context='admin',
+            object_type='database',
+            object_name=name,
+            cmd=sql.SQL("COMMENT ON DATABASE {} IS {};").format(
+                sql.Identifier(name),
+                sql.Literal(text))
+        )
+
+        return sequel
+
+    def get_comment(self, name: str) -> Sequel:
+        sequel = Sequel(
+            name="get_database_comment",
+            description=Description("Read comment on {} database", name),
+            query_context='admin',
+            object_type='database',
+            object_name=name,
+            cmd=sql.SQL("""SELECT shobj_description(oid, 'pg_database')
+                             FROM pg_database WHERE datname = %s;"""),
+            params=(name,)
+        )
+
+        return sequel
+
     def terminate_database(self, name: str) -> Sequel:
         sequel = Sequel(
             name="terminate_database_processes",
-            description="Terminated processes on {} database if it exists."
-            .format(name),
+            description=Description(
+                "Terminated processes on {} database if it exists.",
+                name),
             query_context='admin',
             object_type='database',
             object_name=name,
@@ -182,8 +312,8 @@ class SchemaSequel(AdminSequelBase):
 
     def create(self, name: str) -> Sequel:
         sequel = Sequel(
-            name="create_schema",
-            description="Created SCHEMA IF NOT EXISTS {}".format(name),
+            name=CREATE_SCHEMA,
+            description=Description("Created SCHEMA IF NOT EXISTS {}", name),
             query_context='admin',
             object_type='database',
             object_name=name,
@@ -197,7 +327,7 @@ class SchemaSequel(AdminSequelBase):
     def exists(self, name: str) -> Sequel:
         sequel = Sequel(
             name="database exists",
-            description="Checked existence of {} database.".format(name),
+            description=Description("Checked existence of {} database.", name),
             query_context='admin',
             object_type='database',
             object_name=name,
@@ -209,19 +339,90 @@ class SchemaSequel(AdminSequelBase):
 
         return sequel
 
-    def delete(self, name: str) -> Sequel:
+    def delete(self, name: str, cascade: bool = False) -> Sequel:
         sequel = Sequel(
-            name="drop_schema",
-            description="Dropped schema {}.".format(name),
+            name=DROP_SCHEMA,
+            description=Description("Dropped schema {}.", name),
             query_context='admin',
             object_type='database',
             object_name=name,
-            cmd=sql.SQL("DROP SCHEMA {};").format(
+            cmd=sql.SQL("DROP SCHEMA IF EXISTS {} CASCADE;"
+                        if cascade else "DROP SCHEMA {};").format(
                 sql.Identifier(name))
         )
 
         return sequel
 
+    def rename(self, name: str, new_name: str) -> Sequel:
+        sequel = Sequel(
+            name=RENAME_SCHEMA,
+            description=Description("Renamed schema {} to {}.", name,
+                                    new_name),
+            query_context='admin',
+            object_type='database',
+            object_name=name,
+            cmd=sql.SQL("ALTER SCHEMA {} RENAME TO {};").format(
+                sql.Identifier(name),
+                sql.Identifier(new_name))
+        )
+
+        return sequel
+
+    def names(self) -> Sequel:
+        sequel = Sequel(
+            name="schema_names",
+            description="Selected schema names.",
+            query_context='admin',
+            object_type='database',
+            object_name='pg_namespace',
+            cmd=sql.SQL("SELECT nspname FROM pg_catalog.pg_namespace;")
+        )
+
+        return sequel
+
+    def comment(self, name: str, text: str) -> Sequel:
+        sequel = Sequel(
+            name="comment_schema",
+            description=Description("Commented {} schema", name),
+            query_context='admin',
+            object_type='database',
+            object_name=name,
+            cmd=sql.SQL("COMMENT ON SCHEMA {} IS {};").format(
+                sql.Identifier(name),
+                sql.Literal(text))
+        )
+
+        return sequel
+
+    def get_comment(self, name: str) -> Sequel:
+        sequel = Sequel(
+            name="get_schema_comment",
+            description=Description("Read comment on {} schema", name),
+            query_context='admin',
+            object_type='database',
+            object_name=name,
+            cmd=sql.SQL("""SELECT obj_description(oid, 'pg_namespace')
+                             FROM pg_namespace WHERE nspname = %s;"""),
+            params=(name,)
+        )
+
+        return sequel
+
+    def lock_timeout(self, milliseconds: int) -> Sequel:
+        """Bounds lock waits for the rest of the current transaction."""
+        sequel = Sequel(
+            name="lock_timeout",
+            description=Description("Set lock timeout to {}ms.",
+                                    milliseconds),
+            query_context='admin',
+            object_type='transaction',
+            object_name='connection',
+            cmd=sql.SQL("SET LOCAL lock_timeout = {};").format(
+                sql.Literal(int(milliseconds)))
+        )
+
+        return sequel
+
 
 # --------------------------------------------------------------------------- #
 #                              TABLES SEQUEL                                  #
@@ -232,8 +433,9 @@ class TableSequel(AdminSequelBase):
 
     def create(self, name: str, filepath: str) -> Sequel:
         sequel = Sequel(
-            name="create_table",
-            description="Created table {} from SQL ddl in {}".format(
+            name=CREATE_TABLE,
+            description=Description(
+                "Created table {} from SQL ddl in {}",
                 name, filepath),
             query_context='admin',
             object_type='table',
@@ -245,8 +447,10 @@ class TableSequel(AdminSequelBase):
 
     def batch_create(self, filepath: str) -> Sequel:
         sequel = Sequel(
-            name="batch_create_tables",
-            description="Create tables from SQL ddl in {}".format(filepath),
+            name=BATCH_CREATE_TABLES,
+            description=Description(
+                "Create tables from SQL ddl in {}",
+                filepath),
             query_context='admin',
             object_type='table',
             object_name="batch",
@@ -255,10 +459,28 @@ class TableSequel(AdminSequelBase):
         )
         return sequel
 
+    def statement(self, kind: str, name: str, statement: str) -> Sequel:
+        """Wraps one statement parsed from a DDL script.
+
+        The statement runs without parameters, params=None, so that
+        psycopg2 passes any % in it, e.g. in a comment or a default,
+        through unformatted.
+        """
+        sequel = Sequel(
+            name="ddl_{}".format(kind),
+            description=Description("Executed {} DDL on {}", kind, name),
+            query_context='admin',
+            object_type=kind,
+            object_name=name,
+            cmd=sql.SQL(statement),
+            params=None
+        )
+        return sequel
+
     def exists(self, name: str, schema: str) -> Sequel:
         sequel = Sequel(
             name="table_exists",
-            description="Checked existence of table {}".format(name),
+            description=Description("Checked existence of table {}", name),
             query_context='admin',
             object_type='table',
             object_name=name,
@@ -275,8 +497,8 @@ class TableSequel(AdminSequelBase):
 
     def delete(self, name: str, schema: str) -> Sequel:
         sequel = Sequel(
-            name="delete_table",
-            description="Drop table {}.{}".format(schema, name),
+            name=DELETE_TABLE,
+            description=Description("Drop table {}.{}", schema, name),
             query_context='admin',
             object_type='table',
             object_name=name,
@@ -287,10 +509,42 @@ class TableSequel(AdminSequelBase):
         )
         return sequel
 
+    def analyze(self, name: str, schema: str) -> Sequel:
+        sequel = Sequel(
+            name="analyze_table",
+            description=Description("Analyzed table {}.{}", schema, name),
+            query_context='admin',
+            object_type='table',
+            object_name=name,
+            cmd=sql.SQL("ANALYZE {}.{};").format(
+                sql.Identifier(schema),
+                sql.Identifier(name)
+            )
+        )
+        return sequel
+
+    def copy_from(self, name: str, schema: str, columns: list) -> Sequel:
+        """COPY of text format rows from the client into a table."""
+        sequel = Sequel(
+            name="copy_from",
+            description=Description("Copied rows into {}.{}", schema, name),
+            query_context='admin',
+            object_type='table',
+            object_name=name,
+            cmd=sql.SQL("COPY {}.{} ({}) FROM STDIN;").format(
+                sql.Identifier(schema),
+                sql.Identifier(name),
+                sql.SQL(', ').join(map(sql.Identifier, columns))
+            )
+        )
+        return sequel
+
     def batch_delete(self, filepath) -> Sequel:
         sequel = Sequel(
-            name="delete_tables",
-            description="Drop tables from SQL ddl in {}".format(filepath),
+            name=DELETE_TABLES,
+            description=Description(
+                "Drop tables from SQL ddl in {}",
+                filepath),
             query_context='admin',
             object_type='table',
             object_name="batch",
@@ -303,7 +557,8 @@ class TableSequel(AdminSequelBase):
 
         sequel = Sequel(
             name="column_exists",
-            description="Checked existence of column {} in {} table".format(
+            description=Description(
+                "Checked existence of column {} in {} table",
                 column, name),
             query_context='admin',
             object_type='table',
@@ -325,7 +580,8 @@ class TableSequel(AdminSequelBase):
 
         sequel = Sequel(
             name="column_exists",
-            description="Obtained columns for {}.{} table".format(
+            description=Description(
+                "Obtained columns for {}.{} table",
                 schema, name),
             query_context='admin',
             object_type='table',
@@ -341,12 +597,68 @@ class TableSequel(AdminSequelBase):
 
         return sequel
 
+    def catalog(self, schema: str) -> Sequel:
+        """Tables, views and their columns in a schema, one row per column
+        and one with a null column for relations without columns."""
+        sequel = Sequel(
+            name="catalog",
+            description=Description("Loaded catalog of {} schema", schema),
+            query_context='admin',
+            object_type='database',
+            object_name=schema,
+            cmd=sql.SQL("""SELECT c.relname, a.attname
+                             FROM pg_catalog.pg_class c
+                             JOIN pg_catalog.pg_namespace n
+                               ON n.oid = c.relnamespace
+                        LEFT JOIN pg_catalog.pg_attribute a
+                               ON a.attrelid = c.oid
+                              AND a.attnum > 0
+                              AND NOT a.attisdropped
+                            WHERE n.nspname = %s
+                              AND c.relkind IN ('r', 'p', 'v', 'm', 'f')
+                         ORDER BY c.relname, a.attnum;"""),
+            params=(schema,)
+        )
+
+        return sequel
+
+    def column_stats(self, name: str, schema: str) -> Sequel:
+        """Declared type, planner statistics and row estimate per column."""
+        sequel = Sequel(
+            name="column_stats",
+            description=Description(
+                "Obtained column statistics for {}.{} table",
+                schema, name),
+            query_context='admin',
+            object_type='table',
+            object_name=name,
+            cmd=sql.SQL("""SELECT c.column_name, c.data_type,
+                                  s.n_distinct, s.null_frac, t.reltuples
+                             FROM information_schema.columns c
+                             JOIN pg_catalog.pg_namespace n
+                               ON n.nspname = c.table_schema
+                             JOIN pg_catalog.pg_class t
+                               ON t.relnamespace = n.oid
+                              AND t.relname = c.table_name
+                        LEFT JOIN pg_catalog.pg_stats s
+                               ON s.schemaname = c.table_schema
+                              AND s.tablename = c.table_name
+                              AND s.attname = c.column_name
+                            WHERE c.table_schema = %s
+                              AND c.table_name = %s
+                         ORDER BY c.ordinal_position"""),
+            params=(schema, name)
+        )
+
+        return sequel
+
     def create_column(self, name: str, schema: str, column: str,
                       datatype: str) -> Sequel:
 
         sequel = Sequel(
-            name="column_exists",
-            description="Add column {} to {}.{} table".format(
+            name=CREATE_COLUMN,
+            description=Description(
+                "Add column {} to {}.{} table",
                 column, schema, name),
             query_context='admin',
             object_type='table',
@@ -365,7 +677,9 @@ class TableSequel(AdminSequelBase):
     def tables(self, schema: str = 'public') -> Sequel:
         sequel = Sequel(
             name="tables",
-            description="Selected table names in {} schema.".format(schema),
+            description=Description(
+                "Selected table names in {} schema.",
+                schema),
             query_context='admin',
             object_type='database',
             object_name=schema,
@@ -386,8 +700,8 @@ class UserSequel(AdminSequelBase):
 
     def create(self, name: str, password: str) -> Sequel:
         sequel = Sequel(
-            name="create_user",
-            description="Created user {}".format(name),
+            name=CREATE_USER,
+            description=Description("Created user {}", name),
             query_context='admin',
             object_type='user',
             object_name=name,
@@ -402,8 +716,8 @@ class UserSequel(AdminSequelBase):
 
     def delete(self, name: str) -> Sequel:
         sequel = Sequel(
-            name="drop_user",
-            description="Dropped user {}".format(name),
+            name=DROP_USER,
+            description=Description("Dropped user {}", name),
             query_context='admin',
             object_type='user',
             object_name=name,
@@ -416,7 +730,7 @@ class UserSequel(AdminSequelBase):
     def exists(self, name: str) -> Sequel:
         sequel = Sequel(
             name="user_exists",
-            description="Checked existence of user {}".format(name),
+            description=Description("Checked existence of user {}", name),
             query_context='admin',
             object_type='user',
             object_name=name,
@@ -427,11 +741,24 @@ class UserSequel(AdminSequelBase):
 
         return sequel
 
+    def names(self) -> Sequel:
+        sequel = Sequel(
+            name="user_names",
+            description="Selected role names.",
+            query_context='admin',
+            object_type='user',
+            object_name='pg_roles',
+            cmd=sql.SQL("SELECT rolname FROM pg_catalog.pg_roles;")
+        )
+
+        return sequel
+
     def grant(self, name: str, dbname: str) -> Sequel:
         sequel = Sequel(
             name="grant",
-            description="Granted privileges on database {} to {}"
-            .format(dbname, name),
+            description=Description(
+                "Granted privileges on database {} to {}",
+                dbname, name),
             query_context='admin',
             object_type='user',
             object_name=name,
@@ -446,8 +773,9 @@ class UserSequel(AdminSequelBase):
     def revoke(self, name: str, dbname: str) -> Sequel:
         sequel = Sequel(
             name="revoke",
-            description="Revoked privileges on database, names, and sequences {} from {}"
-            .format(dbname, name),
+            description=Description(
+                "Revoked privileges on database, names, and sequences {} from {}",
+                dbname, name),
             query_context='admin',
             object_type='user',
             object_name=name,
@@ -477,13 +805,13 @@ class AccessSequel(AccessSequelBase):
 
         sequel = Sequel(
             name="select",
-            description="Selected {} from {}.{} where {} = {}".format(
-                columns, schema, name, filter_key, filter_value
-            ),
+            description=Description(
+                "Selected {} from {}.{} where {} = {}",
+                columns, schema, name, filter_key, filter_value),
             query_context='access',
             object_type='table',
             object_name=name,
-            cmd=sql.SQL("SELECT {} FROM {}.{} WHERE {} = {};").format(
+            cmd=sql.SQL("SELECT {} FROM {}.{} WHERE {} = {}").format(
                 sql.SQL(", ").join(map(sql.Identifier, columns)),
                 sql.Identifier(schema),
                 sql.Identifier(name),
@@ -501,13 +829,11 @@ class AccessSequel(AccessSequelBase):
 
         sequel = Sequel(
             name="select",
-            description="Selected * from {}.{}".format(
-                schema, name
-            ),
+            description=Description("Selected * from {}.{}", schema, name),
             query_context='access',
             object_type='table',
             object_name=name,
-            cmd=sql.SQL("SELECT * FROM {}.{};").format(
+            cmd=sql.SQL("SELECT * FROM {}.{}").format(
                 sql.Identifier(schema),
                 sql.Identifier(name)
             )
@@ -520,13 +846,13 @@ class AccessSequel(AccessSequelBase):
 
         sequel = Sequel(
             name="select",
-            description="Selected {} from {}.{}".format(
-                columns, schema, name
-            ),
+            description=Description(
+                "Selected {} from {}.{}",
+                columns, schema, name),
             query_context='access',
             object_type='table',
             object_name=name,
-            cmd=sql.SQL("SELECT {} FROM {}.{};").format(
+            cmd=sql.SQL("SELECT {} FROM {}.{}").format(
                 sql.SQL(", ").join(map(sql.Identifier, columns)),
                 sql.Identifier(schema),
                 sql.Identifier(name)
@@ -542,13 +868,13 @@ class AccessSequel(AccessSequelBase):
 
         sequel = Sequel(
             name="select",
-            description="Selected * from {}.{} where {} = {}".format(
-                schema, name, filter_key, filter_value
-            ),
+            description=Description(
+                "Selected * from {}.{} where {} = {}",
+                schema, name, filter_key, filter_value),
             query_context='access',
             object_type='table',
             object_name=name,
-            cmd=sql.SQL("SELECT * FROM {}.{} WHERE {} = {};").format(
+            cmd=sql.SQL("SELECT * FROM {}.{} WHERE {} = {}").format(
                 sql.Identifier(schema),
                 sql.Identifier(name),
                 sql.Identifier(filter_key),
@@ -558,14 +884,110 @@ class AccessSequel(AccessSequelBase):
         )
         return sequel
 
+    # Comparison operators accepted in filters, with the SQL they compile
+    # to. 'in' and 'not in' bind one array parameter.
+    _operators = {'=': '{} = {}', '<>': '{} <> {}', '!=': '{} <> {}',
+                  '<': '{} < {}', '<=': '{} <= {}', '>': '{} > {}',
+                  '>=': '{} >= {}', 'like': '{} LIKE {}',
+                  'ilike': '{} ILIKE {}', 'in': '{} = ANY({})',
+                  'not in': '{} <> ALL({})'}
+
+    @staticmethod
+    def _unary(operator) -> bool:
+        return isinstance(operator, str) and \
+            operator.lower().strip() in ('is null', 'is not null')
+
+    def _conditions(self, filters) -> list:
+        """Normalizes read filters to (column, operator, value) triples."""
+        if isinstance(filters, dict):
+            filters = list(filters.items())
+        return [tuple(f) if len(f) != 2 or self._unary(f[1])
+                else (f[0], '=', f[1]) for f in filters or []]
+
+    def _predicates(self, filters: list) -> tuple:
+        """Compiles (column, operator, value) filters to a list of sql
+        predicates and their params.
+
+        An equality with a list, tuple or set value compiles to
+        = ANY(%s) bound as an array, and with None to IS NULL. 'between'
+        takes a (low, high) pair; 'is null' and 'is not null' take no value.
+        """
+        predicates, params = [], []
+        for column, operator, *value in filters:
+            value = value[0] if value else None
+            operator = operator.lower().strip()
+            identifier = sql.Identifier(column)
+            if operator == '=' and isinstance(value, (list, tuple, set)):
+                operator = 'in'
+            if operator in ('in', 'not in'):
+                value = list(value)
+            if operator == '=' and value is None:
+                operator = 'is null'
+
+            if operator in ('is null', 'is not null'):
+                predicates.append(sql.SQL('{} ' + operator.upper()).format(
+                    identifier))
+            elif operator == 'between':
+                low, high = value
+                predicates.append(sql.SQL('{} BETWEEN {} AND {}').format(
+                    identifier, sql.Placeholder(), sql.Placeholder()))
+                params.extend([low, high])
+            elif operator in self._operators:
+                predicates.append(sql.SQL(self._operators[operator]).format(
+                    identifier, sql.Placeholder()))
+                params.append(value)
+            else:
+                raise ValueError("Unsupported filter operator {}."
+                                 .format(operator))
+        return predicates, params
+
+    def _filtered(self, name: str, schema: str, columns: list = None,
+                  filters=None) -> Sequel:
+        predicates, params = self._predicates(filters)
+        selection = sql.SQL(", ").join(map(sql.Identifier, columns)) \
+            if columns else sql.SQL("*")
+        sequel = Sequel(
+            name="select",
+            description=Description(
+                "Selected {} from {}.{} where {}",
+                columns or '*', schema, name, filters),
+            query_context='access',
+            object_type='table',
+            object_name=name,
+            cmd=sql.SQL("SELECT {} FROM {}.{} WHERE {}").format(
+                selection,
+                sql.Identifier(schema),
+                sql.Identifier(name),
+                sql.SQL(" AND ").join(predicates)),
+            params=tuple(params)
+        )
+        return sequel
+
     def read(self, name: str, schema: str, columns: list = None,
              filter_key: str = None,
-             filter_value: Union[str, int, float] = None) -> Sequel:
-
+             filter_value: Union[str, int, float, list] = None,
+             filters=None) -> Sequel:
+        """Selects columns, or all columns, of the rows matching a filter.
+
+        Arguments:
+            filter_key, filter_value: A single equality. A list value
+                matches any of its elements.
+            filters: Conjunctive filters, a dict of {column: value}
+                equalities or a list of (column, value) equalities,
+                (column, operator, value) triples and (column, 'is null')
+                pairs. See _predicates.
+        """
         if (filter_key is None and filter_value is None) != \
                 (filter_key is None or filter_value is None):
             raise ValueError("where values not completely specified.")
 
+        if filters or isinstance(filter_value, (list, tuple, set)):
+            conditions = self._conditions(filters)
+            if filter_key is not None:
+                conditions.insert(0, (filter_key, '=', filter_value))
+            return self._filtered(name=name, schema=schema, columns=columns,
+                                  filters=conditions)
+
         if (columns is not None and filter_key is not None):
             # Returns selected columns from selected rows
             return self._get(name=name, schema=schema, columns=columns,
@@ -590,6 +1012,47 @@ class AccessSequel(AccessSequelBase):
                                                   filter_key=filter_key,
                                                   filter_value=filter_value)
 
+    def page(self, name: str, schema: str, key: list, after: tuple = None,
+             limit: int = 1000, columns: list = None,
+             filters=None) -> Sequel:
+        """Selects the next limit rows in key order after the key values
+        in after, or the first rows when after is None.
+
+        The row value comparison (k1, k2) > (%s, %s) lets an index on the
+        key columns start the scan at the previous page's last row.
+        """
+        predicates, params = self._predicates(self._conditions(filters))
+        key = list(key)
+        if after is not None:
+            predicates.append(sql.SQL("({}) > ({})").format(
+                sql.SQL(", ").join(map(sql.Identifier, key)),
+                sql.SQL(", ").join(sql.Placeholder() for _ in key)))
+            params.extend(after)
+        if columns:
+            columns = list(columns) + [k for k in key if k not in columns]
+        selection = sql.SQL(", ").join(map(sql.Identifier, columns)) \
+            if columns else sql.SQL("*")
+        where = sql.SQL(" WHERE {}").format(
+            sql.SQL(" AND ").join(predicates)) if predicates else sql.SQL("")
+        sequel = Sequel(
+            name="select_page",
+            description=Description(
+                "Selected {} rows of {}.{} after {} = {}",
+                limit, schema, name, key, after),
+            query_context='access',
+            object_type='table',
+            object_name=name,
+            cmd=sql.SQL("SELECT {} FROM {}.{}{} ORDER BY {} LIMIT {}").format(
+                selection,
+                sql.Identifier(schema),
+                sql.Identifier(name),
+                where,
+                sql.SQL(", ").join(map(sql.Identifier, key)),
+                sql.Placeholder()),
+            params=tuple(params) + (int(limit),)
+        )
+        return sequel
+
     def create(self, name: str, schema: str, columns: list,
                values: list) -> Sequel:
 
@@ -599,9 +1062,9 @@ class AccessSequel(AccessSequelBase):
 
         sequel = Sequel(
             name="insert",
-            description="Inserted into {}.{} {} values {}".format(
-                schema, name, columns, name
-            ),
+            description=Description(
+                "Inserted into {}.{} {} values {}",
+                schema, name, columns, name),
             query_context='access',
             object_type='table',
             object_name=name,
@@ -617,15 +1080,155 @@ class AccessSequel(AccessSequelBase):
 
         return sequel
 
+    def create_many(self, name: str, schema: str, columns: list,
+                    values: list) -> Sequel:
+        """Inserts many rows in batched multi-row VALUES statements.
+
+        The command contains a single %s placeholder for the VALUES list,
+        as expected by psycopg2.extras.execute_values.
+        """
+        for row in values:
+            if len(row) != len(columns):
+                raise ValueError(
+                    "Number of columns doesn't match number of values")
+
+        sequel = Sequel(
+            name="insert_many",
+            description=Description(
+                "Inserted {} rows into {}.{}", len(values), schema, name),
+            query_context='access',
+            object_type='table',
+            object_name=name,
+            cmd=sql.SQL("INSERT into {}.{} ({}) values %s;")
+            .format(
+                sql.Identifier(schema),
+                sql.Identifier(name),
+                sql.SQL(', ').join(map(sql.Identifier, tuple((*columns,))))
+            ),
+            params=[tuple(row) for row in values]
+        )
+
+        return sequel
+
+    def _conflict(self, columns: list, key: list, update: list = None):
+        """ON CONFLICT clause updating the non-key columns, except id, so
+        that an existing row keeps its identity."""
+        if update is None:
+            update = [c for c in columns if c not in key and c != 'id']
+        if not update:
+            action = sql.SQL("DO NOTHING")
+        else:
+            action = sql.SQL("DO UPDATE SET {}").format(
+                sql.SQL(', ').join(
+                    sql.SQL("{0} = EXCLUDED.{0}").format(sql.Identifier(c))
+                    for c in update))
+        return sql.SQL("ON CONFLICT ({}) {}").format(
+            sql.SQL(', ').join(map(sql.Identifier, key)), action)
+
+    def upsert(self, name: str, schema: str, columns: list, values: list,
+               key: list, update: list = None) -> Sequel:
+        """Inserts a row or, if a row with the same key exists, updates it.
+
+        Arguments:
+            key (list): Columns of a unique index or constraint.
+            update (list): Columns to update on conflict. Defaults to all
+                columns except the key and id. Empty to leave existing
+                rows untouched.
+        """
+        if (len(columns) != len(values)):
+            raise ValueError(
+                "Number of columns doesn't match number of values")
+
+        sequel = Sequel(
+            name="upsert",
+            description=Description(
+                "Upserted into {}.{} {} on {}", schema, name, columns, key),
+            query_context='access',
+            object_type='table',
+            object_name=name,
+            cmd=sql.SQL("INSERT into {}.{} ({}) values ({}) {};")
+            .format(
+                sql.Identifier(schema),
+                sql.Identifier(name),
+                sql.SQL(', ').join(map(sql.Identifier, columns)),
+                sql.SQL(', ').join(sql.Placeholder() * len(columns)),
+                self._conflict(columns, key, update)
+            ),
+            params=(*values,)
+        )
+
+        return sequel
+
+    def stage(self, name: str, schema: str, staging: str) -> Sequel:
+        """Creates an empty session-private copy of a table's columns."""
+        sequel = Sequel(
+            name="create_staging",
+            description=Description(
+                "Created staging table {} for {}.{}", staging, schema, name),
+            query_context='access',
+            object_type='table',
+            object_name=name,
+            cmd=sql.SQL("CREATE TEMPORARY TABLE {} (LIKE {}.{} "
+                        "INCLUDING DEFAULTS);").format(
+                sql.Identifier(staging),
+                sql.Identifier(schema),
+                sql.Identifier(name))
+        )
+
+        return sequel
+
+    def merge(self, name: str, schema: str, staging: str, columns: list,
+              key: list, update: list = None) -> Sequel:
+        """Upserts the rows of a staging table into a table.
+
+        Rows repeating a key within the staging table are reduced to the
+        last one copied, as one statement cannot update a row twice.
+        """
+        sequel = Sequel(
+            name="merge",
+            description=Description(
+                "Merged {} into {}.{} on {}", staging, schema, name, key),
+            query_context='access',
+            object_type='table',
+            object_name=name,
+            cmd=sql.SQL("INSERT into {}.{} ({}) SELECT DISTINCT ON ({}) {} "
+                        "FROM pg_temp.{} ORDER BY {}, ctid DESC {};")
+            .format(
+                sql.Identifier(schema),
+                sql.Identifier(name),
+                sql.SQL(', ').join(map(sql.Identifier, columns)),
+                sql.SQL(', ').join(map(sql.Identifier, key)),
+                sql.SQL(', ').join(map(sql.Identifier, columns)),
+                sql.Identifier(staging),
+                sql.SQL(', ').join(map(sql.Identifier, key)),
+                self._conflict(columns, key, update)
+            )
+        )
+
+        return sequel
+
+    def drop_staging(self, staging: str) -> Sequel:
+        sequel = Sequel(
+            name="drop_staging",
+            description=Description("Dropped staging table {}", staging),
+            query_context='access',
+            object_type='table',
+            object_name=staging,
+            cmd=sql.SQL("DROP TABLE IF EXISTS pg_temp.{};").format(
+                sql.Identifier(staging))
+        )
+
+        return sequel
+
     def update(self, name: str, schema: str, column: str,
                value: Union[str, float, int], filter_key: str,
                filter_value: Union[str, float, int]) -> Sequel:
 
         sequel = Sequel(
             name="update",
-            description="Updated {}.{} setting {} = {} where {} = {}".format(
-                schema, name, column, value, filter_key, filter_value
-            ),
+            description=Description(
+                "Updated {}.{} setting {} = {} where {} = {}",
+                schema, name, column, value, filter_key, filter_value),
             query_context='access',
             object_type='table',
             object_name=name,
@@ -642,18 +1245,46 @@ class AccessSequel(AccessSequelBase):
 
         return sequel
 
-    def delete(self, name: str, schema: str, filter_key: str,
-               filter_value: Union[str, float, int]) -> Sequel:
+    def update_many(self, name: str, schema: str, column: str,
+                    filter_key: str, values: list) -> Sequel:
+        """The update statement with a list of (value, filter_value)
+        parameter pairs, for psycopg2.extras.execute_batch."""
+        sequel = Sequel(
+            name="update_many",
+            description=Description(
+                "Updated {} rows of {}.{} setting {} by {}",
+                len(values), schema, name, column, filter_key),
+            query_context='access',
+            object_type='table',
+            object_name=name,
+            cmd=sql.SQL("UPDATE {}.{} SET {} = {} WHERE {} = {}").format(
+                sql.Identifier(schema),
+                sql.Identifier(name),
+                sql.Identifier(column),
+                sql.Placeholder(),
+                sql.Identifier(filter_key),
+                sql.Placeholder()
+            ),
+            params=[tuple(pair) for pair in values]
+        )
+
+        return sequel
 
+    def delete(self, name: str, schema: str, filter_key: str,
+               filter_value: Union[str, float, int, list]) -> Sequel:
+        """Deletes the rows where filter_key equals filter_value, or any of
+        the values when filter_value is a list."""
+        operator = "= ANY({})" if isinstance(filter_value, list) else "= {}"
         sequel = Sequel(
             name="delete",
-            description="Deleted from {}.{} where {} = {}".format(
-                schema, name, filter_key, filter_value
-            ),
+            description=Description(
+                "Deleted from {}.{} where {} = {}",
+                schema, name, filter_key, filter_value),
             query_context='access',
             object_type='table',
             object_name=name,
-            cmd=sql.SQL("DELETE FROM {} WHERE {} = {}").format(
+            cmd=sql.SQL("DELETE FROM {}.{} WHERE {} " + operator).format(
+                sql.Identifier(schema),
                 sql.Identifier(name),
                 sql.Identifier(filter_key),
                 sql.Placeholder()
@@ -663,6 +1294,38 @@ class AccessSequel(AccessSequelBase):
 
         return sequel
 
+    def describe(self, query: Sequel) -> Sequel:
+        """Zero row query returning the column names and types of query."""
+        sequel = Sequel(
+            name="describe",
+            description=Description("Described {}", query.description),
+            query_context='access',
+            object_type=query.object_type,
+            object_name=query.object_name,
+            cmd=sql.SQL("SELECT * FROM ({}) AS q LIMIT 0").format(
+                query.cmd),
+            params=query.params
+        )
+        return sequel
+
+    def copy_to(self, query: Sequel) -> Sequel:
+        """COPY of the rows of a query to the client in CSV format.
+
+        COPY takes no bind parameters, so the query's parameters are
+        interpolated client side when it is executed.
+        """
+        sequel = Sequel(
+            name="copy_to",
+            description=Description("Copied out {}", query.description),
+            query_context='access',
+            object_type=query.object_type,
+            object_name=query.object_name,
+            cmd=sql.SQL("COPY ({}) TO STDOUT WITH (FORMAT csv)").format(
+                query.cmd),
+            params=query.params
+        )
+        return sequel
+
     def begin(self) -> Sequel:
 
         sequel = Sequel(
@@ -675,3 +1338,263 @@ class AccessSequel(AccessSequelBase):
         )
 
         return sequel
+
+
+# =========================================================================== #
+#                              FEATURE QUERIES                                #
+# =========================================================================== #
+class FeatureSequel:
+    """Compiles per-study aggregates into GROUP BY subqueries."""
+
+    _functions = {
+        'count': "count(*)",
+        'count_distinct': "count(DISTINCT {column})",
+        'flag': "bool_or({column} IS NOT NULL)",
+        'first': "min({column})",
+        'last': "max({column})",
+        'min': "min({column})",
+        'max': "max({column})",
+        'sum': "sum({column})",
+        'avg': "avg({column})"
+    }
+
+    # Aggregates that are zero / false rather than null for studies
+    # without rows in the child table.
+    _defaults = {'count': "0", 'count_distinct': "0", 'flag': "false"}
+
+    def _aggregate(self, aggregate: Aggregate, key: str) -> tuple:
+        if aggregate.function not in FeatureSequel._functions:
+            raise ValueError("Aggregate function {} is not supported."
+                             .format(aggregate.function))
+        if aggregate.column is None and aggregate.function != 'count' and \
+                not (aggregate.function == 'flag' and aggregate.filter_key):
+            raise ValueError("Aggregate {} requires a column."
+                             .format(aggregate.name))
+
+        expression = sql.SQL(FeatureSequel._functions[aggregate.function])\
+            .format(column=sql.Identifier(aggregate.column or key))
+        params = ()
+
+        if aggregate.filter_key is not None:
+            if aggregate.function == 'flag':
+                # A flag records whether any row matches the filter.
+                expression = sql.SQL("bool_or({} = {})").format(
+                    sql.Identifier(aggregate.filter_key), sql.Placeholder())
+            else:
+                expression = sql.SQL("{} FILTER (WHERE {} = {})").format(
+                    expression, sql.Identifier(aggregate.filter_key),
+                    sql.Placeholder())
+            params = (aggregate.filter_value,)
+
+        return expression, params
+
+    def study_features(self, aggregates: list, schema: str = 'ctgov',
+                       base_table: str = 'studies',
+                       key: str = 'nct_id') -> Sequel:
+        """Returns one row per study with a column per aggregate.
+
+        Aggregates are grouped by table so that each child table is scanned
+        once, in a single GROUP BY subquery, and left joined to the base
+        table on the key.
+
+        Arguments:
+            aggregates (list): List of Aggregate objects.
+            schema (str): Schema containing the tables. Defaults to 'ctgov'
+            base_table (str): Table with one row per study.
+            key (str): The study identifier. Defaults to 'nct_id'
+        """
+        tables = {}
+        for aggregate in aggregates:
+            tables.setdefault(aggregate.table, []).append(aggregate)
+
+        columns = [sql.SQL("b.{}").format(sql.Identifier(key))]
+        joins = []
+        params = []
+
+        for i, (table, table_aggregates) in enumerate(tables.items()):
+            alias = sql.Identifier("t{}".format(i))
+            expressions = []
+            for aggregate in table_aggregates:
+                expression, expression_params = self._aggregate(aggregate,
+                                                                key)
+                expressions.append(sql.SQL("{} AS {}").format(
+                    expression, sql.Identifier(aggregate.name)))
+                params.extend(expression_params)
+
+                column = sql.SQL("{}.{}").format(
+                    alias, sql.Identifier(aggregate.name))
+                if aggregate.function in FeatureSequel._defaults:
+                    column = sql.SQL("COALESCE({}, {})").format(
+                        column,
+                        sql.SQL(FeatureSequel._defaults[aggregate.function]))
+                columns.append(sql.SQL("{} AS {}").format(
+                    column, sql.Identifier(aggregate.name)))
+
+            joins.append(sql.SQL(
+                "LEFT JOIN (SELECT {key}, {expressions} FROM {schema}.{table}"
+                " GROUP BY {key}) {alias} ON {alias}.{key} = b.{key}").format(
+                key=sql.Identifier(key),
+                expressions=sql.SQL(", ").join(expressions),
+                schema=sql.Identifier(schema),
+                table=sql.Identifier(table),
+                alias=alias))
+
+        sequel = Sequel(
+            name="study_features",
+            description=Description(
+                "Selected {} aggregates over {} tables in {}",
+                len(aggregates), len(tables), schema),
+            query_context='access',
+            object_type='table',
+            object_name=base_table,
+            cmd=sql.SQL("SELECT {} FROM {}.{} b {};").format(
+                sql.SQL(", ").join(columns),
+                sql.Identifier(schema),
+                sql.Identifier(base_table),
+                sql.SQL(" ").join(joins)),
+            params=tuple(params)
+        )
+        return sequel
+
+
+# =========================================================================== #
+#                               INDEX QUERIES                                 #
+# =========================================================================== #
+class IndexSequel:
+    """Catalog statistics and index maintenance statements."""
+
+    def table_stats(self, schemas: list) -> Sequel:
+        sequel = Sequel(
+            name="table_stats",
+            description=Description(
+                "Selected table access statistics for {}", schemas),
+            query_context='admin',
+            object_type='table',
+            object_name='pg_stat_user_tables',
+            cmd=sql.SQL("""SELECT schemaname, relname, seq_scan,
+                                  seq_tup_read, COALESCE(idx_scan, 0),
+                                  n_live_tup
+                             FROM pg_stat_user_tables
+                            WHERE schemaname = ANY(%s);"""),
+            params=(list(schemas),)
+        )
+        return sequel
+
+    def indexes(self, schemas: list) -> Sequel:
+        sequel = Sequel(
+            name="indexes",
+            description=Description("Selected index columns for {}",
+                                    schemas),
+            query_context='admin',
+            object_type='index',
+            object_name='pg_index',
+            cmd=sql.SQL("""SELECT n.nspname, t.relname, c.relname,
+                                  array_agg(a.attname ORDER BY k.ord)
+                             FROM pg_index i
+                             JOIN pg_class t ON t.oid = i.indrelid
+                             JOIN pg_class c ON c.oid = i.indexrelid
+                             JOIN pg_namespace n ON n.oid = t.relnamespace
+                             JOIN LATERAL unnest(i.indkey)
+                                  WITH ORDINALITY AS k(attnum, ord) ON true
+                             JOIN pg_attribute a ON a.attrelid = t.oid
+                                  AND a.attnum = k.attnum
+                            WHERE n.nspname = ANY(%s) AND i.indisvalid
+                            GROUP BY n.nspname, t.relname, c.relname;"""),
+            params=(list(schemas),)
+        )
+        return sequel
+
+    def tables_with_column(self, schemas: list, column: str) -> Sequel:
+        sequel = Sequel(
+            name="tables_with_column",
+            description=Description("Selected tables in {} with column {}",
+                                    schemas, column),
+            query_context='admin',
+            object_type='table',
+            object_name='columns',
+            cmd=sql.SQL("""SELECT table_schema, table_name
+                             FROM information_schema.columns
+                            WHERE table_schema = ANY(%s)
+                              AND column_name = %s;"""),
+            params=(list(schemas), column)
+        )
+        return sequel
+
+    def validity(self, name: str, schema: str) -> Sequel:
+        sequel = Sequel(
+            name="index_validity",
+            description=Description("Selected validity of index {}.{}",
+                                    schema, name),
+            query_context='admin',
+            object_type='index',
+            object_name=name,
+            cmd=sql.SQL("""SELECT i.indisvalid
+                             FROM pg_index i
+                             JOIN pg_class c ON c.oid = i.indexrelid
+                             JOIN pg_namespace n ON n.oid = c.relnamespace
+                            WHERE n.nspname = %s AND c.relname = %s;"""),
+            params=(schema, name)
+        )
+        return sequel
+
+    def create(self, name: str, schema: str, table: str, columns: list,
+               unique: bool = False, concurrently: bool = True) -> Sequel:
+        sequel = Sequel(
+            name="create_index",
+            description=Description("Created index {} on {}.{} ({})",
+                                    name, schema, table, columns),
+            query_context='admin',
+            object_type='index',
+            object_name=name,
+            cmd=sql.SQL("CREATE {}INDEX {}IF NOT EXISTS {} ON {}.{} ({});")
+            .format(
+                sql.SQL("UNIQUE " if unique else ""),
+                sql.SQL("CONCURRENTLY " if concurrently else ""),
+                sql.Identifier(name),
+                sql.Identifier(schema),
+                sql.Identifier(table),
+                sql.SQL(", ").join(map(sql.Identifier, columns)))
+        )
+        return sequel
+
+    def delete(self, name: str, schema: str,
+               concurrently: bool = True) -> Sequel:
+        sequel = Sequel(
+            name="delete_index",
+            description=Description("Dropped index {}.{}", schema, name),
+            query_context='admin',
+            object_type='index',
+            object_name=name,
+            cmd=sql.SQL("DROP INDEX {}IF EXISTS {}.{};").format(
+                sql.SQL("CONCURRENTLY " if concurrently else ""),
+                sql.Identifier(schema),
+                sql.Identifier(name))
+        )
+        return sequel
+
+    def probe(self, schema: str, table: str, columns: list,
+              values: tuple = None) -> Sequel:
+        """Equality lookup on columns, or a sample row when values is None."""
+        if values is None:
+            cmd = sql.SQL("SELECT {} FROM {}.{} LIMIT 1;").format(
+                sql.SQL(", ").join(map(sql.Identifier, columns)),
+                sql.Identifier(schema),
+                sql.Identifier(table))
+        else:
+            cmd = sql.SQL("SELECT * FROM {}.{} WHERE {} LIMIT 100;").format(
+                sql.Identifier(schema),
+                sql.Identifier(table),
+                sql.SQL(" AND ").join(
+                    sql.SQL("{} = %s").format(sql.Identifier(column))
+                    for column in columns))
+        sequel = Sequel(
+            name="probe",
+            description=Description("Probed {}.{} on {}", schema, table,
+                                    columns),
+            query_context='admin',
+            object_type='table',
+            object_name=table,
+            cmd=cmd,
+            params=tuple(values) if values is not None else ()
+        )
+        return sequel
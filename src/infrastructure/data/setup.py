@@ -19,16 +19,17 @@
 # Copyright: (c) 2021 nov8.ai                                                 #
 # =========================================================================== #
 """Database setup module."""
+from __future__ import annotations
 from abc import ABC, abstractmethod
 import logging
 
-import pandas as pd
-from psycopg2 import sql
-
 from .connect import PGConnectionPool, SAConnectionPool
-from ..utils.logger import exception_handler
+from ...utils.logger import exception_handler
+from ...utils.lazy import lazy_import
 # --------------------------------------------------------------------------- #
 logger = logging.getLogger(__name__)
+pd = lazy_import('pandas')
+sql = lazy_import('psycopg2.sql')
 
 
 # --------------------------------------------------------------------------- #
@@ -58,16 +59,15 @@ class CopyDatabase:
         """
 
         command = sql.SQL("CREATE DATABASE {} WITH TEMPLATE {};").format(
-            sql.Identifier(sourcedb),
-            sql.Identifier(targetdb)
+            sql.Identifier(targetdb),
+            sql.Identifier(sourcedb)
         )
 
         cursor = connection.cursor()
         cursor.execute(command)
         cursor.close()
 
-        logger.info("Created {} database as copy of {}".format(
-            targetdb, sourcedb))
+        logger.info("Created %s database as copy of %s", targetdb, sourcedb)
 
 
 # --------------------------------------------------------------------------- #
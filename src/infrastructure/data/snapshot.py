@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+# -*- coding:utf-8 -*-
+# =========================================================================== #
+# Project  : Drug Approval Analytics                                          #
+# Version  : 0.1.0                                                            #
+# File     : \src\infrastructure\data\snapshot.py                             #
+# Language : Python 3.9.5                                                     #
+# --------------------------------------------------------------------------  #
+# Author   : John James                                                       #
+# Company  : nov8.ai                                                          #
+# Email    : john.james@nov8.ai                                               #
+# URL      : https://github.com/john-james-sf/drug-approval-analytics         #
+# --------------------------------------------------------------------------  #
+# Created  : Monday, October 19th 2026, 5:02:48 am                            #
+# Modified : Monday, October 19th 2026, 5:02:48 am                            #
+# Modifier : John James (john.james@nov8.ai)                                  #
+# --------------------------------------------------------------------------- #
+# License  : BSD 3-clause "New" or "Revised" License                          #
+# Copyright: (c) 2021 nov8.ai                                                 #
+# =========================================================================== #
+"""Template database snapshots for fast database builds.
+
+The database described by a MetaDatabaseBuilder configuration is built
+once, from DDL and initial table data, and copied into a template
+database. Fresh databases are then created from the template with
+CREATE DATABASE ... WITH TEMPLATE, a file level copy that avoids replaying
+the DDL and reloading data.
+
+The template carries a fingerprint of the DDL, schema and initial data in
+its database comment. build() rebuilds the template only when the
+fingerprint no longer matches.
+
+    snapshot = Snapshot(builder)
+    snapshot.build()
+    snapshot.clone('rx2m_test_1')
+    snapshot.restore()
+
+"""
+import hashlib
+import logging
+
+from .connect import DirectConnection
+from .database import Database, MetaDatabaseBuilder
+from ...utils.lazy import lazy_import
+from ...utils.logger import exception_handler
+# --------------------------------------------------------------------------- #
+logger = logging.getLogger(__name__)
+pd = lazy_import('pandas')
+# --------------------------------------------------------------------------- #
+PREFIX = 'snapshot:'
+# --------------------------------------------------------------------------- #
+
+
+class Snapshot:
+    """Template database snapshot of a MetaDatabaseBuilder's database.
+
+    Arguments:
+        builder (MetaDatabaseBuilder): Builds the source database.
+        template (str): Name of the template database. Defaults to the
+            configured database name suffixed with '_template'.
+    """
+
+    def __init__(self, builder: MetaDatabaseBuilder,
+                 template: str = None) -> None:
+        self._builder = builder
+        self._config = builder.config
+        self._template = template or "{}_template".format(self._config.name)
+        self._database = Database()
+        self._fingerprint = None
+
+    @property
+    def template(self) -> str:
+        return self._template
+
+    @property
+    def fingerprint(self) -> str:
+        """SHA-256 over the create DDL, schema name and initial data."""
+        if self._fingerprint is None:
+            digest = hashlib.sha256()
+            with open(self._config.create_table_ddl_filepath, 'rb') as f:
+                digest.update(f.read())
+            digest.update(self._config.schema.encode('utf-8'))
+            for table in sorted(self._config.table_data):
+                data = self._config.table_data[table]
+                digest.update(table.encode('utf-8'))
+                digest.update(repr(list(data.columns)).encode('utf-8'))
+                digest.update(pd.util.hash_pandas_object(
+                    data, index=True).values.tobytes())
+            self._fingerprint = digest.hexdigest()
+        return self._fingerprint
+
+    def _connect(self) -> DirectConnection:
+        return DirectConnection(self._config.dba_pg_credentials)
+
+    @exception_handler()
+    def current(self) -> bool:
+        """True if the template exists and matches the fingerprint."""
+        with self._connect() as connection:
+            if not self._database.exists(self._template, connection):
+                return False
+            comment = self._database.get_comment(self._template, connection)
+        return comment == PREFIX + self.fingerprint
+
+    @exception_handler()
+    def build(self, force: bool = False) -> bool:
+        """Builds the template unless it is current.
+
+        The configured database is built with the builder, then copied
+        into the template, which is marked IS_TEMPLATE and stamped with
+        the fingerprint.
+
+        Returns:
+            True if the template was (re)built.
+        """
+        if not force and self.current():
+            logger.info("Template %s is current.", self._template)
+            return False
+
+        self._builder.reset()
+        self._builder.build_database()
+        self._builder.build_user()
+        self._builder.build_schema()
+        self._builder.build_tables()
+        self._builder.initialize()
+
+        with self._connect() as connection:
+            self._drop(self._template, connection)
+            self._copy(self._config.name, self._template, connection)
+            self._database.set_template(self._template, True, connection)
+            self._database.set_comment(self._template,
+                                       PREFIX + self.fingerprint, connection)
+        logger.info("Built template %s from %s.", self._template,
+                    self._config.name)
+        return True
+
+    @exception_handler()
+    def clone(self, name: str, replace: bool = True) -> None:
+        """Creates database name from the template.
+
+        Arguments:
+            name (str): The database to create.
+            replace (bool): Drop name first if it exists. Defaults to True.
+        """
+        with self._connect() as connection:
+            if self._database.exists(name, connection):
+                if not replace:
+                    raise ValueError("Database {} already exists."
+                                     .format(name))
+                self._drop(name, connection)
+            self._copy(self._template, name, connection)
+        logger.info("Created %s from template %s.", name, self._template)
+
+    @exception_handler()
+    def restore(self) -> None:
+        """Recreates the configured database from the template."""
+        self.clone(self._config.name, replace=True)
+
+    @exception_handler()
+    def drop(self) -> None:
+        """Drops the template database."""
+        with self._connect() as connection:
+            self._drop(self._template, connection)
+
+    def _copy(self, source: str, target: str, connection) -> None:
+        # The source may have no other sessions while it is copied.
+        self._database.terminate_database_processes(source, connection)
+        self._database.clone(target, source, connection)
+
+    def _drop(self, name: str, connection) -> None:
+        if not self._database.exists(name, connection):
+            return
+        self._database.set_template(name, False, connection)
+        self._database.terminate_database_processes(name, connection)
+        self._database.delete(name, connection)
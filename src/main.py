@@ -24,6 +24,7 @@ import logging
 
 from src.infrastructure.setup import PlatformBuilder
 from src.infrastructure.data.config import pg_pg_login, DBCredentials
+from src.utils.logger import configure_logging
 
 # import click
 
@@ -65,8 +66,7 @@ def main():
 
 
 if __name__ == '__main__':
-    log_fmt = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-    logging.basicConfig(level=logging.INFO, format=log_fmt)
+    configure_logging(level=logging.INFO)
 
     # not used in this stub but often useful for finding various files
     project_dir = Path(__file__).resolve().parents[2]
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+# -*- coding:utf-8 -*-
+# =========================================================================== #
+# Project  : Drug Approval Analytics                                          #
+# Version  : 0.1.0                                                            #
+# File     : \src\utils\lazy.py                                               #
+# Language : Python 3.9.5                                                     #
+# --------------------------------------------------------------------------  #
+# Author   : John James                                                       #
+# Company  : nov8.ai                                                          #
+# Email    : john.james@nov8.ai                                               #
+# URL      : https://github.com/john-james-sf/drug-approval-analytics         #
+# --------------------------------------------------------------------------  #
+# Created  : Sunday, October 18th 2026, 3:10:47 pm                            #
+# Modified : Sunday, October 18th 2026, 3:10:47 pm                            #
+# Modifier : John James (john.james@nov8.ai)                                  #
+# --------------------------------------------------------------------------- #
+# License  : BSD 3-clause "New" or "Revised" License                          #
+# Copyright: (c) 2021 nov8.ai                                                 #
+# =========================================================================== #
+"""Deferred imports for heavy third party dependencies.
+
+    pd = lazy_import('pandas')
+
+binds pd to a proxy that imports pandas on first attribute access. Modules
+that only define classes and functions using such dependencies can then be
+imported without paying for them. Modules using a proxy in annotations
+must use 'from __future__ import annotations'.
+
+"""
+import importlib
+import sys
+import threading
+# --------------------------------------------------------------------------- #
+
+
+class LazyModule:
+    """Proxy importing the named module on first attribute access."""
+
+    def __init__(self, name: str) -> None:
+        self._name = name
+        self._module = None
+        self._lock = threading.Lock()
+
+    def _load(self):
+        with self._lock:
+            if self._module is None:
+                self._module = importlib.import_module(self._name)
+        return self._module
+
+    def __getattr__(self, attr: str):
+        return getattr(self._load(), attr)
+
+    def __repr__(self) -> str:
+        state = "loaded" if self._module is not None else "not loaded"
+        return "<lazy module '{}' ({})>".format(self._name, state)
+
+
+def lazy_import(name: str):
+    """Returns the module if already imported, otherwise a LazyModule."""
+    if name in sys.modules:
+        return sys.modules[name]
+    return LazyModule(name)
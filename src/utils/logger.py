@@ -21,21 +21,80 @@
 """This module provides a exception handler decorator for pipeline objects.
 
 This exception handler decorator catches any exception thrown by the
-decorated function and logs it along with a traceback that includes every
-local variable of every frame.
+decorated function, logs it with the location it was raised from, and
+re-raises it. The decorator adds no handlers of its own; handlers are
+installed once by configure_logging, which routes records through a queue
+so that formatting and I/O happen on a listener thread rather than on the
+caller's path.
 
 """
-
+import atexit
 import logging
+import logging.handlers
 import functools
-import inspect
-import sys
+import queue
 # --------------------------------------------------------------------------- #
 LOG_FRAME_TPL = '  File "%s", line %i, in %s\n    %s\n'
-log_filepath = 'exceptions.log',
+LOG_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+log_filepath = 'exceptions.log'
+_listener = None
+_queue_handler = None
 # --------------------------------------------------------------------------- #
 
 
+def configure_logging(level: int = logging.INFO, filepath: str = None,
+                      fmt: str = LOG_FORMAT) -> logging.handlers.QueueListener:
+    """Installs a queue based handler on the root logger.
+
+    Records are put on an in-memory queue by a QueueHandler and written to
+    the console, and optionally to filepath, by a QueueListener running in
+    a background thread. Repeated calls only update the level.
+
+    Arguments:
+        level (int): Root logger level. Defaults to logging.INFO.
+        filepath (str): Optional log file, e.g. log_filepath.
+        fmt (str): Format string for the output handlers.
+
+    Returns:
+        The running QueueListener.
+    """
+    global _listener, _queue_handler
+
+    root = logging.getLogger()
+    root.setLevel(level)
+    if _listener is not None:
+        return _listener
+
+    formatter = logging.Formatter(fmt)
+    handlers = [logging.StreamHandler()]
+    if filepath:
+        handlers.append(logging.FileHandler(filepath))
+    for handler in handlers:
+        handler.setFormatter(formatter)
+
+    records = queue.SimpleQueue()
+    _queue_handler = logging.handlers.QueueHandler(records)
+    root.addHandler(_queue_handler)
+    _listener = logging.handlers.QueueListener(records, *handlers)
+    _listener.start()
+    atexit.register(shutdown_logging)
+    return _listener
+
+
+def shutdown_logging() -> None:
+    """Flushes queued records and removes the handler installed above."""
+    global _listener, _queue_handler
+
+    if _listener is None:
+        return
+    logging.getLogger().removeHandler(_queue_handler)
+    _listener.stop()
+    for handler in _listener.handlers:
+        handler.close()
+    _listener = None
+    _queue_handler = None
+
+
 def log_to_str(v):
     """ Converts newlines to  newline literals."""
     if isinstance(v, str):
@@ -78,7 +137,8 @@ def exception_handler(frame_template: str = LOG_FRAME_TPL,
         decorated function.
 
     Notes:
-        Caught exceptions are re-raised.
+        Caught exceptions are re-raised. An exception propagating through
+        several decorated functions is logged once, by the innermost.
 
     Reference:
         This module was motivated by the following gist:
@@ -88,21 +148,8 @@ def exception_handler(frame_template: str = LOG_FRAME_TPL,
 
     def decorator(func):
 
-        logging.basicConfig(level=logging.DEBUG)
-        logger = logging.getLogger(func.__class__.__name__)
-
-        console_handler = logging.StreamHandler()
-        console_handler.setLevel(logging.DEBUG)
-
-        # create formatter
-        formatter = logging.Formatter(
-            '%(asctime)s - %(name)s - %(levelname)s - %(message)s')
-
-        # add formatter to ch
-        console_handler.setFormatter(formatter)
-
-        # add ch to logger
-        logger.addHandler(console_handler)
+        logger = logging.getLogger(getattr(func, '__module__', __name__))
+        name = getattr(func, '__qualname__', repr(func))
 
         @functools.wraps(func)
         def wrapper(*args, **kwds):
@@ -112,47 +159,24 @@ def exception_handler(frame_template: str = LOG_FRAME_TPL,
 
             except Exception as error:
 
-                curframe = inspect.currentframe()
-                calframe = inspect.getouterframes(curframe, 3)
-                caller = calframe[1][3]
-                line = calframe[1][2]
-
-                # log exception information first in case something fails
-                # below
-                logger.error('Exception thrown in %s, line %d, %s: %s\n' % (
-                    caller,
-                    line,
-                    type(error),
-                    str(error)))
-
-                # # iterate through the frames in reverse order so we print
-                # # the most recent frame first
-                # frames = inspect.getinnerframes(sys.exc_info()[2])
-                # for frame_info in reversed(frames):
-                #     f_locals = frame_info[0].f_locals
-
-                #     # if there's a local variable named
-                #     # '__lgw_marker_local__', we assume the frame is
-                #     # from a call of this function, 'wrapper', and
-                #     # we skip it. Printing these frames won't help
-                #     # determine the cause of an exception, so skipping
-                #     # it reduces clutter.
-                #     if '__lgw_marker_local__' in f_locals:
-                #         continue
-
-                #     # log the frame information
-                #     logger.error(frame_template %
-                #                  (frame_info[1], frame_info[2],
-                #                   frame_info[3],
-                #                   frame_info[4][0].lstrip()))
-
-                #     # log every local variable of the frame
-                #     for k, v in f_locals.items():
-                #         logger.error('    %s = %s\n' %
-                #                      (k, value_to_string(v)))
-
+                if getattr(error, '_logged', False):
+                    raise
+
+                # The innermost traceback entry is where the error was
+                # raised; no frame introspection is needed to find it.
+                tb = error.__traceback__
+                while tb.tb_next is not None:
+                    tb = tb.tb_next
+                code = tb.tb_frame.f_code
+
+                logger.error('Exception thrown in %s (%s, line %d), %s: %s',
+                             name, code.co_name, tb.tb_lineno,
+                             type(error).__name__, error)
+                try:
+                    error._logged = True
+                except AttributeError:
+                    pass
                 raise
-                sys.exit(1)
 
         return wrapper
 
@@ -0,0 +1,333 @@
+#!/usr/bin/env python3
+# -*- coding:utf-8 -*-
+# =========================================================================== #
+# Project  : Drug Approval Analytics                                          #
+# Version  : 0.1.0                                                            #
+# File     : \src\utils\metrics.py                                            #
+# Language : Python 3.9.5                                                     #
+# --------------------------------------------------------------------------  #
+# Author   : John James                                                       #
+# Company  : nov8.ai                                                          #
+# Email    : john.james@nov8.ai                                               #
+# URL      : https://github.com/john-james-sf/drug-approval-analytics         #
+# --------------------------------------------------------------------------  #
+# Created  : Monday, October 19th 2026, 1:31:26 am                            #
+# Modified : Monday, October 19th 2026, 1:31:26 am                            #
+# Modifier : John James (john.james@nov8.ai)                                  #
+# --------------------------------------------------------------------------- #
+# License  : BSD 3-clause "New" or "Revised" License                          #
+# Copyright: (c) 2021 nov8.ai                                                 #
+# =========================================================================== #
+"""In-process metrics registry with histograms, counters and profiling.
+
+The data layer records per statement latency, rows and bytes fetched, pool
+checkout waits and data access call latency into the module level
+registry. Metrics are dumped as Prometheus text or JSON:
+
+    print(registry.to_prometheus())
+
+and a pipeline stage is profiled with:
+
+    with profile('build_features') as stage:
+        ...
+    print(stage)
+
+"""
+from contextlib import contextmanager
+import functools
+import json
+import threading
+import time
+# --------------------------------------------------------------------------- #
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5,
+                   1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+# --------------------------------------------------------------------------- #
+
+
+class Counter:
+    """Monotonic counter keyed by label values."""
+
+    kind = 'counter'
+
+    def __init__(self, name: str, help: str, labelnames: tuple = ()) -> None:
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labels, amount: float = 1) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def value(self, *labels) -> float:
+        return self._values.get(labels, 0)
+
+    def samples(self) -> list:
+        """Returns [(suffix, labels, value)]."""
+        with self._lock:
+            return [('', labels, value)
+                    for labels, value in sorted(self._values.items())]
+
+    def to_dict(self) -> dict:
+        with self._lock:
+            return {'|'.join(map(str, labels)): value
+                    for labels, value in self._values.items()}
+
+    def reset(self) -> None:
+        with self._lock:
+            self._values.clear()
+
+
+class Histogram:
+    """Cumulative bucket histogram keyed by label values."""
+
+    kind = 'histogram'
+
+    def __init__(self, name: str, help: str, labelnames: tuple = (),
+                 buckets: tuple = LATENCY_BUCKETS) -> None:
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *labels) -> None:
+        with self._lock:
+            state = self._values.get(labels)
+            if state is None:
+                state = self._values[labels] = [
+                    [0] * len(self.buckets), 0, 0.0, 0.0]
+            counts = state[0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[i] += 1
+                    break
+            state[1] += 1
+            state[2] += value
+            state[3] = max(state[3], value)
+
+    def count(self, *labels) -> int:
+        state = self._values.get(labels)
+        return state[1] if state else 0
+
+    def sum(self, *labels) -> float:
+        state = self._values.get(labels)
+        return state[2] if state else 0.0
+
+    def quantile(self, q: float, *labels) -> float:
+        """Upper bucket bound below which a q fraction of values fall."""
+        state = self._values.get(labels)
+        if not state or not state[1]:
+            return None
+        target, running = q * state[1], 0
+        for bound, n in zip(self.buckets, state[0]):
+            running += n
+            if running >= target:
+                return bound
+        return state[3]
+
+    def totals(self) -> tuple:
+        """Returns (count, sum) over all label values."""
+        with self._lock:
+            return (sum(s[1] for s in self._values.values()),
+                    sum(s[2] for s in self._values.values()))
+
+    def samples(self) -> list:
+        with self._lock:
+            items = sorted((k, (list(v[0]), v[1], v[2]))
+                           for k, v in self._values.items())
+        samples = []
+        for labels, (counts, count, total) in items:
+            running = 0
+            for bound, n in zip(self.buckets, counts):
+                running += n
+                samples.append(('_bucket', labels + (('le', bound),),
+                                running))
+            samples.append(('_bucket', labels + (('le', '+Inf'),), count))
+            samples.append(('_sum', labels, total))
+            samples.append(('_count', labels, count))
+        return samples
+
+    def to_dict(self) -> dict:
+        with self._lock:
+            keys = list(self._values)
+        return {'|'.join(map(str, labels)): {
+            'count': self.count(*labels),
+            'sum': self.sum(*labels),
+            'p50': self.quantile(0.5, *labels),
+            'p95': self.quantile(0.95, *labels),
+            'p99': self.quantile(0.99, *labels),
+            'max': self._values[labels][3]} for labels in keys}
+
+    def reset(self) -> None:
+        with self._lock:
+            self._values.clear()
+
+
+class MetricsRegistry:
+    """Holds named metrics and renders them for export."""
+
+    def __init__(self) -> None:
+        self.enabled = True
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def _register(self, cls, name: str, *args, **kwargs):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, *args, **kwargs)
+            elif not isinstance(metric, cls):
+                raise ValueError("Metric {} is already registered as a {}."
+                                 .format(name, metric.kind))
+            return metric
+
+    def counter(self, name: str, help: str = '',
+                labelnames: tuple = ()) -> Counter:
+        """Returns the named counter, creating it on first use."""
+        return self._register(Counter, name, help, labelnames)
+
+    def histogram(self, name: str, help: str = '', labelnames: tuple = (),
+                  buckets: tuple = LATENCY_BUCKETS) -> Histogram:
+        """Returns the named histogram, creating it on first use."""
+        return self._register(Histogram, name, help, labelnames, buckets)
+
+    def __getitem__(self, name: str):
+        return self._metrics[name]
+
+    def reset(self) -> None:
+        """Clears all recorded values, keeping the registrations."""
+        for metric in list(self._metrics.values()):
+            metric.reset()
+
+    def to_dict(self) -> dict:
+        return {name: {'type': metric.kind, 'help': metric.help,
+                       'labels': list(metric.labelnames),
+                       'values': metric.to_dict()}
+                for name, metric in sorted(self._metrics.items())}
+
+    def to_json(self, indent: int = None) -> str:
+        return json.dumps(self.to_dict(), indent=indent, default=str)
+
+    def to_prometheus(self) -> str:
+        """Renders the Prometheus text exposition format."""
+        lines = []
+        for name, metric in sorted(self._metrics.items()):
+            lines.append("# HELP {} {}".format(name, metric.help))
+            lines.append("# TYPE {} {}".format(name, metric.kind))
+            for suffix, labels, value in metric.samples():
+                pairs = list(zip(metric.labelnames, labels)) + \
+                    [label for label in labels[len(metric.labelnames):]]
+                text = ",".join('{}="{}"'.format(k, _escape(v))
+                                for k, v in pairs)
+                lines.append("{}{}{} {}".format(
+                    name, suffix, "{" + text + "}" if text else "", value))
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"')\
+        .replace('\n', '\\n')
+
+
+# --------------------------------------------------------------------------- #
+registry = MetricsRegistry()
+
+query_seconds = registry.histogram(
+    'db_query_seconds', 'Statement latency by Sequel name.', ('statement',))
+query_rows = registry.counter(
+    'db_query_rows_total', 'Rows returned or affected by Sequel name.',
+    ('statement',))
+query_bytes = registry.counter(
+    'db_query_bytes_total', 'Estimated bytes fetched by Sequel name.',
+    ('statement',))
+pool_wait_seconds = registry.histogram(
+    'db_pool_wait_seconds', 'Connection pool checkout wait.', ('pool',))
+dao_seconds = registry.histogram(
+    'dao_call_seconds', 'Data access object call latency.', ('method',))
+stage_seconds = registry.histogram(
+    'stage_seconds', 'Profiled pipeline stage duration.', ('stage',))
+cache_lookups = registry.counter(
+    'dao_cache_lookups_total', 'Result cache lookups by memory, disk or miss.',
+    ('tier',))
+
+
+def estimate_bytes(rows: list, sample: int = 32) -> int:
+    """Estimates the payload size of fetched rows from a small sample."""
+    if not rows:
+        return 0
+    size = 0
+    head = rows[:sample]
+    for row in head:
+        for value in row:
+            if isinstance(value, (str, bytes, bytearray, memoryview)):
+                size += len(value)
+            elif value is not None:
+                size += 8
+    return size * len(rows) // len(head)
+
+
+def observe_query(name: str, seconds: float, rowcount: int = None,
+                  rows: list = None) -> None:
+    """Records one executed statement."""
+    if not registry.enabled:
+        return
+    query_seconds.observe(seconds, name)
+    if rowcount is not None and rowcount >= 0:
+        query_rows.inc(name, amount=rowcount)
+    if rows:
+        query_bytes.inc(name, amount=estimate_bytes(rows))
+
+
+def timed(histogram: Histogram, label: str):
+    """Decorator observing the call duration of func under label."""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not registry.enabled:
+                return func(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                histogram.observe(time.perf_counter() - start, label)
+        return wrapper
+    return decorator
+
+
+class Profile:
+    """Result of a profile() block."""
+
+    def __init__(self, stage: str) -> None:
+        self.stage = stage
+        self.seconds = None
+        self.queries = 0
+        self.query_seconds = 0.0
+
+    def __repr__(self) -> str:
+        return ("Profile(stage={!r}, seconds={:.3f}, queries={}, "
+                "query_seconds={:.3f})").format(
+                    self.stage, self.seconds or 0, self.queries,
+                    self.query_seconds)
+
+
+@contextmanager
+def profile(stage: str):
+    """Times a block and the database work done while it ran.
+
+    Query totals are process wide, so concurrent work on other threads is
+    included in the figures.
+    """
+    result = Profile(stage)
+    count, total = query_seconds.totals()
+    start = time.perf_counter()
+    try:
+        yield result
+    finally:
+        result.seconds = time.perf_counter() - start
+        after_count, after_total = query_seconds.totals()
+        result.queries = after_count - count
+        result.query_seconds = after_total - total
+        stage_seconds.observe(result.seconds, stage)
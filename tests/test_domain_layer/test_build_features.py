@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+# -*- coding:utf-8 -*-
+# =========================================================================== #
+# Project  : Drug Approval Analytics                                          #
+# Version  : 0.1.0                                                            #
+# File     : \tests\test_domain_layer\test_build_features.py                  #
+# Language : Python 3.9.5                                                     #
+# --------------------------------------------------------------------------  #
+# Author   : John James                                                       #
+# Company  : nov8.ai                                                          #
+# Email    : john.james@nov8.ai                                               #
+# URL      : https://github.com/john-james-sf/drug-approval-analytics         #
+# --------------------------------------------------------------------------  #
+# Created  : Sunday, October 18th 2026, 9:41:17 am                            #
+# Modified : Sunday, October 18th 2026, 9:41:17 am                            #
+# Modifier : John James (john.james@nov8.ai)                                  #
+# --------------------------------------------------------------------------- #
+# License  : BSD 3-clause "New" or "Revised" License                          #
+# Copyright: (c) 2021 nov8.ai                                                 #
+# =========================================================================== #
+import pytest
+import logging
+
+import numpy as np
+import pandas as pd
+
+from src.domain.features.build_features import FeatureEngine, FeatureSource
+from src.domain.features.build_features import FeatureTransform
+from tests.test_utils.debugging import announce
+logger = logging.getLogger(__name__)
+
+
+class CountingLoader:
+    """Returns a fixed study table and counts the loads."""
+
+    def __init__(self, data: pd.DataFrame) -> None:
+        self._data = data
+        self.calls = []
+
+    def __call__(self, columns: list) -> pd.DataFrame:
+        self.calls.append(list(columns))
+        return self._data[['nct_id'] + list(columns)]
+
+
+@pytest.fixture
+def engine():
+    studies = pd.DataFrame({'nct_id': ['NCT01', 'NCT02', 'NCT03'],
+                            'enrollment': [100, 20, 0],
+                            'number_of_arms': [2, 1, 4],
+                            'phase': ['Phase 2', 'Phase 3', 'Phase 2']})
+    loader = CountingLoader(studies)
+    engine = FeatureEngine()
+    engine.add_source(FeatureSource(
+        name='studies', columns=['enrollment', 'number_of_arms', 'phase'],
+        loader=loader))
+    engine.add_transform(FeatureTransform(
+        name='log_enrollment', inputs=['enrollment'],
+        outputs=['log_enrollment'], func=np.log1p))
+    engine.add_transform(FeatureTransform(
+        name='per_arm', inputs=['log_enrollment', 'number_of_arms'],
+        outputs=['log_enrollment_per_arm'], func=lambda e, a: e / a))
+    engine.add_transform(FeatureTransform(
+        name='is_phase_3', inputs=['phase'], outputs=['is_phase_3'],
+        func=lambda p: p.eq('Phase 3')))
+    return engine, loader
+
+
+@pytest.mark.features
+class FeatureEngineTests:
+
+    @announce
+    def test_compile_only_requested_path(self, engine):
+        engine, loader = engine
+        plan = engine.compile(['log_enrollment_per_arm'])
+        assert plan.sources == {'studies': ['enrollment', 'number_of_arms']}
+        assert [t.name for t in plan.transforms] == [
+            'log_enrollment', 'per_arm']
+        assert loader.calls == []
+
+    @announce
+    def test_build(self, engine):
+        engine, loader = engine
+        df = engine.build(['log_enrollment_per_arm', 'is_phase_3'])
+        assert list(df.columns) == ['log_enrollment_per_arm', 'is_phase_3']
+        assert df.loc['NCT01', 'log_enrollment_per_arm'] == \
+            pytest.approx(np.log1p(100) / 2)
+        assert df['is_phase_3'].tolist() == [False, True, False]
+        assert len(loader.calls) == 1
+
+    @announce
+    def test_intermediates_are_shared(self, engine):
+        engine, loader = engine
+        engine.build(['log_enrollment_per_arm'])
+        plan = engine.compile(['log_enrollment', 'log_enrollment_per_arm'])
+        assert plan.sources == {}
+        assert plan.transforms == []
+
+    @announce
+    def test_cycle_and_unknown_columns(self, engine):
+        engine, loader = engine
+        engine.add_transform(FeatureTransform(
+            name='a', inputs=['b'], outputs=['a'], func=lambda b: b))
+        engine.add_transform(FeatureTransform(
+            name='b', inputs=['a'], outputs=['b'], func=lambda a: a))
+        with pytest.raises(ValueError):
+            engine.compile(['a'])
+        with pytest.raises(KeyError):
+            engine.compile(['unknown'])
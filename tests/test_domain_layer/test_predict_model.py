@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+# -*- coding:utf-8 -*-
+# =========================================================================== #
+# Project  : Drug Approval Analytics                                          #
+# Version  : 0.1.0                                                            #
+# File     : \tests\test_domain_layer\test_predict_model.py                   #
+# Language : Python 3.9.5                                                     #
+# --------------------------------------------------------------------------  #
+# Author   : John James                                                       #
+# Company  : nov8.ai                                                          #
+# Email    : john.james@nov8.ai                                               #
+# URL      : https://github.com/john-james-sf/drug-approval-analytics         #
+# --------------------------------------------------------------------------  #
+# Created  : Sunday, October 18th 2026, 2:03:19 pm                            #
+# Modified : Sunday, October 18th 2026, 2:03:19 pm                            #
+# Modifier : John James (john.james@nov8.ai)                                  #
+# --------------------------------------------------------------------------- #
+# License  : BSD 3-clause "New" or "Revised" License                          #
+# Copyright: (c) 2021 nov8.ai                                                 #
+# =========================================================================== #
+import pytest
+from datetime import date
+import logging
+import os
+import pickle
+
+import numpy as np
+import pandas as pd
+
+from src.domain.features.store import FeatureStore
+from src.domain.models.predict_model import Predictor, load_model
+from tests.test_utils.debugging import announce
+logger = logging.getLogger(__name__)
+
+
+@pytest.fixture
+def predictor(tmp_path):
+    from sklearn.linear_model import LogisticRegression
+
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(200, 2))
+    y = (X[:, 0] > 0).astype(int)
+    uri = str(tmp_path / 'model.pkl')
+    with open(uri, 'wb') as f:
+        pickle.dump(LogisticRegression().fit(X, y), f)
+    return Predictor(uri, features=['a', 'b'])
+
+
+@pytest.mark.prediction
+class PredictorTests:
+
+    @announce
+    def test_model_cache(self, predictor):
+        assert load_model(predictor._model_uri) is predictor.model
+
+    @announce
+    def test_predict_one_matches_batch(self, predictor):
+        df = pd.DataFrame({'nct_id': ['NCT01', 'NCT02'],
+                           'a': [2.0, -2.0], 'b': [0.0, 1.0]})
+        batch = predictor.predict_batch(df)
+        assert batch['prediction'].iloc[0] > 0.5 > batch['prediction'].iloc[1]
+        assert predictor.predict_one({'a': 2.0, 'b': 0.0}) == \
+            pytest.approx(batch['prediction'].iloc[0])
+
+    @announce
+    def test_score_store(self, predictor, tmp_path):
+        store = FeatureStore(root=str(tmp_path / 'features'))
+        store.write('design', pd.DataFrame({
+            'nct_id': ["NCT{:02d}".format(i) for i in range(25)],
+            'a': np.linspace(-1, 1, 25), 'b': np.zeros(25)}),
+            snapshot=date(2021, 1, 1))
+        filepath = str(tmp_path / 'predictions.parquet')
+        n = predictor.score(store.iter_batches('design', ['a', 'b'],
+                                               batch_size=10), filepath)
+        assert n == 25
+        assert os.path.exists(filepath)
+        assert pd.read_parquet(filepath).shape == (25, 3)
+
+    @announce
+    def test_failed_score_leaves_no_file(self, predictor, tmp_path):
+        def batches():
+            yield pd.DataFrame({'a': [1.0], 'b': [0.0]},
+                               index=pd.Index(['NCT01'], name='nct_id'))
+            raise IOError("Lost the feature store.")
+
+        filepath = str(tmp_path / 'predictions.parquet')
+        with pytest.raises(IOError):
+            predictor.score(batches(), filepath)
+        assert os.listdir(str(tmp_path)) == ['model.pkl']
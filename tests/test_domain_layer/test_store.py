@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+# -*- coding:utf-8 -*-
+# =========================================================================== #
+# Project  : Drug Approval Analytics                                          #
+# Version  : 0.1.0                                                            #
+# File     : \tests\test_domain_layer\test_store.py                           #
+# Language : Python 3.9.5                                                     #
+# --------------------------------------------------------------------------  #
+# Author   : John James                                                       #
+# Company  : nov8.ai                                                          #
+# Email    : john.james@nov8.ai                                               #
+# URL      : https://github.com/john-james-sf/drug-approval-analytics         #
+# --------------------------------------------------------------------------  #
+# Created  : Sunday, October 18th 2026, 11:32:45 am                           #
+# Modified : Sunday, October 18th 2026, 11:32:45 am                           #
+# Modifier : John James (john.james@nov8.ai)                                  #
+# --------------------------------------------------------------------------- #
+# License  : BSD 3-clause "New" or "Revised" License                          #
+# Copyright: (c) 2021 nov8.ai                                                 #
+# =========================================================================== #
+import pytest
+from datetime import date
+import logging
+
+import pandas as pd
+
+from src.domain.features.store import FeatureStore
+from tests.test_utils.debugging import announce
+logger = logging.getLogger(__name__)
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = FeatureStore(root=str(tmp_path))
+    store.write('design', pd.DataFrame({'nct_id': ['NCT02', 'NCT01'],
+                                        'n_arms': [1, 2]}),
+                snapshot=date(2021, 1, 1))
+    store.write('design', pd.DataFrame({'nct_id': ['NCT01', 'NCT02'],
+                                        'n_arms': [3, 4]}),
+                snapshot=date(2021, 6, 1))
+    return store
+
+
+@pytest.mark.featurestore
+class FeatureStoreTests:
+
+    @announce
+    def test_snapshots(self, store):
+        assert store.groups() == ['design']
+        assert store.snapshots('design') == [date(2021, 1, 1),
+                                             date(2021, 6, 1)]
+
+    @announce
+    def test_read_as_of(self, store):
+        df = store.read('design', nct_ids=['NCT01'], as_of=date(2021, 3, 1))
+        assert df.loc['NCT01', 'n_arms'] == 2
+        df = store.read('design', nct_ids=['NCT01'])
+        assert df.loc['NCT01', 'n_arms'] == 3
+        assert store.lookup('design', 'NCT02', date(2021, 1, 1))['n_arms'] \
+            == 1
+        with pytest.raises(LookupError):
+            store.read('design', as_of=date(2020, 1, 1))
+
+    @announce
+    def test_results_do_not_share_cached_snapshot(self, store):
+        df = store.read('design')
+        df['n_arms'] = 0
+        row = store.lookup('design', 'NCT01')
+        row['n_arms'] = 0
+        assert store.read('design')['n_arms'].tolist() == [3, 4]
+
+    @announce
+    def test_point_in_time(self, store):
+        events = pd.DataFrame({'nct_id': ['NCT01', 'NCT01', 'NCT02'],
+                               'as_of': ['2020-12-01', '2021-02-01',
+                                         '2021-07-01']})
+        df = store.point_in_time('design', events)
+        assert df['nct_id'].tolist() == ['NCT01', 'NCT01', 'NCT02']
+        assert pd.isna(df['n_arms'].iloc[0])
+        assert df['n_arms'].iloc[1:].tolist() == [2, 4]
+
+    @announce
+    def test_point_in_time_before_first_snapshot(self, store):
+        events = pd.DataFrame({'nct_id': ['NCT01'], 'as_of': ['2020-12-01']})
+        df = store.point_in_time('design', events)
+        assert list(df.columns) == ['nct_id', 'as_of', 'n_arms']
+        assert df['n_arms'].isna().all()
+        df = store.point_in_time('design', events, features=['n_arms'])
+        assert list(df.columns) == ['nct_id', 'as_of', 'n_arms']
+
+    @announce
+    def test_point_in_time_named_index(self, store):
+        events = pd.DataFrame({'nct_id': ['NCT02', 'NCT01'],
+                               'as_of': ['2021-07-01', '2021-02-01']},
+                              index=pd.Index([7, 3], name='row'))
+        df = store.point_in_time('design', events)
+        assert df.index.tolist() == [7, 3] and df.index.name == 'row'
+        assert df['n_arms'].tolist() == [4, 2]
+
+    @announce
+    def test_point_in_time_key_index(self, store):
+        events = pd.DataFrame({'as_of': ['2021-07-01', '2021-02-01']},
+                              index=pd.Index(['NCT02', 'NCT01'],
+                                             name='nct_id'))
+        df = store.point_in_time('design', events)
+        assert df.index.tolist() == ['NCT02', 'NCT01']
+        assert list(df.columns) == ['as_of', 'n_arms']
+        assert df['n_arms'].tolist() == [4, 2]
+        events['nct_id'] = events.index
+        df = store.point_in_time('design', events)
+        assert df['n_arms'].tolist() == [4, 2]
+
+
+class MetabaseDAO:
+    """Records metabase writes in memory."""
+
+    def __init__(self):
+        self.datasets = []
+        self.features = []
+
+    def read(self, name, columns=None, filter_key=None, filter_value=None,
+             schema='public', **kwargs):
+        if name == 'dataset':
+            rows = [d for d in self.datasets if d[filter_key] == filter_value]
+            return pd.DataFrame(rows, columns=['id', 'uri', 'version'])
+        return pd.DataFrame({'name': self.features})
+
+    def create(self, name, columns, values, schema='public'):
+        row = dict(zip(columns, values))
+        if name == 'dataset':
+            row['id'] = str(len(self.datasets))
+            self.datasets.append(row)
+        else:
+            self.features.append(row['name'])
+
+    def update(self, name, column, value, filter_key, filter_value,
+               schema='public'):
+        for row in self.datasets:
+            if row[filter_key] == filter_value:
+                row[column] = value
+
+
+@pytest.mark.featurestore
+class FeatureStoreRegistrationTests:
+
+    @announce
+    def test_rewrite_updates_dataset(self, tmp_path):
+        dao = MetabaseDAO()
+        store = FeatureStore(root=str(tmp_path), dao=dao)
+        df = pd.DataFrame({'nct_id': ['NCT01'], 'n_arms': [1]})
+        store.write('design', df, snapshot=date(2021, 1, 1))
+        store.write('design', df, snapshot=date(2021, 1, 1),
+                    description='Corrected')
+        assert len(dao.datasets) == 1
+        assert dao.datasets[0]['description'] == 'Corrected'
+        assert dao.features == ['n_arms']
+
+    @announce
+    def test_names_validated_before_write(self, tmp_path):
+        store = FeatureStore(root=str(tmp_path), dao=MetabaseDAO())
+        df = pd.DataFrame({'nct_id': ['NCT01'], 'n': [1]})
+        with pytest.raises(ValueError):
+            store.write('intervention_design', df)
+        with pytest.raises(ValueError):
+            store.write('design', df.rename(columns={'n': 'n' * 25}))
+        assert store.groups() == []
@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+# -*- coding:utf-8 -*-
+# =========================================================================== #
+# Project  : Drug Approval Analytics                                          #
+# Version  : 0.1.0                                                            #
+# File     : \tests\test_domain_layer\test_study_features.py                  #
+# Language : Python 3.9.5                                                     #
+# --------------------------------------------------------------------------  #
+# Author   : John James                                                       #
+# Company  : nov8.ai                                                          #
+# Email    : john.james@nov8.ai                                               #
+# URL      : https://github.com/john-james-sf/drug-approval-analytics         #
+# --------------------------------------------------------------------------  #
+# Created  : Monday, October 19th 2026, 12:02:14 pm                           #
+# Modified : Monday, October 19th 2026, 12:02:14 pm                           #
+# Modifier : John James (john.james@nov8.ai)                                  #
+# --------------------------------------------------------------------------- #
+# License  : BSD 3-clause "New" or "Revised" License                          #
+# Copyright: (c) 2021 nov8.ai                                                 #
+# =========================================================================== #
+import pytest
+
+from src.domain.features.study_features import StudyFeatureBuilder
+from src.infrastructure.data.database import Response
+from src.infrastructure.data.sequel import Aggregate
+from tests.test_infrastructure_layer.test_sequel import render
+from tests.test_utils.debugging import announce
+# --------------------------------------------------------------------------- #
+
+
+class Database:
+    """Records the sequel executed and answers with one study."""
+
+    def __init__(self):
+        self.sequels = []
+
+    def execute(self, sequel, connection):
+        self.sequels.append(sequel)
+        return Response(fetchall=[('NCT01', 3)],
+                        description=[('nct_id',), ('n_facilities',)])
+
+
+@pytest.mark.features
+class StudyFeatureBuilderTests:
+
+    @announce
+    def test_build_selected_features(self):
+        builder = StudyFeatureBuilder(connection=None)
+        builder._database = Database()
+        builder.add(Aggregate('n_facilities', 'facilities', 'count'))
+        builder.add(Aggregate('n_conditions', 'conditions', 'count'))
+        with pytest.raises(ValueError):
+            builder.add(Aggregate('n_facilities', 'facilities', 'count'))
+        df = builder.build(['n_facilities'])
+        assert list(df.columns) == ['nct_id', 'n_facilities']
+        text = render(builder._database.sequels[0].cmd)
+        assert '"facilities"' in text and '"conditions"' not in text
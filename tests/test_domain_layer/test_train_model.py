@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+# -*- coding:utf-8 -*-
+# =========================================================================== #
+# Project  : Drug Approval Analytics                                          #
+# Version  : 0.1.0                                                            #
+# File     : \tests\test_domain_layer\test_train_model.py                     #
+# Language : Python 3.9.5                                                     #
+# --------------------------------------------------------------------------  #
+# Author   : John James                                                       #
+# Company  : nov8.ai                                                          #
+# Email    : john.james@nov8.ai                                               #
+# URL      : https://github.com/john-james-sf/drug-approval-analytics         #
+# --------------------------------------------------------------------------  #
+# Created  : Sunday, October 18th 2026, 12:58:31 pm                           #
+# Modified : Sunday, October 18th 2026, 12:58:31 pm                           #
+# Modifier : John James (john.james@nov8.ai)                                  #
+# --------------------------------------------------------------------------- #
+# License  : BSD 3-clause "New" or "Revised" License                          #
+# Copyright: (c) 2021 nov8.ai                                                 #
+# =========================================================================== #
+import pytest
+import logging
+import os
+
+import numpy as np
+
+from src.domain.models.train_model import ModelSpec, TrainingRunner
+from tests.test_utils.debugging import announce
+logger = logging.getLogger(__name__)
+
+
+@pytest.mark.training
+class TrainingRunnerTests:
+
+    @announce
+    def test_fit(self, tmp_path):
+        from sklearn.linear_model import LogisticRegression
+        from sklearn.tree import DecisionTreeClassifier
+
+        rng = np.random.default_rng(0)
+        X = rng.normal(size=(300, 4))
+        y = (X[:, 0] + rng.normal(size=300) > 0).astype(int)
+        specs = [ModelSpec('logit', LogisticRegression(), {'C': [0.1, 1.0]}),
+                 ModelSpec('tree', DecisionTreeClassifier(),
+                           {'max_depth': [2, 3], 'min_samples_leaf': [1, 5]})]
+        runner = TrainingRunner(specs, cv=3, n_jobs=2, random_state=1,
+                                model_dir=str(tmp_path))
+        results = runner.fit(X, y)
+        assert results.shape[0] == 6
+        assert results['mean_score'].between(0, 1).all()
+        assert runner.best_params in results['params'].tolist()
+        assert os.path.exists(runner.model_uri)
+        assert runner.best_model.predict(X).shape == (300,)
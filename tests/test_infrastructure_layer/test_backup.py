@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+# -*- coding:utf-8 -*-
+# =========================================================================== #
+# Project  : Drug Approval Analytics                                          #
+# Version  : 0.1.0                                                            #
+# File     : \tests\test_infrastructure_layer\test_backup.py                  #
+# Language : Python 3.9.5                                                     #
+# --------------------------------------------------------------------------  #
+# Author   : John James                                                       #
+# Company  : nov8.ai                                                          #
+# Email    : john.james@nov8.ai                                               #
+# URL      : https://github.com/john-james-sf/drug-approval-analytics         #
+# --------------------------------------------------------------------------  #
+# Created  : Monday, October 19th 2026, 6:03:27 am                            #
+# Modified : Monday, October 19th 2026, 6:03:27 am                            #
+# Modifier : John James (john.james@nov8.ai)                                  #
+# --------------------------------------------------------------------------- #
+# License  : BSD 3-clause "New" or "Revised" License                          #
+# Copyright: (c) 2021 nov8.ai                                                 #
+# =========================================================================== #
+import stat
+
+import pytest
+
+from src.infrastructure.data.backup import PGBackup, BackupError
+from tests.test_utils.debugging import announce
+# --------------------------------------------------------------------------- #
+CREDENTIALS = {'user': 'rx2m', 'password': 's3cret', 'host': 'localhost',
+               'port': 5432, 'dbname': 'postgres'}
+SCRIPT = """#!/bin/sh
+[ "$PGPASSWORD" = "s3cret" ] || exit 3
+mkdir -p "$OUT"
+printf 'data' > "$OUT/toc.dat"
+echo 'pg_dump: dumping contents of table "ctgov.studies"' >&2
+echo 'pg_dump: dumping contents of table "ctgov.facilities"' >&2
+exit ${CODE:-0}
+"""
+
+
+@pytest.mark.backup
+class BackupCommandTests:
+
+    @announce
+    def test_dump_command(self):
+        command = PGBackup(CREDENTIALS, jobs=8).dump_command(
+            'aact', 'data/aact', tables=['ctgov.studies'], compress=5)
+        assert command[0] == 'pg_dump'
+        assert '--format=directory' in command
+        assert '--jobs=8' in command
+        assert '--compress=5' in command
+        assert command[command.index('--table') + 1] == 'ctgov.studies'
+        assert command[command.index('--dbname') + 1] == 'aact'
+        assert not any('s3cret' in part for part in command)
+
+    @announce
+    def test_restore_command(self):
+        command = PGBackup(CREDENTIALS, jobs=2).restore_command(
+            'aact', 'data/aact', tables=['ctgov.studies', 'ctgov.sponsors'],
+            clean=True)
+        assert command[0] == 'pg_restore'
+        assert command[-1] == 'data/aact'
+        assert '--jobs=2' in command
+        assert '--clean' in command and '--if-exists' in command
+        tables = [command[i + 1] for i, part in enumerate(command)
+                  if part == '--table']
+        assert tables == ['studies', 'sponsors']
+        assert command.count('--schema') == 1
+        assert not any('s3cret' in part for part in command)
+
+    @announce
+    def test_run_streams_progress(self, tmp_path, monkeypatch):
+        binary = tmp_path / 'pg_dump'
+        binary.write_text(SCRIPT)
+        binary.chmod(binary.stat().st_mode | stat.S_IEXEC)
+        out = tmp_path / 'dump'
+        monkeypatch.setenv('OUT', str(out))
+        lines = []
+        backup = PGBackup(CREDENTIALS, bindir=str(tmp_path),
+                          progress=lines.append)
+        result = backup.dump('aact', str(out))
+        assert result.tables == 2
+        assert result.bytes == 4
+        assert len(lines) == 2
+        monkeypatch.setenv('CODE', '1')
+        with pytest.raises(BackupError):
+            backup.dump('aact', str(out))
+
+    @announce
+    def test_script_with_verbose_stderr(self, tmp_path, monkeypatch):
+        # More stderr than a pipe buffer holds, before any stdout.
+        binary = tmp_path / 'pg_restore'
+        binary.write_text("#!/bin/sh\n"
+                          "head -c 200000 /dev/zero | tr '\\0' 'w' >&2\n"
+                          "echo 'pg_restore: error: bad entry' >&2\n"
+                          "echo 'CREATE TABLE ctgov.studies ();'\n"
+                          "exit ${CODE:-0}\n")
+        binary.chmod(binary.stat().st_mode | stat.S_IEXEC)
+        backup = PGBackup(CREDENTIALS, bindir=str(tmp_path))
+        with backup.script('data/aact') as stdout:
+            assert stdout.readline() == b'CREATE TABLE ctgov.studies ();\n'
+        monkeypatch.setenv('CODE', '1')
+        with pytest.raises(BackupError, match='bad entry'):
+            with backup.script('data/aact') as stdout:
+                stdout.read()
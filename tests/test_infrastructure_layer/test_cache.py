@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+# -*- coding:utf-8 -*-
+# =========================================================================== #
+# Project  : Drug Approval Analytics                                          #
+# Version  : 0.1.0                                                            #
+# File     : \tests\test_infrastructure_layer\test_cache.py                   #
+# Language : Python 3.9.5                                                     #
+# --------------------------------------------------------------------------  #
+# Author   : John James                                                       #
+# Company  : nov8.ai                                                          #
+# Email    : john.james@nov8.ai                                               #
+# URL      : https://github.com/john-james-sf/drug-approval-analytics         #
+# --------------------------------------------------------------------------  #
+# Created  : Monday, October 19th 2026, 11:06:40 am                           #
+# Modified : Monday, October 19th 2026, 11:06:40 am                           #
+# Modifier : John James (john.james@nov8.ai)                                  #
+# --------------------------------------------------------------------------- #
+# License  : BSD 3-clause "New" or "Revised" License                          #
+# Copyright: (c) 2021 nov8.ai                                                 #
+# =========================================================================== #
+import os
+import time
+
+import pytest
+
+from src.infrastructure.data.access import PGDao
+from src.infrastructure.data.cache import ResultCache, hashable
+from src.infrastructure.data.database import Response
+from tests.test_utils.debugging import announce
+# --------------------------------------------------------------------------- #
+
+
+class Connection:
+    dbname = 'test'
+    autocommit = True
+
+
+class Command:
+    """Counts reads and answers them with two rows."""
+
+    def __init__(self):
+        self.reads = 0
+
+    def execute(self, sequel, connection):
+        if sequel.name == 'select':
+            self.reads += 1
+            return Response(fetchall=[('NCT1', 1), ('NCT2', 2)],
+                            description=[('nct_id',), ('phase',)])
+        return Response(rowcount=1)
+
+
+def dao(cache):
+    dao = PGDao(connection=Connection(), cache=cache)
+    dao._command = Command()
+    return dao
+
+
+@pytest.mark.cache
+class ResultCacheTests:
+
+    @announce
+    def test_hashable(self):
+        key = hashable((['a', 'b'], {'x': [1]}, {2, 1}))
+        assert key == (('a', 'b'), (('x', (1,)),), (1, 2))
+        hash(key)
+
+    @announce
+    def test_repeated_read_from_memory(self):
+        access = dao(ResultCache())
+        first = access.read('studies', schema='ctgov',
+                            filter_key='nct_id', filter_value=['NCT1'])
+        first['phase'] = 0
+        second = access.read('studies', schema='ctgov',
+                             filter_key='nct_id', filter_value=['NCT1'])
+        assert access._command.reads == 1
+        assert list(second['phase']) == [1, 2]
+        access.read('studies', schema='ctgov', filter_key='nct_id',
+                    filter_value=['NCT2'])
+        access.read('studies', schema='ctgov', cache=False)
+        assert access._command.reads == 3
+
+    @announce
+    def test_writes_invalidate_table(self):
+        access = dao(ResultCache())
+        access.read('studies', schema='ctgov')
+        access.read('sponsors', schema='ctgov')
+        access.delete('studies', 'nct_id', 'NCT1', schema='ctgov')
+        access.read('studies', schema='ctgov')
+        access.read('sponsors', schema='ctgov')
+        assert access._command.reads == 3
+
+    @announce
+    def test_lru_bounded_by_bytes(self):
+        cache = ResultCache()
+        access = dao(cache)
+        access.read('studies', schema='ctgov')
+        cache.max_bytes = cache.nbytes * 2
+        access.read('sponsors', schema='ctgov')
+        access.read('studies', schema='ctgov')
+        access.read('outcomes', schema='ctgov')
+        assert len(cache) == 2
+        assert cache.nbytes <= cache.max_bytes
+        access.read('studies', schema='ctgov')
+        assert access._command.reads == 3
+
+    @announce
+    def test_disk_tier(self, tmp_path):
+        access = dao(ResultCache(directory=str(tmp_path)))
+        access.read('studies', schema='ctgov')
+        again = dao(ResultCache(directory=str(tmp_path)))
+        df = again.read('studies', schema='ctgov')
+        assert again._command.reads == 0
+        assert list(df['nct_id']) == ['NCT1', 'NCT2']
+        again.update('studies', 'phase', 3, 'nct_id', 'NCT1',
+                     schema='ctgov')
+        assert not list(tmp_path.iterdir())
+
+    @announce
+    def test_snapshot_swap_invalidates(self):
+        tokens = {'ctgov': 'a'}
+        cache = ResultCache(token=lambda connection, schema: tokens[schema],
+                            check_interval=0)
+        access = dao(cache)
+        access.read('studies', schema='ctgov')
+        access.read('studies', schema='ctgov')
+        tokens['ctgov'] = 'b'
+        access.read('studies', schema='ctgov')
+        assert access._command.reads == 2
+        assert len(cache) == 1
+
+    @announce
+    def test_untokenized_entries_expire(self, tmp_path):
+        cache = ResultCache(directory=str(tmp_path), ttl=60)
+        access = dao(cache)
+        access.read('datasource', schema='metabase')
+        access.read('datasource', schema='metabase')
+        assert access._command.reads == 1
+        for entry in cache._entries.values():
+            entry.created -= 120
+        old = time.time() - 120
+        for path in tmp_path.rglob('*.parquet'):
+            os.utime(path, (old, old))
+        access.read('datasource', schema='metabase')
+        assert access._command.reads == 2
+
+    @announce
+    def test_written_tables_dropped_at_transaction_end(self):
+        cache = ResultCache()
+        writer, reader = dao(cache), dao(cache)
+        writer._connection.autocommit = False
+        writer.update('datasource', 'version', 2, 'name', 'aact',
+                      schema='metabase')
+        # Read by another connection before the commit: the old row.
+        reader.read('datasource', schema='metabase')
+        writer.end_transaction()
+        reader.read('datasource', schema='metabase')
+        assert reader._command.reads == 2
+        writer.end_transaction()
+        reader.read('datasource', schema='metabase')
+        assert reader._command.reads == 2
+
+    @announce
+    def test_own_uncommitted_writes_not_cached(self):
+        cache = ResultCache()
+        access = dao(cache)
+        access._connection.autocommit = False
+        access.update('datasource', 'version', 2, 'name', 'aact',
+                      schema='metabase')
+        access.read('datasource', schema='metabase')
+        assert len(cache) == 0
+        access.end_transaction()
+        access.read('datasource', schema='metabase')
+        assert len(cache) == 1
+
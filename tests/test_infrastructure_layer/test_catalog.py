@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+# -*- coding:utf-8 -*-
+# =========================================================================== #
+# Project  : Drug Approval Analytics                                          #
+# Version  : 0.1.0                                                            #
+# File     : \tests\test_infrastructure_layer\test_catalog.py                 #
+# Language : Python 3.9.5                                                     #
+# --------------------------------------------------------------------------  #
+# Author   : John James                                                       #
+# Company  : nov8.ai                                                          #
+# Email    : john.james@nov8.ai                                               #
+# URL      : https://github.com/john-james-sf/drug-approval-analytics         #
+# --------------------------------------------------------------------------  #
+# Created  : Monday, October 19th 2026, 8:36:50 am                            #
+# Modified : Monday, October 19th 2026, 8:36:50 am                            #
+# Modifier : John James (john.james@nov8.ai)                                  #
+# --------------------------------------------------------------------------- #
+# License  : BSD 3-clause "New" or "Revised" License                          #
+# Copyright: (c) 2021 nov8.ai                                                 #
+# =========================================================================== #
+import pytest
+
+from src.infrastructure.data.catalog import Catalog
+from src.infrastructure.data.database import Database, Response
+from src.infrastructure.data.sequel import DatabaseSequel, Sequel
+from tests.test_utils.debugging import announce
+# --------------------------------------------------------------------------- #
+ROWS = {'schema_names': [('public',), ('Metabase',)],
+        'catalog': [('datasource', 'id'), ('datasource', 'name'),
+                    ('empty', None)],
+        'user_names': [('rx2m',)]}
+
+
+class Connection:
+    dbname = 'rx2m'
+
+
+class FakeDatabase(Database):
+    """Database answering catalog queries from ROWS."""
+
+    def __init__(self):
+        super(FakeDatabase, self).__init__()
+        self.queries = []
+
+    def execute(self, sequel, connection):
+        self.queries.append(sequel.name)
+        return Response(fetchall=ROWS.get(sequel.name, []))
+
+
+@pytest.fixture
+def catalog(monkeypatch):
+    catalog = Catalog()
+    monkeypatch.setattr('src.infrastructure.data.database.catalog', catalog)
+    return catalog
+
+
+@pytest.mark.catalog
+class CatalogTests:
+
+    @announce
+    def test_lookups_are_cached(self, catalog):
+        database, connection = FakeDatabase(), Connection()
+        for _ in range(3):
+            assert database.schema_exists('metabase', connection)
+            assert not database.schema_exists('ctgov', connection)
+            assert database.table_exists('datasource', connection, 'public')
+            assert database.table_exists('empty', connection, 'public')
+            assert database.column_exists('datasource', 'name', connection,
+                                          'public')
+            assert not database.column_exists('datasource', 'x', connection,
+                                              'public')
+            assert database.get_columns('datasource', connection,
+                                        'public') == [('id',), ('name',)]
+            assert database.user_exists('rx2m', connection)
+        assert database.queries == ['schema_names', 'catalog', 'user_names']
+        assert catalog.misses == 3
+
+    @announce
+    def test_ddl_invalidates(self, catalog):
+        database, connection = FakeDatabase(), Connection()
+        database.table_exists('datasource', connection, 'public')
+        catalog.observe(Sequel(name='select', description='', cmd=None),
+                        connection)
+        database.table_exists('datasource', connection, 'public')
+        assert database.queries == ['catalog']
+        catalog.observe(Sequel(name='ddl_table', description='', cmd=None),
+                        connection)
+        database.table_exists('datasource', connection, 'public')
+        assert database.queries == ['catalog', 'catalog']
+        database.user_exists('rx2m', connection)
+        catalog.observe(Sequel(name='create_user', description='',
+                               cmd=None), connection)
+        database.user_exists('rx2m', connection)
+        assert database.queries.count('user_names') == 2
+
+    @announce
+    def test_drop_database_invalidates(self, catalog):
+        database, connection = FakeDatabase(), Connection()
+        database.schema_exists('metabase', connection)
+        database.table_exists('datasource', connection, 'public')
+        catalog.observe(DatabaseSequel().delete('rx2m'), connection)
+        database.schema_exists('metabase', connection)
+        database.table_exists('datasource', connection, 'public')
+        assert database.queries == ['schema_names', 'catalog',
+                                    'schema_names', 'catalog']
+
+    @announce
+    def test_transactional_ddl_dropped_at_end(self, catalog):
+        database = FakeDatabase()
+        writer, reader = Connection(), Connection()
+        writer._connection = type('Raw', (), {'autocommit': False})()
+        catalog.observe(Sequel(name='ddl_table', description='', cmd=None),
+                        writer)
+        # Not cached while the DDL may yet be rolled back.
+        database.table_exists('datasource', reader, 'public')
+        database.table_exists('datasource', writer, 'public')
+        assert database.queries == ['catalog', 'catalog']
+        catalog.end_transaction(writer)
+        database.table_exists('datasource', reader, 'public')
+        database.table_exists('datasource', reader, 'public')
+        assert database.queries == ['catalog'] * 3
+
+    @announce
+    def test_disabled(self, catalog):
+        catalog.enabled = False
+        database, connection = FakeDatabase(), Connection()
+        database.schema_exists('public', connection)
+        database.schema_exists('public', connection)
+        assert database.queries == ['schema_names', 'schema_names']
+        assert catalog.misses == 0
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+# -*- coding:utf-8 -*-
+# =========================================================================== #
+# Project  : Drug Approval Analytics                                          #
+# Version  : 0.1.0                                                            #
+# File     : \tests\test_infrastructure_layer\test_columnar.py                #
+# Language : Python 3.9.5                                                     #
+# --------------------------------------------------------------------------  #
+# Author   : John James                                                       #
+# Company  : nov8.ai                                                          #
+# Email    : john.james@nov8.ai                                               #
+# URL      : https://github.com/john-james-sf/drug-approval-analytics         #
+# --------------------------------------------------------------------------  #
+# Created  : Monday, October 19th 2026, 7:21:44 am                            #
+# Modified : Monday, October 19th 2026, 7:21:44 am                            #
+# Modifier : John James (john.james@nov8.ai)                                  #
+# --------------------------------------------------------------------------- #
+# License  : BSD 3-clause "New" or "Revised" License                          #
+# Copyright: (c) 2021 nov8.ai                                                 #
+# =========================================================================== #
+import io
+
+import pytest
+
+from src.infrastructure.data import columnar
+from tests.test_utils.debugging import announce
+# --------------------------------------------------------------------------- #
+DESCRIPTION = [('nct_id', 1043), ('enrollment', 23), ('has_dmc', 16),
+               ('start_date', 1082), ('updated_at', 1184), ('zip', 25)]
+CSV = (b'NCT01,120,t,2020-01-31,2021-05-01 10:00:00+00,02139\n'
+       b'NCT02,,f,,2021-05-02 12:30:00.25+02,""\n')
+
+
+@pytest.mark.columnar
+class ColumnarTests:
+
+    @announce
+    def test_column_types(self):
+        types = columnar.column_types(DESCRIPTION)
+        assert types['enrollment'] == ('int32', 'Int32')
+        assert types['zip'] == columnar.STRING
+
+    @announce
+    def test_decode_arrow(self):
+        pytest.importorskip('pyarrow')
+        table = columnar.decode(io.BytesIO(CSV), DESCRIPTION, arrow=True)
+        assert table.column_names == [c[0] for c in DESCRIPTION]
+        assert str(table.schema.field('enrollment').type) == 'int32'
+        assert table.column('enrollment').to_pylist() == [120, None]
+        assert table.column('has_dmc').to_pylist() == [True, False]
+        assert table.column('zip').to_pylist() == ['02139', '']
+        assert table.column('start_date').null_count == 1
+        df = columnar.decode(io.BytesIO(CSV), DESCRIPTION)
+        assert len(df) == 2 and list(df.columns) == list(table.column_names)
+
+    @announce
+    def test_read_pandas(self):
+        df = columnar.read_pandas(io.BytesIO(CSV),
+                                  columnar.column_types(DESCRIPTION))
+        assert str(df['enrollment'].dtype) == 'Int32'
+        assert df['enrollment'].isna().tolist() == [False, True]
+        assert df['has_dmc'].tolist() == [True, False]
+        assert df['zip'].iloc[0] == '02139'
+        assert str(df['updated_at'].dt.tz) == 'UTC'
+
+    @announce
+    def test_decode_empty(self):
+        df = columnar.decode(io.BytesIO(b''), DESCRIPTION)
+        assert len(df) == 0
+        assert list(df.columns) == [c[0] for c in DESCRIPTION]
@@ -19,8 +19,9 @@
 # Copyright: (c) 2021 nov8.ai                                                 #
 # =========================================================================== #
 import pytest
+from configparser import ConfigParser
 
-from src.infrastructure.data.config import DBCredentials
+from src.infrastructure.data.config import Config, DBCredentials
 # --------------------------------------------------------------------------- #
 
 
@@ -53,3 +54,42 @@ class DBCredentialsTests:
         assert password == credentials['password'], "DBCredentials ValueError"
         assert port == int(credentials['port']), "DBCredentials ValueError"
         assert isinstance(dict(credentials), dict), "DBCredentials, TypeError"
+
+
+@pytest.mark.config
+class ConfigCacheTests:
+
+    def test_parse_once(self, tmp_path, monkeypatch):
+        filepath = str(tmp_path / "database.cfg")
+        credentials = DBCredentials(filepath)
+        credentials.create(user='j2', password='pwd', dbname='rx2m')
+
+        reads = []
+        original = ConfigParser.read
+
+        def read(self, *args, **kwargs):
+            reads.append(args)
+            return original(self, *args, **kwargs)
+
+        monkeypatch.setattr(ConfigParser, 'read', read)
+        config = Config(filepath)
+        for _ in range(5):
+            assert config.has_section('j2_rx2m')
+            assert config.get_config('j2_rx2m', 'user') == 'j2'
+        assert len(reads) <= 1, "Config file parsed more than once."
+
+    def test_invalidated_by_write(self, tmp_path):
+        filepath = str(tmp_path / "database.cfg")
+        config = Config(filepath)
+        config.set_section('j2_rx2m', {'user': 'j2'})
+        assert config.get_config('j2_rx2m', 'user') == 'j2'
+        config.set_config('j2_rx2m', 'user', 'j3')
+        assert config.get_config('j2_rx2m', 'user') == 'j3'
+
+    def test_lazy_credentials(self, tmp_path):
+        filepath = str(tmp_path / "database.cfg")
+        credentials = DBCredentials(filepath).get('j2', 'rx2m')
+        DBCredentials(filepath).create(user='j2', password='pwd',
+                                       dbname='rx2m', port=5433)
+        assert credentials.dbname == 'rx2m'
+        assert dict(credentials)['port'] == '5433'
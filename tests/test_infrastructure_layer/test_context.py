@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+# -*- coding:utf-8 -*-
+# =========================================================================== #
+# Project  : Drug Approval Analytics                                          #
+# Version  : 0.1.0                                                            #
+# File     : \tests\test_infrastructure_layer\test_context.py                 #
+# Language : Python 3.9.5                                                     #
+# --------------------------------------------------------------------------  #
+# Author   : John James                                                       #
+# Company  : nov8.ai                                                          #
+# Email    : john.james@nov8.ai                                               #
+# URL      : https://github.com/john-james-sf/drug-approval-analytics         #
+# --------------------------------------------------------------------------  #
+# Created  : Monday, October 19th 2026, 10:12:05 am                           #
+# Modified : Monday, October 19th 2026, 10:12:05 am                           #
+# Modifier : John James (john.james@nov8.ai)                                  #
+# --------------------------------------------------------------------------- #
+# License  : BSD 3-clause "New" or "Revised" License                          #
+# Copyright: (c) 2021 nov8.ai                                                 #
+# =========================================================================== #
+import pytest
+
+from src.infrastructure.data.context import Context, UnitOfWork
+from tests.test_utils.debugging import announce
+# --------------------------------------------------------------------------- #
+
+
+class Dao:
+    """Records the calls made to it."""
+
+    def __init__(self, connection=None):
+        self.connection = connection
+        self.calls = []
+
+    def __getattr__(self, attr):
+        def call(*args, **kwargs):
+            self.calls.append((attr, args, kwargs))
+        return call
+
+
+class Connection:
+
+    def __init__(self):
+        self.events = []
+        self.dbname = 'test'
+
+    def begin_transaction(self):
+        self.events.append('begin')
+
+    def commit(self):
+        self.events.append('commit')
+
+    def rollback(self):
+        self.events.append('rollback')
+
+
+@pytest.mark.context
+class ContextTests:
+
+    @announce
+    def test_dao_instantiated_once(self):
+        connection = Connection()
+        context = Context(connection, Dao)
+        assert context.dao is context.dao
+        assert context.dao.connection is connection
+
+    @announce
+    def test_coalesces_consecutive_writes(self):
+        dao = Dao()
+        unit = UnitOfWork(dao)
+        unit.create('event', ['a', 'b'], [1, 2])
+        unit.create('event', ['a', 'b'], [3, 4])
+        unit.create_many('event', ['a', 'b'], [[5, 6]])
+        unit.update('event', 'a', 9, 'id', 1)
+        unit.update('event', 'a', 8, 'id', 2)
+        unit.delete('event', 'id', 3)
+        unit.delete('event', 'id', [4, 5])
+        unit.create('event', ['a', 'b'], [7, 8])
+        assert unit.pending == 9
+        assert unit.flush() == 4
+        assert [c[0] for c in dao.calls] == [
+            'create_many', 'update_many', 'delete', 'create_many']
+        assert dao.calls[0][1][2] == [[1, 2], [3, 4], [5, 6]]
+        assert dao.calls[1][1][2] == [(9, 1), (8, 2)]
+        assert dao.calls[2][1][2] == [3, 4, 5]
+        assert unit.pending == 0
+
+    @announce
+    def test_different_shapes_not_coalesced(self):
+        dao = Dao()
+        unit = UnitOfWork(dao)
+        unit.update('event', 'a', 1, 'id', 1)
+        unit.update('event', 'b', 1, 'id', 2)
+        unit.upsert('source', ['name'], ['x'], 'name')
+        unit.flush()
+        assert [c[0] for c in dao.calls] == ['update', 'update', 'upsert']
+
+    @announce
+    def test_reads_flush_first(self):
+        dao = Dao()
+        unit = UnitOfWork(dao)
+        unit.upsert('source', ['name'], ['x'], 'name')
+        unit.upsert_many('source', ['name'], [['y']], 'name')
+        unit.read('source')
+        assert [c[0] for c in dao.calls] == ['upsert_many', 'read']
+
+    @announce
+    def test_save_and_rollback(self):
+        connection = Connection()
+        context = Context(connection, Dao, unit_of_work=True)
+        context.dao.create('event', ['a'], [1])
+        assert context.dao._dao.calls == []
+        context.save()
+        assert connection.events == ['begin', 'commit']
+        assert context.dao._dao.calls[0][0] == 'create_many'
+        context.dao.create('event', ['a'], [2])
+        context.rollback()
+        assert context.dao.pending == 0
+        assert connection.events[-1] == 'rollback'
+
+    @announce
+    def test_read_flushes_inside_transaction(self):
+        connection = Connection()
+        context = Context(connection, Dao, unit_of_work=True)
+        context.dao.create('event', ['a'], [1])
+        context.dao.read('event')
+        assert connection.events == ['begin']
+        assert [c[0] for c in context.dao._dao.calls] == ['create_many',
+                                                          'read']
+        context.dao.create('event', ['a'], [2])
+        context.dao.read('event')
+        context.rollback()
+        assert connection.events == ['begin', 'rollback']
+        context.dao.create('event', ['a'], [3])
+        context.save()
+        assert connection.events == ['begin', 'rollback', 'begin', 'commit']
+
+
+    @announce
+    def test_after_transaction_callbacks(self):
+        context = Context(Connection(), Dao)
+        ended = []
+        context.after_transaction(lambda: ended.append('now'))
+        assert ended == ['now']
+        context.begin_transaction()
+        context.after_transaction(lambda: ended.append('first'))
+        assert ended == ['now']
+        context.save()
+        context.save()
+        context.begin_transaction()
+        context.after_transaction(lambda: ended.append('second'))
+        context.rollback()
+        assert ended == ['now', 'first', 'second']
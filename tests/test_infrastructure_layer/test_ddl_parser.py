@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+# -*- coding:utf-8 -*-
+# =========================================================================== #
+# Project  : Drug Approval Analytics                                          #
+# Version  : 0.1.0                                                            #
+# File     : \tests\test_infrastructure_layer\test_ddl_parser.py              #
+# Language : Python 3.9.5                                                     #
+# --------------------------------------------------------------------------  #
+# Author   : John James                                                       #
+# Company  : nov8.ai                                                          #
+# Email    : john.james@nov8.ai                                               #
+# URL      : https://github.com/john-james-sf/drug-approval-analytics         #
+# --------------------------------------------------------------------------  #
+# Created  : Monday, October 19th 2026, 4:31:12 am                            #
+# Modified : Monday, October 19th 2026, 4:31:12 am                            #
+# Modifier : John James (john.james@nov8.ai)                                  #
+# --------------------------------------------------------------------------- #
+# License  : BSD 3-clause "New" or "Revised" License                          #
+# Copyright: (c) 2021 nov8.ai                                                 #
+# =========================================================================== #
+import pytest
+
+from src.infrastructure.data.ddl.parser import DDLGraph, split_statements
+from src.infrastructure.data.ddl.parser import TABLE, INDEX, CONSTRAINT
+from tests.test_utils.debugging import announce
+# --------------------------------------------------------------------------- #
+CREATE = "src/infrastructure/data/ddl/metabase/metadata_table_create.sql"
+DROP = "src/infrastructure/data/ddl/metabase/metadata_table_drop.sql"
+SCRIPT = """
+-- parent; child references it inline
+CREATE TABLE metabase.parent (id char(36) NOT NULL, PRIMARY KEY (id));
+CREATE TABLE metabase.child (
+id char(36) NOT NULL,
+parent_id char(36) REFERENCES metabase.parent(id),
+note varchar(24) DEFAULT 'metabase.x; y'
+);
+CREATE INDEX ON metabase.child (parent_id);
+ALTER TABLE metabase.parent ADD CONSTRAINT fk_p FOREIGN KEY (id)
+REFERENCES metabase.child(id);
+"""
+
+
+@pytest.mark.ddl
+class DDLParserTests:
+
+    @announce
+    def test_split(self):
+        statements = split_statements(SCRIPT)
+        assert len(statements) == 4
+        assert "'metabase.x; y'" in statements[1]
+
+    @announce
+    def test_classify_and_substitute(self):
+        graph = DDLGraph.parse(SCRIPT, schema='test', if_not_exists=True)
+        kinds = [s.kind for s in graph.statements]
+        assert kinds == [TABLE, TABLE, INDEX, CONSTRAINT]
+        child = graph.statements[1]
+        assert child.table == 'test.child'
+        assert child.references == ('test.parent',)
+        assert child.sql.startswith("CREATE TABLE IF NOT EXISTS test.child")
+        # String literals are not requalified.
+        assert "'metabase.x; y'" in child.sql
+        assert graph.statements[2].sql == (
+            'CREATE INDEX IF NOT EXISTS "child_parent_id_idx" ON '
+            'test.child (parent_id)')
+
+    @announce
+    def test_waves(self):
+        graph = DDLGraph.parse(SCRIPT)
+        assert graph.waves() == [['metabase.parent'], ['metabase.child']]
+        assert [s.kind for s in graph.units()['metabase.child']] == \
+            [TABLE, INDEX]
+        assert [s.name for s in graph.constraints] == ['fk_p']
+
+    @announce
+    def test_alter_joins_unit(self):
+        script = ("DROP TABLE s.a;"
+                  "CREATE TABLE s.a (id int, n int);"
+                  "ALTER TABLE s.a ALTER COLUMN n SET DEFAULT 0;"
+                  "CREATE INDEX ON s.a (n);"
+                  "ALTER TABLE s.b ALTER COLUMN n SET NOT NULL;")
+        graph = DDLGraph.parse(script)
+        assert [s.sql.split()[0] for s in graph.units()['s.a']] == \
+            ['CREATE', 'ALTER', 'CREATE']
+        assert [s.sql for s in graph.prologue()] == \
+            ['DROP TABLE s.a', 'ALTER TABLE s.b ALTER COLUMN n SET NOT NULL']
+
+    @announce
+    def test_metabase_ddl(self):
+        graph = DDLGraph.from_file(CREATE, schema='test')
+        assert len(graph.waves()) == 1
+        assert len(graph.tables) == 11
+        assert len(graph.constraints) == 8
+        assert not graph.prologue()
+        assert all('metabase' not in s.sql for s in graph.statements)
+        drop = DDLGraph.from_file(DROP, schema='test', if_exists=True)
+        assert all(s.sql.startswith('DROP TABLE IF EXISTS test.')
+                   for s in drop.statements)
+
+    @announce
+    def test_cycle(self):
+        script = ("CREATE TABLE s.a (id int REFERENCES s.b(id));"
+                  "CREATE TABLE s.b (id int REFERENCES s.a(id));")
+        with pytest.raises(ValueError):
+            DDLGraph.parse(script).waves()
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+# -*- coding:utf-8 -*-
+# =========================================================================== #
+# Project  : Drug Approval Analytics                                          #
+# Version  : 0.1.0                                                            #
+# File     : \tests\test_infrastructure_layer\test_dtypes.py                  #
+# Language : Python 3.9.5                                                     #
+# --------------------------------------------------------------------------  #
+# Author   : John James                                                       #
+# Company  : nov8.ai                                                          #
+# Email    : john.james@nov8.ai                                               #
+# URL      : https://github.com/john-james-sf/drug-approval-analytics         #
+# --------------------------------------------------------------------------  #
+# Created  : Monday, October 19th 2026, 7:58:09 am                            #
+# Modified : Monday, October 19th 2026, 7:58:09 am                            #
+# Modifier : John James (john.james@nov8.ai)                                  #
+# --------------------------------------------------------------------------- #
+# License  : BSD 3-clause "New" or "Revised" License                          #
+# Copyright: (c) 2021 nov8.ai                                                 #
+# =========================================================================== #
+import datetime
+
+import pandas as pd
+import pytest
+
+from src.infrastructure.data.dtypes import ColumnStats, compact_dtypes
+from src.infrastructure.data.dtypes import compact, memory
+from src.infrastructure.data.dtypes import AUTO_CATEGORY, AUTO_INTEGER
+from tests.test_utils.debugging import announce
+# --------------------------------------------------------------------------- #
+ROWS = 40000
+STATS = [('nct_id', 'character varying', -1.0, 0.0, ROWS),
+         ('phase', 'character varying', 6.0, 0.1, ROWS),
+         ('brief_title', 'text', None, None, ROWS),
+         ('enrollment', 'integer', 800.0, 0.02, ROWS),
+         ('number_of_arms', 'integer', 12.0, 0.0, ROWS),
+         ('start_date', 'date', 900.0, 0.0, ROWS),
+         ('has_dmc', 'boolean', 2.0, 0.0, ROWS),
+         ('latitude', 'numeric', 500.0, 0.0, ROWS)]
+
+
+def frame() -> pd.DataFrame:
+    phases = ['Phase 1', 'Phase 2', 'Phase 3', 'Phase 4', None, 'N/A']
+    return pd.DataFrame({
+        'nct_id': ['NCT%08d' % i for i in range(ROWS)],
+        'phase': [phases[i % 6] for i in range(ROWS)],
+        'brief_title': ['Study of drug %d' % (i % 50) for i in range(ROWS)],
+        'enrollment': [None if i % 50 == 0 else i % 800
+                       for i in range(ROWS)],
+        'number_of_arms': [i % 12 for i in range(ROWS)],
+        'start_date': [datetime.date(2020, 1, 1 + i % 28)
+                       for i in range(ROWS)],
+        'has_dmc': [i % 2 == 0 for i in range(ROWS)],
+        'latitude': [42.36 for i in range(ROWS)]})
+
+
+@pytest.mark.dtypes
+class DtypesTests:
+
+    @announce
+    def test_distinct(self):
+        assert ColumnStats('a', 'text', -0.5, 0.0, 1000).distinct == 500
+        assert ColumnStats('a', 'text', 12.0, 0.0, 1000).distinct == 12
+        assert ColumnStats('a', 'text', None, None, 1000).distinct is None
+
+    @announce
+    def test_compact_dtypes(self):
+        chosen = compact_dtypes(ColumnStats.from_rows(STATS))
+        assert 'nct_id' not in chosen
+        assert chosen['phase'] == 'category'
+        assert chosen['brief_title'] == AUTO_CATEGORY
+        assert chosen['enrollment'] == 'Int32'
+        assert chosen['number_of_arms'] == AUTO_INTEGER
+        assert chosen['start_date'] == 'datetime64[ns]'
+        assert chosen['has_dmc'] == 'bool'
+        assert 'latitude' not in chosen
+
+    @announce
+    def test_compact(self):
+        df = frame()
+        before = memory(df.drop(columns=['nct_id', 'brief_title']))
+        chosen = compact_dtypes(ColumnStats.from_rows(STATS))
+        compact(df, chosen, overrides={'brief_title': None})
+        assert str(df['phase'].dtype) == 'category'
+        assert df['phase'].isna().sum() == ROWS // 6 + (ROWS % 6 > 4)
+        assert str(df['brief_title'].dtype) != 'category'
+        assert str(df['enrollment'].dtype) == 'Int32'
+        assert str(df['number_of_arms'].dtype) == 'int8'
+        assert str(df['start_date'].dtype).startswith('datetime64')
+        assert memory(df.drop(columns=['nct_id', 'brief_title'])) * 3 < \
+            before
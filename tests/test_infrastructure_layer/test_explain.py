@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+# -*- coding:utf-8 -*-
+# =========================================================================== #
+# Project  : Drug Approval Analytics                                          #
+# Version  : 0.1.0                                                            #
+# File     : \tests\test_infrastructure_layer\test_explain.py                 #
+# Language : Python 3.9.5                                                     #
+# --------------------------------------------------------------------------  #
+# Author   : John James                                                       #
+# Company  : nov8.ai                                                          #
+# Email    : john.james@nov8.ai                                               #
+# URL      : https://github.com/john-james-sf/drug-approval-analytics         #
+# --------------------------------------------------------------------------  #
+# Created  : Monday, October 19th 2026, 2:41:19 am                            #
+# Modified : Monday, October 19th 2026, 2:41:19 am                            #
+# Modifier : John James (john.james@nov8.ai)                                  #
+# --------------------------------------------------------------------------- #
+# License  : BSD 3-clause "New" or "Revised" License                          #
+# Copyright: (c) 2021 nov8.ai                                                 #
+# =========================================================================== #
+import pytest
+
+from src.infrastructure.data.explain import Explainer, PlanRecord
+from src.infrastructure.data.explain import (
+    explainable, normalize, predicate_columns)
+from src.infrastructure.data.sequel import Sequel
+from tests.test_utils.debugging import announce
+# --------------------------------------------------------------------------- #
+PLAN = [{'Plan': {
+    'Node Type': 'Hash Join', 'Actual Rows': 10, 'Actual Loops': 1,
+    'Plans': [
+        {'Node Type': 'Seq Scan', 'Relation Name': 'facilities',
+         'Schema': 'ctgov', 'Actual Rows': 12, 'Actual Loops': 1,
+         'Rows Removed by Filter': 480000,
+         'Filter': "(((nct_id)::text = 'NCT01'::text) AND "
+                   "(start_date >= '2020-01-01'::date))"},
+        {'Node Type': 'Seq Scan', 'Relation Name': 'datasource',
+         'Schema': 'metabase', 'Actual Rows': 20, 'Actual Loops': 1},
+        {'Node Type': 'Index Scan', 'Relation Name': 'studies',
+         'Schema': 'ctgov', 'Actual Rows': 1, 'Actual Loops': 10}]}}]
+
+
+
+class Cursor:
+
+    def __init__(self, connection):
+        self._connection = connection
+
+    def execute(self, command, params=None):
+        self._connection.executed.append(command)
+        if command.startswith('EXPLAIN') and self._connection.fail:
+            self._connection.aborted = True
+            raise RuntimeError('canceling statement due to timeout')
+        if command.startswith('ROLLBACK TO'):
+            self._connection.aborted = False
+
+    def fetchone(self):
+        return [PLAN]
+
+    def close(self):
+        pass
+
+
+class Connection:
+
+    def __init__(self, autocommit=True, fail=False):
+        self.autocommit = autocommit
+        self.fail = fail
+        self.aborted = False
+        self.executed = []
+
+    def cursor(self):
+        return Cursor(self)
+
+
+def sequel(cmd):
+    return Sequel(name='select', description='', query_context='access',
+                  object_type='table', object_name='studies', cmd=cmd)
+
+
+@pytest.mark.explain
+class ExplainTests:
+
+    @announce
+    def test_normalize(self):
+        a = normalize("SELECT *  FROM x WHERE id = 'NCT01' AND n > 10;")
+        b = normalize("SELECT * FROM x\nWHERE id = 'NCT02' AND n > 3")
+        assert a == b == "SELECT * FROM x WHERE id = ? AND n > ?"
+        assert normalize("SELECT a FROM x WHERE b = %s;") == \
+            "SELECT a FROM x WHERE b = ?"
+
+    @announce
+    def test_predicate_columns(self):
+        condition = PLAN[0]['Plan']['Plans'][0]['Filter']
+        assert predicate_columns(condition) == ['nct_id', 'start_date']
+
+    @announce
+    def test_report_flags_large_seq_scans(self):
+        explainer = Explainer()
+        explainer._plans['abc'] = PlanRecord(
+            shape='abc', name='select', statement='SELECT ...',
+            duration_ms=900.0, plan=PLAN, captured='now')
+        findings = explainer.report(min_rows=1000)
+        assert len(findings) == 1
+        finding = findings[0]
+        assert finding['relation'] == 'ctgov.facilities'
+        assert finding['rows_scanned'] == 480012
+        assert finding['suggestion'] == \
+            "CREATE INDEX ON ctgov.facilities (nct_id, start_date);"
+        assert "suggest: CREATE INDEX" in explainer.render(min_rows=1000)
+
+    @announce
+    def test_disabled_by_default(self):
+        explainer = Explainer(threshold_ms=0)
+        explainer.observe(None, 10, None)
+        assert not explainer.plans
+
+    @announce
+    def test_save_load(self, tmp_path):
+        explainer = Explainer()
+        explainer._plans['abc'] = PlanRecord(
+            shape='abc', name='select', statement='SELECT ...',
+            duration_ms=900.0, plan=PLAN, captured='now')
+        filepath = str(tmp_path / 'plans.json')
+        explainer.save(filepath)
+        restored = Explainer()
+        restored.load(filepath)
+        assert restored.plans['abc'].plan == PLAN
+
+    @announce
+    def test_explainable(self):
+        assert explainable("SELECT * FROM ctgov.studies WHERE phase = %s")
+        assert explainable("WITH s AS (SELECT 1) SELECT * FROM s")
+        assert explainable('SELECT "updated" FROM t WHERE a = \'delete\'')
+        assert not explainable("WITH d AS (DELETE FROM t RETURNING id) "
+                               "SELECT * FROM d")
+        assert not explainable("SELECT nextval('studies_id_seq')")
+        assert not explainable("SELECT pg_terminate_backend(pid) "
+                               "FROM pg_stat_activity")
+        assert not explainable("SELECT * FROM t FOR UPDATE")
+        assert not explainable("SELECT * INTO copy FROM t")
+        assert not explainable("UPDATE t SET a = 1")
+
+    @announce
+    def test_data_modifying_cte_not_run(self):
+        explainer = Explainer(threshold_ms=0)
+        explainer.enable()
+        connection = Connection()
+        explainer.observe(sequel("WITH d AS (DELETE FROM t RETURNING id) "
+                                 "SELECT * FROM d"), 1, connection)
+        assert connection.executed == []
+        explainer.observe(sequel("SELECT * FROM t"), 1, connection)
+        assert connection.executed == ["EXPLAIN (ANALYZE, BUFFERS, FORMAT "
+                                       "JSON) SELECT * FROM t"]
+        assert len(explainer.plans) == 1
+
+    @announce
+    def test_sequel_without_command_skipped(self, caplog):
+        explainer = Explainer(threshold_ms=0)
+        explainer.enable()
+        connection = Connection()
+        explainer.observe(sequel(None), 1, connection)
+        assert connection.executed == []
+        assert not [r for r in caplog.records if r.levelname == 'WARNING']
+
+    @announce
+    def test_failure_in_transaction_rolled_back(self):
+        explainer = Explainer(threshold_ms=0)
+        explainer.enable()
+        connection = Connection(autocommit=False, fail=True)
+        explainer.observe(sequel("SELECT * FROM t"), 1, connection)
+        assert not connection.aborted
+        assert connection.executed[0] == "SAVEPOINT explain_capture"
+        assert connection.executed[-2:] == [
+            "ROLLBACK TO SAVEPOINT explain_capture",
+            "RELEASE SAVEPOINT explain_capture"]
+        assert not explainer.plans
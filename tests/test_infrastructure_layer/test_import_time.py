@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+# -*- coding:utf-8 -*-
+# =========================================================================== #
+# Project  : Drug Approval Analytics                                          #
+# Version  : 0.1.0                                                            #
+# File     : \tests\test_infrastructure_layer\test_import_time.py             #
+# Language : Python 3.9.5                                                     #
+# --------------------------------------------------------------------------  #
+# Author   : John James                                                       #
+# Company  : nov8.ai                                                          #
+# Email    : john.james@nov8.ai                                               #
+# URL      : https://github.com/john-james-sf/drug-approval-analytics         #
+# --------------------------------------------------------------------------  #
+# Created  : Sunday, October 18th 2026, 3:32:05 pm                            #
+# Modified : Sunday, October 18th 2026, 3:32:05 pm                            #
+# Modifier : John James (john.james@nov8.ai)                                  #
+# --------------------------------------------------------------------------- #
+# License  : BSD 3-clause "New" or "Revised" License                          #
+# Copyright: (c) 2021 nov8.ai                                                 #
+# =========================================================================== #
+import os
+import subprocess
+import sys
+
+import pytest
+
+# --------------------------------------------------------------------------- #
+MODULES = ['src.infrastructure.data.config',
+           'src.infrastructure.data.sequel',
+           'src.infrastructure.data.connect',
+           'src.infrastructure.data.database',
+           'src.infrastructure.data.access',
+           'src.infrastructure.data.context']
+HEAVY = ['pandas', 'numpy', 'sqlalchemy', 'psycopg2', 'bs4', 'requests']
+# Cumulative import time budget in microseconds, overridable per machine.
+BUDGET = int(os.environ.get('IMPORT_TIME_BUDGET_US', 250000))
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(
+    os.path.abspath(__file__))))
+
+
+def importtime(modules: list) -> tuple:
+    """Returns (total microseconds, imported names) via python -X importtime.
+
+    The total is the sum of cumulative times of the top level imports, which
+    excludes the interpreter start up cost.
+    """
+    code = "import " + ", ".join(modules)
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', code],
+                            cwd=ROOT, capture_output=True, text=True,
+                            check=True)
+    total, names = 0, set()
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        names.add(name.strip())
+        if name.strip() in modules and not name[1:].startswith(' '):
+            total += int(cumulative)
+    return total, names
+
+
+@pytest.mark.importtime
+class ImportTimeTests:
+
+    @pytest.mark.importtime
+    def test_heavy_dependencies_deferred(self):
+        _, names = importtime(MODULES)
+        loaded = [m for m in HEAVY if m in names]
+        assert not loaded, "Eagerly imported: {}".format(loaded)
+
+    @pytest.mark.importtime
+    def test_import_time_budget(self):
+        total, _ = importtime(MODULES)
+        assert total < BUDGET, \
+            "Import time {}us exceeds budget {}us".format(total, BUDGET)
+
+    @pytest.mark.importtime
+    def test_lazy_module_loads_on_access(self):
+        code = ("import sys; from src.utils.lazy import lazy_import; "
+                "m = lazy_import('json.tool'); "
+                "assert 'json.tool' not in sys.modules; m.main; "
+                "assert 'json.tool' in sys.modules")
+        subprocess.run([sys.executable, '-c', code], cwd=ROOT, check=True)
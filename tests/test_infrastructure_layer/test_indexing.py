@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+# -*- coding:utf-8 -*-
+# =========================================================================== #
+# Project  : Drug Approval Analytics                                          #
+# Version  : 0.1.0                                                            #
+# File     : \tests\test_infrastructure_layer\test_indexing.py                #
+# Language : Python 3.9.5                                                     #
+# --------------------------------------------------------------------------  #
+# Author   : John James                                                       #
+# Company  : nov8.ai                                                          #
+# Email    : john.james@nov8.ai                                               #
+# URL      : https://github.com/john-james-sf/drug-approval-analytics         #
+# --------------------------------------------------------------------------  #
+# Created  : Monday, October 19th 2026, 3:40:37 am                            #
+# Modified : Monday, October 19th 2026, 3:40:37 am                            #
+# Modifier : John James (john.james@nov8.ai)                                  #
+# --------------------------------------------------------------------------- #
+# License  : BSD 3-clause "New" or "Revised" License                          #
+# Copyright: (c) 2021 nov8.ai                                                 #
+# =========================================================================== #
+import pytest
+
+from src.infrastructure.data.indexing import statement_predicates
+from src.infrastructure.data.indexing import index_name
+from src.infrastructure.data.indexing import IndexBuilder, IndexProposal
+from src.infrastructure.data.database import Response
+from tests.test_utils.debugging import announce
+# --------------------------------------------------------------------------- #
+
+
+@pytest.mark.indexing
+class IndexAdvisorTests:
+
+    @announce
+    def test_equality_predicate(self):
+        statement = ('SELECT "name", "id" FROM "metabase"."datasource" '
+                     'WHERE "name" = %s;')
+        assert statement_predicates(statement) == \
+            ('metabase', 'datasource', ('name',))
+
+    @announce
+    def test_equality_before_range(self):
+        statement = ('SELECT * FROM "ctgov"."facilities" WHERE "start_date" '
+                     '>= %s AND "nct_id" = ANY(%s) ORDER BY "id" LIMIT 5;')
+        assert statement_predicates(statement) == \
+            ('ctgov', 'facilities', ('nct_id', 'start_date'))
+
+    @announce
+    def test_unfiltered(self):
+        assert statement_predicates('SELECT * FROM "ctgov"."studies";') \
+            is None
+        assert statement_predicates(
+            'SELECT * FROM "ctgov"."studies" WHERE "title" LIKE %s;') is None
+
+    @announce
+    def test_index_name(self):
+        assert index_name('datasource', ('name',)) == 'datasource_name_idx'
+        assert len(index_name('t' * 60, ('c' * 20,))) == 63
+
+
+class DirectConnection:
+
+    def __init__(self, credentials):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, type, value, traceback):
+        pass
+
+
+class FakeDatabase:
+    """Answers the validity query with valid, or no rows for None."""
+
+    def __init__(self, valid):
+        self.valid = valid
+        self.queries = []
+
+    def execute(self, sequel, connection):
+        self.queries.append(sequel.name)
+        rows = [] if self.valid is None else [(self.valid,)]
+        return Response(fetchall=rows)
+
+
+@pytest.mark.indexing
+class IndexBuilderTests:
+
+    @pytest.mark.parametrize('valid, queries, created', [
+        (None, ['index_validity', 'create_index'], True),
+        (False, ['index_validity', 'delete_index', 'create_index'], True),
+        (True, ['index_validity'], False)])
+    @announce
+    def test_invalid_index_rebuilt(self, monkeypatch, valid, queries,
+                                   created):
+        monkeypatch.setattr('src.infrastructure.data.indexing.'
+                            'DirectConnection', DirectConnection)
+        builder = IndexBuilder(credentials=None)
+        builder._database = FakeDatabase(valid)
+        proposal = IndexProposal('ctgov', 'facilities', ('nct_id',),
+                                 'join key')
+        result = builder._create(proposal)
+        assert builder._database.queries == queries
+        assert result['created'] is created
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+# -*- coding:utf-8 -*-
+# =========================================================================== #
+# Project  : Drug Approval Analytics                                          #
+# Version  : 0.1.0                                                            #
+# File     : \tests\test_infrastructure_layer\test_pagination.py              #
+# Language : Python 3.9.5                                                     #
+# --------------------------------------------------------------------------  #
+# Author   : John James                                                       #
+# Company  : nov8.ai                                                          #
+# Email    : john.james@nov8.ai                                               #
+# URL      : https://github.com/john-james-sf/drug-approval-analytics         #
+# --------------------------------------------------------------------------  #
+# Created  : Monday, October 19th 2026, 9:24:10 am                            #
+# Modified : Monday, October 19th 2026, 9:24:10 am                            #
+# Modifier : John James (john.james@nov8.ai)                                  #
+# --------------------------------------------------------------------------- #
+# License  : BSD 3-clause "New" or "Revised" License                          #
+# Copyright: (c) 2021 nov8.ai                                                 #
+# =========================================================================== #
+import datetime
+
+import pytest
+
+from src.infrastructure.data.access import PGDao, KeysetCursor
+from src.infrastructure.data.database import Response
+from tests.test_utils.debugging import announce
+# --------------------------------------------------------------------------- #
+ROWS = [('NCT%05d' % i, datetime.date(2020, 1, 1 + i % 28))
+        for i in range(25)]
+
+
+class Info:
+    transaction_status = 0
+
+
+class Connection:
+    """Connection outside autocommit that counts rollbacks."""
+    autocommit = False
+    info = Info()
+    rollbacks = 0
+
+    def rollback(self):
+        self.rollbacks += 1
+
+
+class Table:
+    """Answers page sequels from ROWS."""
+
+    def __init__(self):
+        self.pages = 0
+
+    def execute(self, sequel, connection):
+        self.pages += 1
+        *filters, limit = sequel.params
+        after = filters[-1] if filters else ''
+        rows = [r for r in ROWS if r[0] > after][:limit]
+        return Response(fetchall=rows, description=[('nct_id',),
+                                                    ('start_date',)])
+
+
+def dao(connection=None) -> PGDao:
+    dao = PGDao(connection or Connection())
+    dao._command = Table()
+    return dao
+
+
+@pytest.mark.pagination
+class KeysetPaginationTests:
+
+    @announce
+    def test_paginate(self):
+        access = dao()
+        pages = list(access.paginate('studies', 'nct_id', limit=10,
+                                     schema='ctgov'))
+        assert [len(df) for df, _ in pages] == [10, 10, 5]
+        assert pages[0][1].after == ['NCT00009']
+        assert pages[-1][1].done
+        assert access._command.pages == 3
+        assert access._connection.rollbacks == 3
+
+    @announce
+    def test_cursor_resumes_elsewhere(self):
+        _, cursor = dao().read_page(KeysetCursor('studies', ['nct_id'],
+                                                 limit=10))
+        text = cursor.to_json()
+        resumed = KeysetCursor.from_json(text)
+        assert resumed == cursor
+        df, cursor = dao().read_page(resumed)
+        assert df['nct_id'].iloc[0] == 'NCT00010'
+        rest = list(dao().paginate('studies', 'nct_id', cursor=cursor))
+        assert sum(len(df) for df, _ in rest) == 5
+
+    @announce
+    def test_cursor_json(self):
+        cursor = KeysetCursor('studies', ['start_date', 'nct_id'],
+                              filters=[('phase', ['Phase 1', 'Phase 2'])],
+                              after=[datetime.date(2020, 1, 5), 'NCT01'])
+        resumed = KeysetCursor.from_json(cursor.to_json())
+        assert resumed.after == ['2020-01-05', 'NCT01']
+        assert resumed.filters == [('phase', ['Phase 1', 'Phase 2'])]
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+# -*- coding:utf-8 -*-
+# =========================================================================== #
+# Project  : Drug Approval Analytics                                          #
+# Version  : 0.1.0                                                            #
+# File     : \tests\test_infrastructure_layer\test_querylog.py                #
+# Language : Python 3.9.5                                                     #
+# --------------------------------------------------------------------------  #
+# Author   : John James                                                       #
+# Company  : nov8.ai                                                          #
+# Email    : john.james@nov8.ai                                               #
+# URL      : https://github.com/john-james-sf/drug-approval-analytics         #
+# --------------------------------------------------------------------------  #
+# Created  : Monday, October 19th 2026, 1:06:52 am                            #
+# Modified : Monday, October 19th 2026, 1:06:52 am                            #
+# Modifier : John James (john.james@nov8.ai)                                  #
+# --------------------------------------------------------------------------- #
+# License  : BSD 3-clause "New" or "Revised" License                          #
+# Copyright: (c) 2021 nov8.ai                                                 #
+# =========================================================================== #
+import logging
+
+import pytest
+
+from src.infrastructure.data.querylog import QueryLog
+from src.infrastructure.data.sequel import Sequel, Description
+from tests.test_utils.debugging import announce
+# --------------------------------------------------------------------------- #
+LOGGER = 'src.infrastructure.data.querylog'
+
+
+class Command:
+    """Counts how often it is rendered as SQL."""
+    renders = 0
+
+    def as_string(self, connection):
+        Command.renders += 1
+        return "SELECT 1"
+
+
+class Columns:
+    """Counts how often it is rendered."""
+    renders = 0
+
+    def __format__(self, spec):
+        Columns.renders += 1
+        return "a, b"
+
+
+@pytest.mark.querylog
+class DescriptionTests:
+
+    @announce
+    def test_rendered_on_demand(self):
+        Columns.renders = 0
+        description = Description("Selected {} from {}", Columns(), 'x')
+        assert Columns.renders == 0
+        assert str(description) == "Selected a, b from x"
+        assert str(description) == "Selected a, b from x"
+        assert Columns.renders == 1
+        assert description == "Selected a, b from x"
+
+
+@pytest.mark.querylog
+class QueryLogTests:
+
+    def sequel(self):
+        Columns.renders = 0
+        return Sequel(name='select', cmd=None, object_name='studies',
+                      description=Description("Selected {}", Columns()))
+
+    @announce
+    def test_slow_statement_emitted(self, caplog):
+        querylog = QueryLog(sample_rate=0, slow_ms=100)
+        with caplog.at_level(logging.INFO, logger=LOGGER):
+            querylog.record(self.sequel(), 0.5, rowcount=3)
+        assert len(caplog.records) == 1
+        fields = caplog.records[0].query
+        assert fields['statement'] == 'select'
+        assert fields['rowcount'] == 3
+        assert fields['duration_ms'] == 500
+
+    @announce
+    def test_unsampled_not_formatted(self, caplog):
+        querylog = QueryLog(sample_rate=0)
+        with caplog.at_level(logging.DEBUG, logger=LOGGER):
+            querylog.record(self.sequel(), 0.001)
+        assert not caplog.records
+        assert Columns.renders == 0
+
+    @announce
+    def test_unselected_shape_not_rendered(self):
+        Command.renders = 0
+        sequel = Sequel(name='select', cmd=Command(), object_name='studies',
+                        description='')
+        QueryLog(sample_rate=0).record(sequel, 0.001)
+        QueryLog(sample_rate=1, rate_limit=1).record(sequel, 0.001)
+        assert Command.renders == 1
+        querylog = QueryLog(sample_rate=1, rate_limit=1)
+        querylog._tokens = 0
+        querylog.record(sequel, 0.001)
+        assert Command.renders == 1 and querylog.suppressed == 1
+
+    @announce
+    def test_rate_limited(self, caplog):
+        querylog = QueryLog(sample_rate=1, rate_limit=5)
+        with caplog.at_level(logging.DEBUG, logger=LOGGER):
+            for _ in range(20):
+                querylog.record(self.sequel(), 0.001)
+        assert 5 <= len(caplog.records) < 20
+        assert querylog.suppressed == 20 - len(caplog.records)
+
+    @announce
+    def test_history_keeps_shape_not_params(self, caplog):
+        querylog = QueryLog(sample_rate=1, history=2)
+        ids = ['NCT%08d' % i for i in range(5000)]
+        sequel = Sequel(name='select', object_name='studies',
+                        cmd="SELECT *\n  FROM ctgov.studies\n"
+                            " WHERE nct_id = ANY(%s)", params=(ids,))
+        with caplog.at_level(logging.WARNING, logger=LOGGER):
+            for _ in range(3):
+                querylog.record(sequel, 0.001)
+        assert not caplog.records
+        recent = querylog.recent
+        assert len(recent) == 2
+        assert recent[0]['sql'] == \
+            "SELECT * FROM ctgov.studies WHERE nct_id = ANY(%s)"
+        assert recent[0]['parameterized']
+        assert all(not isinstance(v, (list, tuple, Sequel))
+                   for v in recent[0].values())
+
+    @announce
+    def test_no_history_samples_only_at_debug(self, caplog):
+        querylog = QueryLog(sample_rate=1, history=0)
+        with caplog.at_level(logging.INFO, logger=LOGGER):
+            querylog.record(self.sequel(), 0.001)
+        assert querylog.recent == [] and querylog.suppressed == 0
+        assert querylog._tokens == querylog.rate_limit
+
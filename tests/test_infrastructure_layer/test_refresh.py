@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+# -*- coding:utf-8 -*-
+# =========================================================================== #
+# Project  : Drug Approval Analytics                                          #
+# Version  : 0.1.0                                                            #
+# File     : \tests\test_infrastructure_layer\test_refresh.py                 #
+# Language : Python 3.9.5                                                     #
+# --------------------------------------------------------------------------  #
+# Author   : John James                                                       #
+# Company  : nov8.ai                                                          #
+# Email    : john.james@nov8.ai                                               #
+# URL      : https://github.com/john-james-sf/drug-approval-analytics         #
+# --------------------------------------------------------------------------  #
+# Created  : Monday, October 19th 2026, 6:40:52 am                            #
+# Modified : Monday, October 19th 2026, 6:40:52 am                            #
+# Modifier : John James (john.james@nov8.ai)                                  #
+# --------------------------------------------------------------------------- #
+# License  : BSD 3-clause "New" or "Revised" License                          #
+# Copyright: (c) 2021 nov8.ai                                                 #
+# =========================================================================== #
+import io
+import stat
+
+import pytest
+
+from src.infrastructure.data.refresh import SchemaRefresh, CopyStream
+from src.infrastructure.data.refresh import requalify_script
+from tests.test_utils.debugging import announce
+# --------------------------------------------------------------------------- #
+CREDENTIALS = {'user': 'rx2m', 'password': 's3cret', 'host': 'localhost',
+               'port': 5432, 'dbname': 'aact'}
+TOC = """;
+; Archive created at 2026-10-18 03:00:01 UTC
+;
+3; 2615 16386 SCHEMA - ctgov aact
+215; 1259 16387 TABLE ctgov studies aact
+216; 1259 16390 SEQUENCE ctgov studies_id_seq aact
+217; 1259 16391 TABLE public spatial_ref_sys aact
+4003; 0 16387 TABLE DATA ctgov studies aact
+4004; 0 0 SEQUENCE SET ctgov studies_id_seq aact
+3880; 2606 16400 CONSTRAINT ctgov studies studies_pkey aact
+3881; 1259 16401 INDEX ctgov index_studies_on_phase aact
+"""
+
+
+@pytest.mark.refresh
+class SchemaRefreshTests:
+
+    @announce
+    def test_requalify_script(self):
+        text = ("ALTER TABLE ONLY ctgov.studies ALTER COLUMN id SET DEFAULT "
+                "nextval('ctgov.studies_id_seq'::regclass);\n"
+                "COMMENT ON TABLE ctgov.studies IS 'see ctgov. docs';")
+        result = requalify_script(text, 'ctgov', 'ctgov_staging')
+        assert "ONLY ctgov_staging.studies" in result
+        assert "'ctgov_staging.studies_id_seq'::regclass" in result
+        assert "'see ctgov. docs'" in result
+
+    @announce
+    def test_copy_stream_stops_at_end_of_data(self):
+        lines = iter([b'NCT01\tPhase 1\n', b'NCT02\tPhase 2\n', b'\\.\n',
+                      b'SET search_path = ctgov;\n'])
+        stream = CopyStream(lines)
+        assert stream.read(4) == b'NCT0'
+        assert stream.readline() == b'1\tPhase 1\n'
+        assert stream.read() == b'NCT02\tPhase 2\n'
+        assert stream.read() == b''
+        assert stream.rows == 2
+        assert next(lines) == b'SET search_path = ctgov;\n'
+
+    @announce
+    def test_copy_stream_with_copy_expert_sized_reads(self):
+        rows = [b'%d\tname %d\n' % (i, i) for i in range(1000)]
+        stream = CopyStream(iter(rows + [b'\\.\n']))
+        out = io.BytesIO()
+        while True:
+            chunk = stream.read(8192)
+            if not chunk:
+                break
+            out.write(chunk)
+        assert out.getvalue() == b''.join(rows)
+
+    @announce
+    def test_entries_selects_live_schema(self, tmp_path):
+        binary = tmp_path / 'pg_restore'
+        binary.write_text("#!/bin/sh\ncat <<'TOC'\n{}TOC\n".format(TOC))
+        binary.chmod(binary.stat().st_mode | stat.S_IEXEC)
+        refresh = SchemaRefresh(CREDENTIALS, bindir=str(tmp_path))
+        entries = refresh.entries('aact.dmp')
+        assert len(entries) == 6
+        assert not any('SCHEMA' in e or 'public' in e for e in entries)
+        assert refresh.staging == 'ctgov_staging'
+        assert refresh.previous == 'ctgov_previous'
+        with pytest.raises(ValueError):
+            SchemaRefresh(CREDENTIALS, schema='other',
+                          bindir=str(tmp_path)).entries('aact.dmp')
@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+# -*- coding:utf-8 -*-
+# =========================================================================== #
+# Project  : Drug Approval Analytics                                          #
+# Version  : 0.1.0                                                            #
+# File     : \tests\test_infrastructure_layer\test_repository.py              #
+# Language : Python 3.9.5                                                     #
+# --------------------------------------------------------------------------  #
+# Author   : John James                                                       #
+# Company  : nov8.ai                                                          #
+# Email    : john.james@nov8.ai                                               #
+# URL      : https://github.com/john-james-sf/drug-approval-analytics         #
+# --------------------------------------------------------------------------  #
+# Created  : Monday, October 19th 2026, 10:31:48 am                           #
+# Modified : Monday, October 19th 2026, 10:31:48 am                           #
+# Modifier : John James (john.james@nov8.ai)                                  #
+# --------------------------------------------------------------------------- #
+# License  : BSD 3-clause "New" or "Revised" License                          #
+# Copyright: (c) 2021 nov8.ai                                                 #
+# =========================================================================== #
+import math
+
+import pandas as pd
+import pytest
+
+from src.infrastructure.data.repository import (
+    DataSource, DataSourceEvent, IdentityMap, Repository)
+from tests.test_utils.debugging import announce
+# --------------------------------------------------------------------------- #
+
+
+class Dao:
+    """Counts reads and records writes."""
+
+    def __init__(self):
+        self.reads = 0
+        self.writes = []
+
+    def read(self, name, **kwargs):
+        self.reads += 1
+        return pd.DataFrame({'name': [kwargs.get('filter_value')]})
+
+    def update(self, name, **kwargs):
+        self.writes.append(('update', kwargs['column']))
+
+    def create(self, name, **kwargs):
+        self.writes.append(('create', name))
+
+    def delete(self, name, **kwargs):
+        self.writes.append(('delete', kwargs['filter_value']))
+
+
+class Context:
+
+    def __init__(self, dbname='test'):
+        self.dao = Dao()
+        self.dbname = dbname
+        self.callbacks = []
+        self.in_transaction = False
+
+    def begin_transaction(self):
+        self.in_transaction = True
+
+    def after_transaction(self, callback):
+        if not self.in_transaction:
+            callback()
+            return
+        self.callbacks.append(callback)
+
+    def save(self):
+        self.in_transaction = False
+        callbacks, self.callbacks = self.callbacks, []
+        for callback in callbacks:
+            callback()
+
+
+@pytest.fixture(autouse=True)
+def maps():
+    Repository._maps.clear()
+    yield
+    Repository._maps.clear()
+
+
+@pytest.mark.repository
+class RepositoryTests:
+
+    @announce
+    def test_identity_map_ttl(self):
+        now = [0.0]
+        identity = IdentityMap(clock=lambda: now[0])
+        identity.put('aact', 1)
+        assert identity.get('aact', ttl=10) == 1
+        now[0] = 11.0
+        assert identity.get('aact', ttl=10) != 1
+        assert identity.get('aact', ttl=math.inf) == 1
+        assert (identity.hits, identity.misses) == (2, 1)
+
+    @announce
+    def test_read_through(self):
+        context = Context()
+        datasources = DataSource(context)
+        first = datasources.read('aact')
+        assert datasources.read('aact') is first
+        assert context.dao.reads == 1
+        datasources.read()
+        datasources.read()
+        assert context.dao.reads == 2
+
+    @announce
+    def test_map_shared_per_entity_type(self):
+        context = Context()
+        first = DataSource(context).read('aact')
+        assert DataSource(context).read('aact') is first
+        DataSourceEvent(context).read('aact')
+        DataSource(Context('other')).read('aact')
+        assert context.dao.reads == 2
+
+    @announce
+    def test_writes_invalidate(self):
+        context = Context()
+        datasources = DataSource(context)
+        datasources.read('aact')
+        datasources.read('drugs')
+        datasources.read()
+        datasources.update('aact', 2, [], True, None, None, 'test')
+        datasources.read('aact')
+        datasources.read('drugs')
+        datasources.read()
+        assert context.dao.reads == 5
+        datasources.delete('drugs')
+        datasources.read('drugs')
+        assert context.dao.reads == 6
+
+    @announce
+    def test_ttl_zero_disables(self):
+        context = Context()
+        events = DataSourceEvent(context, ttl=0)
+        events.read('schema_swap')
+        events.read('schema_swap')
+        assert context.dao.reads == 2
+        assert len(events.identity_map) == 0
+
+    @announce
+    def test_read_before_commit_dropped_on_commit(self):
+        writer, reader = Context(), Context()
+        writer.begin_transaction()
+        DataSource(writer).update('aact', 2, [], True, None, None, 'test')
+        # A read by another context before the commit sees the old row.
+        DataSource(reader).read('aact')
+        DataSource(reader).read('aact')
+        assert reader.dao.reads == 1
+        writer.save()
+        DataSource(reader).read('aact')
+        assert reader.dao.reads == 2
+
@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+# -*- coding:utf-8 -*-
+# =========================================================================== #
+# Project  : Drug Approval Analytics                                          #
+# Version  : 0.1.0                                                            #
+# File     : \tests\test_infrastructure_layer\test_sequel.py                  #
+# Language : Python 3.9.5                                                     #
+# --------------------------------------------------------------------------  #
+# Author   : John James                                                       #
+# Company  : nov8.ai                                                          #
+# Email    : john.james@nov8.ai                                               #
+# URL      : https://github.com/john-james-sf/drug-approval-analytics         #
+# --------------------------------------------------------------------------  #
+# Created  : Monday, October 19th 2026, 8:58:21 am                            #
+# Modified : Monday, October 19th 2026, 8:58:21 am                            #
+# Modifier : John James (john.james@nov8.ai)                                  #
+# --------------------------------------------------------------------------- #
+# License  : BSD 3-clause "New" or "Revised" License                          #
+# Copyright: (c) 2021 nov8.ai                                                 #
+# =========================================================================== #
+import datetime
+
+from psycopg2 import sql
+import pytest
+
+from src.infrastructure.data.sequel import (
+    AccessSequel, Aggregate, FeatureSequel, TableSequel)
+from tests.test_utils.debugging import announce
+# --------------------------------------------------------------------------- #
+
+
+def render(composable) -> str:
+    """Renders a composable without a connection, for comparison."""
+    if isinstance(composable, sql.Composed):
+        return ''.join(render(part) for part in composable.seq)
+    if isinstance(composable, sql.Identifier):
+        return '.'.join('"{}"'.format(s) for s in composable.strings)
+    if isinstance(composable, sql.Placeholder):
+        return '%s'
+    return composable.string
+
+
+@pytest.mark.sequel
+class AccessSequelReadTests:
+
+    @announce
+    def test_single_filter_unchanged(self):
+        sequel = AccessSequel().read('studies', 'ctgov', ['nct_id'],
+                                     filter_key='phase',
+                                     filter_value='Phase 2')
+        assert render(sequel.cmd) == \
+            'SELECT "nct_id" FROM "ctgov"."studies" WHERE "phase" = %s'
+        assert sequel.params == ('Phase 2',)
+
+    @announce
+    def test_list_value_binds_array(self):
+        ids = ['NCT%08d' % i for i in range(5000)]
+        sequel = AccessSequel().read('studies', 'ctgov',
+                                     filter_key='nct_id', filter_value=ids)
+        assert render(sequel.cmd) == \
+            'SELECT * FROM "ctgov"."studies" WHERE "nct_id" = ANY(%s)'
+        assert sequel.params == (ids,)
+
+    @announce
+    def test_conjunctive_filters(self):
+        start = datetime.date(2020, 1, 1)
+        sequel = AccessSequel().read(
+            'studies', 'ctgov', ['nct_id', 'phase'],
+            filter_key='study_type', filter_value='Interventional',
+            filters=[('phase', ('Phase 2', 'Phase 3')),
+                     ('start_date', '>=', start),
+                     ('enrollment', 'between', (10, 100)),
+                     ('overall_status', 'not in', ['Withdrawn']),
+                     ('completion_date', 'is null'),
+                     ('brief_title', 'ilike', '%cancer%')])
+        assert render(sequel.cmd) == (
+            'SELECT "nct_id", "phase" FROM "ctgov"."studies" WHERE '
+            '"study_type" = %s AND "phase" = ANY(%s) AND "start_date" >= %s '
+            'AND "enrollment" BETWEEN %s AND %s AND '
+            '"overall_status" <> ALL(%s) AND "completion_date" IS NULL AND '
+            '"brief_title" ILIKE %s')
+        assert sequel.params == ('Interventional', ['Phase 2', 'Phase 3'],
+                                 start, 10, 100, ['Withdrawn'], '%cancer%')
+
+    @announce
+    def test_dict_filters(self):
+        sequel = AccessSequel().read('datasource', 'metabase',
+                                     filters={'name': ['aact', 'drugs'],
+                                              'type': None})
+        assert render(sequel.cmd) == (
+            'SELECT * FROM "metabase"."datasource" WHERE '
+            '"name" = ANY(%s) AND "type" IS NULL')
+        assert sequel.params == (['aact', 'drugs'],)
+
+    @announce
+    def test_invalid_filters(self):
+        with pytest.raises(ValueError):
+            AccessSequel().read('studies', 'ctgov',
+                                filters=[('phase', 'matches', 'x')])
+        with pytest.raises(ValueError):
+            AccessSequel().read('studies', 'ctgov', filter_key='phase')
+
+    @announce
+    def test_page(self):
+        sequel = AccessSequel().page('studies', 'ctgov', ['nct_id'],
+                                     limit=500, columns=['phase'],
+                                     filters={'study_type': 'Interventional'})
+        assert render(sequel.cmd) == (
+            'SELECT "phase", "nct_id" FROM "ctgov"."studies" WHERE '
+            '"study_type" = %s ORDER BY "nct_id" LIMIT %s')
+        assert sequel.params == ('Interventional', 500)
+        sequel = AccessSequel().page('facilities', 'ctgov',
+                                     ['nct_id', 'id'], after=('NCT01', 7))
+        assert render(sequel.cmd) == (
+            'SELECT * FROM "ctgov"."facilities" WHERE ("nct_id", "id") > '
+            '(%s, %s) ORDER BY "nct_id", "id" LIMIT %s')
+        assert sequel.params == ('NCT01', 7, 1000)
+
+
+@pytest.mark.sequel
+class AccessSequelUpsertTests:
+
+    @announce
+    def test_upsert(self):
+        sequel = AccessSequel().upsert('datasource', 'metabase',
+                                       ['name', 'version', 'id'],
+                                       ['aact', 2, 'abc'], key=['name'])
+        assert render(sequel.cmd) == (
+            'INSERT into "metabase"."datasource" ("name", "version", "id") '
+            'values (%s, %s, %s) ON CONFLICT ("name") DO UPDATE SET '
+            '"version" = EXCLUDED."version";')
+        assert sequel.params == ('aact', 2, 'abc')
+        sequel = AccessSequel().upsert('datasource', 'metabase', ['name'],
+                                       ['aact'], key=['name'])
+        assert render(sequel.cmd).endswith('ON CONFLICT ("name") DO NOTHING;')
+
+    @announce
+    def test_merge(self):
+        sequel = AccessSequel().merge('datasource', 'metabase', 'stage_1',
+                                      ['name', 'version'], ['name'])
+        assert render(sequel.cmd) == (
+            'INSERT into "metabase"."datasource" ("name", "version") '
+            'SELECT DISTINCT ON ("name") "name", "version" FROM '
+            'pg_temp."stage_1" ORDER BY "name", ctid DESC ON CONFLICT '
+            '("name") DO UPDATE SET "version" = EXCLUDED."version";')
+
+
+@pytest.mark.sequel
+class FeatureSequelTests:
+
+    AGGREGATES = [
+        Aggregate('n_facilities', 'facilities', 'count'),
+        Aggregate('n_countries', 'facilities', 'count_distinct', 'country'),
+        Aggregate('has_placebo', 'interventions', 'flag',
+                  filter_key='intervention_type', filter_value='Placebo'),
+        Aggregate('n_drugs', 'interventions', 'count',
+                  filter_key='intervention_type', filter_value='Drug'),
+        Aggregate('first_start', 'outcomes', 'first', 'time_frame')]
+
+    @announce
+    def test_one_group_by_per_table(self):
+        sequel = FeatureSequel().study_features(self.AGGREGATES)
+        text = render(sequel.cmd)
+        assert text.count('GROUP BY') == 3
+        assert text.count('FROM "ctgov"."facilities"') == 1
+        assert text.count('FROM "ctgov"."interventions"') == 1
+        assert text.startswith('SELECT b."nct_id", ')
+        assert 'FROM "ctgov"."studies" b LEFT JOIN' in text
+
+    @announce
+    def test_defaults_filters_and_flags(self):
+        sequel = FeatureSequel().study_features(self.AGGREGATES)
+        text = render(sequel.cmd)
+        assert 'COALESCE("t0"."n_facilities", 0) AS "n_facilities"' in text
+        assert 'COALESCE("t0"."n_countries", 0)' in text
+        assert 'COALESCE("t1"."has_placebo", false)' in text
+        assert '"t2"."first_start" AS "first_start"' in text
+        assert 'bool_or("intervention_type" = %s) AS "has_placebo"' in text
+        assert ('count(*) FILTER (WHERE "intervention_type" = %s) '
+                'AS "n_drugs"') in text
+        assert sequel.params == ('Placebo', 'Drug')
+
+    @announce
+    def test_key(self):
+        sequel = FeatureSequel().study_features(
+            [Aggregate('n_sites', 'sites', 'count_distinct', 'site'),
+             Aggregate('any_site', 'sites', 'flag', filter_key='status',
+                       filter_value='open')],
+            schema='trials', base_table='trials', key='trial_id')
+        text = render(sequel.cmd)
+        assert 'nct_id' not in text
+        assert ('LEFT JOIN (SELECT "trial_id", count(DISTINCT "site") AS '
+                '"n_sites"') in text
+        assert 'GROUP BY "trial_id") "t0" ON "t0"."trial_id" = b."trial_id"' \
+            in text
+
+    @announce
+    def test_invalid_aggregates(self):
+        with pytest.raises(ValueError):
+            FeatureSequel().study_features(
+                [Aggregate('x', 'facilities', 'median', 'country')])
+        with pytest.raises(ValueError):
+            FeatureSequel().study_features(
+                [Aggregate('x', 'facilities', 'sum')])
+
+
+@pytest.mark.sequel
+class TableSequelStatementTests:
+
+    @announce
+    def test_percent_passed_through(self):
+        # psycopg2 %-formats a statement whenever params is not None, so a
+        # literal % would raise "tuple index out of range" with params=().
+        text = ("COMMENT ON COLUMN metabase.score.value IS "
+                "'Share of studies, 0-100%'")
+        sequel = TableSequel().statement('comment', 'metabase.score', text)
+        assert sequel.params is None
+        assert render(sequel.cmd) == text
+
@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+# -*- coding:utf-8 -*-
+# =========================================================================== #
+# Project  : Drug Approval Analytics                                          #
+# Version  : 0.1.0                                                            #
+# File     : \tests\test_infrastructure_layer\test_snapshot.py                #
+# Language : Python 3.9.5                                                     #
+# --------------------------------------------------------------------------  #
+# Author   : John James                                                       #
+# Company  : nov8.ai                                                          #
+# Email    : john.james@nov8.ai                                               #
+# URL      : https://github.com/john-james-sf/drug-approval-analytics         #
+# --------------------------------------------------------------------------  #
+# Created  : Monday, October 19th 2026, 5:20:16 am                            #
+# Modified : Monday, October 19th 2026, 5:20:16 am                            #
+# Modifier : John James (john.james@nov8.ai)                                  #
+# --------------------------------------------------------------------------- #
+# License  : BSD 3-clause "New" or "Revised" License                          #
+# Copyright: (c) 2021 nov8.ai                                                 #
+# =========================================================================== #
+from types import SimpleNamespace
+
+import pandas as pd
+import pytest
+
+from src.infrastructure.data.snapshot import Snapshot
+from tests.test_utils.debugging import announce
+# --------------------------------------------------------------------------- #
+DDL = "src/infrastructure/data/ddl/metabase/metadata_table_create.sql"
+
+
+def snapshot(ddl, schema='metabase', data=None):
+    config = SimpleNamespace(name='rx2m', schema=schema,
+                             create_table_ddl_filepath=ddl,
+                             table_data=data or {})
+    return Snapshot(SimpleNamespace(config=config))
+
+
+@pytest.mark.snapshot
+class SnapshotTests:
+
+    @announce
+    def test_template_name(self):
+        assert snapshot(DDL).template == 'rx2m_template'
+
+    @announce
+    def test_fingerprint(self, tmp_path):
+        df = pd.DataFrame({'name': ['aact'], 'version': [1]})
+        base = snapshot(DDL, data={'datasource': df}).fingerprint
+        assert base == snapshot(DDL, data={'datasource': df}).fingerprint
+        assert base != snapshot(DDL, schema='test',
+                                data={'datasource': df}).fingerprint
+        changed = df.assign(version=2)
+        assert base != snapshot(DDL, data={'datasource': changed}).fingerprint
+        ddl = tmp_path / 'create.sql'
+        ddl.write_text(open(DDL).read() + "\n-- changed\n")
+        assert base != snapshot(str(ddl), data={'datasource': df}).fingerprint
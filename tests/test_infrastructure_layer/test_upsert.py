@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+# -*- coding:utf-8 -*-
+# =========================================================================== #
+# Project  : Drug Approval Analytics                                          #
+# Version  : 0.1.0                                                            #
+# File     : \tests\test_infrastructure_layer\test_upsert.py                  #
+# Language : Python 3.9.5                                                     #
+# --------------------------------------------------------------------------  #
+# Author   : John James                                                       #
+# Company  : nov8.ai                                                          #
+# Email    : john.james@nov8.ai                                               #
+# URL      : https://github.com/john-james-sf/drug-approval-analytics         #
+# --------------------------------------------------------------------------  #
+# Created  : Monday, October 19th 2026, 9:51:37 am                            #
+# Modified : Monday, October 19th 2026, 9:51:37 am                            #
+# Modifier : John James (john.james@nov8.ai)                                  #
+# --------------------------------------------------------------------------- #
+# License  : BSD 3-clause "New" or "Revised" License                          #
+# Copyright: (c) 2021 nov8.ai                                                 #
+# =========================================================================== #
+from psycopg2 import extensions
+import pytest
+
+from src.infrastructure.data.access import PGDao, copy_text
+from src.infrastructure.data.database import Response
+from tests.test_utils.debugging import announce
+# --------------------------------------------------------------------------- #
+
+
+class Command:
+    """Records the sequels executed and the rows copied."""
+
+    def __init__(self):
+        self.sequels = []
+        self.copied = None
+
+    def execute(self, sequel, connection):
+        self.sequels.append(sequel.name)
+        return Response(rowcount=2)
+
+    def copy_from(self, sequel, stream, connection):
+        self.sequels.append(sequel.name)
+        self.copied = stream.read()
+        return self.copied.count('\n')
+
+
+@pytest.mark.upsert
+class UpsertTests:
+
+    @announce
+    def test_copy_text(self):
+        assert copy_text(None) == '\\N'
+        assert copy_text('a\tb\nc\\d') == 'a\\tb\\nc\\\\d'
+        assert copy_text(['x', 'y"z', None]) == '{"x","y\\\\"z",NULL}'
+        assert copy_text(3) == '3'
+
+    @announce
+    def test_upsert_many_stages_and_merges(self):
+        dao = PGDao(connection=None)
+        dao._command = Command()
+        count = dao.upsert_many('datasource', ['name', 'version'],
+                                [['aact', 1], ['fda', None], ['aact', 2]],
+                                key='name', schema='metabase')
+        assert count == 2
+        assert dao._command.sequels == ['create_staging', 'copy_from',
+                                        'merge', 'drop_staging']
+        lines = dao._command.copied.splitlines()
+        assert len(lines) == 3
+        assert lines[1].startswith('fda\t\\N\t')
+
+    @announce
+    def test_staging_dropped_on_failure(self):
+        command = Command()
+
+        def fail(sequel, stream, connection):
+            raise ValueError("copy failed")
+        command.copy_from = fail
+        dao = PGDao(connection=None)
+        dao._command = command
+        with pytest.raises(ValueError):
+            dao.upsert_many('datasource', ['name'], [['aact']], key='name')
+        assert command.sequels[-1] == 'drop_staging'
+
+    @announce
+    def test_staging_not_dropped_in_aborted_transaction(self):
+        command = Command()
+
+        def fail(sequel, stream, connection):
+            raise ValueError("copy failed")
+        command.copy_from = fail
+        info = type('Info', (), {
+            'transaction_status': extensions.TRANSACTION_STATUS_INERROR})
+        connection = type('Connection', (), {'info': info})
+        dao = PGDao(connection=connection)
+        dao._command = command
+        with pytest.raises(ValueError):
+            dao.upsert_many('datasource', ['name'], [['aact']], key='name')
+        assert command.sequels == ['create_staging']
+
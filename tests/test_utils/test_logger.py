@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+# -*- coding:utf-8 -*-
+# =========================================================================== #
+# Project  : Drug Approval Analytics                                          #
+# Version  : 0.1.0                                                            #
+# File     : \tests\test_utils\test_logger.py                                 #
+# Language : Python 3.9.5                                                     #
+# --------------------------------------------------------------------------  #
+# Author   : John James                                                       #
+# Company  : nov8.ai                                                          #
+# Email    : john.james@nov8.ai                                               #
+# URL      : https://github.com/john-james-sf/drug-approval-analytics         #
+# --------------------------------------------------------------------------  #
+# Created  : Monday, October 19th 2026, 12:21:40 am                           #
+# Modified : Monday, October 19th 2026, 12:21:40 am                           #
+# Modifier : John James (john.james@nov8.ai)                                  #
+# --------------------------------------------------------------------------- #
+# License  : BSD 3-clause "New" or "Revised" License                          #
+# Copyright: (c) 2021 nov8.ai                                                 #
+# =========================================================================== #
+import logging
+
+import pytest
+
+from src.utils.logger import exception_handler, configure_logging
+from src.utils.logger import shutdown_logging
+from tests.test_utils.debugging import announce
+# --------------------------------------------------------------------------- #
+logger = logging.getLogger(__name__)
+
+
+@exception_handler()
+def fail():
+    raise ValueError("bad value")
+
+
+@exception_handler()
+def outer():
+    return fail()
+
+
+@pytest.mark.logger
+class ExceptionHandlerTests:
+
+    @announce
+    def test_no_handlers_added(self):
+        before = len(logging.getLogger(__name__).handlers)
+        exception_handler()(lambda: None)
+        assert len(logging.getLogger(__name__).handlers) == before
+
+    @announce
+    def test_logged_once_and_reraised(self, caplog):
+        with caplog.at_level(logging.ERROR, logger=__name__):
+            with pytest.raises(ValueError):
+                outer()
+        records = [r for r in caplog.records if r.name == __name__]
+        assert len(records) == 1
+        assert "fail" in records[0].getMessage()
+        assert "bad value" in records[0].getMessage()
+
+
+@pytest.mark.logger
+class ConfigureLoggingTests:
+
+    @announce
+    def test_idempotent(self):
+        root = logging.getLogger()
+        level = root.level
+        try:
+            listener = configure_logging(logging.WARNING)
+            count = len(root.handlers)
+            assert configure_logging(logging.WARNING) is listener
+            assert len(root.handlers) == count
+        finally:
+            shutdown_logging()
+            root.setLevel(level)
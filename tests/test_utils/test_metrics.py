@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+# -*- coding:utf-8 -*-
+# =========================================================================== #
+# Project  : Drug Approval Analytics                                          #
+# Version  : 0.1.0                                                            #
+# File     : \tests\test_utils\test_metrics.py                                #
+# Language : Python 3.9.5                                                     #
+# --------------------------------------------------------------------------  #
+# Author   : John James                                                       #
+# Company  : nov8.ai                                                          #
+# Email    : john.james@nov8.ai                                               #
+# URL      : https://github.com/john-james-sf/drug-approval-analytics         #
+# --------------------------------------------------------------------------  #
+# Created  : Monday, October 19th 2026, 1:58:09 am                            #
+# Modified : Monday, October 19th 2026, 1:58:09 am                            #
+# Modifier : John James (john.james@nov8.ai)                                  #
+# --------------------------------------------------------------------------- #
+# License  : BSD 3-clause "New" or "Revised" License                          #
+# Copyright: (c) 2021 nov8.ai                                                 #
+# =========================================================================== #
+import json
+
+import pytest
+
+from src.utils.metrics import MetricsRegistry, profile, timed
+from src.utils import metrics
+from tests.test_utils.debugging import announce
+# --------------------------------------------------------------------------- #
+
+
+@pytest.mark.metrics
+class MetricsRegistryTests:
+
+    @announce
+    def test_histogram(self):
+        registry = MetricsRegistry()
+        histogram = registry.histogram('latency', 'Latency.', ('statement',),
+                                       buckets=(0.1, 1, 10))
+        for value in (0.05, 0.5, 0.5, 5):
+            histogram.observe(value, 'select')
+        assert histogram.count('select') == 4
+        assert histogram.sum('select') == pytest.approx(6.05)
+        assert histogram.quantile(0.5, 'select') == 1
+        assert histogram.quantile(1.0, 'select') == 10
+        assert registry.histogram('latency') is histogram
+
+    @announce
+    def test_prometheus(self):
+        registry = MetricsRegistry()
+        registry.counter('rows_total', 'Rows.', ('statement',)).inc(
+            'select', amount=3)
+        registry.histogram('latency', 'Latency.', ('statement',),
+                           buckets=(1,)).observe(0.5, 'select')
+        text = registry.to_prometheus()
+        assert '# TYPE rows_total counter' in text
+        assert 'rows_total{statement="select"} 3' in text
+        assert 'latency_bucket{statement="select",le="1"} 1' in text
+        assert 'latency_bucket{statement="select",le="+Inf"} 1' in text
+        assert 'latency_count{statement="select"} 1' in text
+        data = json.loads(registry.to_json())
+        assert data['rows_total']['values'] == {'select': 3}
+
+    @announce
+    def test_type_conflict(self):
+        registry = MetricsRegistry()
+        registry.counter('x')
+        with pytest.raises(ValueError):
+            registry.histogram('x')
+
+
+@pytest.mark.metrics
+class ProfileTests:
+
+    @announce
+    def test_profile_counts_queries(self):
+        with profile('stage') as stage:
+            metrics.observe_query('select', 0.25, 2, [('a', 1), ('bb', 2)])
+        assert stage.queries == 1
+        assert stage.query_seconds == pytest.approx(0.25)
+        assert stage.seconds >= 0
+        assert metrics.stage_seconds.count('stage') >= 1
+
+    @announce
+    def test_timed(self):
+        registry = MetricsRegistry()
+        histogram = registry.histogram('calls')
+
+        @timed(histogram, 'f')
+        def f(x):
+            return x * 2
+
+        assert f(2) == 4
+        assert histogram.count('f') == 1
+
+    @announce
+    def test_estimate_bytes(self):
+        rows = [('abcd', 1)] * 100
+        assert metrics.estimate_bytes(rows) == 1200